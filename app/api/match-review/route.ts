@@ -102,19 +102,23 @@ export async function DELETE(req: NextRequest) {
   const { account, kvKey } = parsed;
 
   try {
-    const { itemId } = (await req.json()) as { itemId: string };
+    const { itemId, itemIds } = (await req.json()) as { itemId?: string; itemIds?: string[] };
 
-    if (!itemId) {
-      return NextResponse.json({ error: "itemId required" }, { status: 400 });
+    // Bulk form { itemIds: [...] } removes several items in one read-modify-write
+    const ids = Array.isArray(itemIds) ? itemIds : itemId ? [itemId] : [];
+    if (ids.length === 0) {
+      return NextResponse.json({ error: "itemId or itemIds required" }, { status: 400 });
     }
 
     const data =
       (await kv.get<CompanyMatchState>(kvKey)) || { ...EMPTY_MATCH_STATE };
-    delete data.approved[itemId];
-    delete data.rejected[itemId];
-    delete data.manual[itemId];
+    for (const id of ids) {
+      delete data.approved[id];
+      delete data.rejected[id];
+      delete data.manual[id];
+    }
     await Promise.all([kv.set(kvKey, data), bumpSyncVersion(account)]);
-    return NextResponse.json({ success: true, itemId });
+    return NextResponse.json(itemIds ? { success: true, itemIds: ids } : { success: true, itemId });
   } catch (error) {
     console.error("[match-review] KV error:", error);
     return NextResponse.json({ error: "Database error" }, { status: 500 });
@@ -152,15 +152,16 @@ export async function DELETE(req: NextRequest) {
   try {
     const body = await req.json();
     const keyField = getKeyField(type);
-    const entityKey = body[keyField] as string;
-    if (!entityKey) {
-      return NextResponse.json({ error: `${keyField} required` }, { status: 400 });
+    // Bulk form { keys: [...] } removes several entries in one read-modify-write
+    const keys: string[] = Array.isArray(body.keys) ? body.keys : body[keyField] ? [body[keyField]] : [];
+    if (keys.length === 0) {
+      return NextResponse.json({ error: `${keyField} or keys required` }, { status: 400 });
     }
 
     const existing = (await kv.get<Record<string, unknown>>(kvKey)) || {};
-    delete existing[entityKey];
+    for (const key of keys) delete existing[key];
     await Promise.all([kv.set(kvKey, existing), bumpSyncVersion(account)]);
-    return NextResponse.json({ success: true });
+    return NextResponse.json({ success: true, deleted: keys.length });
   } catch (error) {
     console.error(`[org-state:${type}] KV error:`, error);
     return NextResponse.json({ error: "Database error" }, { status: 500 });
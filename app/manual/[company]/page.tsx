@@ -13,7 +13,8 @@ import {
 } from "@/lib/types";
 import { useKVState } from "@/lib/use-kv-state";
 import { useMatchReview } from "@/lib/use-match-review";
-import { buildWorkingTree } from "@/lib/build-working-tree";
+import { buildCompanyWorkingTree } from "@/lib/build-working-tree";
+import { parseViewerJson } from "@/lib/viewer-json";
 import { buildEntityList, type EntityListItem } from "@/lib/match-helpers";
 import {
   findNodeById,
@@ -55,8 +56,8 @@ export default function ManualMapPage() {
     let cancelled = false;
     setDataLoading(true);
     Promise.all([
-      fetch(`/data/${company}/manual.json`).then((r) => (r.ok ? r.json() : null)),
-      fetch(`/data/${company}/match-review.json`).then((r) => (r.ok ? r.json() : null)),
+      fetch(`/data/${company}/manual.json`).then((r) => (r.ok ? r.json() : null)).then(parseViewerJson),
+      fetch(`/data/${company}/match-review.json`).then((r) => (r.ok ? r.json() : null)).then(parseViewerJson),
     ]).then(([manual, review]) => {
       if (!cancelled) {
         setCompanyData(manual);
@@ -74,13 +75,12 @@ export default function ManualMapPage() {
     setSelectedNodeId(null);
   }, [company]);
 
-  const loading = kvLoading || dataLoading || mrLoading;
 
   // Build working tree
   const workingTree = useMemo(() => {
     if (!companyData) return null;
-    return buildWorkingTree(
-      companyData.root,
+    return buildCompanyWorkingTree(
+      companyData,
       state.manualMapOverrides,
       state.manualMapModifications,
       state.merges,
@@ -88,6 +88,23 @@ export default function ManualMapPage() {
     );
   }, [companyData, state.manualMapOverrides, state.manualMapModifications, state.merges, state.fieldEdits]);
 
+  // A decision baked into manual.json was since changed or undone: switch to the unbaked map
+  const unbakedFile = !kvLoading && companyData && !workingTree ? companyData.kvOverlay?.base : undefined;
+  useEffect(() => {
+    if (!unbakedFile) return;
+    let cancelled = false;
+    fetch(`/data/${company}/${unbakedFile}`)
+      .then((r) => (r.ok ? r.json() : null))
+      .then(parseViewerJson)
+      .then((base) => {
+        if (!cancelled && base) setCompanyData(base);
+      })
+      .catch(() => {});
+    return () => { cancelled = true; };
+  }, [company, unbakedFile]);
+
+  const loading = kvLoading || dataLoading || mrLoading || !!unbakedFile;
+
   // Build entity list for modals
   const entityList = useMemo<EntityListItem[]>(() => {
     if (!workingTree) return [];
@@ -194,8 +211,8 @@ export default function ManualMapPage() {
   const handleRefresh = useCallback(async () => {
     // Re-fetch both JSON data files AND KV state
     const [manual, review] = await Promise.all([
-      fetch(`/data/${company}/manual.json`).then((r) => (r.ok ? r.json() : null)).catch(() => null),
-      fetch(`/data/${company}/match-review.json`).then((r) => (r.ok ? r.json() : null)).catch(() => null),
+      fetch(`/data/${company}/manual.json`).then((r) => (r.ok ? r.json() : null)).then(parseViewerJson).catch(() => null),
+      fetch(`/data/${company}/match-review.json`).then((r) => (r.ok ? r.json() : null)).then(parseViewerJson).catch(() => null),
       refresh(),
     ]);
     if (manual) setCompanyData(manual);
@@ -12,7 +12,8 @@ import {
 import { useKVState } from "@/lib/use-kv-state";
 import { useMatchReview } from "@/lib/use-match-review";
 import { buildEntityList, type EntityListItem } from "@/lib/match-helpers";
-import { buildWorkingTree } from "@/lib/build-working-tree";
+import { buildCompanyWorkingTree } from "@/lib/build-working-tree";
+import { parseViewerJson } from "@/lib/viewer-json";
 import MatchReviewTable from "@/components/MatchReviewTable";
 import EntityPickerModal from "@/components/EntityPickerModal";
 import { setRefreshHandler } from "@/lib/refresh-store";
@@ -40,8 +41,8 @@ export default function MatchReviewPage() {
     let cancelled = false;
     setDataLoading(true);
     Promise.all([
-      fetch(`/data/${company}/match-review.json`).then((r) => (r.ok ? r.json() : null)),
-      fetch(`/data/${company}/manual.json`).then((r) => (r.ok ? r.json() : null)),
+      fetch(`/data/${company}/match-review.json`).then((r) => (r.ok ? r.json() : null)).then(parseViewerJson),
+      fetch(`/data/${company}/manual.json`).then((r) => (r.ok ? r.json() : null)).then(parseViewerJson),
     ]).then(([review, manual]) => {
       if (!cancelled) {
         setReviewData(review);
@@ -58,8 +59,8 @@ export default function MatchReviewPage() {
 
   const handleRefresh = useCallback(async () => {
     const [review, manual] = await Promise.all([
-      fetch(`/data/${company}/match-review.json`).then((r) => (r.ok ? r.json() : null)).catch(() => null),
-      fetch(`/data/${company}/manual.json`).then((r) => (r.ok ? r.json() : null)).catch(() => null),
+      fetch(`/data/${company}/match-review.json`).then((r) => (r.ok ? r.json() : null)).then(parseViewerJson).catch(() => null),
+      fetch(`/data/${company}/manual.json`).then((r) => (r.ok ? r.json() : null)).then(parseViewerJson).catch(() => null),
       refresh(),
     ]);
     if (review) setReviewData(review);
@@ -73,21 +74,49 @@ export default function MatchReviewPage() {
     return () => setRefreshHandler(null, false);
   }, [handleRefresh, refreshing]);
 
-  // Build entity list for picker modal
-  const entityList = useMemo<EntityListItem[]>(() => {
-    if (!companyData) return [];
-    const workingTree = buildWorkingTree(
-      companyData.root,
+  // Build working tree and entity list for picker modal
+  const workingTree = useMemo(() => {
+    if (!companyData) return null;
+    return buildCompanyWorkingTree(
+      companyData,
       state.manualMapOverrides,
       state.manualMapModifications,
       state.merges,
       state.fieldEdits
     );
-    return buildEntityList(workingTree, state.fieldEdits);
   }, [companyData, state.manualMapOverrides, state.manualMapModifications, state.merges, state.fieldEdits]);
 
+  const entityList = useMemo<EntityListItem[]>(() => {
+    if (!workingTree) return [];
+    return buildEntityList(workingTree, state.fieldEdits);
+  }, [workingTree, state.fieldEdits]);
+
+  // A decision baked into manual.json was since changed or undone: switch to the unbaked map
+  const unbakedFile = !kvLoading && companyData && !workingTree ? companyData.kvOverlay?.base : undefined;
+  useEffect(() => {
+    if (!unbakedFile) return;
+    let cancelled = false;
+    fetch(`/data/${company}/${unbakedFile}`)
+      .then((r) => (r.ok ? r.json() : null))
+      .then(parseViewerJson)
+      .then((base) => {
+        if (!cancelled && base) setCompanyData(base);
+      })
+      .catch(() => {});
+    return () => { cancelled = true; };
+  }, [company, unbakedFile]);
+
   const reviewItems = useMemo(() => reviewData?.items || [], [reviewData]);
 
+  // Build-time ranked candidates for the item being matched, resolved against the working tree
+  const entityById = useMemo(() => new Map(entityList.map((e) => [e.id, e])), [entityList]);
+  const pickerCandidates = useMemo<EntityListItem[]>(() => {
+    const item = pickerItemId ? reviewItems.find((i) => i.id === pickerItemId) : undefined;
+    return (item?.candidate_matches || [])
+      .map((c) => entityById.get(c.manual_node_id))
+      .filter((e): e is EntityListItem => !!e);
+  }, [pickerItemId, reviewItems, entityById]);
+
   // Callbacks
   const handleApprove = useCallback(
     (itemId: string, manualNode: string, manualPath: string, manualNodeId: string) => {
@@ -175,6 +204,7 @@ export default function MatchReviewPage() {
       <EntityPickerModal
         isOpen={pickerItemId !== null}
         entities={entityList}
+        candidates={pickerCandidates}
         onSelect={handleEntitySelected}
         onClose={() => setPickerItemId(null)}
       />
@@ -38,6 +38,22 @@ describe("EntityPickerModal", () => {
     expect(screen.queryByText("Cardiology")).toBeNull();
   });
 
+  it("opens on suggested candidates and searches all entities", () => {
+    render(
+      <EntityPickerModal
+        isOpen={true}
+        entities={entities}
+        candidates={[entities[2]]}
+        onSelect={vi.fn()}
+        onClose={vi.fn()}
+      />
+    );
+    expect(screen.getByText("Neurology")).toBeDefined();
+    expect(screen.queryByText("Oncology")).toBeNull();
+    fireEvent.change(screen.getByPlaceholderText("Search entities..."), { target: { value: "onc" } });
+    expect(screen.getByText("Oncology")).toBeDefined();
+  });
+
   it("calls onSelect with entity when clicked", () => {
     const onSelect = vi.fn();
     render(
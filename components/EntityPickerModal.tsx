@@ -6,11 +6,13 @@ import type { EntityListItem } from "@/lib/match-helpers";
 interface Props {
   isOpen: boolean;
   entities: EntityListItem[];
+  /** Pre-ranked suggestions, shown instead of the full list until the user searches */
+  candidates?: EntityListItem[];
   onSelect: (entity: EntityListItem) => void;
   onClose: () => void;
 }
 
-export default function EntityPickerModal({ isOpen, entities, onSelect, onClose }: Props) {
+export default function EntityPickerModal({ isOpen, entities, candidates, onSelect, onClose }: Props) {
   const [search, setSearch] = useState("");
 
   useEffect(() => {
@@ -25,13 +27,16 @@ export default function EntityPickerModal({ isOpen, entities, onSelect, onClose
 
   if (!isOpen) return null;
 
+  const suggested = !search && candidates && candidates.length > 0;
   const filtered = search
     ? entities.filter(
         (e) =>
           e.name.toLowerCase().includes(search.toLowerCase()) ||
           e.path.toLowerCase().includes(search.toLowerCase())
       )
-    : entities;
+    : suggested
+      ? candidates
+      : entities;
 
   return (
     <div
@@ -53,6 +58,11 @@ export default function EntityPickerModal({ isOpen, entities, onSelect, onClose
           />
         </div>
         <div className="overflow-y-auto flex-1">
+          {suggested && (
+            <div className="px-3 py-1.5 text-xs text-gray-500 bg-gray-50 border-b border-gray-100">
+              Suggested matches &mdash; type to search all entities
+            </div>
+          )}
           {filtered.length === 0 ? (
             <div className="p-4 text-center text-sm text-gray-400">
               No entities match &quot;{search}&quot;
@@ -5,6 +5,7 @@ import type { MatchDecisions } from "@/lib/match-helpers";
 import { getApprovedMatchesForNode } from "@/lib/match-helpers";
 import { getDisplaySize } from "@/lib/tree-ops";
 import { findNodeParent } from "@/lib/tree-ops";
+import { hasContext } from "@/lib/speaker-resolution";
 import { sanitizeUrl } from "@/lib/utils";
 
 function decodeEntities(text: string): string {
@@ -81,6 +82,7 @@ export default function EvidencePanel({
         customerName: firstSnippet?.customerName || match.speaker_name,
         internalName: firstSnippet?.internalName,
         entityName: match.gong_entity + " (approved match)",
+        context: firstSnippet?.context,
         contextBefore: firstSnippet?.contextBefore,
         contextAfter: firstSnippet?.contextAfter,
         callTitle: firstSnippet?.callTitle,
@@ -246,7 +248,7 @@ export default function EvidencePanel({
                 <div className="flex items-center justify-between mb-1">
                   <span className="text-xs text-gray-500">{s.date || ""}</span>
                   <div className="flex items-center gap-2">
-                    {s.contextBefore !== undefined && (
+                    {hasContext(s) && (
                       <button
                         onClick={() => onContextClick(s)}
                         className="text-[11px] text-gray-600 border border-gray-300 rounded px-1.5 py-0.5 hover:bg-gray-50"
@@ -43,6 +43,22 @@ describe("SnippetContextModal", () => {
     expect(body?.textContent).toContain("That sounds right.");
   });
 
+  it("renders pre-segmented speaker turns", () => {
+    const segmented: Snippet = {
+      quote: snippet.quote,
+      date: snippet.date,
+      context: {
+        speakers: ["Jane", "Alice"],
+        before: [[0, " How big is the team?"]],
+        after: [[1, " That sounds right."]],
+      },
+    };
+    render(<SnippetContextModal snippet={segmented} onClose={vi.fn()} />);
+    const body = document.querySelector("[data-testid='context-body']");
+    expect(body?.textContent).toContain("[Jane] How big is the team?");
+    expect(body?.textContent).toContain("[Alice] That sounds right.");
+  });
+
   it("renders Gong link when gongUrl present", () => {
     render(<SnippetContextModal snippet={snippet} onClose={vi.fn()} />);
     const link = screen.getByText(/open in gong/i);
@@ -2,7 +2,11 @@
 
 import { useEffect } from "react";
 import type { Snippet } from "@/lib/types";
-import { buildSpeakerMap, resolveSpeakers } from "@/lib/speaker-resolution";
+import {
+  buildSpeakerMap,
+  renderTurns,
+  resolveSpeakers,
+} from "@/lib/speaker-resolution";
 import { sanitizeUrl } from "@/lib/utils";
 
 interface Props {
@@ -22,9 +26,18 @@ export default function SnippetContextModal({ snippet, onClose }: Props) {
 
   if (!snippet) return null;
 
-  const fullContext =
-    (snippet.contextBefore || "") + snippet.quote + (snippet.contextAfter || "");
-  const speakerMap = buildSpeakerMap(fullContext, snippet);
+  let before = "";
+  let after = "";
+  if (snippet.context) {
+    before = renderTurns(snippet.context.before, snippet.context.speakers);
+    after = renderTurns(snippet.context.after, snippet.context.speakers);
+  } else {
+    const fullContext =
+      (snippet.contextBefore || "") + snippet.quote + (snippet.contextAfter || "");
+    const speakerMap = buildSpeakerMap(fullContext, snippet);
+    before = resolveSpeakers(snippet.contextBefore || "", speakerMap);
+    after = resolveSpeakers(snippet.contextAfter || "", speakerMap);
+  }
 
   return (
     <div
@@ -64,18 +77,14 @@ export default function SnippetContextModal({ snippet, onClose }: Props) {
           )}
         </div>
         <div data-testid="context-body" className="p-4 space-y-3 text-sm font-serif leading-[1.7]">
-          {snippet.contextBefore && (
-            <div className="text-gray-600 whitespace-pre-wrap">
-              {resolveSpeakers(snippet.contextBefore, speakerMap)}
-            </div>
+          {before && (
+            <div className="text-gray-600 whitespace-pre-wrap">{before}</div>
           )}
           <div className="bg-[#fef3c7] border-l-[3px] border-[#f59e0b] px-3 py-2 text-gray-900 font-medium whitespace-pre-wrap">
             {snippet.quote}
           </div>
-          {snippet.contextAfter && (
-            <div className="text-gray-600 whitespace-pre-wrap">
-              {resolveSpeakers(snippet.contextAfter, speakerMap)}
-            </div>
+          {after && (
+            <div className="text-gray-600 whitespace-pre-wrap">{after}</div>
           )}
         </div>
       </div>
@@ -16,7 +16,7 @@ interface Props {
   onSelect: (nodeId: string) => void;
 }
 
-type SortField = "name" | "type" | "leader" | "size" | "mentions" | "confidence" | "sites";
+type SortField = "name" | "type" | "leader" | "size" | "mentions" | "subtree" | "confidence" | "sites";
 type SortDir = "asc" | "desc";
 
 interface FlatEntity {
@@ -26,6 +26,7 @@ interface FlatEntity {
   leader: string;
   size: string;
   mentions: number;
+  subtree: number;
   confidence: string;
   sites: string;
   path: string;
@@ -83,6 +84,7 @@ export default function TableView({
           leader: n.displayLeaderName || n.leader?.name || "",
           size: displaySize ? String(displaySize) : "",
           mentions: evidence.totalMentions + approvedMatches.length,
+          subtree: n.rollup?.snippets ?? 0,
           confidence: evidence.confidence || "none",
           sites: n.sites?.join(", ") || "",
           path: pathParts.join(" / "),
@@ -139,6 +141,7 @@ export default function TableView({
     { key: "leader", label: "Leader" },
     { key: "size", label: "Size" },
     { key: "mentions", label: "Mentions" },
+    { key: "subtree", label: "Subtree" },
     { key: "confidence", label: "Confidence" },
     { key: "sites", label: "Sites" },
   ];
@@ -184,6 +187,7 @@ export default function TableView({
                 <td className="py-1.5 pr-3 text-gray-600">{entity.leader}</td>
                 <td className="py-1.5 pr-3 text-gray-600">{entity.size}</td>
                 <td className="py-1.5 pr-3 text-gray-600">{entity.mentions}</td>
+                <td className="py-1.5 pr-3 text-gray-600">{entity.subtree}</td>
                 <td className="py-1.5 pr-3">
                   <span
                     className={`px-1.5 py-0.5 rounded text-[10px] font-medium ${
@@ -9,7 +9,7 @@ import type {
 } from "@/lib/types";
 import type { MatchDecisions } from "@/lib/match-helpers";
 import { getApprovedMatchesForNode } from "@/lib/match-helpers";
-import { buildWorkingTree } from "@/lib/build-working-tree";
+import { buildCompanyWorkingTree } from "@/lib/build-working-tree";
 import { getDisplaySize, isDescendant } from "@/lib/tree-ops";
 
 interface Props {
@@ -49,14 +49,14 @@ export default function TreeView({
 
   const workingTree = useMemo(
     () =>
-      buildWorkingTree(
-        companyData.root,
+      buildCompanyWorkingTree(
+        companyData,
         state.manualMapOverrides,
         state.manualMapModifications,
         state.merges,
         state.fieldEdits
       ),
-    [companyData.root, state.manualMapOverrides, state.manualMapModifications, state.merges, state.fieldEdits]
+    [companyData, state.manualMapOverrides, state.manualMapModifications, state.merges, state.fieldEdits]
   );
 
   const handleEditStart = useCallback(
@@ -85,6 +85,9 @@ export default function TreeView({
     setEditingNode(null);
   }, []);
 
+  // Stale baked manual.json: the page is loading the unbaked map
+  if (!workingTree) return null;
+
   return (
     <div className="tree-container overflow-x-auto">
       <TreeNode
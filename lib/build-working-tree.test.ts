@@ -1,6 +1,7 @@
 import { describe, it, expect } from "vitest";
-import { buildWorkingTree } from "./build-working-tree";
+import { buildWorkingTree, buildCompanyWorkingTree } from "./build-working-tree";
 import type {
+  CompanyData,
   OrgNode,
   ManualMapOverride,
   CompanyModifications,
@@ -162,6 +163,41 @@ describe("buildWorkingTree", () => {
     expect(divA.children.map((c) => c.id)).toContain("new1");
   });
 
+  it("recomputes subtree rollups after a move", () => {
+    const base = makeTree();
+    const a1 = base.children[0].children[0];
+    a1.gongEvidence = {
+      snippets: [
+        { quote: "one", date: "2025-03-01", callId: "c1" },
+        { quote: "two", date: "2025-05-01", callId: "c2" },
+      ],
+      sizeMentions: [],
+      matchedContacts: [],
+      totalMentions: 2,
+      confidence: "medium",
+      status: "auto_matched",
+    };
+    // Build-time rollups: a1's evidence under Division A
+    base.rollup = { snippets: 2, matchedDescendants: 1, calls: 2 };
+    base.children[0].rollup = { snippets: 2, matchedDescendants: 1, calls: 2 };
+    const overrides: Record<string, ManualMapOverride> = {
+      a1: { originalParent: "a", newParent: "b", movedAt: "2026-01-01" },
+    };
+    const tree = buildWorkingTree(base, overrides, null, {}, {});
+    const [divA, divB] = tree.children;
+    expect(divA.rollup).toEqual({ snippets: 0, matchedDescendants: 0, calls: 0 });
+    expect(divB.rollup).toEqual({
+      snippets: 2,
+      matchedDescendants: 1,
+      calls: 2,
+      firstDate: "2025-03-01",
+      lastDate: "2025-05-01",
+    });
+    expect(tree.rollup?.snippets).toBe(2);
+    // Base data untouched
+    expect(base.children[0].rollup?.snippets).toBe(2);
+  });
+
   it("handles empty overlays", () => {
     const tree = buildWorkingTree(makeTree(), {}, null, {}, {});
     expect(tree.children).toHaveLength(2);
@@ -169,3 +205,48 @@ describe("buildWorkingTree", () => {
     expect(tree.children[1].children).toHaveLength(1);
   });
 });
+
+describe("buildCompanyWorkingTree", () => {
+  // manual.json as integrate_viewer.py --bake-kv writes it: a2 absorbed at build time
+  function makeBaked(): CompanyData {
+    const root = makeTree();
+    const a2 = root.children[0].children[1] as OrgNode & { absorbed?: boolean };
+    a2.absorbed = true;
+    return {
+      company: "Test",
+      source: "manual",
+      stats: { entities: 6, matched: 0, snippets: 0 },
+      root,
+      kvOverlay: {
+        syncVersion: "1700000000000",
+        bakedAt: "2026-01-01T00:00:00",
+        base: "manual.base.json",
+        stamps: { merges: { a: "2026-01-01T00:00:00Z" } },
+      },
+    };
+  }
+  const bakedMerges = {
+    a: { absorbed: ["a2"], mergedAt: "2026-01-01", savedAt: "2026-01-01T00:00:00Z" } as EntityMerge,
+  };
+
+  it("builds unbaked data from all overlays", () => {
+    const data = { ...makeBaked(), kvOverlay: undefined, root: makeTree() };
+    const tree = buildCompanyWorkingTree(data, {}, null, bakedMerges, {})!;
+    expect(tree.children[0].children[1].absorbed).toBe(true);
+  });
+
+  it("applies only decisions made after the build", () => {
+    const edits: Record<string, FieldEdit> = {
+      b: { name: { original: "Division B", edited: "Division Beta" } },
+    };
+    const tree = buildCompanyWorkingTree(makeBaked(), {}, null, bakedMerges, edits)!;
+    expect(tree.children[0].children[1].absorbed).toBe(true);
+    expect(tree.children[1].displayName).toBe("Division Beta");
+  });
+
+  it("returns null when a baked decision was undone or rewritten", () => {
+    expect(buildCompanyWorkingTree(makeBaked(), {}, null, {}, {})).toBeNull();
+    const rewritten = { a: { ...bakedMerges.a, savedAt: "2026-02-01T00:00:00Z" } };
+    expect(buildCompanyWorkingTree(makeBaked(), {}, null, rewritten, {})).toBeNull();
+  });
+});
@@ -2,6 +2,8 @@
 // No side effects, no global state.
 
 import type {
+  CompanyData,
+  KVOverlayMarker,
   OrgNode,
   WorkingTreeNode,
   ManualMapOverride,
@@ -9,7 +11,7 @@ import type {
   EntityMerge,
   FieldEdit,
 } from "./types";
-import { isEntityAbsorbed } from "./tree-ops";
+import { computeRollups, isEntityAbsorbed } from "./tree-ops";
 
 /**
  * Build a working tree by applying all KV overlays to the base tree.
@@ -20,6 +22,7 @@ import { isEntityAbsorbed } from "./tree-ops";
  * 3. Apply merges (mark absorbed entities)
  * 4. Apply field edits (display name/leader overrides)
  * 5. Apply move overrides (reparenting)
+ * 6. Recompute subtree rollups if 2 or 5 changed the structure
  */
 export function buildWorkingTree(
   root: OrgNode,
@@ -45,9 +48,106 @@ export function buildWorkingTree(
   // 5. Apply move overrides
   applyMoveOverrides(tree, overrides);
 
+  // 6. Build-time rollups no longer describe moved, added or deleted subtrees
+  const restructured =
+    Object.keys(overrides || {}).length > 0 ||
+    (modifications?.added?.length ?? 0) > 0 ||
+    (modifications?.deleted?.length ?? 0) > 0;
+  if (root.rollup && restructured) computeRollups(tree);
+
   return tree;
 }
 
+/**
+ * Build the working tree for a company's manual.json.
+ *
+ * A manual.json baked at build time (kvOverlay marker) already has the
+ * decisions made before the build applied; only later ones are applied here.
+ * Returns null when a baked decision has since been changed or removed: the
+ * baked tree can't be un-applied, so the caller must load the unbaked base
+ * file (kvOverlay.base) instead.
+ */
+export function buildCompanyWorkingTree(
+  data: CompanyData,
+  overrides: Record<string, ManualMapOverride>,
+  modifications: CompanyModifications | null,
+  merges: Record<string, EntityMerge>,
+  fieldEdits: Record<string, FieldEdit>
+): WorkingTreeNode | null {
+  if (!data.kvOverlay) {
+    return buildWorkingTree(data.root, overrides, modifications, merges, fieldEdits);
+  }
+  const residual = residualOverlays(data.kvOverlay, overrides, modifications, merges, fieldEdits);
+  if (!residual) return null;
+  return buildWorkingTree(
+    data.root,
+    residual.overrides,
+    residual.modifications,
+    residual.merges,
+    residual.fieldEdits
+  );
+}
+
+export interface ResidualOverlays {
+  overrides: Record<string, ManualMapOverride>;
+  modifications: CompanyModifications;
+  merges: Record<string, EntityMerge>;
+  fieldEdits: Record<string, FieldEdit>;
+}
+
+/**
+ * Overlay entries not yet baked into the tree (made after the build).
+ * Null when a baked entry is missing or its stamp differs.
+ */
+export function residualOverlays(
+  marker: KVOverlayMarker,
+  overrides: Record<string, ManualMapOverride>,
+  modifications: CompanyModifications | null,
+  merges: Record<string, EntityMerge>,
+  fieldEdits: Record<string, FieldEdit>
+): ResidualOverlays | null {
+  const residualOverrides = residualEntries(marker.stamps["manual-map-overrides"], overrides || {});
+  const residualMerges = residualEntries(marker.stamps.merges, merges || {});
+  const residualEdits = residualEntries(marker.stamps["field-edits"], fieldEdits || {});
+
+  const added = Array.isArray(modifications?.added) ? modifications.added : [];
+  const deleted = Array.isArray(modifications?.deleted) ? modifications.deleted : [];
+  const modificationStamps = marker.stamps["manual-map-modifications"] || {};
+  const current: Record<string, string> = {};
+  for (const a of added) current[`added:${a.id}`] = a.addedAt || "";
+  for (const d of deleted) current[`deleted:${d.id}`] = d.deletedAt || "";
+  for (const [key, stamp] of Object.entries(modificationStamps)) {
+    if (current[key] !== stamp) return null;
+  }
+
+  if (!residualOverrides || !residualMerges || !residualEdits) return null;
+  return {
+    overrides: residualOverrides,
+    modifications: {
+      added: added.filter((a) => !(`added:${a.id}` in modificationStamps)),
+      deleted: deleted.filter((d) => !(`deleted:${d.id}` in modificationStamps)),
+    },
+    merges: residualMerges,
+    fieldEdits: residualEdits,
+  };
+}
+
+function residualEntries<T>(
+  stamps: Record<string, string> | undefined,
+  entries: Record<string, T>
+): Record<string, T> | null {
+  const baked = stamps || {};
+  for (const [key, stamp] of Object.entries(baked)) {
+    const entry = entries[key] as { savedAt?: string } | undefined;
+    if (!entry || (entry.savedAt || "") !== stamp) return null;
+  }
+  const residual: Record<string, T> = {};
+  for (const [key, entry] of Object.entries(entries)) {
+    if (!(key in baked)) residual[key] = entry;
+  }
+  return residual;
+}
+
 function deepCloneNode(node: OrgNode): WorkingTreeNode {
   return {
     ...node,
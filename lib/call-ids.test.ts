@@ -0,0 +1,19 @@
+import { describe, it, expect } from "vitest";
+import { callKey, snippetCallKey } from "./call-ids";
+
+const FULL = "1868065fa493e4cf0b7c2d9a1e5f3b8c6d4a2e0f9b7c5d3a1e8f6b4c2d0a2f35";
+
+describe("callKey", () => {
+  it("agrees across the id forms of one call", () => {
+    expect(callKey("2025-11-12_1868065FA493")).toBe("1868065fa493");
+    expect(callKey(FULL)).toBe("1868065fa493");
+    expect(snippetCallKey({ gongUrl: `https://app.gong.io/call?id=${FULL}` })).toBe(
+      "1868065fa493"
+    );
+  });
+
+  it("keeps unparseable forms as they are", () => {
+    expect(callKey(undefined, "c1", "c2")).toBe("c1");
+    expect(snippetCallKey({})).toBeNull();
+  });
+});
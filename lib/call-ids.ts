@@ -0,0 +1,42 @@
+// One key per Gong call whichever id form a snippet carries, as
+// scripts/call_ids.py call_key() computes it. A call shows up as a dated
+// callId ("2025-11-12_1868065fa493"), a full hash, or a gongUrl
+// ("...call?id=1868065fa493e4cf..."); all give the first CALL_KEY_LENGTH
+// hash chars.
+
+const DATED_ID = /^\d{4}-\d{2}-\d{2}[_-]([0-9a-fA-F]+)$/;
+const URL_ID = /[?&]id=([0-9a-zA-Z]+)/;
+const HEX_ID = /^[0-9a-fA-F]+$/;
+
+/** Shorter hashes are too likely to collide to identify a call. */
+const MIN_PREFIX = 8;
+
+/** Hash chars of a dated snippet callId; longer hashes are cut to this. */
+const CALL_KEY_LENGTH = 12;
+
+function callHash(value: string | undefined): string | null {
+  const v = (value || "").trim();
+  if (!v) return null;
+  const hash =
+    DATED_ID.exec(v)?.[1] ?? URL_ID.exec(v)?.[1] ?? (HEX_ID.test(v) ? v : null);
+  return hash ? hash.toLowerCase() : null;
+}
+
+/** call_key(): the first form's hash prefix, else the first non-empty form. */
+export function callKey(...forms: (string | undefined)[]): string | null {
+  for (const form of forms) {
+    const hash = callHash(form);
+    if (hash && hash.length >= MIN_PREFIX) {
+      return hash.slice(0, CALL_KEY_LENGTH);
+    }
+  }
+  return forms.find((f) => f) || null;
+}
+
+/** callKey() of a snippet's callId and gongUrl. */
+export function snippetCallKey(s: {
+  callId?: string;
+  gongUrl?: string;
+}): string | null {
+  return callKey(s.callId, s.gongUrl);
+}
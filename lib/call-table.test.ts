@@ -0,0 +1,53 @@
+import { describe, it, expect } from "vitest";
+import { expandCalls } from "./call-table";
+
+const calls = [
+  {
+    callId: "2025-07-10_d7af7ddef683",
+    gongUrl: "https://app.gong.io/call?id=d7af",
+    callTitle: "Intro Call",
+    date: "2025-07-10",
+    customerName: "Kira Fahy; Shuang Chen",
+  },
+];
+
+describe("expandCalls", () => {
+  it("restores snippet and review item call fields", () => {
+    const data = expandCalls({
+      calls,
+      items: [
+        {
+          gong_entity: "Lake County",
+          call: 0,
+          all_snippets: [{ quote: "lake county", call: 0, date: "2025-07-11" }],
+        },
+      ],
+    });
+    expect(data).not.toHaveProperty("calls");
+    const item = data.items[0] as Record<string, unknown>;
+    expect(item.call_id).toBe("2025-07-10_d7af7ddef683");
+    expect(item.person_name).toBe("Kira Fahy; Shuang Chen");
+    expect(item).not.toHaveProperty("callTitle");
+    expect(item.all_snippets).toEqual([
+      { ...calls[0], quote: "lake county", date: "2025-07-11" },
+    ]);
+  });
+
+  it("keeps an item's own call fields over its row's", () => {
+    const data = expandCalls({
+      calls,
+      items: [
+        { gong_entity: "Lake County", call: 0, person_name: "Someone Else" },
+      ],
+    });
+    const item = data.items[0] as Record<string, unknown>;
+    expect(item.person_name).toBe("Someone Else");
+    expect(item.call_id).toBe("2025-07-10_d7af7ddef683");
+  });
+
+  it("passes other data through", () => {
+    const data = { items: [{ quote: "q", call: 3 }] };
+    expect(expandCalls(data)).toBe(data);
+    expect(expandCalls(null)).toBeNull();
+  });
+});
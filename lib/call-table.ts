@@ -0,0 +1,45 @@
+// Expands the compact data format (scripts/call_table.py): a file's call
+// metadata lives once in a top-level "calls" table, and snippets and
+// match-review items point at a row with "call": <index>, keeping only the
+// call fields that differ from the row. Expanding on load keeps every
+// consumer on the plain Snippet / MatchReviewItem shapes.
+
+import type { CallRecord } from "./types";
+
+/** Match-review item fields holding call metadata -> their call-table field. */
+const ITEM_CALL_FIELDS: Record<string, keyof CallRecord> = {
+  call_id: "callId",
+  gong_url: "gongUrl",
+  snippet_date: "date",
+  person_name: "customerName",
+  person_email: "customerEmail",
+  internal_name: "internalName",
+  internal_email: "internalEmail",
+};
+
+function expand(value: unknown, calls: CallRecord[]): unknown {
+  if (Array.isArray(value)) return value.map((v) => expand(v, calls));
+  if (!value || typeof value !== "object") return value;
+  const { call, ...rest } = value as Record<string, unknown>;
+  const expanded: Record<string, unknown> = {};
+  for (const [key, v] of Object.entries(rest)) expanded[key] = expand(v, calls);
+  if (typeof call !== "number" || !calls[call]) return expanded;
+  const row = calls[call];
+  if ("gong_entity" in rest) {
+    for (const [field, callField] of Object.entries(ITEM_CALL_FIELDS)) {
+      if (row[callField] !== undefined && !(field in expanded)) {
+        expanded[field] = row[callField];
+      }
+    }
+    return expanded;
+  }
+  return { ...row, ...expanded };
+}
+
+/** Data as fetched, with a compact-format calls table expanded; other data is returned as is. */
+export function expandCalls<T>(data: T): T {
+  if (!data || typeof data !== "object" || !("calls" in data)) return data;
+  const { calls, ...rest } = data as Record<string, unknown>;
+  if (!Array.isArray(calls)) return data;
+  return expand(rest, calls as CallRecord[]) as T;
+}
@@ -1,5 +1,10 @@
 import { describe, it, expect } from "vitest";
-import { buildSpeakerMap, resolveSpeakers } from "./speaker-resolution";
+import {
+  buildSpeakerMap,
+  hasContext,
+  renderTurns,
+  resolveSpeakers,
+} from "./speaker-resolution";
 
 describe("buildSpeakerMap", () => {
   it("returns empty map when no speakerId", () => {
@@ -104,3 +109,25 @@ describe("resolveSpeakers", () => {
     expect(result).toBe("[Alice] intro [Speaker A] and [Speaker B] end");
   });
 });
+
+describe("renderTurns", () => {
+  it("tags turns with speaker names and leaves untagged text as is", () => {
+    const result = renderTurns(
+      [
+        [-1, "...end of a turn "],
+        [0, ": How big is it? "],
+        [1, ": About 50."],
+      ],
+      ["Alice", "Speaker A"]
+    );
+    expect(result).toBe(
+      "...end of a turn [Alice]: How big is it? [Speaker A]: About 50."
+    );
+  });
+
+  it("detects context in either format", () => {
+    expect(hasContext({ context: { speakers: [], before: [], after: [] } })).toBe(true);
+    expect(hasContext({ contextBefore: "" })).toBe(true);
+    expect(hasContext({})).toBe(false);
+  });
+});
@@ -1,4 +1,8 @@
 // Pure functions for resolving speaker IDs to names in transcript context.
+// Data built by scripts/integrate_viewer.py --json carries pre-segmented
+// turns (Snippet.context); the regex path is kept for older data files.
+
+import type { ContextTurn } from "./types";
 
 interface SnippetSpeakerInfo {
   quote: string;
@@ -49,6 +53,23 @@ export function buildSpeakerMap(
   return speakerMap;
 }
 
+/** Whether a snippet has a context window in either format. */
+export function hasContext(snippet: {
+  context?: unknown;
+  contextBefore?: string;
+}): boolean {
+  return snippet.context !== undefined || snippet.contextBefore !== undefined;
+}
+
+/** Render pre-segmented turns as text, each tagged with its speaker's name. */
+export function renderTurns(turns: ContextTurn[], speakers: string[]): string {
+  return turns
+    .map(([speaker, text]) =>
+      speaker >= 0 ? "[" + (speakers[speaker] ?? "Speaker") + "]" + text : text
+    )
+    .join("");
+}
+
 /** Replace [Speaker N] tags with resolved names or fallback labels (A, B, C...). */
 export function resolveSpeakers(
   text: string,
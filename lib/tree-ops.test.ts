@@ -10,8 +10,15 @@ import {
   isEntityAbsorbed,
   getDisplaySize,
   getSizeOverrideKey,
+  computeRollups,
 } from "./tree-ops";
-import type { OrgNode, EntityMerge, SizeOverride } from "./types";
+import type {
+  OrgNode,
+  EntityMerge,
+  GongEvidence,
+  SizeOverride,
+  Snippet,
+} from "./types";
 
 // --- Test fixtures ---
 
@@ -297,3 +304,36 @@ describe("getSizeOverrideKey", () => {
     );
   });
 });
+
+// --- computeRollups ---
+
+describe("computeRollups", () => {
+  function evidence(snippets: Snippet[]): GongEvidence {
+    return {
+      snippets,
+      sizeMentions: [],
+      matchedContacts: [],
+      totalMentions: snippets.length,
+      confidence: "medium",
+      status: "auto_matched",
+    };
+  }
+
+  it("counts one call for mixed callId and gongUrl forms", () => {
+    const tree = makeTree();
+    tree.gongEvidence = evidence([
+      { quote: "a", date: "2025-07-10", callId: "2025-07-10_d7af7ddef683" },
+    ]);
+    tree.children[0].gongEvidence = evidence([
+      {
+        quote: "b",
+        date: "2025-07-10",
+        gongUrl: "https://app.gong.io/call?id=d7af7ddef683",
+      },
+      { quote: "c", date: "2025-07-10", callId: "d7af7ddef6831b2c99" },
+    ]);
+    expect(computeRollups(tree).calls).toBe(1);
+    expect(tree.children[0].rollup?.calls).toBe(1);
+    expect(tree.rollup?.snippets).toBe(3);
+  });
+});
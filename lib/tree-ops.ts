@@ -1,7 +1,14 @@
 // Pure tree traversal and data structure operations.
 // No global state reads — all functions accept state as parameters.
 
-import type { OrgNode, EntityMerge, SizeMention, SizeOverride } from "./types";
+import type {
+  OrgNode,
+  EntityMerge,
+  SizeMention,
+  SizeOverride,
+  SubtreeRollup,
+} from "./types";
+import { snippetCallKey } from "./call-ids";
 
 export function countNodes(node: OrgNode): number {
   let count = 1;
@@ -23,6 +30,58 @@ export function collectAllNodes(
   return result;
 }
 
+/**
+ * Recompute every node's subtree rollup in one bottom-up pass, as
+ * scripts/subtree_rollups.py does at build time. Needed only after moves,
+ * additions or deletions change what is below a node. Calls are counted by
+ * snippetCallKey(), so a callId and a gongUrl of one call are one call.
+ */
+export function computeRollups(node: OrgNode): SubtreeRollup {
+  return rollupNode(node).rollup;
+}
+
+function rollupNode(node: OrgNode): {
+  rollup: SubtreeRollup;
+  matched: number;
+  calls: Set<string>;
+} {
+  const snippets = node.gongEvidence?.snippets || [];
+  let count = snippets.length;
+  let calls = new Set<string>();
+  let first: string | undefined;
+  let last: string | undefined;
+  for (const s of snippets) {
+    const call = snippetCallKey(s);
+    if (call) calls.add(call);
+    if (s.date && (!first || s.date < first)) first = s.date;
+    if (s.date && (!last || s.date > last)) last = s.date;
+  }
+  let matchedBelow = 0;
+  for (const child of node.children) {
+    const sub = rollupNode(child);
+    count += sub.rollup.snippets;
+    matchedBelow += sub.matched;
+    let smaller = sub.calls;
+    if (smaller.size > calls.size) [calls, smaller] = [smaller, calls];
+    smaller.forEach((c) => calls.add(c));
+    const { firstDate, lastDate } = sub.rollup;
+    if (firstDate && (!first || firstDate < first)) first = firstDate;
+    if (lastDate && (!last || lastDate > last)) last = lastDate;
+  }
+  const rollup: SubtreeRollup = {
+    snippets: count,
+    matchedDescendants: matchedBelow,
+    calls: calls.size,
+  };
+  if (first) {
+    rollup.firstDate = first;
+    rollup.lastDate = last;
+  }
+  node.rollup = rollup;
+  const matchedSelf = node.gongEvidence?.status === "auto_matched" ? 1 : 0;
+  return { rollup, matched: matchedBelow + matchedSelf, calls };
+}
+
 /** Returns the canonical entity ID if this entity was absorbed, or null. */
 export function isEntityAbsorbed(
   entityId: string,
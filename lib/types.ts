@@ -23,15 +23,39 @@ export interface OrgNode {
   sites?: string[];
   notes?: string;
   gongEvidence?: GongEvidence;
+  /** Evidence totals of this node's subtree (scripts/subtree_rollups.py) */
+  rollup?: SubtreeRollup;
   children: OrgNode[];
 }
 
+export interface SubtreeRollup {
+  /** Snippets on the node and its descendants */
+  snippets: number;
+  /** Auto-matched nodes below the node */
+  matchedDescendants: number;
+  /** Distinct calls those snippets come from */
+  calls: number;
+  firstDate?: string;
+  lastDate?: string;
+}
+
+/** [speaker index into SnippetContext.speakers, or -1 before the first tag; text after the tag] */
+export type ContextTurn = [number, string];
+
+/** Context window segmented into speaker turns at build time (scripts/speaker_turns.py). */
+export interface SnippetContext {
+  speakers: string[];
+  before: ContextTurn[];
+  after: ContextTurn[];
+}
+
 export interface Snippet {
   quote: string;
   date: string;
   gongUrl?: string;
   callId?: string;
   callTitle?: string;
+  context?: SnippetContext;
   contextBefore?: string;
   contextAfter?: string;
   speakerId?: string;
@@ -55,6 +79,8 @@ export interface Contact {
 export interface MatchedEntity {
   name: string;
   confidence: ConfidenceLevel;
+  /** How the pipeline joined this auto entity to the node */
+  matchedBy?: "id" | "name" | "alias" | "local";
 }
 
 export interface GongEvidence {
@@ -69,6 +95,8 @@ export interface GongEvidence {
 }
 
 // --- Company data envelope (what manual.json looks like per company) ---
+// Files leave null and default fields out; parseViewerJson (lib/viewer-json.ts)
+// restores them on load, so these types describe the loaded shape.
 
 export interface CompanyData {
   company: string;
@@ -76,6 +104,32 @@ export interface CompanyData {
   stats: { entities: number; matched: number; snippets: number };
   dateRange?: { earliest: string; latest: string };
   root: OrgNode;
+  kvOverlay?: KVOverlayMarker;
+}
+
+/** KV decisions already applied to root at build time (integrate_viewer.py --bake-kv). */
+export interface KVOverlayMarker {
+  syncVersion: string;
+  bakedAt: string;
+  /** Unbaked manual map, next to manual.json */
+  base: string;
+  /** Per overlay type: entry key -> savedAt (modifications: "added:<id>"/"deleted:<id>" -> addedAt/deletedAt) */
+  stamps: Partial<Record<
+    "merges" | "field-edits" | "manual-map-overrides" | "manual-map-modifications",
+    Record<string, string>
+  >>;
+}
+
+/** Row of the compact format's per-file call table (integrate_viewer.py --compact-calls). */
+export interface CallRecord {
+  callId?: string;
+  gongUrl?: string;
+  callTitle?: string;
+  date?: string;
+  customerName?: string;
+  customerEmail?: string;
+  internalName?: string;
+  internalEmail?: string;
 }
 
 // --- Working tree types (enriched at runtime with overlays) ---
@@ -196,6 +250,8 @@ export interface MatchReviewItem {
     confidence?: ConfidenceLevel;
     reasoning?: string;
   } | null;
+  /** Best manual nodes for this entity, ranked at build time (entity picker suggestions) */
+  candidate_matches?: CandidateMatch[];
   confidence?: ConfidenceLevel;
   reasoning?: string;
   speaker_name?: string;
@@ -207,9 +263,18 @@ export interface MatchReviewItem {
   all_snippets?: Snippet[];
 }
 
+export interface CandidateMatch {
+  manual_node_id: string;
+  manual_node_name: string;
+  manual_node_path: string;
+  score: number;
+}
+
 export interface MatchReviewCompany {
   total_unmatched: number;
   total_with_suggestions?: number;
+  /** Entities the pipeline's local matcher matched to manual nodes (not in items) */
+  total_auto_matched?: number;
   items: MatchReviewItem[];
 }
 
@@ -0,0 +1,42 @@
+import { describe, it, expect } from "vitest";
+import { parseViewerJson } from "./viewer-json";
+import type { CompanyData } from "./types";
+
+describe("parseViewerJson", () => {
+  it("restores default node, evidence and snippet fields", () => {
+    const data = parseViewerJson({
+      company: "Roche",
+      root: {
+        id: "root",
+        name: "Roche",
+        children: [
+          { id: "leaf", name: "Leaf" },
+          {
+            id: "matched",
+            name: "Matched",
+            gongEvidence: { snippets: [{ quote: "q" }], status: "auto_matched" },
+          },
+        ],
+      },
+    } as unknown as CompanyData);
+    const [leaf, matched] = data.root.children;
+    expect(leaf.children).toEqual([]);
+    expect(leaf.level).toBe(0);
+    expect(leaf.gongEvidence?.snippets).toEqual([]);
+    expect(leaf.gongEvidence?.confidence).toBe("none");
+    expect(matched.gongEvidence?.status).toBe("auto_matched");
+    expect(matched.gongEvidence?.matchedContacts).toEqual([]);
+    expect(matched.gongEvidence?.snippets[0]).toEqual({ quote: "q", sizeMentions: [] });
+  });
+
+  it("leaves review items without default fields", () => {
+    const data = parseViewerJson({
+      items: [{ id: "a", gong_entity: "A", all_snippets: [{ quote: "q" }] }],
+    });
+    expect(data.items[0]).toEqual({
+      id: "a",
+      gong_entity: "A",
+      all_snippets: [{ quote: "q", sizeMentions: [] }],
+    });
+  });
+});
@@ -0,0 +1,78 @@
+// Normalizes per-company data files as fetched. The pipeline leaves null
+// and default fields out (scripts/sparse_json.py) and may move call
+// metadata into a calls table (scripts/call_table.py); this restores the
+// full OrgNode / GongEvidence / Snippet shapes the components expect.
+// The defaults here must match the ones in sparse_json.py.
+
+import { expandCalls } from "./call-table";
+
+type Kind = "node" | "evidence" | "snippet" | null;
+
+const NODE_DEFAULTS = {
+  level: 0,
+  sites: [],
+  notes: "",
+  children: [],
+  rollup: { snippets: 0, matchedDescendants: 0, calls: 0 },
+};
+
+const EVIDENCE_DEFAULTS = {
+  matchedEntities: [],
+  matchedContacts: [],
+  totalMentions: 0,
+  teamSizes: [],
+  sizeMentions: [],
+  snippets: [],
+  confidence: "none",
+  status: "unverified",
+};
+
+const SNIPPET_DEFAULTS = { sizeMentions: [] };
+
+const DEFAULTS: Record<string, Record<string, unknown>> = {
+  node: NODE_DEFAULTS,
+  evidence: EVIDENCE_DEFAULTS,
+  snippet: SNIPPET_DEFAULTS,
+};
+
+/** Record kind a field's value holds, per enclosing kind (null: plain data). */
+const CHILD_KINDS: Record<string, Record<string, Kind>> = {
+  null: { root: "node", all_snippets: "snippet" },
+  node: { children: "node", gongEvidence: "evidence" },
+  evidence: { snippets: "snippet" },
+  snippet: {},
+};
+
+function withDefaults(defaults: Record<string, unknown>): Record<string, unknown> {
+  const result: Record<string, unknown> = {};
+  for (const [key, value] of Object.entries(defaults)) {
+    if (Array.isArray(value)) result[key] = [];
+    else if (value && typeof value === "object") result[key] = { ...value };
+    else result[key] = value;
+  }
+  return result;
+}
+
+function fill(value: unknown, kind: Kind): unknown {
+  if (Array.isArray(value)) return value.map((v) => fill(v, kind));
+  if (!value || typeof value !== "object") return value;
+  const childKinds = CHILD_KINDS[String(kind)];
+  const result = kind ? withDefaults(DEFAULTS[kind]) : {};
+  for (const [key, v] of Object.entries(value)) {
+    result[key] = fill(v, childKinds[key] ?? null);
+  }
+  if (kind === "node" && !result.gongEvidence) {
+    result.gongEvidence = withDefaults(EVIDENCE_DEFAULTS);
+  }
+  return result;
+}
+
+/** Restore fields a sparse data file leaves out at their default. */
+export function fillDefaults<T>(data: T): T {
+  return fill(data, null) as T;
+}
+
+/** A fetched manual.json / match-review.json in the shape the viewer uses. */
+export function parseViewerJson<T>(data: T): T {
+  return fillDefaults(expandCalls(data));
+}
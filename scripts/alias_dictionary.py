@@ -0,0 +1,263 @@
+"""Per-company alias dictionary harvested from manual maps, KV merges and quotes.
+
+The same unit goes by several names: manual maps write "Pharma Research &
+Early Development (pRED)", reviewers merge "DS" into "Discovery Sciences" in
+the viewer (KV merges' aliases), and customers say "Genentech Research and
+Early Development (gRED)" on calls. This module collects those pairs into
+groups of names that denote one unit:
+
+- manual map: every node's name, its name without the parenthetical, and
+  the parenthetical acronym
+- KV merges: each canonical id's aliases, plus the names of absorbed nodes
+- quotes: "Full Name (ABC)" where ABC is the initials of the name's last
+  words (leading words that are not part of the acronym are dropped)
+
+Groups sharing a full name are one group. An acronym claimed for two
+different groups is ambiguous and dropped, except that manual and KV claims
+(made by people) win over quote claims.
+
+The dictionary is written to output/{company}/alias_dictionary.json with an
+"index" from normalized alias to group, so consumers (consolidation
+pre-merge, integrate_viewer's manual/auto join) resolve a name with one
+dict lookup.
+"""
+import json
+import re
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from entity_similarity import UnionFind, name_acronym, parenthetical_acronym
+from fetch_kv_merges import AliasIndex, normalize_entity_name
+
+# A short token that reads as an acronym ("DS", "gRED", "R&D")
+ACRONYM_FORM = re.compile(r"[A-Za-z][A-Za-z0-9&]{1,7}")
+
+# "Full Name (ABC)" in free text; the expansion is trimmed to the acronym afterwards
+QUOTE_ACRONYM_PATTERN = re.compile(
+    r"(?P<expansion>[A-Z][\w'-]*(?:\s+(?:[A-Z][\w'-]*|&|and|of|for|the))*)\s*\((?P<acronym>[A-Za-z][A-Za-z0-9&]{1,7})\)"
+)
+
+# Who made an acronym claim; people's claims win over harvested quotes
+CLAIM_PRIORITY = {"manual": 0, "kv": 0, "quote": 1}
+
+
+def is_acronym(text: str) -> bool:
+    """True for short tokens with a capital after the first letter ("DS", "gRED", "BE")."""
+    text = (text or "").strip()
+    return bool(ACRONYM_FORM.fullmatch(text)) and any(c.isupper() for c in text[1:])
+
+
+def strip_parenthetical(name: str) -> str:
+    return re.sub(r"\s*\([^)]*\)", " ", name or "").strip()
+
+
+def _expansion_for(expansion: str, acronym: str) -> str | None:
+    """Shortest tail of expansion whose initials spell the acronym, or None.
+
+    Shortest, so a leading "In" or "The" (not counted as initials) is dropped.
+    """
+    key = acronym.lower().replace("&", "")
+    words = expansion.split()
+    for start in reversed(range(len(words))):
+        if words[start][0].isupper() and name_acronym(" ".join(words[start:])) == key:
+            return " ".join(words[start:])
+    return None
+
+
+def harvest_quote_pairs(texts: Iterable[str]) -> Counter:
+    """Count (expansion, acronym) pairs stated as "Full Name (ABC)" in texts."""
+    pairs = Counter()
+    seen = set()
+    for text in texts:
+        if not text or "(" not in text or text in seen:
+            continue
+        seen.add(text)  # The same quote is often attached to several entities
+        for match in QUOTE_ACRONYM_PATTERN.finditer(text):
+            acronym = match.group("acronym")
+            if not is_acronym(acronym):
+                continue
+            expansion = _expansion_for(match.group("expansion"), acronym)
+            if expansion:
+                pairs[(expansion, acronym)] += 1
+    return pairs
+
+
+class _Builder:
+    """Groups of names; groups sharing a normalized full name or id collapse into one."""
+
+    def __init__(self):
+        self.groups = []
+        self.uf = UnionFind()
+        self.by_name = {}
+        self.by_key = {}
+        self.claims = []  # (acronym, group, origin, count)
+
+    def group(self, key: str, canonical: str, **fields) -> int:
+        if key in self.by_key:
+            index = self.by_key[key]
+            for field, value in fields.items():
+                self.groups[index][field] = self.groups[index].get(field) or value
+            return index
+        index = len(self.groups)
+        self.groups.append({"key": key, "canonical": canonical, "manual_node_id": None,
+                            "kv_canonical_id": None, "aliases": Counter(), "origins": {}, **fields})
+        self.by_key[key] = index
+        self.uf.find(index)
+        return index
+
+    def name(self, index: int, name: str, origin: str, count: int = 1):
+        normalized = normalize_entity_name(name or "")
+        if not normalized:
+            return
+        if normalized in self.by_name:
+            self.uf.union(self.by_name[normalized], index)
+        else:
+            self.by_name[normalized] = index
+        self._alias(index, name, origin, count)
+
+    def claim(self, index: int, acronym: str, origin: str, count: int = 1):
+        self.claims.append((acronym, index, origin, count))
+
+    def _alias(self, index: int, alias: str, origin: str, count: int):
+        group = self.groups[index]
+        group["aliases"][alias] += count
+        group["origins"].setdefault(alias, origin)
+
+    def build(self) -> tuple:
+        """(groups, ambiguous acronyms) after collapsing and settling acronym claims."""
+        # Attach acronyms: best-priority claims must agree on one group
+        by_acronym = {}
+        for acronym, index, origin, count in self.claims:
+            by_acronym.setdefault(acronym.lower().replace("&", ""), []).append(
+                (CLAIM_PRIORITY[origin], self.uf.find(index), acronym, origin, count))
+        ambiguous = {}
+        for key, claims in by_acronym.items():
+            best = min(priority for priority, *_ in claims)
+            owners = {root for priority, root, *_ in claims if priority == best}
+            if len(owners) > 1:
+                ambiguous[key] = sorted(self.groups[root]["canonical"] for root in owners)
+                continue
+            for priority, root, acronym, origin, count in claims:
+                if root in owners:
+                    self._alias(root, acronym, origin, count)
+
+        merged = []
+        for members in self.uf.groups():
+            members = sorted(members)
+            first = self.groups[members[0]]
+            group = {"key": first["key"], "canonical": first["canonical"],
+                     "manual_node_id": None, "kv_canonical_id": None}
+            aliases, origins = Counter(), {}
+            for index in members:
+                member = self.groups[index]
+                group["manual_node_id"] = group["manual_node_id"] or member["manual_node_id"]
+                group["kv_canonical_id"] = group["kv_canonical_id"] or member["kv_canonical_id"]
+                aliases.update(member["aliases"])
+                for alias, origin in member["origins"].items():
+                    origins.setdefault(alias, origin)
+            # A KV canonical id names the group everywhere else (viewer merges, alias hits)
+            group["key"] = group["kv_canonical_id"] or group["manual_node_id"] or group["key"]
+            group["aliases"] = [{"alias": alias, "origin": origins[alias], "count": count}
+                                for alias, count in sorted(aliases.items(), key=lambda item: (-item[1], item[0]))]
+            if len(group["aliases"]) > 1:
+                merged.append(group)
+        return merged, ambiguous
+
+
+def build_alias_dictionary(company: str, manual_root: Dict | None = None, merges: Dict | None = None,
+                           quotes: Iterable[str] = ()) -> Dict:
+    """Harvest alias groups for one company; only groups with two or more names are kept."""
+    builder = _Builder()
+
+    def collect(node):
+        name = node.get("name") or ""
+        if name and node.get("id"):
+            index = builder.group(node["id"], strip_parenthetical(name) or name, manual_node_id=node["id"])
+            builder.name(index, name, "manual")
+            builder.name(index, strip_parenthetical(name), "manual")
+            match = re.search(r"\(([^)]*)\)\s*$", name)
+            if match and parenthetical_acronym(name) and is_acronym(match.group(1)):
+                builder.claim(index, match.group(1), "manual")
+        for child in node.get("children", []):
+            collect(child)
+
+    if manual_root:
+        collect(manual_root)
+
+    for canonical_id, merge in (merges or {}).items():
+        aliases = merge.get("aliases", [])
+        index = builder.group(canonical_id, aliases[0] if aliases else canonical_id, kv_canonical_id=canonical_id)
+        for absorbed_id in merge.get("absorbed", []):
+            if absorbed_id in builder.by_key:
+                builder.uf.union(index, builder.by_key[absorbed_id])
+        for alias in aliases:
+            if is_acronym(alias):
+                builder.claim(index, alias, "kv")
+            else:
+                builder.name(index, alias, "kv")
+
+    for (expansion, acronym), count in harvest_quote_pairs(quotes).items():
+        normalized = normalize_entity_name(expansion)
+        index = builder.by_name.get(normalized)
+        if index is None:
+            index = builder.group(f"alias:{normalized}", expansion)
+            builder.name(index, expansion, "quote", count)
+        builder.claim(index, acronym, "quote", count)
+
+    groups, ambiguous = builder.build()
+    index = {}
+    for i, group in enumerate(groups):
+        for entry in group["aliases"]:
+            index.setdefault(normalize_entity_name(entry["alias"]), i)
+
+    return {
+        "company": company,
+        "generated_at": datetime.now().isoformat(),
+        "group_count": len(groups),
+        "alias_count": len(index),
+        "groups": groups,
+        "index": index,
+        "ambiguous": ambiguous,
+    }
+
+
+def save_alias_dictionary(filepath: Path, dictionary: Dict):
+    """Write alias_dictionary.json."""
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(filepath, "w") as f:
+        json.dump(dictionary, f, indent=2)
+
+
+def load_alias_dictionary(filepath: Path) -> Dict | None:
+    """Read alias_dictionary.json, or None when it has not been harvested yet."""
+    if not filepath.exists():
+        return None
+    with open(filepath) as f:
+        return json.load(f)
+
+
+def alias_group(dictionary: Dict | None, name: str) -> Dict | None:
+    """The group a name belongs to (exact normalized lookup), or None."""
+    if not dictionary:
+        return None
+    index = dictionary["index"].get(normalize_entity_name(name or ""))
+    return dictionary["groups"][index] if index is not None else None
+
+
+def aliases_of(dictionary: Dict | None, name: str) -> List[str]:
+    """Every other name of the unit a name denotes (empty when unknown)."""
+    group = alias_group(dictionary, name)
+    if not group:
+        return []
+    normalized = normalize_entity_name(name)
+    return [e["alias"] for e in group["aliases"] if normalize_entity_name(e["alias"]) != normalized]
+
+
+def add_to_alias_index(dictionary: Dict | None, index: AliasIndex) -> AliasIndex:
+    """Register every harvested alias in an AliasIndex under its group key."""
+    for group in (dictionary or {}).get("groups", []):
+        for entry in group["aliases"]:
+            index.add(entry["alias"], group["key"], origin=entry["origin"])
+    return index
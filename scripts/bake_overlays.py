@@ -0,0 +1,156 @@
+"""Apply KV review overlays to a company's manual map at build time.
+
+The viewer turns manual.json into its working tree on every page load
+(lib/build-working-tree.ts): entity additions/deletions, merges (absorbed
+flags), field edits (display name/leader) and move overrides. This module
+does the same in Python from a KV snapshot (kv_snapshot.py), so the exported
+manual.json already carries every decision made before the build.
+
+The baked file records what it contains in a "kvOverlay" marker:
+
+    {"syncVersion": "...", "bakedAt": "...", "base": "manual.base.json",
+     "stamps": {"merges": {canonicalId: savedAt}, "field-edits": {...},
+                "manual-map-overrides": {...},
+                "manual-map-modifications": {"added:<id>": addedAt, "deleted:<id>": deletedAt}}}
+
+The viewer applies only entries whose key is missing from the stamps (made
+after the build). If a stamped entry was since changed or removed, the baked
+tree cannot be un-applied and the viewer loads the unbaked base file instead.
+"""
+import copy
+from datetime import datetime
+from typing import Dict
+
+from subtree_rollups import add_rollups
+
+# org-state types the working tree is built from, in buildWorkingTree's order
+OVERLAY_TYPES = ("manual-map-modifications", "merges", "field-edits", "manual-map-overrides")
+
+# Unbaked manual map written next to the baked manual.json
+BASE_FILENAME = "manual.base.json"
+
+
+def _find(node: Dict, node_id: str) -> Dict | None:
+    if node.get("id") == node_id:
+        return node
+    for child in node.get("children", []):
+        found = _find(child, node_id)
+        if found:
+            return found
+    return None
+
+
+def _find_parent(node: Dict, node_id: str, parent: Dict | None = None) -> Dict | None:
+    if node.get("id") == node_id:
+        return parent
+    for child in node.get("children", []):
+        found = _find_parent(child, node_id, node)
+        if found:
+            return found
+    return None
+
+
+def _remove(node: Dict, node_id: str):
+    node["children"] = [c for c in node.get("children", []) if c.get("id") != node_id]
+    for child in node["children"]:
+        _remove(child, node_id)
+
+
+def _walk(node: Dict):
+    yield node
+    for child in node.get("children", []):
+        yield from _walk(child)
+
+
+def bake_working_tree(root: Dict, overrides: Dict | None = None, modifications: Dict | None = None,
+                      merges: Dict | None = None, field_edits: Dict | None = None) -> Dict:
+    """Working tree for a viewer manual root, as buildWorkingTree() would build it.
+
+    Returns a new tree; root is not modified.
+    """
+    tree = copy.deepcopy(root)
+
+    # 1. Modifications: deletions, then additions
+    modifications = modifications or {}
+    for deletion in modifications.get("deleted") or []:
+        _remove(tree, deletion["id"])
+    for addition in modifications.get("added") or []:
+        parent = _find(tree, addition["parentId"])
+        if parent:
+            parent.setdefault("children", []).append(
+                {"id": addition["id"], "name": addition["name"], "type": "team", "children": []})
+
+    # 2. Merges: absorbed entities stay in place, flagged
+    absorbed = {node_id for merge in (merges or {}).values() for node_id in merge.get("absorbed", [])}
+    # 3. Field edits: display overrides (leader edits only where there is a leader)
+    for node in _walk(tree):
+        if node.get("id") in absorbed:
+            node["absorbed"] = True
+        edit = (field_edits or {}).get(node.get("id"))
+        if not edit:
+            continue
+        if (edit.get("name") or {}).get("edited"):
+            node["displayName"] = edit["name"]["edited"]
+        if (edit.get("leaderName") or {}).get("edited") and node.get("leader"):
+            node["displayLeaderName"] = edit["leaderName"]["edited"]
+        if (edit.get("leaderTitle") or {}).get("edited") and node.get("leader"):
+            node["displayLeaderTitle"] = edit["leaderTitle"]["edited"]
+
+    # 4. Move overrides
+    for node_id, override in (overrides or {}).items():
+        node = _find(tree, node_id)
+        if not node:
+            continue
+        parent = _find_parent(tree, node_id)
+        if parent:
+            parent["children"] = [c for c in parent["children"] if c.get("id") != node_id]
+        new_parent = _find(tree, override.get("newParent"))
+        if new_parent:
+            node["originalParent"] = override.get("originalParent")
+            node["override"] = override
+            new_parent.setdefault("children", []).append(node)
+
+    return tree
+
+
+def overlay_stamps(state: Dict) -> Dict[str, Dict[str, str]]:
+    """{type: {key: stamp}} for every overlay entry; a rewrite of an entry changes its stamp.
+
+    Keyed types are stamped with the savedAt the API sets on every write;
+    modification items with their addedAt/deletedAt.
+    """
+    stamps = {}
+    for state_type in ("merges", "field-edits", "manual-map-overrides"):
+        stamps[state_type] = {key: (value or {}).get("savedAt", "")
+                              for key, value in (state.get(state_type) or {}).items()}
+    modifications = state.get("manual-map-modifications") or {}
+    stamps["manual-map-modifications"] = {
+        **{f"added:{a['id']}": a.get("addedAt", "") for a in modifications.get("added") or []},
+        **{f"deleted:{d['id']}": d.get("deletedAt", "") for d in modifications.get("deleted") or []},
+    }
+    return stamps
+
+
+def bake_company_data(company_data: Dict, snapshot: Dict) -> Dict:
+    """A viewer manual.json envelope with the snapshot's overlays applied and a kvOverlay marker."""
+    state = snapshot.get("state", {})
+    root = bake_working_tree(
+        company_data["root"],
+        overrides=state.get("manual-map-overrides"),
+        modifications=state.get("manual-map-modifications"),
+        merges=state.get("merges"),
+        field_edits=state.get("field-edits"),
+    )
+    # Moves, additions and deletions change what is below a node
+    if "rollup" in company_data["root"]:
+        add_rollups(root)
+    return {
+        **company_data,
+        "root": root,
+        "kvOverlay": {
+            "syncVersion": snapshot.get("sync_version", ""),
+            "bakedAt": datetime.now().isoformat(),
+            "base": BASE_FILENAME,
+            "stamps": overlay_stamps(state),
+        },
+    }
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass size-mention scanner against the old per-pattern loop.
+
+Reads every raw_quote from real extraction files and times:
+- legacy: six regexes per quote, first hit only (the old extract_team_size_from_text)
+- scan_text: combined pattern, every mention, one quote at a time
+- scan_texts: combined pattern, every mention, SCAN_BATCH_SIZE quotes per pass
+
+Usage:
+    python3 scripts/bench_size_mentions.py --all
+    python3 scripts/bench_size_mentions.py --company roche --repeat 5
+    python3 scripts/bench_size_mentions.py --file path/to/entities_llm_v2.json
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+from size_mentions import SCAN_BATCH_SIZE, scan_text, scan_texts
+from streaming_json import iter_json_array
+
+# The per-pattern loop replaced by size_mentions.SIZE_MENTION_PATTERN
+LEGACY_TEAM_SIZE_PATTERNS = [
+    re.compile(r'(?:about|around|approximately|roughly|close to|nearly|maybe|like|probably)?\s*(\d{1,4}(?:,\d{3})*)\s*(?:people|person|scientists|researchers|employees|team members?|members?|folks|FTEs?)', re.IGNORECASE),
+    re.compile(r'(\d{1,4})\s+of\s+us', re.IGNORECASE),
+    re.compile(r'(?:team|group|department)\s+of\s+(\d{1,4})', re.IGNORECASE),
+    re.compile(r'(\d{1,4})[\s-]person\s+(?:team|group|department)', re.IGNORECASE),
+    re.compile(r"we(?:'re| are)\s+(?:about\s+)?(\d{1,4})(?!\s*(?:year|month|day|license|seat))", re.IGNORECASE),
+    re.compile(r'(\d{1,4})\s*(?:to|-)\s*(\d{1,4})\s*(?:people|person|scientists)', re.IGNORECASE),
+]
+
+
+def legacy_team_size(text: str) -> str | None:
+    for pattern in LEGACY_TEAM_SIZE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            groups = match.groups()
+            if len(groups) == 2 and groups[1]:
+                return f"{groups[0]}-{groups[1]}"
+            return groups[0]
+    return None
+
+
+def load_quotes(filepath: Path) -> list:
+    with open(filepath) as f:
+        return [e.get("raw_quote") or e.get("quote") or "" for e in iter_json_array(f, "entities")]
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench(label: str, quotes: list, repeat: int):
+    quotes = [q for q in quotes if q]
+    chars = sum(len(q) for q in quotes)
+
+    legacy_hits = sum(1 for q in quotes if legacy_team_size(q))
+    single = [scan_text(q) for q in quotes]
+    batched = [m for i in range(0, len(quotes), SCAN_BATCH_SIZE) for m in scan_texts(quotes[i:i + SCAN_BATCH_SIZE])]
+    assert [[m["value"] for m in ms] for ms in single] == [[m["value"] for m in ms] for ms in batched]
+
+    timings = {
+        "legacy (first hit)": best_of(lambda: [legacy_team_size(q) for q in quotes], repeat),
+        "scan_text (all)": best_of(lambda: [scan_text(q) for q in quotes], repeat),
+        "scan_texts (all, batched)": best_of(
+            lambda: [scan_texts(quotes[i:i + SCAN_BATCH_SIZE]) for i in range(0, len(quotes), SCAN_BATCH_SIZE)],
+            repeat),
+    }
+
+    print(f"\n{label}: {len(quotes)} quotes, {chars / 1e6:.1f}M chars")
+    print(f"  Quotes with a size: legacy {legacy_hits}, scanner {sum(1 for ms in single if ms)}")
+    print(f"  Size mentions found: legacy {legacy_hits}, scanner {sum(len(ms) for ms in single)}")
+    baseline = timings["legacy (first hit)"]
+    for name, seconds in timings.items():
+        print(f"  {name:<28} {seconds * 1000:8.1f} ms  ({baseline / seconds:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark size-mention extraction")
+    parser.add_argument("--company", type=str, help="Company extractions to benchmark")
+    parser.add_argument("--all", action="store_true", help="Benchmark all companies")
+    parser.add_argument("--file", type=Path, action="append", default=[], help="Extraction file (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per method (best is reported)")
+    args = parser.parse_args()
+
+    files = [(str(path), path) for path in args.file]
+    if args.company or args.all:
+        from config import COMPANIES, EXTRACTIONS_DIR
+        companies = COMPANIES if args.all else [args.company]
+        files += [(c, EXTRACTIONS_DIR / c / "entities_llm_v2.json") for c in companies]
+    if not files:
+        parser.error("Specify --company, --all or --file")
+
+    for label, path in files:
+        if not path.exists():
+            print(f"  Warning: {path} not found, skipping")
+            continue
+        bench(label, load_quotes(path), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
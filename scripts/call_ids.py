@@ -0,0 +1,147 @@
+"""Resolve the several forms a Gong call id takes to one transcript key.
+
+The same call shows up as:
+
+- "2025-11-12_1868065fa493"   snippet callId: call date + 12-char hash prefix
+- "1868065fa493e4cf...2f35716" full 64-char hash
+- "https://app.gong.io/call?id=1868065fa493e4cf..."  snippet gongUrl
+
+Batch files key transcripts by their own call_id, which is usually the
+first form but has drifted over time. A plain dict lookup misses whenever a
+snippet and a batch disagree on the form. CallIdResolver keeps every known
+hash in a sorted index, so a query's hash is matched in both directions
+(a query prefix of a stored hash, or a stored prefix of a query hash) with
+one bisect plus one dict lookup per stored prefix length. When several
+calls share a prefix the date, if known, decides; otherwise the id is
+ambiguous and does not resolve.
+"""
+import bisect
+import re
+from typing import Dict, Iterable
+
+# "2025-11-12_1868065fa493" and friends
+DATED_ID = re.compile(r"^(?P<date>\d{4}-\d{2}-\d{2})[_-](?P<hash>[0-9a-fA-F]+)$")
+URL_ID = re.compile(r"[?&]id=(?P<hash>[0-9a-zA-Z]+)")
+HEX_ID = re.compile(r"^[0-9a-fA-F]+$")
+
+# Shorter hash prefixes are too likely to collide to resolve anything
+MIN_PREFIX = 8
+
+# Hash chars of a dated snippet callId, the shortest usual form; call_key() cuts longer hashes to it
+CALL_KEY_LENGTH = 12
+
+
+def parse_call_id(value: str) -> tuple:
+    """(date or None, lowercase hash or None) from any call id form."""
+    value = (value or "").strip()
+    if not value:
+        return None, None
+    match = DATED_ID.match(value)
+    if match:
+        return match.group("date"), match.group("hash").lower()
+    match = URL_ID.search(value)
+    if match:
+        return None, match.group("hash").lower()
+    if HEX_ID.match(value):
+        return None, value.lower()
+    return None, None
+
+
+def call_key(*forms: str) -> str | None:
+    """One key per call whichever id forms a record carries, to count distinct calls.
+
+    The first form with a hash gives its first CALL_KEY_LENGTH chars, so a
+    dated callId, a full hash and a gongUrl of one call agree; without any,
+    the first non-empty form is the key as is. Unlike CallIdResolver this
+    needs no transcripts; two calls sharing a CALL_KEY_LENGTH prefix (which
+    dated callIds cannot tell apart either) count as one.
+    """
+    for form in forms:
+        _, hash_ = parse_call_id(form)
+        if hash_ and len(hash_) >= MIN_PREFIX:
+            return hash_[:CALL_KEY_LENGTH]
+    return next((form for form in forms if form), None)
+
+
+def snippet_call_key(snippet: Dict) -> str | None:
+    """call_key() of a snippet's callId and gongUrl."""
+    return call_key(snippet.get("callId"), snippet.get("gongUrl"))
+
+
+class CallIdResolver:
+    """Index over the call keys of one company's transcripts."""
+
+    def __init__(self, calls: Iterable[tuple] = ()):
+        """calls: (key, other id forms...) per call, e.g. (batch call_id, gongUrl, date)."""
+        self.keys = set()
+        self.hashes = []         # (hash, key), sorted before the first lookup
+        self.sorted = True
+        self.by_hash = {}        # hash -> {keys}
+        self.lengths = set()     # distinct stored hash lengths
+        self.dates = {}          # key -> date
+        for key, *forms in calls:
+            self.add(key, *forms)
+
+    @classmethod
+    def from_transcripts(cls, transcripts: Dict) -> "CallIdResolver":
+        """Resolver over load_transcripts() output (keys plus each call's gongUrl and date)."""
+        return cls((key, data.get("gongUrl"), data.get("date")) for key, data in (transcripts or {}).items())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key: str, *forms: str):
+        if not key:
+            return
+        self.keys.add(key)
+        for form in (key,) + forms:
+            if form and re.fullmatch(r"\d{4}-\d{2}-\d{2}", form):
+                self.dates.setdefault(key, form)
+                continue
+            date, hash_ = parse_call_id(form)
+            if date:
+                self.dates.setdefault(key, date)
+            if hash_ and len(hash_) >= MIN_PREFIX and key not in self.by_hash.get(hash_, ()):
+                self.by_hash.setdefault(hash_, set()).add(key)
+                self.hashes.append((hash_, key))
+                self.sorted = False
+                self.lengths.add(len(hash_))
+
+    def _candidates(self, hash_: str) -> set:
+        if not self.sorted:
+            self.hashes.sort()
+            self.sorted = True
+        found = set()
+        # Stored hashes the query is a prefix of
+        start = bisect.bisect_left(self.hashes, (hash_,))
+        for stored, key in self.hashes[start:]:
+            if not stored.startswith(hash_):
+                break
+            found.add(key)
+        # Stored (truncated) hashes that are a prefix of the query
+        for length in self.lengths:
+            if length < len(hash_):
+                found |= self.by_hash.get(hash_[:length], set())
+        return found
+
+    def resolve(self, *forms: str, date: str | None = None) -> str | None:
+        """Transcript key for the first form that resolves to exactly one call, else None."""
+        for form in forms:
+            if not form:
+                continue
+            if form in self.keys:
+                return form
+            form_date, hash_ = parse_call_id(form)
+            if not hash_ or len(hash_) < MIN_PREFIX:
+                continue
+            found = self._candidates(hash_)
+            when = form_date or date
+            if len(found) > 1 and when:
+                found = {key for key in found if self.dates.get(key) == when}
+            if len(found) == 1:
+                return found.pop()
+        return None
+
+    def resolve_snippet(self, snippet: Dict) -> str | None:
+        """Transcript key for a snippet, from its callId, then its gongUrl."""
+        return self.resolve(snippet.get("callId"), snippet.get("gongUrl"), date=snippet.get("date"))
@@ -0,0 +1,112 @@
+"""Opt-in compact viewer JSON: call metadata in one per-file table.
+
+Every snippet repeats its call's URL, title, date and participant
+names/emails (often "Ana Alba; Bernardo Antunes; ..." strings), and every
+match-review item repeats them again under snake_case names. All of it is
+the same for every snippet from one call. In the compact format
+(integrate_viewer.py --json --compact-calls) a file carries
+
+    "calls": [{"callId", "gongUrl", "callTitle", "date",
+               "customerName", "customerEmail", "internalName", "internalEmail"}, ...]
+
+(fields omitted when unknown), one row per call as call_ids.call_key()
+identifies it, so a snippet carrying only a callId and one carrying only
+a gongUrl of the same call share a row. A row holds the first record's
+call fields plus any field a later record of the call adds. A snippet or
+item keeps only its own fields, the call fields whose value differs from
+its row, and "call": <index into calls>. Expanding a snippet is
+{...calls[call], ...snippet}; an item gets ITEM_CALL_FIELDS it does not
+carry itself filled from the row. Nothing but null fields is lost, though
+a record may gain call fields it lacked (e.g. the gongUrl of its call).
+The viewer expands the table on load (lib/call-table.ts).
+"""
+from typing import Any, Dict
+
+from call_ids import call_key
+
+# Snippet fields that are the same for every snippet of a call
+CALL_FIELDS = ("callId", "gongUrl", "callTitle", "date",
+               "customerName", "customerEmail", "internalName", "internalEmail")
+
+# Match-review item fields holding call metadata -> their call-table field
+ITEM_CALL_FIELDS = {
+    "call_id": "callId",
+    "gong_url": "gongUrl",
+    "snippet_date": "date",
+    "person_name": "customerName",
+    "person_email": "customerEmail",
+    "internal_name": "internalName",
+    "internal_email": "internalEmail",
+}
+
+
+class CallTable:
+    """Call metadata rows, one per call_key()."""
+
+    def __init__(self):
+        self.rows = []
+        self.by_call = {}
+
+    def index(self, record: Dict) -> int:
+        """Row index for record's call, adding a row or filling the row's missing fields."""
+        key = call_key(record.get("callId"), record.get("gongUrl"))
+        if key not in self.by_call:
+            self.by_call[key] = len(self.rows)
+            self.rows.append(dict(record))
+        else:
+            row = self.rows[self.by_call[key]]
+            for field, value in record.items():
+                row.setdefault(field, value)
+        return self.by_call[key]
+
+    def compact(self, data: Any) -> Any:
+        if isinstance(data, list):
+            return [self.compact(item) for item in data]
+        if not isinstance(data, dict):
+            return data
+        if "quote" in data:
+            return self._compact_record(data, {field: field for field in CALL_FIELDS})
+        compacted = {key: self.compact(value) for key, value in data.items()}
+        if "gong_entity" in data:
+            return self._compact_record(compacted, ITEM_CALL_FIELDS)
+        return compacted
+
+    def _compact_record(self, data: Dict, field_map: Dict) -> Dict:
+        record = {call_field: data[field] for field, call_field in field_map.items()
+                  if data.get(field) is not None}
+        if not (record.get("callId") or record.get("gongUrl")):
+            return data
+        index = self.index(record)
+        row = self.rows[index]
+        result = {key: value for key, value in data.items()
+                  if key not in field_map or (value is not None and value != row[field_map[key]])}
+        result["call"] = index
+        return result
+
+
+def compact_calls(data: Dict) -> Dict:
+    """Copy of a viewer JSON file with call metadata moved into a "calls" table."""
+    table = CallTable()
+    compacted = table.compact(data)
+    compacted["calls"] = table.rows
+    return compacted
+
+
+def expand_calls(data: Any, calls: list = None) -> Any:
+    """Inverse of compact_calls() (what the viewer does on load)."""
+    if calls is None and isinstance(data, dict) and "calls" in data:
+        calls = data["calls"]
+        data = {key: value for key, value in data.items() if key != "calls"}
+    if isinstance(data, list):
+        return [expand_calls(item, calls) for item in data]
+    if not isinstance(data, dict):
+        return data
+    expanded = {key: expand_calls(value, calls) for key, value in data.items() if key != "call"}
+    if "call" in data and calls:
+        row = calls[data["call"]]
+        if "gong_entity" in data:
+            expanded.update({field: row[call_field] for field, call_field in ITEM_CALL_FIELDS.items()
+                             if call_field in row and field not in expanded})
+        else:
+            expanded = {**row, **expanded}
+    return expanded
@@ -10,6 +10,10 @@ Takes raw entity extractions from Gong calls and:
 Usage:
     python3 scripts/consolidate_with_hierarchy.py --company roche
     python3 scripts/consolidate_with_hierarchy.py --all
+    python3 scripts/consolidate_with_hierarchy.py --company roche --incremental
+    python3 scripts/consolidate_with_hierarchy.py --company roche --local
+    python3 scripts/consolidate_with_hierarchy.py --company roche --no-llm
+    python3 scripts/consolidate_with_hierarchy.py --company roche --kv-snapshot
 """
 
 import json
@@ -26,10 +30,37 @@ import anthropic
 
 from adapters import normalize_extraction
 from config import COMPANIES, EXTRACTIONS_DIR, OUTPUT_DIR, RATE_LIMIT_DELAY, MODEL
-from fetch_kv_merges import fetch_merges, build_alias_lookup, normalize_entity_name
+from fetch_kv_merges import fetch_merges, build_alias_index, prefetch_merges
+from kv_snapshot import SnapshotMissing
+from alias_dictionary import add_to_alias_index, build_alias_dictionary, save_alias_dictionary
+from manual_maps import load_manual_map
+from consolidation_batching import form_batches
+from consolidation_prompts import (
+    CONSOLIDATION_SYSTEM_PROMPT, CONSOLIDATION_TASK_PROMPT, CROSS_BATCH_SYSTEM_PROMPT,
+    cached_system, encode_compact_table, encode_entity_table,
+)
+from llm_ledger import CallLedger
+from consolidation_planner import build_plan, estimate_call, expected_output_tokens, write_plan
+from hierarchical_consolidation import plan_reduce_jobs, tree_reduce
+from streaming_json import IncrementalArrayParser, iter_json_array, split_remainder
+from source_reservoir import SourceReservoir, SOURCE_RESERVOIR_SIZE
+from size_mentions import SizeMentionCollector
+from duplicate_candidates import find_duplicate_candidates, save_duplicate_candidates
+from hierarchy_rules import edges_report, propose_parent_edges, settle_by_rules
+from consolidation_merge import merge_consolidation_with_sources
+from local_consolidation import combine_consolidations, local_consolidate, premerge_entities, singleton_structures
+from incremental_consolidation import (
+    load_existing_consolidation, diff_against_existing, collect_neighbors, apply_placements,
+)
 
 BASE_DIR = Path(__file__).parent.parent
 
+# Entities per consolidation call (stays within context/output limits)
+MAX_ENTITIES_PER_CALL = 50
+
+# Output cap per consolidation call; truncated replies are split and re-requested
+CONSOLIDATION_MAX_TOKENS = 4000
+
 
 def slugify(name: str) -> str:
     """Convert entity name to URL-safe id (kebab-case)."""
@@ -42,40 +73,21 @@ def slugify(name: str) -> str:
     return slug.strip("-")
 
 
-# Team size extraction patterns (pre-compiled for performance)
-TEAM_SIZE_PATTERNS = [
-    re.compile(r'(?:about|around|approximately|roughly|close to|nearly|maybe|like|probably)?\s*(\d{1,4}(?:,\d{3})*)\s*(?:people|person|scientists|researchers|employees|team members?|members?|folks|FTEs?)', re.IGNORECASE),
-    re.compile(r'(\d{1,4})\s+of\s+us', re.IGNORECASE),
-    re.compile(r'(?:team|group|department)\s+of\s+(\d{1,4})', re.IGNORECASE),
-    re.compile(r'(\d{1,4})[\s-]person\s+(?:team|group|department)', re.IGNORECASE),
-    re.compile(r"we(?:'re| are)\s+(?:about\s+)?(\d{1,4})(?!\s*(?:year|month|day|license|seat))", re.IGNORECASE),
-    re.compile(r'(\d{1,4})\s*(?:to|-)\s*(\d{1,4})\s*(?:people|person|scientists)', re.IGNORECASE),
-]
-
-
-def extract_team_size_from_text(text: str) -> str | None:
-    """Extract team size from text using pre-compiled patterns."""
-    for pattern in TEAM_SIZE_PATTERNS:
-        match = pattern.search(text)
-        if match:
-            groups = match.groups()
-            if len(groups) == 2 and groups[1]:
-                return f"{groups[0]}-{groups[1]}"
-            return groups[0]
-    return None
-
-
-def load_raw_extractions(company: str) -> List[Dict]:
-    """Load raw entity extractions for a company."""
+def load_raw_extractions(company: str):
+    """Stream raw entity extractions for a company, one entity at a time."""
     filepath = EXTRACTIONS_DIR / company / "entities_llm_v2.json"
     if not filepath.exists():
         raise FileNotFoundError(f"Extractions not found: {filepath}")
+    return _iter_extraction_file(filepath)
+
+
+def _iter_extraction_file(filepath: Path):
     with open(filepath) as f:
-        data = json.load(f)
-    return data.get("entities", [])
+        yield from iter_json_array(f, "entities")
 
 
-def pre_aggregate_entities(raw_entities: List[Dict]) -> Dict[str, Dict]:
+def pre_aggregate_entities(raw_entities, source_limit: int = SOURCE_RESERVOIR_SIZE,
+                           stats: Dict | None = None) -> Dict[str, Dict]:
     """
     Pre-aggregate raw extractions by normalized entity name.
 
@@ -83,7 +95,13 @@ def pre_aggregate_entities(raw_entities: List[Dict]) -> Dict[str, Dict]:
     - Format A (roche): entity_type, entity_name
     - Format B (astrazeneca): type, value
 
-    Returns dict of {normalized_name: {entity_name, entity_type, sources: [...]}}
+    raw_entities may be any iterable (load_raw_extractions streams). Each name
+    keeps only its top source_limit sources by confidence and recency, plus
+    the full mention count and confidence tally. If stats is given,
+    stats["raw_extractions"] is set to the number of entities read.
+
+    Returns dict of {normalized_name: {entity_name, entity_type, mention_count,
+    source_confidence, size_mentions, sources: [...]}}
     """
     aggregated = defaultdict(lambda: {
         "entity_name": None,
@@ -92,10 +110,14 @@ def pre_aggregate_entities(raw_entities: List[Dict]) -> Dict[str, Dict]:
         "leader": None,
         "leader_title": None,
         "confidence_counts": defaultdict(int),
-        "sources": []
+        "sources": SourceReservoir(source_limit)
     })
 
+    size_collector = SizeMentionCollector()
+
+    raw_count = 0
     for e in raw_entities:
+        raw_count += 1
         # Use adapter to normalize extraction format
         normalized_entity = normalize_extraction(e)
 
@@ -130,9 +152,12 @@ def pre_aggregate_entities(raw_entities: List[Dict]) -> Dict[str, Dict]:
         if not call_ids and call_id:
             call_ids = [call_id]
 
-        # Extract team size from quote if not already found
-        if not agg["team_size"] and raw_quote:
-            agg["team_size"] = extract_team_size_from_text(raw_quote)
+        # Queue the quote for the batched size-mention scan
+        size_collector.add(normalized, raw_quote, {
+            "call_id": call_ids[0] if call_ids else None,
+            "call_date": call_date,
+            "speaker_id": speaker_id,
+        })
 
         # Preserve leader from extraction (first non-null wins)
         if not agg["leader"] and normalized_entity["leader"]:
@@ -142,7 +167,7 @@ def pre_aggregate_entities(raw_entities: List[Dict]) -> Dict[str, Dict]:
         # Create a source entry for each call_id (or one if none)
         if call_ids:
             for cid in call_ids[:3]:  # Limit to first 3 call_ids per entity
-                agg["sources"].append({
+                agg["sources"].add({
                     "call_id": cid,
                     "call_date": call_date,
                     "raw_quote": raw_quote,
@@ -150,7 +175,7 @@ def pre_aggregate_entities(raw_entities: List[Dict]) -> Dict[str, Dict]:
                     "confidence": confidence
                 })
         else:
-            agg["sources"].append({
+            agg["sources"].add({
                 "call_id": None,
                 "call_date": call_date,
                 "raw_quote": raw_quote,
@@ -158,6 +183,8 @@ def pre_aggregate_entities(raw_entities: List[Dict]) -> Dict[str, Dict]:
                 "confidence": confidence
             })
 
+    size_mentions = size_collector.results()
+
     # Finalize entity types
     for normalized, agg in aggregated.items():
         if agg["confidence_counts"]:
@@ -166,6 +193,17 @@ def pre_aggregate_entities(raw_entities: List[Dict]) -> Dict[str, Dict]:
             agg["entity_type"] = "team"
         del agg["confidence_counts"]
 
+        reservoir = agg["sources"]
+        agg["mention_count"] = reservoir.count
+        agg["source_confidence"] = dict(reservoir.confidence_counts)
+        agg["sources"] = reservoir.sources()
+
+        agg["size_mentions"] = size_mentions.get(normalized, [])
+        if agg["size_mentions"]:
+            agg["team_size"] = agg["size_mentions"][0]["value"]
+
+    if stats is not None:
+        stats["raw_extractions"] = raw_count
     return dict(aggregated)
 
 
@@ -210,18 +248,22 @@ def filter_quality_entities(aggregated: Dict[str, Dict], min_mentions: int = 1,
             continue
 
         # Filter by mention count
-        mention_count = len(agg["sources"])
+        mention_count = agg.get("mention_count", len(agg["sources"]))
         if mention_count < min_mentions:
             continue
 
-        # Determine overall confidence
-        confidences = [s.get("confidence", "medium") for s in agg["sources"]]
-        high_count = confidences.count("high")
-        medium_count = confidences.count("medium")
+        # Determine overall confidence (tally covers every mention, not just kept sources)
+        tally = agg.get("source_confidence")
+        if tally is None:
+            tally = defaultdict(int)
+            for s in agg["sources"]:
+                tally[s.get("confidence", "medium")] += 1
+        high_count = tally.get("high", 0)
+        medium_count = tally.get("medium", 0)
 
-        if high_count >= len(confidences) * 0.5:
+        if high_count >= mention_count * 0.5:
             overall_confidence = "high"
-        elif high_count + medium_count >= len(confidences) * 0.5:
+        elif high_count + medium_count >= mention_count * 0.5:
             overall_confidence = "medium"
         else:
             overall_confidence = "low"
@@ -235,6 +277,7 @@ def filter_quality_entities(aggregated: Dict[str, Dict], min_mentions: int = 1,
             "leader_title": agg.get("leader_title"),
             "mention_count": mention_count,
             "confidence": overall_confidence,
+            "size_mentions": agg.get("size_mentions", []),
             "all_sources": agg["sources"]
         })
 
@@ -244,62 +287,39 @@ def filter_quality_entities(aggregated: Dict[str, Dict], min_mentions: int = 1,
     return quality_entities
 
 
-CONSOLIDATION_SYSTEM_PROMPT = """You are an expert at consolidating organizational data extracted from sales call transcripts into a unified org chart.
-
-Your task is to analyze a list of organizational entities extracted from multiple calls and:
-
-1. IDENTIFY DUPLICATES: Find entities that refer to the same organizational unit
-   - "Discovery Sciences" and "Discovery Sciences (DS)" → same entity
-   - "BE" and "Biologics Engineering" → same entity (if evidence supports)
-   - "gRED" and "Genentech Research" → potentially same
-   - Keep the most complete/formal name as canonical
-
-2. INFER HIERARCHY: Determine parent-child relationships between entities
-   - Look for explicit statements like "X is part of Y", "X reports to Y", "X within Y"
-   - Departments typically contain teams
-   - Business units contain departments
-   - Sites are typically peers at top level (not in hierarchy with departments)
-   - Therapeutic areas may contain specific research groups
-
-3. OUTPUT: Return a JSON object with:
-   - entities: array of consolidated entities with parent_id relationships
-   - hierarchy_notes: explain your reasoning for hierarchy decisions
-   - duplicate_resolutions: document which entities you merged and why
-
-Rules:
-- If uncertain about a merge, keep entities separate
-- If hierarchy is ambiguous, leave parent_id as null
-- Confidence is "high" only if multiple sources confirm the relationship
-- All IDs must be kebab-case (lowercase, hyphens instead of spaces)"""
+# Per-call token/latency ledger, reset per company and saved beside its output
+_call_ledger = CallLedger()
 
 
-def consolidate_with_llm(company: str, entities: List[Dict], client: anthropic.Anthropic) -> Dict:
+def consolidate_with_llm(company: str, entities: List[Dict], client: anthropic.Anthropic,
+                         reference: List[Dict] | None = None) -> Dict:
     """
     Use Claude to consolidate entities and infer hierarchy.
 
-    This processes entities in batches if needed to stay within context limits.
+    Entities are grouped into batches by local name similarity (likely
+    duplicates and parent/child pairs share a batch) and sized by an
+    estimated token budget to stay within context and output limits.
+    reference: entities already placed without the LLM; each batch sees
+    its likely neighbors among them as possible parents.
     """
-    # For very large entity lists, we need to batch
-    MAX_ENTITIES_PER_CALL = 50
+    batches = form_batches(entities, max_entities=MAX_ENTITIES_PER_CALL)
 
-    if len(entities) <= MAX_ENTITIES_PER_CALL:
-        return _single_consolidation_call(company, entities, client)
+    if len(batches) <= 1:
+        return _single_consolidation_call(company, entities, client, reference=reference)
 
     # Batch processing for large lists
-    print(f"  Large entity list ({len(entities)}), processing in batches...")
+    total_batches = len(batches)
+    print(f"  Large entity list ({len(entities)}), processing in {total_batches} similarity-clustered batches...")
 
     all_consolidated = []
     all_duplicates = []
     all_notes = []
 
-    for i in range(0, len(entities), MAX_ENTITIES_PER_CALL):
-        batch = entities[i:i + MAX_ENTITIES_PER_CALL]
-        batch_num = i // MAX_ENTITIES_PER_CALL + 1
-        total_batches = (len(entities) + MAX_ENTITIES_PER_CALL - 1) // MAX_ENTITIES_PER_CALL
-
+    for batch_num, batch in enumerate(batches, start=1):
         print(f"    Batch {batch_num}/{total_batches} ({len(batch)} entities)...")
 
-        result = _single_consolidation_call(company, batch, client, batch_context=f"Batch {batch_num}/{total_batches}")
+        result = _single_consolidation_call(company, batch, client, batch_context=f"Batch {batch_num}/{total_batches}",
+                                            reference=reference)
 
         batch_entities = result.get("entities", [])
         print(f"      → Returned {len(batch_entities)} entities")
@@ -310,17 +330,9 @@ def consolidate_with_llm(company: str, entities: List[Dict], client: anthropic.A
 
         time.sleep(RATE_LIMIT_DELAY)
 
-    # Skip aggressive cross-batch consolidation - just use batch results
-    # The per-batch consolidation already handles dedup within each batch
-    if total_batches > 1:
-        print(f"  Using {len(all_consolidated)} entities from {total_batches} batches (skipping cross-batch dedup)")
-
-        return {
-            "account": company,
-            "entities": all_consolidated,
-            "hierarchy_notes": "\n\n".join(all_notes),
-            "duplicate_resolutions": all_duplicates
-        }
+    # Likely duplicates were clustered into the same batch, so per-batch
+    # consolidation handles dedup; no separate cross-batch pass
+    print(f"  Using {len(all_consolidated)} entities from {total_batches} batches")
 
     return {
         "account": company,
@@ -330,226 +342,391 @@ def consolidate_with_llm(company: str, entities: List[Dict], client: anthropic.A
     }
 
 
-def _single_consolidation_call(company: str, entities: List[Dict], client: anthropic.Anthropic, batch_context: str = "") -> Dict:
-    """Single consolidation API call."""
+def _stream_llm_call(client: anthropic.Anthropic, call_type: str, context: str, system: List[Dict],
+                     user_prompt: str, max_tokens: int = CONSOLIDATION_MAX_TOKENS, on_text=None) -> tuple:
+    """Stream one LLM call, recording tokens and latency in the call ledger.
 
-    # Prepare entity summary (without full sources to save tokens)
-    entity_summaries = []
-    for e in entities:
-        summary = {
-            "id": e["id"],
-            "entity_name": e["entity_name"],
-            "entity_type": e["entity_type"],
-            "mention_count": e["mention_count"],
-            "confidence": e["confidence"],
-            # Include a few representative quotes
-            "sample_quotes": [s["raw_quote"][:200] for s in e["all_sources"][:3]]
-        }
-        entity_summaries.append(summary)
+    Returns (response_text, stop_reason). on_text(chunk) sees text as it arrives.
+    """
+    started = time.monotonic()
+    chunks = []
+    with client.messages.stream(
+        model=MODEL,
+        max_tokens=max_tokens,
+        system=system,
+        messages=[{"role": "user", "content": user_prompt}]
+    ) as stream:
+        for text in stream.text_stream:
+            chunks.append(text)
+            if on_text:
+                on_text(text)
+        final = stream.get_final_message()
+
+    _call_ledger.record(call_type, context, final.usage, time.monotonic() - started, final.stop_reason)
+    return "".join(chunks), final.stop_reason
+
+
+def _parse_json_response(response_text: str) -> Dict | None:
+    """Parse a JSON object from an LLM reply (fenced ```json block or bare JSON)."""
+    try:
+        # Look for JSON block
+        json_match = re.search(r"```json\s*([\s\S]*?)\s*```", response_text)
+        if json_match:
+            return json.loads(json_match.group(1))
+        # Try parsing the whole response
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        return None
 
-    # Build a list of just the IDs for reference
-    input_ids = [e["id"] for e in entity_summaries]
 
-    user_prompt = f"""Process these {len(entities)} organizational entities from {company.upper()} Gong calls.
+def _consolidation_user_prompt(company: str, entities: List[Dict], batch_context: str = "",
+                               placed: List[Dict] | None = None) -> str:
+    """Per-batch user prompt for a consolidation call (static instructions are in the system prompt)."""
+    placed_section = f"""
+## Already placed from explicit quotes (do NOT output these; you may use their ids as parent_id)
+{encode_compact_table(placed)}
+""" if placed else ""
+    return f"""Process these {len(entities)} organizational entities from {company.upper()} Gong calls.
 {f"({batch_context})" if batch_context else ""}
+{placed_section}
+## Entities
+{encode_entity_table(entities)}
+
+Output {len(entities)} minus garbage entities."""
 
-Input entity IDs: {input_ids}
+
+def _single_consolidation_call(company: str, entities: List[Dict], client: anthropic.Anthropic, batch_context: str = "",
+                               reference: List[Dict] | None = None) -> Dict:
+    """Single consolidation API call."""
+
+    placed = collect_neighbors(entities, reference) if reference else None
+    user_prompt = _consolidation_user_prompt(company, entities, batch_context, placed)
+
+    # Stream the reply so complete entities survive a max_tokens cut-off
+    parser = IncrementalArrayParser("entities")
+    response_text, stop_reason = _stream_llm_call(
+        client, "consolidate", batch_context,
+        system=cached_system(CONSOLIDATION_SYSTEM_PROMPT, CONSOLIDATION_TASK_PROMPT),
+        user_prompt=user_prompt,
+        on_text=parser.feed,
+    )
+
+    if stop_reason != "max_tokens":
+        parsed = _parse_json_response(response_text)
+        if parsed is not None:
+            return parsed
+        print(f"  Warning: Could not parse LLM response as JSON (kept {len(parser.items)} complete entities)")
+        print(f"  Response: {response_text[:500]}...")
+        return {"entities": parser.items, "hierarchy_notes": "Parse error", "duplicate_resolutions": []}
+
+    # Truncated: keep what arrived, re-request only the inputs not yet covered
+    result = {"entities": list(parser.items), "hierarchy_notes": "", "duplicate_resolutions": []}
+    pieces = split_remainder(entities, parser.items)
+    print(f"  Warning: Reply truncated at max_tokens after {len(parser.items)} entities"
+          f"{f'; re-requesting {sum(len(p) for p in pieces)} remaining in {len(pieces)} parts' if pieces else ''}")
+
+    for part_num, piece in enumerate(pieces, start=1):
+        context = f"{batch_context + ', ' if batch_context else ''}remainder part {part_num}/{len(pieces)}"
+        part = _single_consolidation_call(company, piece, client, batch_context=context, reference=reference)
+        result["entities"].extend(part.get("entities", []))
+        result["duplicate_resolutions"].extend(part.get("duplicate_resolutions", []))
+        if part.get("hierarchy_notes"):
+            result["hierarchy_notes"] = "\n\n".join(n for n in [result["hierarchy_notes"], part["hierarchy_notes"]] if n)
+
+    return result
+
+
+def _cross_batch_user_prompt(company: str, entities: List[Dict], batch_context: str = "") -> str:
+    """User prompt for a cross-batch (reduce) call over compacted entities."""
+    return f"""These {company.upper()} entities were consolidated in separate batches.
+{f"({batch_context})" if batch_context else ""}
+Check for any remaining duplicates that should be merged, and for parents
+that can now be inferred because the parent entity is in this list.
 
 ## Entities
+{encode_compact_table(entities)}
+
+Return ONLY entities that change. If nothing changes, return empty arrays.
+- Merge: output the canonical entity's id and list every merged input id in original_ids
+- New parent: output the entity's id with parent_id set to another id from this list
+
 ```json
-{json.dumps(entity_summaries, indent=2)}
-```
+{{
+  "entities": [
+    {{"id": "discovery-sciences", "name": "Discovery Sciences", "type": "department", "parent_id": null, "original_ids": ["discovery-sciences", "ds"]}}
+  ],
+  "hierarchy_notes": "Cross-batch findings",
+  "duplicate_resolutions": [{{"merged_names": ["Discovery Sciences", "DS"], "canonical_name": "Discovery Sciences", "reason": "Same entity"}}]
+}}
+```"""
+
+
+def _cross_batch_consolidation(company: str, entities: List[Dict], client: anthropic.Anthropic,
+                               batch_context: str = "") -> Dict:
+    """Reduce pass: merge duplicates and fill in parents across batch outputs.
+
+    Takes compacted entities (id, name, type, parent_id) and returns only the
+    entities that change, for hierarchical_consolidation.apply_reduction().
+    """
+    user_prompt = _cross_batch_user_prompt(company, entities, batch_context)
+
+    response_text, _ = _stream_llm_call(
+        client, "cross_batch", batch_context,
+        system=cached_system(CROSS_BATCH_SYSTEM_PROMPT),
+        user_prompt=user_prompt,
+    )
+
+    parsed = _parse_json_response(response_text)
+    if parsed is None:
+        print(f"  Warning: Could not parse cross-batch response as JSON ({batch_context})")
+        return {"entities": [], "hierarchy_notes": "", "duplicate_resolutions": []}
+    return parsed
+
+
+def consolidate_with_llm_tree(company: str, entities: List[Dict], client: anthropic.Anthropic,
+                              max_workers: int = 4, reference: List[Dict] | None = None) -> Dict:
+    """
+    Hierarchical map-reduce consolidation for very large entity lists.
+
+    Batches are consolidated in parallel, then their compacted outputs are
+    cross-batch consolidated level by level until one global result remains.
+    """
+    batches = form_batches(entities, max_entities=MAX_ENTITIES_PER_CALL)
+    print(f"  Tree-reduce consolidation: {len(entities)} entities in {len(batches)} batches ({max_workers} workers)")
+
+    result = tree_reduce(
+        batches,
+        map_fn=lambda batch, context: _single_consolidation_call(company, batch, client, batch_context=context,
+                                                                 reference=reference),
+        reduce_fn=lambda compact, context: _cross_batch_consolidation(company, compact, client, batch_context=context),
+        max_workers=max_workers,
+    )
+    print(f"  Reduced to {len(result['entities'])} entities in {result['reduction_levels']} levels")
+
+    return {
+        "account": company,
+        "entities": result["entities"],
+        "hierarchy_notes": result["hierarchy_notes"],
+        "duplicate_resolutions": result["duplicate_resolutions"]
+    }
+
+
+def _placement_call(company: str, new_entities: List[Dict], neighbors: List[Dict],
+                    client: anthropic.Anthropic, batch_context: str = "") -> Dict:
+    """Place new entities relative to already-consolidated neighbors (incremental mode)."""
+    user_prompt = f"""Place these {len(new_entities)} NEW organizational entities from {company.upper()} Gong calls
+into an org chart that has already been consolidated.
+{f"({batch_context})" if batch_context else ""}
+
+## Existing consolidated entities (likely neighbors, do NOT re-output unless merging)
+{encode_compact_table(neighbors)}
+
+## New entities
+{encode_entity_table(new_entities)}
 
 ## YOUR TASK
 
-For each input entity, decide:
-1. Is it a VALID organizational unit (department, team, site, therapeutic area)?
-   - YES: Include it in output with its original ID
-   - NO (garbage/noise): Exclude it
-2. Should it be MERGED with another entity (same org unit, different name)?
-   - YES: Combine into one entry, list both IDs in original_ids
-   - NO: Keep as separate entry
-3. Can you infer its PARENT from the quotes?
-   - YES: Set parent_id to the parent's kebab-case ID
-   - NO: Set parent_id to null (this is fine!)
+For each new entity, decide:
+1. Is it a VALID organizational unit? If not, exclude it.
+2. Is it the SAME org unit as an existing entity?
+   - YES: Output an entry whose id is the EXISTING entity's id, listing the new ID(s) in original_ids
+3. Otherwise output it with its own ID and infer its PARENT from the quotes.
+   parent_id may reference an existing entity's id, another new entity's id, or be null.
 
 ## OUTPUT FORMAT
 
-Return ONLY a JSON object. No explanation text before or after.
+Return ONLY a JSON object in the same format as a full consolidation:
 
 ```json
 {{
   "entities": [
-    {{"id": "discovery-sciences", "name": "Discovery Sciences", "type": "department", "parent_id": null, "confidence": "high", "original_ids": ["discovery-sciences"]}},
-    {{"id": "oncology", "name": "Oncology", "type": "therapeutic_area", "parent_id": "discovery-sciences", "confidence": "medium", "original_ids": ["oncology", "discovery-oncology"]}}
+    {{"id": "oncology", "name": "Oncology", "type": "therapeutic_area", "parent_id": "discovery-sciences", "confidence": "medium", "original_ids": ["oncology-research"]}}
   ],
-  "hierarchy_notes": "Brief notes on hierarchy decisions",
+  "hierarchy_notes": "Brief notes on placement decisions",
   "duplicate_resolutions": [{{"merged_names": ["Name A", "Name B"], "canonical_name": "Name A", "reason": "Same entity"}}]
 }}
-```
-
-CRITICAL:
-- Output {len(entities)} minus garbage entities (expect 60-90% to be valid)
-- Every valid entity MUST appear in your output
-- If you're unsure about an entity, INCLUDE it with confidence: "low"
-- An empty entities array is WRONG unless ALL inputs are garbage"""
+```"""
 
-    response = client.messages.create(
-        model=MODEL,
-        max_tokens=4000,
-        system=CONSOLIDATION_SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": user_prompt}]
+    response_text, _ = _stream_llm_call(
+        client, "placement", batch_context,
+        system=cached_system(CONSOLIDATION_SYSTEM_PROMPT),
+        user_prompt=user_prompt,
     )
 
-    # Extract JSON from response
-    response_text = response.content[0].text
-
-    # Try to parse JSON from response
-    try:
-        # Look for JSON block
-        json_match = re.search(r"```json\s*([\s\S]*?)\s*```", response_text)
-        if json_match:
-            return json.loads(json_match.group(1))
-        # Try parsing the whole response
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        print(f"  Warning: Could not parse LLM response as JSON")
+    parsed = _parse_json_response(response_text)
+    if parsed is None:
+        print(f"  Warning: Could not parse LLM placement response as JSON")
         print(f"  Response: {response_text[:500]}...")
         return {"entities": [], "hierarchy_notes": "Parse error", "duplicate_resolutions": []}
+    return parsed
 
 
-def _cross_batch_consolidation(company: str, entities: List[Dict], client: anthropic.Anthropic) -> Dict:
-    """Light pass to merge duplicates across batches."""
+def place_new_entities(company: str, new_entities: List[Dict], existing_entities: List[Dict],
+                       client: anthropic.Anthropic) -> Dict:
+    """Send only new entities (plus their likely neighbors) to the LLM for placement."""
+    all_placed = []
+    all_duplicates = []
+    all_notes = []
 
-    # Just get entity names and IDs for a quick dedup pass
-    entity_list = [{"id": e["id"], "name": e["name"], "type": e["type"]} for e in entities]
+    total_batches = (len(new_entities) + MAX_ENTITIES_PER_CALL - 1) // MAX_ENTITIES_PER_CALL
+    for i in range(0, len(new_entities), MAX_ENTITIES_PER_CALL):
+        batch = new_entities[i:i + MAX_ENTITIES_PER_CALL]
+        batch_num = i // MAX_ENTITIES_PER_CALL + 1
+        neighbors = collect_neighbors(batch, existing_entities)
 
-    user_prompt = f"""These entities were consolidated in separate batches.
-Check for any remaining duplicates that should be merged.
+        print(f"    Placement batch {batch_num}/{total_batches} ({len(batch)} new, {len(neighbors)} neighbors)...")
+        result = _placement_call(company, batch, neighbors, client,
+                                 batch_context=f"Batch {batch_num}/{total_batches}" if total_batches > 1 else "")
 
-## Entities
-```json
-{json.dumps(entity_list, indent=2)}
-```
+        all_placed.extend(result.get("entities", []))
+        all_duplicates.extend(result.get("duplicate_resolutions", []))
+        all_notes.append(result.get("hierarchy_notes", ""))
 
-Return only entities that should be merged. If no merges needed, return empty arrays.
-{{
-  "entities": [],  // Only include if changes needed
-  "hierarchy_notes": "Cross-batch findings",
-  "duplicate_resolutions": []
-}}"""
+        if batch_num < total_batches:
+            time.sleep(RATE_LIMIT_DELAY)
 
-    response = client.messages.create(
-        model=MODEL,
-        max_tokens=2000,
-        system="You are deduplicating organizational entities across batches. Be conservative - only merge if clearly the same entity.",
-        messages=[{"role": "user", "content": user_prompt}]
-    )
+    return {
+        "account": company,
+        "entities": all_placed,
+        "hierarchy_notes": "\n\n".join(all_notes),
+        "duplicate_resolutions": all_duplicates
+    }
 
-    response_text = response.content[0].text
 
-    try:
-        json_match = re.search(r"```json\s*([\s\S]*?)\s*```", response_text)
-        if json_match:
-            return json.loads(json_match.group(1))
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        return {"entities": [], "hierarchy_notes": "", "duplicate_resolutions": []}
+def _reference_entities(structures: List[Dict]) -> List[Dict]:
+    """Locally placed structures in the shape collect_neighbors()/encode_compact_table() read."""
+    return [{"id": s["id"], "entity_name": s["name"], "entity_type": s["type"], "parent_entity": s["parent_id"]}
+            for s in structures]
 
 
-def merge_consolidation_with_sources(consolidated: Dict, original_entities: List[Dict]) -> List[Dict]:
+def prepare_llm_input(company: str, local_first: bool = False, rule_parents: bool = False,
+                      kv_offline: bool = False, dry_run: bool = False) -> Dict:
     """
-    Merge LLM consolidation results with original source data.
-
-    The LLM provides structure (hierarchy, dedup), but we need to attach
-    the full source quotes from the original extractions.
+    Pre-LLM half of the consolidation pipeline, shared by the real run and the dry-run planner.
+
+    Loads and pre-aggregates raw extractions, filters to quality entities,
+    pre-merges known aliases, finds duplicate candidates and settles what
+    it can locally (local_first) or by explicit quote phrasing
+    (rule_parents). Returns read_stats, aggregated, quality_entities,
+    premerge_resolutions, local (None when nothing was settled locally),
+    llm_entities and reference. The alias, duplicate-candidate and
+    parent-edge reports under output/{company}/ are written on the way,
+    except with dry_run, which also reads KV merges from the stored snapshot
+    only: a dry run makes no requests and writes nothing but its plan.
     """
-    # Build lookup of original entities by ID
-    originals_by_id = {e["id"]: e for e in original_entities}
-
-    merged_entities = []
-
-    for ce in consolidated.get("entities", []):
-        # Get IDs that were merged into this entity
-        original_ids = ce.get("original_ids", [ce["id"]])
-
-        # Aggregate all sources from merged entities
-        all_sources = []
-        total_mentions = 0
-
-        for orig_id in original_ids:
-            if orig_id in originals_by_id:
-                orig = originals_by_id[orig_id]
-                all_sources.extend(orig.get("all_sources", []))
-                total_mentions += orig.get("mention_count", 0)
-
-        # Deduplicate sources by call_id, but preserve sources without call_id
-        seen_calls = set()
-        unique_sources = []
-        sources_without_call_id = 0
-        for src in all_sources:
-            call_id = src.get("call_id")
-            if call_id:
-                if call_id not in seen_calls:
-                    seen_calls.add(call_id)
-                    unique_sources.append(src)
-            else:
-                # Preserve sources without call_id - they may have valuable quotes
-                unique_sources.append(src)
-                sources_without_call_id += 1
-
-        if sources_without_call_id > 0:
-            print(f"    Note: {sources_without_call_id} sources without call_id preserved")
-
-        # Get team_size from original entities (first non-null wins)
-        team_size = None
-        for orig_id in original_ids:
-            if orig_id in originals_by_id:
-                orig = originals_by_id[orig_id]
-                if orig.get("team_size"):
-                    team_size = orig["team_size"]
-                    break
-
-        # Get leader from original entities (most recent source date wins for determinism)
-        leader = None
-        leader_title = None
-        leader_date = ""
-        for orig_id in original_ids:
-            if orig_id in originals_by_id:
-                orig = originals_by_id[orig_id]
-                if orig.get("leader"):
-                    # Find the most recent source date for this entity
-                    orig_date = ""
-                    for src in orig.get("all_sources", []):
-                        src_date = src.get("call_date", "")
-                        if src_date > orig_date:
-                            orig_date = src_date
-                    # Use most recent leader, not first found
-                    if not leader or orig_date > leader_date:
-                        leader = orig["leader"]
-                        leader_title = orig.get("leader_title")
-                        leader_date = orig_date
-
-        merged_entity = {
-            "id": ce["id"],
-            "entity_name": ce["name"],
-            "entity_type": ce["type"],
-            "parent_entity": ce.get("parent_id"),  # This is the key field!
-            "team_size": team_size,
-            "leader": leader,
-            "leader_title": leader_title,
-            "mention_count": total_mentions or len(unique_sources),
-            "confidence": ce.get("confidence", "medium"),
-            "all_sources": unique_sources[:10],  # Keep top 10 sources
-            "original_ids": original_ids
-        }
+    # Steps 1-2: Stream raw extractions straight into pre-aggregation
+    read_stats = {}
+    aggregated = pre_aggregate_entities(load_raw_extractions(company), stats=read_stats)
+    print(f"  Raw extractions: {read_stats['raw_extractions']}")
+    print(f"  Unique normalized names: {len(aggregated)}")
 
-        merged_entities.append(merged_entity)
+    # Step 3: Filter to quality entities
+    quality_entities = filter_quality_entities(aggregated, min_mentions=1)
+    print(f"  Quality entities: {len(quality_entities)}")
 
-    return merged_entities
+    prepared = {"read_stats": read_stats, "aggregated": aggregated, "quality_entities": quality_entities,
+                "premerge_resolutions": [], "local": None, "llm_entities": quality_entities, "reference": None}
+    if not quality_entities:
+        return prepared
+
+    # Step 3.5: Check known aliases (KV merges + harvested alias dictionary)
+    print("  Checking known aliases from KV...")
+    try:
+        merges = fetch_merges(company, offline=kv_offline or dry_run)
+    except (requests.RequestException, SnapshotMissing) as e:
+        print(f"  Warning: Could not fetch merges from KV ({e}). Using manual map and quotes only.")
+        merges = {}
+    alias_index = build_alias_index(merges)
+    print(f"  Loaded {len(alias_index)} known aliases")
+
+    manual_map = load_manual_map(company)
+    alias_dictionary = build_alias_dictionary(
+        company, manual_map.get("root", manual_map), merges,
+        (s.get("raw_quote") for e in quality_entities for s in e.get("all_sources", [])))
+    add_to_alias_index(alias_dictionary, alias_index)
+    print(f"  Harvested alias dictionary: {alias_dictionary['group_count']} groups, "
+          f"{alias_dictionary['alias_count']} names")
+    if not dry_run:
+        dictionary_path = OUTPUT_DIR / company / "alias_dictionary.json"
+        save_alias_dictionary(dictionary_path, alias_dictionary)
+        print(f"    Saved: {dictionary_path}")
 
+    alias_matches = []
+    for entity in quality_entities:
+        hit = alias_index.lookup(entity['entity_name'], entity.get('id'))
+        # Harvested aliases are only trusted on exact, token-set or acronym hits
+        if hit and (hit['origin'] in ('kv', 'id') or hit['match_type'] != 'trigram'):
+            alias_matches.append({
+                'extracted_name': entity['entity_name'],
+                'extracted_id': entity.get('id', ''),
+                'canonical_id': hit['canonical_id'],
+                'matched_alias': hit['alias'],
+                'origin': hit['origin'],
+                'match_type': hit['match_type'],
+                'score': hit['score'],
+                'sources': [s.get('call_id') for s in entity.get('all_sources', [])]
+            })
 
-def consolidate_company(company: str, client: anthropic.Anthropic) -> Dict:
+    print(f"  Alias matches found: {len(alias_matches)}")
+    if alias_matches and not dry_run:
+        matches_path = OUTPUT_DIR / company / "alias_matches.json"
+        matches_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(matches_path, 'w') as f:
+            json.dump({
+                'company': company,
+                'generated_at': datetime.now().isoformat(),
+                'matches': alias_matches,
+                'summary': {'total': len(alias_matches)}
+            }, f, indent=2)
+        print(f"    Saved: {matches_path}")
+
+    # Pre-merge entities known to be one unit, so the LLM does not re-decide them
+    alias_groups = defaultdict(list)
+    for match in alias_matches:
+        alias_groups[match['canonical_id']].append(match['extracted_id'])
+    quality_entities, premerge_resolutions = premerge_entities(
+        quality_entities, alias_groups, "Known alias (reviewer merge or alias dictionary)")
+    if premerge_resolutions:
+        print(f"  Pre-merged {len(premerge_resolutions)} known-alias groups → {len(quality_entities)} entities")
+
+    # Step 3.6: All-pairs duplicate-candidate report (cross-batch duplicates for review)
+    candidates = find_duplicate_candidates(quality_entities)
+    print(f"  Duplicate candidate pairs: {candidates['pair_count']}")
+    if not dry_run:
+        candidates_path = OUTPUT_DIR / company / "duplicate_candidates.json"
+        save_duplicate_candidates(candidates_path, company, candidates)
+        print(f"    Saved: {candidates_path}")
+
+    # Step 3.7: Parent edges stated explicitly in quotes
+    rule_edges = propose_parent_edges(quality_entities)
+    print(f"  Explicit parent edges from quotes: {len(rule_edges)}")
+    if not dry_run:
+        edges_path = OUTPUT_DIR / company / "rule_parent_edges.json"
+        with open(edges_path, "w") as f:
+            json.dump({"company": company, "generated_at": datetime.now().isoformat(),
+                       "edges": edges_report(quality_entities, rule_edges)}, f, indent=2)
+        print(f"    Saved: {edges_path}")
+
+    # Step 4 (local part): settle what needs no LLM
+    llm_entities = quality_entities
+    local = None
+    if local_first:
+        local = local_consolidate(quality_entities)
+        llm_entities = local["unresolved"]
+        print(f"  Resolved locally: {len(local['entities'])} entities "
+              f"({len(local['duplicate_resolutions'])} merges), ambiguous: {len(llm_entities)}")
+    elif rule_parents:
+        local = settle_by_rules(quality_entities, rule_edges, near_duplicate_ids=set(candidates["per_entity"]))
+        llm_entities = local["unresolved"]
+        print(f"  Placed by explicit quote phrasing: {len(local['entities'])}, left for LLM: {len(llm_entities)}")
+    reference = _reference_entities(local["entities"]) if local else None
+    prepared.update(quality_entities=quality_entities, premerge_resolutions=premerge_resolutions,
+                    local=local, llm_entities=llm_entities, reference=reference)
+    return prepared
+
+
+def consolidate_company(company: str, client: anthropic.Anthropic | None, tree_reduce_workers: int = 0,
+                        local_first: bool = False, rule_parents: bool = False, kv_offline: bool = False) -> Dict:
     """
     Full consolidation pipeline for a company.
 
@@ -557,23 +734,25 @@ def consolidate_company(company: str, client: anthropic.Anthropic) -> Dict:
     2. Pre-aggregate by normalized name
     3. Filter to quality entities
     4. LLM consolidation with hierarchy inference
+       (tree_reduce_workers > 0: hierarchical map-reduce with that many parallel calls;
+       local_first: settle easy duplicates/parents locally and send only ambiguous
+       entities to the LLM, or to nobody when client is None;
+       rule_parents (opt-in, --rule-parents): otherwise still place entities whose
+       parent a quote states explicitly, so the LLM sees only the rest)
+       (kv_offline: read known aliases from the stored KV snapshot, no requests)
     5. Merge back with full source data
     """
     print(f"\n{'='*60}")
     print(f"Consolidating {company.upper()}")
     print(f"{'='*60}")
+    _call_ledger.reset()
 
-    # Step 1: Load raw extractions
-    raw_entities = load_raw_extractions(company)
-    print(f"  Raw extractions: {len(raw_entities)}")
-
-    # Step 2: Pre-aggregate
-    aggregated = pre_aggregate_entities(raw_entities)
-    print(f"  Unique normalized names: {len(aggregated)}")
-
-    # Step 3: Filter to quality entities
-    quality_entities = filter_quality_entities(aggregated, min_mentions=1)
-    print(f"  Quality entities: {len(quality_entities)}")
+    prepared = prepare_llm_input(company, local_first=local_first, rule_parents=rule_parents,
+                                 kv_offline=kv_offline)
+    read_stats, aggregated = prepared["read_stats"], prepared["aggregated"]
+    quality_entities, local = prepared["quality_entities"], prepared["local"]
+    llm_entities, reference = prepared["llm_entities"], prepared["reference"]
+    premerge_resolutions = prepared["premerge_resolutions"]
 
     if not quality_entities:
         print("  No quality entities to consolidate")
@@ -585,47 +764,23 @@ def consolidate_company(company: str, client: anthropic.Anthropic) -> Dict:
             "duplicate_resolutions": []
         }
 
-    # Step 3.5: Check known aliases from KV
-    print("  Checking known aliases from KV...")
-    alias_matches = []
-    try:
-        merges = fetch_merges(company)
-        alias_lookup = build_alias_lookup(merges)
-        print(f"  Loaded {len(alias_lookup)} known aliases")
-
-        for entity in quality_entities:
-            normalized = normalize_entity_name(entity['name'])
-            if normalized in alias_lookup:
-                match_info = alias_lookup[normalized]
-                alias_matches.append({
-                    'extracted_name': entity['name'],
-                    'extracted_id': entity.get('id', ''),
-                    'canonical_id': match_info['canonical_id'],
-                    'matched_alias': match_info['alias'],
-                    'match_type': 'normalized',
-                    'sources': [s.get('call_id') for s in entity.get('sources', [])]
-                })
+    # Step 4: LLM consolidation
 
-        if alias_matches:
-            matches_path = OUTPUT_DIR / company / "alias_matches.json"
-            matches_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(matches_path, 'w') as f:
-                json.dump({
-                    'company': company,
-                    'generated_at': datetime.now().isoformat(),
-                    'matches': alias_matches,
-                    'summary': {'total': len(alias_matches)}
-                }, f, indent=2)
-            print(f"  Alias matches found: {len(alias_matches)} (see {matches_path})")
+    if not llm_entities:
+        consolidated = {"entities": [], "hierarchy_notes": "", "duplicate_resolutions": []}
+    elif client is None:
+        print("  No LLM client: leaving ambiguous entities unmerged")
+        consolidated = {"entities": singleton_structures(llm_entities), "hierarchy_notes": "",
+                        "duplicate_resolutions": []}
+    else:
+        print("  Running LLM consolidation...")
+        if tree_reduce_workers > 0:
+            consolidated = consolidate_with_llm_tree(company, llm_entities, client, max_workers=tree_reduce_workers,
+                                                     reference=reference)
         else:
-            print("  No alias matches found")
-
-    except requests.RequestException as e:
-        print(f"  Warning: Could not fetch merges from KV ({e}). Skipping alias check.")
-
-    # Step 4: LLM consolidation
-    print("  Running LLM consolidation...")
-    consolidated = consolidate_with_llm(company, quality_entities, client)
+            consolidated = consolidate_with_llm(company, llm_entities, client, reference=reference)
+    if local is not None:
+        consolidated = combine_consolidations(local, consolidated)
     print(f"  Consolidated entities: {len(consolidated.get('entities', []))}")
     print(f"  Duplicate resolutions: {len(consolidated.get('duplicate_resolutions', []))}")
 
@@ -642,19 +797,169 @@ def consolidate_company(company: str, client: anthropic.Anthropic) -> Dict:
         "consolidated_at": datetime.now().isoformat(),
         "source": "llm_consolidation_with_hierarchy",
         "stats": {
-            "raw_extractions": len(raw_entities),
+            "raw_extractions": read_stats["raw_extractions"],
             "pre_aggregated": len(aggregated),
             "quality_filtered": len(quality_entities),
             "final_consolidated": len(merged_entities),
-            "with_hierarchy": with_parent
+            "with_hierarchy": with_parent,
+            "llm_entities": len(llm_entities) if client is not None else 0,
         },
         "entities": merged_entities,
         "contacts": [],  # Not consolidating contacts in this version
         "hierarchy_notes": consolidated.get("hierarchy_notes"),
-        "duplicate_resolutions": consolidated.get("duplicate_resolutions", [])
+        "duplicate_resolutions": premerge_resolutions + consolidated.get("duplicate_resolutions", [])
+    }
+
+
+def consolidate_company_incremental(company: str, client: anthropic.Anthropic) -> Dict:
+    """
+    Incremental consolidation against the previous consolidated_with_hierarchy.json.
+
+    1-3. Load, pre-aggregate and filter exactly like a full run
+    4. Diff quality entities against the existing consolidation
+    5. Re-attach sources of known entities deterministically (no LLM)
+    6. LLM placement for genuinely new entities only, with likely neighbors
+
+    Known entities keep the merges and parents of the previous run; alias
+    pre-merge, rule parents and local settling are not re-run, so main()
+    rejects the flags that configure them. Falls back to
+    consolidate_company() with default settings when there is no previous
+    output.
+    """
+    existing_path = OUTPUT_DIR / company / "consolidated_with_hierarchy.json"
+    existing = load_existing_consolidation(existing_path)
+    if not existing:
+        print(f"  No existing consolidation for {company}, running full consolidation")
+        return consolidate_company(company, client)
+
+    print(f"\n{'='*60}")
+    print(f"Incrementally consolidating {company.upper()}")
+    print(f"{'='*60}")
+    _call_ledger.reset()
+
+    read_stats = {}
+    aggregated = pre_aggregate_entities(load_raw_extractions(company), stats=read_stats)
+    quality_entities = filter_quality_entities(aggregated, min_mentions=1)
+    print(f"  Quality entities: {len(quality_entities)} (existing consolidated: {len(existing['entities'])})")
+
+    structures, new_entities = diff_against_existing(quality_entities, existing)
+    print(f"  Known entities: {len(quality_entities) - len(new_entities)}, new entities: {len(new_entities)}")
+
+    placement = {"entities": [], "hierarchy_notes": "", "duplicate_resolutions": []}
+    if new_entities:
+        print("  Running LLM placement for new entities...")
+        placement = place_new_entities(company, new_entities, existing["entities"], client)
+        structures = apply_placements(structures, placement, new_entities)
+
+    merged_entities = merge_consolidation_with_sources({"entities": structures}, quality_entities)
+
+    # Keep previously consolidated entities whose sources no longer pass the quality filter
+    existing_by_id = {e["id"]: e for e in existing["entities"]}
+    merged_entities = [
+        existing_by_id[e["id"]] if not e["all_sources"] and e["id"] in existing_by_id else e
+        for e in merged_entities
+    ]
+    print(f"  Final entities with sources: {len(merged_entities)}")
+
+    with_parent = sum(1 for e in merged_entities if e.get("parent_entity"))
+    notes = [existing.get("hierarchy_notes") or "", placement.get("hierarchy_notes") or ""]
+
+    return {
+        "account": company,
+        "consolidated_at": datetime.now().isoformat(),
+        "source": "llm_consolidation_with_hierarchy",
+        "stats": {
+            "raw_extractions": read_stats["raw_extractions"],
+            "pre_aggregated": len(aggregated),
+            "quality_filtered": len(quality_entities),
+            "final_consolidated": len(merged_entities),
+            "with_hierarchy": with_parent,
+            "incremental": {
+                "previous_consolidated_at": existing.get("consolidated_at"),
+                "known_entities": len(quality_entities) - len(new_entities),
+                "new_entities": len(new_entities),
+            }
+        },
+        "entities": merged_entities,
+        "contacts": [],
+        "hierarchy_notes": "\n\n".join(n for n in notes if n),
+        "duplicate_resolutions": existing.get("duplicate_resolutions", []) + placement.get("duplicate_resolutions", [])
     }
 
 
+def plan_company(company: str, tree_reduce_workers: int = 0, rate_limit_rpm: float = 0,
+                 local_first: bool = False, rule_parents: bool = False, no_llm: bool = False) -> Dict:
+    """
+    Dry-run planner: build the real batches and prompts without sending them.
+
+    Runs the same pre-LLM pipeline as consolidate_company() in memory
+    (prepare_llm_input with dry_run: stored KV snapshot only, no reports),
+    then estimates tokens per call, call count, cost and wall-clock time, and
+    writes only output/{company}/consolidation_plan.json. With no_llm the
+    ambiguous entities stay unmerged, so no calls are planned. Tree-reduce
+    plans assume no merges at reduce levels (an upper bound on reduce calls).
+    """
+    print(f"\nPlanning {company.upper()}")
+    prepared = prepare_llm_input(company, local_first=local_first or no_llm, rule_parents=rule_parents,
+                                 dry_run=True)
+    read_stats, aggregated = prepared["read_stats"], prepared["aggregated"]
+    quality_entities, reference = prepared["quality_entities"], prepared["reference"]
+    llm_entities = [] if no_llm else prepared["llm_entities"]
+
+    batches = form_batches(llm_entities, max_entities=MAX_ENTITIES_PER_CALL) if llm_entities else []
+    consolidation_system = CONSOLIDATION_SYSTEM_PROMPT + CONSOLIDATION_TASK_PROMPT
+
+    calls = []
+    for batch_num, batch in enumerate(batches, start=1):
+        context = f"Batch {batch_num}/{len(batches)}" if len(batches) > 1 else ""
+        calls.append(estimate_call(
+            "consolidate", context, consolidation_system,
+            _consolidation_user_prompt(company, batch, context,
+                                       collect_neighbors(batch, reference) if reference else None),
+            expected_output_tokens(len(batch)), CONSOLIDATION_MAX_TOKENS,
+        ))
+
+    if tree_reduce_workers > 0 and len(batches) > 1:
+        groups = [[{"id": e["id"], "name": e["entity_name"], "type": e["entity_type"], "parent_id": None}
+                   for e in batch] for batch in batches]
+        for level, (_, compact, context) in plan_reduce_jobs(groups):
+            # Reduce calls return only changes; assume ~10% of entities change
+            calls.append(estimate_call(
+                "cross_batch", context, CROSS_BATCH_SYSTEM_PROMPT,
+                _cross_batch_user_prompt(company, compact, context),
+                expected_output_tokens(len(compact) // 10), CONSOLIDATION_MAX_TOKENS, level=level,
+            ))
+
+    if tree_reduce_workers > 0:
+        mode, concurrency, delay_s = "tree-reduce", tree_reduce_workers, 0.0
+    else:
+        mode, concurrency, delay_s = "flat", 1, RATE_LIMIT_DELAY
+
+    plan = build_plan(
+        company,
+        counts={
+            "raw_extractions": read_stats["raw_extractions"],
+            "pre_aggregated": len(aggregated),
+            "quality_filtered": len(quality_entities),
+            "llm_entities": len(llm_entities),
+            "batches": len(batches),
+        },
+        calls=calls, mode=mode, concurrency=concurrency,
+        rate_limit_rpm=rate_limit_rpm, delay_s=delay_s,
+    )
+    plan_path = OUTPUT_DIR / company / "consolidation_plan.json"
+    write_plan(plan_path, plan)
+
+    cost = plan["cost"]
+    print(f"\n{company}: {read_stats['raw_extractions']} raw → {len(aggregated)} aggregated → {len(quality_entities)} quality")
+    print(f"  Plan ({mode}): {plan['calls']} calls, ~{cost['input_tokens'] + cost['cache_write_tokens'] + cost['cache_read_tokens']:,} input"
+          f" / ~{cost['output_tokens']:,} output tokens, ~${cost['usd']:.2f},"
+          f" ~{plan['projection']['wall_clock_s'] / 60:.1f} min (see {plan_path})")
+    if plan["calls_that_may_truncate"]:
+        print(f"  Warning: {plan['calls_that_may_truncate']} calls may hit max_tokens and be split")
+    return plan
+
+
 def save_consolidated(company: str, data: Dict):
     """Save consolidated data to output directory."""
     # Save to company-specific directory
@@ -666,13 +971,52 @@ def save_consolidated(company: str, data: Dict):
         json.dump(data, f, indent=2)
     print(f"  Saved: {filepath}")
 
+    # Per-call token/latency ledger for this run
+    if _call_ledger.calls:
+        ledger_path = company_dir / "consolidation_calls.json"
+        _call_ledger.save(ledger_path, company)
+        totals = _call_ledger.totals()
+        print(f"  LLM calls: {totals['calls']}, input tokens: {totals['input_tokens']:,} "
+              f"(cache read {totals['cache_read_input_tokens']:,}), output tokens: {totals['output_tokens']:,}, "
+              f"latency: {totals['latency_s']:.1f}s (see {ledger_path})")
+
 
 def main():
     parser = argparse.ArgumentParser(description="Consolidate entities with LLM-inferred hierarchy")
     parser.add_argument("--company", type=str, help="Single company to process")
     parser.add_argument("--all", action="store_true", help="Process all companies")
-    parser.add_argument("--dry-run", action="store_true", help="Skip LLM calls, just show stats")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Skip LLM calls; plan batches and estimate tokens, cost and wall-clock time")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only send entities not in the existing consolidated_with_hierarchy.json to the LLM "
+                             "(known entities keep their merges and parents; no alias pre-merge or rule parents)")
+    parser.add_argument("--tree-reduce", action="store_true",
+                        help="Hierarchical map-reduce consolidation (cross-batch merges for large entity lists)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel LLM calls for --tree-reduce")
+    parser.add_argument("--rate-limit", type=float, default=0,
+                        help="Requests per minute to assume in --dry-run projections (0 = unlimited)")
+    parser.add_argument("--local", action="store_true",
+                        help="Resolve easy duplicates and quote-stated parents locally; only ambiguous entities go to the LLM")
+    parser.add_argument("--no-llm", action="store_true",
+                        help="Local consolidation only (implies --local); ambiguous entities stay unmerged")
+    parser.add_argument("--rule-parents", action="store_true",
+                        help="Place entities whose parent a quote states explicitly without the LLM "
+                             "(they skip the LLM's duplicate and type review)")
+    parser.add_argument("--kv-snapshot", action="store_true",
+                        help="Offline: read KV merges from output/kv_snapshots/ instead of the viewer API")
     args = parser.parse_args()
+    local_first = args.local or args.no_llm
+    if args.no_llm and args.incremental:
+        parser.error("--incremental needs the LLM to place new entities; drop --no-llm")
+    if args.dry_run and args.incremental:
+        parser.error("--dry-run plans a full consolidation; drop --incremental")
+    if args.incremental:
+        # Incremental placement does not run the full-run pipeline these flags configure
+        ignored = [flag for flag, given in (("--tree-reduce", args.tree_reduce), ("--local", args.local),
+                                            ("--kv-snapshot", args.kv_snapshot),
+                                            ("--rule-parents", args.rule_parents)) if given]
+        if ignored:
+            parser.error(f"--incremental cannot be combined with {', '.join(ignored)}; run a full consolidation")
 
     if not args.company and not args.all:
         parser.print_help()
@@ -680,25 +1024,45 @@ def main():
 
     # Initialize Anthropic client
     api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key and not args.dry_run:
+    if not api_key and not args.dry_run and not args.no_llm:
         print("ERROR: ANTHROPIC_API_KEY not set")
         return
 
-    client = anthropic.Anthropic(api_key=api_key) if api_key else None
+    client = anthropic.Anthropic(api_key=api_key) if api_key and not args.no_llm else None
 
     companies = COMPANIES if args.all else [args.company.lower()]
+    plans = []
+
+    if len(companies) > 1 and not args.dry_run and not args.incremental and not args.kv_snapshot:
+        # One concurrent round of KV reads over pooled connections instead of one per company
+        prefetch_merges(companies)
 
     for company in companies:
         if args.dry_run:
-            # Just show stats without LLM
-            raw_entities = load_raw_extractions(company)
-            aggregated = pre_aggregate_entities(raw_entities)
-            quality = filter_quality_entities(aggregated)
-            print(f"\n{company}: {len(raw_entities)} raw → {len(aggregated)} aggregated → {len(quality)} quality")
+            # Plan batches, tokens, cost and wall-clock time without LLM calls
+            plans.append(plan_company(company,
+                                      tree_reduce_workers=args.concurrency if args.tree_reduce else 0,
+                                      rate_limit_rpm=args.rate_limit, local_first=local_first,
+                                      rule_parents=args.rule_parents, no_llm=args.no_llm))
         else:
-            result = consolidate_company(company, client)
+            if args.incremental:
+                result = consolidate_company_incremental(company, client)
+            else:
+                result = consolidate_company(company, client,
+                                             tree_reduce_workers=args.concurrency if args.tree_reduce else 0,
+                                             local_first=local_first,
+                                             rule_parents=args.rule_parents,
+                                             kv_offline=args.kv_snapshot)
             save_consolidated(company, result)
-            time.sleep(RATE_LIMIT_DELAY)
+            if client is not None:
+                time.sleep(RATE_LIMIT_DELAY)
+
+    if args.dry_run:
+        total_calls = sum(p["calls"] for p in plans)
+        total_usd = sum(p["cost"]["usd"] for p in plans)
+        total_s = sum(p["projection"]["wall_clock_s"] for p in plans)
+        print(f"\nDry-run total: {total_calls} calls, ~${total_usd:.2f}, ~{total_s / 60:.1f} min (companies run sequentially)")
+        return
 
     print("\n" + "="*60)
     print("CONSOLIDATION COMPLETE")
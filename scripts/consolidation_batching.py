@@ -0,0 +1,131 @@
+"""Similarity-clustered, token-budgeted batch formation for LLM consolidation.
+
+consolidate_with_llm() used to slice the mention-sorted entity list into
+fixed 50-entity chunks, so "Discovery Sciences" and "DS" could land in
+different batches and never be merged. Here candidate duplicates and likely
+parent/child pairs are clustered with cheap local blocking (shared tokens,
+trigram similarity, acronyms), and clusters are packed into batches sized by
+an estimated token budget instead of a fixed count.
+"""
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from consolidation_prompts import encode_entity_line
+from entity_similarity import UnionFind, acronym_keys, name_similarity, name_tokens
+
+# Rough chars-per-token ratio for English prose and JSON
+CHARS_PER_TOKEN = 4
+
+# Prompt overhead per batch (cached system instructions + per-batch header)
+PROMPT_OVERHEAD_TOKENS = 900
+
+# Estimated output tokens per consolidated entity in the LLM reply
+OUTPUT_TOKENS_PER_ENTITY = 60
+
+DEFAULT_INPUT_TOKEN_BUDGET = 12000
+DEFAULT_OUTPUT_TOKEN_BUDGET = 3200  # stays under max_tokens=4000 with headroom
+
+# Tokens shared by more entities than this are too generic to block on ("research")
+MAX_BLOCK_SIZE = 30
+
+# Minimum name similarity for two entities in the same block to be clustered
+CLUSTER_SIMILARITY = 0.5
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate LLM tokens for a string."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_entity_tokens(entity: Dict) -> int:
+    """Estimate prompt tokens for one entity row as encoded in the prompt."""
+    return estimate_tokens(encode_entity_line(entity))
+
+
+def candidate_clusters(entities: List[Dict], name_key: str = "entity_name") -> List[List[int]]:
+    """Group entity indices that are likely duplicates or parent/child pairs.
+
+    Blocking keys are significant name tokens and acronym forms; only pairs
+    sharing a key are compared, so this stays near-linear for real data.
+    Pairs are joined when they share an acronym key ("DS" / "Discovery
+    Sciences (DS)"), when one name's tokens contain the other's ("Oncology" /
+    "Oncology Research"), or when name similarity is high.
+    """
+    tokens = [name_tokens(e[name_key]) for e in entities]
+    acronyms = [acronym_keys(e[name_key]) for e in entities]
+
+    blocks = defaultdict(list)
+    for i in range(len(entities)):
+        for token in tokens[i]:
+            blocks[("t", token)].append(i)
+        for key in acronyms[i]:
+            blocks[("a", key)].append(i)
+
+    uf = UnionFind(range(len(entities)))
+    compared = set()
+    for (kind, _), members in blocks.items():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                i, j = members[x], members[y]
+                if i == j or (i, j) in compared:
+                    continue
+                compared.add((i, j))
+                if kind == "a" and acronyms[i] & acronyms[j]:
+                    uf.union(i, j)
+                elif tokens[i] and tokens[j] and (tokens[i] <= tokens[j] or tokens[j] <= tokens[i]):
+                    uf.union(i, j)
+                elif name_similarity(entities[i][name_key], entities[j][name_key]) >= CLUSTER_SIMILARITY:
+                    uf.union(i, j)
+
+    return uf.groups()
+
+
+def form_batches(entities: List[Dict],
+                 input_token_budget: int = DEFAULT_INPUT_TOKEN_BUDGET,
+                 output_token_budget: int = DEFAULT_OUTPUT_TOKEN_BUDGET,
+                 max_entities: int | None = None,
+                 token_estimator: Callable[[Dict], int] = estimate_entity_tokens,
+                 name_key: str = "entity_name") -> List[List[Dict]]:
+    """Pack similarity clusters into batches under input/output token budgets.
+
+    Clusters are kept whole when they fit and placed first-fit, most
+    mentioned first, so related names share a batch and batches fill up.
+    A cluster larger than one batch is split in mention order.
+    """
+    max_output_entities = max(1, output_token_budget // OUTPUT_TOKENS_PER_ENTITY)
+    if max_entities:
+        max_output_entities = min(max_output_entities, max_entities)
+    input_budget = max(1, input_token_budget - PROMPT_OVERHEAD_TOKENS)
+
+    costs = [token_estimator(e) for e in entities]
+    clusters = candidate_clusters(entities, name_key)
+    clusters.sort(key=lambda c: (-max(entities[i].get("mention_count", 0) for i in c), min(c)))
+
+    # Split oversize clusters into budget-sized pieces (mention order preserved)
+    pieces = []
+    for cluster in clusters:
+        cluster = sorted(cluster, key=lambda i: (-entities[i].get("mention_count", 0), i))
+        piece, piece_cost = [], 0
+        for i in cluster:
+            if piece and (len(piece) >= max_output_entities or piece_cost + costs[i] > input_budget):
+                pieces.append(piece)
+                piece, piece_cost = [], 0
+            piece.append(i)
+            piece_cost += costs[i]
+        if piece:
+            pieces.append(piece)
+
+    batches = []  # [indices, input_cost]
+    for piece in pieces:
+        piece_cost = sum(costs[i] for i in piece)
+        for batch in batches:
+            if len(batch[0]) + len(piece) <= max_output_entities and batch[1] + piece_cost <= input_budget:
+                batch[0].extend(piece)
+                batch[1] += piece_cost
+                break
+        else:
+            batches.append([list(piece), piece_cost])
+
+    return [[entities[i] for i in indices] for indices, _ in batches]
@@ -0,0 +1,110 @@
+"""Attach extraction sources to a consolidated entity structure.
+
+Local settling, the LLM and incremental placement all produce the same
+structure ({id, name, type, parent_id, confidence, original_ids} per
+entity). merge_consolidation_with_sources() joins it back to the quality
+entities those ids name, producing the saved consolidated entities.
+"""
+from typing import Dict, List
+
+from size_mentions import merge_size_mentions
+
+
+def merge_consolidation_with_sources(consolidated: Dict, original_entities: List[Dict]) -> List[Dict]:
+    """
+    Merge LLM consolidation results with original source data.
+
+    The LLM provides structure (hierarchy, dedup), but we need to attach
+    the full source quotes from the original extractions.
+    """
+    # Build lookup of original entities by ID
+    originals_by_id = {e["id"]: e for e in original_entities}
+
+    merged_entities = []
+
+    for ce in consolidated.get("entities", []):
+        # Get IDs that were merged into this entity
+        original_ids = ce.get("original_ids", [ce["id"]])
+
+        # Aggregate all sources from merged entities
+        all_sources = []
+        total_mentions = 0
+
+        for orig_id in original_ids:
+            if orig_id in originals_by_id:
+                orig = originals_by_id[orig_id]
+                all_sources.extend(orig.get("all_sources", []))
+                total_mentions += orig.get("mention_count", 0)
+
+        # Deduplicate sources by call_id, but preserve sources without call_id
+        seen_calls = set()
+        unique_sources = []
+        sources_without_call_id = 0
+        for src in all_sources:
+            call_id = src.get("call_id")
+            if call_id:
+                if call_id not in seen_calls:
+                    seen_calls.add(call_id)
+                    unique_sources.append(src)
+            else:
+                # Preserve sources without call_id - they may have valuable quotes
+                unique_sources.append(src)
+                sources_without_call_id += 1
+
+        if sources_without_call_id > 0:
+            print(f"    Note: {sources_without_call_id} sources without call_id preserved")
+
+        # Get team_size from original entities (first non-null wins)
+        team_size = None
+        for orig_id in original_ids:
+            if orig_id in originals_by_id:
+                orig = originals_by_id[orig_id]
+                if orig.get("team_size"):
+                    team_size = orig["team_size"]
+                    break
+
+        # Get leader from original entities (most recent source date wins for determinism)
+        leader = None
+        leader_title = None
+        leader_date = ""
+        for orig_id in original_ids:
+            if orig_id in originals_by_id:
+                orig = originals_by_id[orig_id]
+                if orig.get("leader"):
+                    # Find the most recent source date for this entity
+                    orig_date = ""
+                    for src in orig.get("all_sources", []):
+                        src_date = src.get("call_date", "")
+                        if src_date > orig_date:
+                            orig_date = src_date
+                    # Use most recent leader, not first found
+                    if not leader or orig_date > leader_date:
+                        leader = orig["leader"]
+                        leader_title = orig.get("leader_title")
+                        leader_date = orig_date
+
+        # Ids pre-merged away before the LLM (premerge_entities()) belong to this entity too
+        premerged_ids = [premerged for orig_id in original_ids
+                         for premerged in originals_by_id.get(orig_id, {}).get("premerged_ids", [])]
+
+        merged_entity = {
+            "id": ce["id"],
+            "entity_name": ce["name"],
+            "entity_type": ce["type"],
+            "parent_entity": ce.get("parent_id"),  # This is the key field!
+            "team_size": team_size,
+            "leader": leader,
+            "leader_title": leader_title,
+            "mention_count": total_mentions or len(unique_sources),
+            "confidence": ce.get("confidence", "medium"),
+            "size_mentions": merge_size_mentions(
+                originals_by_id[orig_id].get("size_mentions", [])
+                for orig_id in original_ids if orig_id in originals_by_id
+            ),
+            "all_sources": unique_sources[:10],  # Keep top 10 sources
+            "original_ids": list(dict.fromkeys(list(original_ids) + premerged_ids)),
+        }
+
+        merged_entities.append(merged_entity)
+
+    return merged_entities
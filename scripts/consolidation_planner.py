@@ -0,0 +1,141 @@
+"""Cost and latency planner for consolidate_with_hierarchy.py --dry-run.
+
+The dry run builds the real batches and prompts, then estimates tokens per
+call, call count, dollar cost and wall-clock time under a given concurrency
+and rate limit, without sending anything. Estimates use the same
+chars-per-token heuristic as batch formation, so treat them as
+order-of-magnitude guidance, and compare against consolidation_calls.json
+from a real run to calibrate.
+"""
+import heapq
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from consolidation_batching import OUTPUT_TOKENS_PER_ENTITY, estimate_tokens
+from consolidation_prompts import MIN_CACHEABLE_TOKENS
+
+# USD per million tokens (Sonnet-class list prices)
+DEFAULT_PRICES = {
+    "input": 3.00,
+    "output": 15.00,
+    "cache_write": 3.75,
+    "cache_read": 0.30,
+}
+
+# Latency model: fixed time-to-first-token plus output generation speed
+BASE_LATENCY_S = 2.0
+OUTPUT_TOKENS_PER_S = 60.0
+
+
+def estimate_call(call_type: str, context: str, system_text: str, user_prompt: str,
+                  expected_output_tokens: int, max_tokens: int, level: int = 0) -> Dict:
+    """Estimate one call's tokens from its rendered prompts.
+
+    level is the tree-reduce level the call runs at (0 for map calls).
+    """
+    system_tokens = estimate_tokens(system_text)
+    return {
+        "call_type": call_type,
+        "context": context,
+        "level": level,
+        "system_tokens": system_tokens,
+        "user_tokens": estimate_tokens(user_prompt),
+        "output_tokens": min(expected_output_tokens, max_tokens),
+        "may_truncate": expected_output_tokens > max_tokens,
+    }
+
+
+def expected_output_tokens(entity_count: int) -> int:
+    """Expected reply size for a consolidation call over entity_count inputs."""
+    return entity_count * OUTPUT_TOKENS_PER_ENTITY + 100
+
+
+def estimate_latency(call: Dict) -> float:
+    """Estimated seconds for one call."""
+    return BASE_LATENCY_S + call["output_tokens"] / OUTPUT_TOKENS_PER_S
+
+
+def project_wall_clock(calls: List[Dict], concurrency: int = 1, rate_limit_rpm: float = 0,
+                       delay_s: float = 0.0) -> float:
+    """Simulate running calls on `concurrency` workers in order, level by level.
+
+    Calls of one tree-reduce level ("level", default 0) share the workers;
+    a level starts only when the previous one has finished, as in
+    tree_reduce(), so the projection is the sum of the per-level times.
+    rate_limit_rpm spaces call starts at least 60/rpm seconds apart;
+    delay_s is a sleep after each call on its worker (RATE_LIMIT_DELAY).
+    """
+    levels = {}
+    for call in calls:
+        levels.setdefault(call.get("level", 0), []).append(call)
+    spacing = 60.0 / rate_limit_rpm if rate_limit_rpm else 0.0
+    finish = 0.0
+    for level in sorted(levels):
+        workers = [finish] * max(1, concurrency)
+        next_start = finish
+        for call in levels[level]:
+            free_at = heapq.heappop(workers)
+            start = max(free_at, next_start)
+            next_start = start + spacing
+            end = start + estimate_latency(call)
+            finish = max(finish, end)
+            heapq.heappush(workers, end + delay_s)
+    return round(finish, 1)
+
+
+def estimate_cost(calls: List[Dict], prices: Dict = None) -> Dict:
+    """Estimate USD cost, treating the shared system prompt as cached after the first call."""
+    prices = prices or DEFAULT_PRICES
+    input_tokens = cache_write = cache_read = output_tokens = 0
+    cached_seen = set()
+    for call in calls:
+        output_tokens += call["output_tokens"]
+        input_tokens += call["user_tokens"]
+        key = (call["call_type"], call["system_tokens"])
+        if call["system_tokens"] < MIN_CACHEABLE_TOKENS:
+            input_tokens += call["system_tokens"]
+        elif key in cached_seen:
+            cache_read += call["system_tokens"]
+        else:
+            cache_write += call["system_tokens"]
+            cached_seen.add(key)
+
+    usd = (input_tokens * prices["input"] + output_tokens * prices["output"]
+           + cache_write * prices["cache_write"] + cache_read * prices["cache_read"]) / 1_000_000
+    return {
+        "input_tokens": input_tokens,
+        "cache_write_tokens": cache_write,
+        "cache_read_tokens": cache_read,
+        "output_tokens": output_tokens,
+        "usd": round(usd, 4),
+    }
+
+
+def build_plan(company: str, counts: Dict, calls: List[Dict], mode: str,
+               concurrency: int, rate_limit_rpm: float, delay_s: float) -> Dict:
+    """Assemble the per-company plan written by --dry-run."""
+    return {
+        "company": company,
+        "generated_at": datetime.now().isoformat(),
+        "mode": mode,
+        "counts": counts,
+        "calls": len(calls),
+        "calls_that_may_truncate": sum(1 for c in calls if c["may_truncate"]),
+        "cost": estimate_cost(calls),
+        "projection": {
+            "concurrency": concurrency,
+            "rate_limit_rpm": rate_limit_rpm,
+            "delay_s": delay_s,
+            "wall_clock_s": project_wall_clock(calls, concurrency, rate_limit_rpm, delay_s),
+        },
+        "call_estimates": calls,
+    }
+
+
+def write_plan(filepath: Path, plan: Dict):
+    """Write a plan file."""
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(filepath, "w") as f:
+        json.dump(plan, f, indent=2)
@@ -0,0 +1,164 @@
+"""Compact prompt encoding for consolidation calls.
+
+Entity summaries used to be embedded as indented JSON plus a duplicate list
+of input ids. A line-per-entity table with truncated sample quotes carries
+the same information in a fraction of the tokens. Static instructions and
+reference material live in system blocks marked for prompt caching so they
+are not re-billed in full on every batch. A prefix shorter than
+MIN_CACHEABLE_TOKENS cannot be cached, so it gets no marker.
+"""
+import re
+from typing import Dict, List
+
+# Prompt caching only applies to prefixes at least this long; shorter blocks get no breakpoint
+MIN_CACHEABLE_TOKENS = 1024
+
+FIELD_SEP = " | "
+QUOTE_SEP = " ~ "
+
+SAMPLE_QUOTES = 3
+QUOTE_CHARS = 160
+
+ENTITY_TABLE_HEADER = "id | name | type | mentions | confidence | sample quotes (~-separated)"
+COMPACT_TABLE_HEADER = "id | name | type | parent_id"
+
+CONSOLIDATION_SYSTEM_PROMPT = """You are an expert at consolidating organizational data extracted from sales call transcripts into a unified org chart.
+
+Your task is to analyze a list of organizational entities extracted from multiple calls and:
+
+1. IDENTIFY DUPLICATES: Find entities that refer to the same organizational unit
+   - "Discovery Sciences" and "Discovery Sciences (DS)" → same entity
+   - "BE" and "Biologics Engineering" → same entity (if evidence supports)
+   - "gRED" and "Genentech Research" → potentially same
+   - Keep the most complete/formal name as canonical
+
+2. INFER HIERARCHY: Determine parent-child relationships between entities
+   - Look for explicit statements like "X is part of Y", "X reports to Y", "X within Y"
+   - Departments typically contain teams
+   - Business units contain departments
+   - Sites are typically peers at top level (not in hierarchy with departments)
+   - Therapeutic areas may contain specific research groups
+
+3. OUTPUT: Return a JSON object with:
+   - entities: array of consolidated entities with parent_id relationships
+   - hierarchy_notes: explain your reasoning for hierarchy decisions
+   - duplicate_resolutions: document which entities you merged and why
+
+Rules:
+- If uncertain about a merge, keep entities separate
+- If hierarchy is ambiguous, leave parent_id as null
+- Confidence is "high" only if multiple sources confirm the relationship
+- All IDs must be kebab-case (lowercase, hyphens instead of spaces)"""
+
+# Static per-batch instructions, sent in the cached system block with
+# CONSOLIDATION_SYSTEM_PROMPT instead of being repeated in every user prompt
+CONSOLIDATION_TASK_PROMPT = """## INPUT FORMAT
+
+Entities arrive as a table, one per line:
+id | name | type | mentions | confidence | sample quotes (~-separated, truncated)
+
+## YOUR TASK
+
+For each input entity, decide:
+1. Is it a VALID organizational unit (department, team, site, therapeutic area)?
+   - YES: Include it in output with its original ID
+   - NO (garbage/noise): Exclude it
+2. Should it be MERGED with another entity (same org unit, different name)?
+   - YES: Combine into one entry, list both IDs in original_ids
+   - NO: Keep as separate entry
+3. Can you infer its PARENT from the quotes?
+   - YES: Set parent_id to the parent's kebab-case ID
+   - NO: Set parent_id to null (this is fine!)
+
+## OUTPUT FORMAT
+
+Return ONLY a JSON object. No explanation text before or after.
+
+```json
+{
+  "entities": [
+    {"id": "discovery-sciences", "name": "Discovery Sciences", "type": "department", "parent_id": null, "confidence": "high", "original_ids": ["discovery-sciences"]},
+    {"id": "oncology", "name": "Oncology", "type": "therapeutic_area", "parent_id": "discovery-sciences", "confidence": "medium", "original_ids": ["oncology", "discovery-oncology"]}
+  ],
+  "hierarchy_notes": "Brief notes on hierarchy decisions",
+  "duplicate_resolutions": [{"merged_names": ["Name A", "Name B"], "canonical_name": "Name A", "reason": "Same entity"}]
+}
+```
+
+CRITICAL:
+- Expect 60-90% of input entities to be valid
+- Every valid entity MUST appear in your output
+- If you're unsure about an entity, INCLUDE it with confidence: "low"
+- An empty entities array is WRONG unless ALL inputs are garbage"""
+
+
+CROSS_BATCH_SYSTEM_PROMPT = "You are deduplicating organizational entities across batches. Be conservative - only merge if clearly the same entity."
+
+
+def _cell(value) -> str:
+    """Render a table cell on one line without field separators."""
+    if value is None:
+        return "-"
+    text = re.sub(r"\s+", " ", str(value)).strip()
+    return text.replace("|", "/")
+
+
+def encode_entity_line(entity: Dict, sample_quotes: int = SAMPLE_QUOTES, quote_chars: int = QUOTE_CHARS) -> str:
+    """Encode one quality entity as a single table row."""
+    quotes = []
+    for source in entity.get("all_sources", [])[:sample_quotes]:
+        quote = _cell(source.get("raw_quote") or "")
+        if len(quote) > quote_chars:
+            quote = quote[:quote_chars].rstrip() + "…"
+        if quote:
+            quotes.append(quote.replace("~", "-"))
+    return FIELD_SEP.join([
+        _cell(entity["id"]),
+        _cell(entity["entity_name"]),
+        _cell(entity.get("entity_type")),
+        _cell(entity.get("mention_count", 0)),
+        _cell(entity.get("confidence")),
+        QUOTE_SEP.join(quotes) or "-",
+    ])
+
+
+def encode_entity_table(entities: List[Dict]) -> str:
+    """Encode quality entities as a header line plus one row per entity."""
+    return "\n".join([ENTITY_TABLE_HEADER] + [encode_entity_line(e) for e in entities])
+
+
+def encode_compact_table(entities: List[Dict]) -> str:
+    """Encode consolidated entities (id/name/type/parent_id) as a table."""
+    rows = [COMPACT_TABLE_HEADER]
+    for e in entities:
+        rows.append(FIELD_SEP.join([
+            _cell(e["id"]),
+            _cell(e.get("name") or e.get("entity_name")),
+            _cell(e.get("type") or e.get("entity_type")),
+            _cell(e.get("parent_id", e.get("parent_entity"))),
+        ]))
+    return "\n".join(rows)
+
+
+# Prefix sizes already reported as too short to cache (logged once each)
+_short_prefixes_logged = set()
+
+
+def cached_system(*blocks: str) -> List[Dict]:
+    """System prompt blocks with a cache breakpoint after the last static block.
+
+    The breakpoint is left off (and that logged once) for a prefix shorter
+    than MIN_CACHEABLE_TOKENS, where it would have no effect.
+    """
+    from consolidation_batching import estimate_tokens  # consolidation_batching imports this module
+    system = [{"type": "text", "text": block} for block in blocks]
+    if not system:
+        return system
+    tokens = estimate_tokens("".join(blocks))
+    if tokens >= MIN_CACHEABLE_TOKENS:
+        system[-1]["cache_control"] = {"type": "ephemeral"}
+    elif tokens not in _short_prefixes_logged:
+        _short_prefixes_logged.add(tokens)
+        print(f"    Note: system prefix ~{tokens} tokens is below the {MIN_CACHEABLE_TOKENS}-token "
+              f"cache minimum; not marked for caching")
+    return system
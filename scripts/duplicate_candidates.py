@@ -0,0 +1,111 @@
+"""All-pairs duplicate-candidate report over quality entity names.
+
+Consolidation batches never see each other, so a duplicate split across two
+batches survives unless someone spots it. Comparing every pair in Python is
+O(n^2) name_similarity() calls; here names become character-trigram vectors
+in one NumPy matrix and the full cosine-similarity matrix comes from a
+blocked matrix product, which handles thousands of names in well under a
+second. The top candidates per entity are written to
+output/{company}/duplicate_candidates.json for consolidation and review.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from entity_similarity import char_trigrams
+
+# Trigram vocabularies larger than this are folded into this many columns
+MAX_FEATURES = 2048
+
+# Rows of the similarity matrix computed per block (bounds peak memory)
+BLOCK_ROWS = 1024
+
+# Reported pairs must be at least this similar (trigram cosine)
+DEFAULT_MIN_SIMILARITY = 0.6
+DEFAULT_TOP_K = 5
+
+
+def trigram_matrix(names: List[str], max_features: int = MAX_FEATURES) -> np.ndarray:
+    """Row-normalized binary trigram vectors, one row per name (float32)."""
+    vocab = {}
+    rows, cols = [], []
+    for row, name in enumerate(names):
+        for gram in char_trigrams(name):
+            rows.append(row)
+            cols.append(vocab.setdefault(gram, len(vocab)))
+    width = min(max(len(vocab), 1), max_features)
+
+    matrix = np.zeros((len(names), width), dtype=np.float32)
+    if rows:
+        matrix[np.array(rows), np.array(cols) % width] = 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_similar(matrix: np.ndarray, top_k: int = DEFAULT_TOP_K, min_similarity: float = DEFAULT_MIN_SIMILARITY,
+                block_rows: int = BLOCK_ROWS) -> List[List[tuple]]:
+    """For each row, up to top_k (column, similarity) pairs above min_similarity, best first."""
+    n = matrix.shape[0]
+    k = min(top_k, n - 1)
+    results = [[] for _ in range(n)]
+    if k <= 0:
+        return results
+
+    for start in range(0, n, block_rows):
+        block = matrix[start:start + block_rows] @ matrix.T
+        block[np.arange(block.shape[0]), np.arange(start, start + block.shape[0])] = -1.0  # no self-pairs
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        for offset in range(block.shape[0]):
+            results[start + offset] = [(int(j), float(s)) for j, s in zip(top[offset], scores[offset])
+                                       if s >= min_similarity]
+    return results
+
+
+def find_duplicate_candidates(entities: List[Dict], top_k: int = DEFAULT_TOP_K,
+                              min_similarity: float = DEFAULT_MIN_SIMILARITY,
+                              name_key: str = "entity_name") -> Dict:
+    """Top similar names per entity plus the deduplicated pair list, best first."""
+    matrix = trigram_matrix([e[name_key] for e in entities])
+    neighbors = top_similar(matrix, top_k, min_similarity)
+
+    per_entity = {}
+    pairs = {}
+    for i, entity in enumerate(entities):
+        if not neighbors[i]:
+            continue
+        per_entity[entity["id"]] = [
+            {"id": entities[j]["id"], "name": entities[j][name_key], "score": round(score, 3)}
+            for j, score in neighbors[i]
+        ]
+        for j, score in neighbors[i]:
+            pairs.setdefault((min(i, j), max(i, j)), score)
+
+    pair_list = [{
+        "a_id": entities[i]["id"], "a_name": entities[i][name_key],
+        "b_id": entities[j]["id"], "b_name": entities[j][name_key],
+        "score": round(score, 3),
+    } for (i, j), score in sorted(pairs.items(), key=lambda item: (-item[1], item[0]))]
+
+    return {
+        "entity_count": len(entities),
+        "top_k": top_k,
+        "min_similarity": min_similarity,
+        "pair_count": len(pair_list),
+        "pairs": pair_list,
+        "per_entity": per_entity,
+    }
+
+
+def save_duplicate_candidates(filepath: Path, company: str, report: Dict):
+    """Write duplicate_candidates.json."""
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(filepath, "w") as f:
+        json.dump({"company": company, "generated_at": datetime.now().isoformat(), **report}, f, indent=2)
@@ -0,0 +1,110 @@
+"""Cheap local name-similarity helpers for entity dedup and placement.
+
+No LLM calls: tokens, character trigrams and Jaccard overlap over
+normalized entity names. normalize_entity_name() comes from
+fetch_kv_merges, so importing this module also imports the KV client and
+with it requests.
+"""
+import re
+
+from fetch_kv_merges import normalize_entity_name
+
+# Words that carry no identity in org-unit names ("Head of the Oncology Team")
+NAME_STOP_WORDS = {'the', 'of', 'and', 'for', 'in', 'at', 'a', 'an', 'team', 'group',
+                   'department', 'dept', 'unit', 'function', 'division'}
+
+
+def name_tokens(name: str) -> set:
+    """Return the set of significant lowercase word tokens in a name."""
+    if not name:
+        return set()
+    words = re.findall(r'[a-z0-9]+', normalize_entity_name(name).replace('&', ' and '))
+    return {w for w in words if w not in NAME_STOP_WORDS}
+
+
+def char_trigrams(name: str) -> set:
+    """Return padded character trigrams of a normalized name."""
+    if not name:
+        return set()
+    text = f"  {re.sub(r'[^a-z0-9]+', ' ', normalize_entity_name(name)).strip()} "
+    if len(text) < 4:
+        return set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def jaccard(a: set, b: set) -> float:
+    """Jaccard overlap of two sets (0.0 when either is empty)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Blend of token-set and trigram Jaccard similarity, in [0, 1]."""
+    return max(jaccard(name_tokens(a), name_tokens(b)),
+               jaccard(char_trigrams(a), char_trigrams(b)))
+
+
+def name_acronym(name: str) -> str:
+    """Initials of a multi-word name ("Discovery Sciences" -> "ds"), else ""."""
+    words = re.findall(r'[a-z0-9]+', re.sub(r'\([^)]*\)', ' ', (name or '').lower()))
+    words = [w for w in words if w not in ('of', 'and', 'the', 'for', 'in', 'a', 'an')]
+    if len(words) < 2:
+        return ""
+    return "".join(w[0] for w in words)
+
+
+def parenthetical_acronym(name: str) -> str:
+    """Acronym given in parentheses ("Discovery Sciences (DS)" -> "ds"), else ""."""
+    match = re.search(r'\(([A-Za-z][A-Za-z0-9&]{1,9})\)\s*$', name or '')
+    return match.group(1).lower().replace('&', '') if match else ""
+
+
+def stated_acronyms(name: str) -> set:
+    """Acronym forms a name states outright, lowercase: its parenthetical, or
+    the name itself when it is a short single token ("DS", "gRED")."""
+    keys = {parenthetical_acronym(name)}
+    bare = re.sub(r'[^A-Za-z0-9]', '', name or '')
+    if bare and len(bare) <= 6 and ' ' not in (name or '').strip():
+        keys.add(bare.lower())
+    keys.discard("")
+    return keys
+
+
+def acronym_keys(name: str) -> set:
+    """All acronym forms a name can be referred to by, lowercase.
+
+    A short single-token name ("DS", "gRED") is its own acronym key, so it
+    collides with the initials of "Discovery Sciences".
+    """
+    keys = stated_acronyms(name) | {name_acronym(name)}
+    keys.discard("")
+    return keys
+
+
+class UnionFind:
+    """Disjoint-set over hashable keys with path compression."""
+
+    def __init__(self, keys=()):
+        self.parent = {k: k for k in keys}
+
+    def find(self, key):
+        self.parent.setdefault(key, key)
+        root = key
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[key] != root:
+            self.parent[key], key = root, self.parent[key]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+    def groups(self) -> list:
+        """Return groups as lists of keys, in first-inserted key order."""
+        groups = {}
+        for key in self.parent:
+            groups.setdefault(self.find(key), []).append(key)
+        return list(groups.values())
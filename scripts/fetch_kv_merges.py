@@ -1,39 +1,29 @@
 """Fetch entity merges from Vercel KV API for pipeline use."""
-import os
 import re
-import requests
+from typing import Dict, Iterable
 
+from kv_snapshot import kv_state, prefetch_snapshots
 
-def fetch_merges(company: str) -> dict:
-    """Fetch merges from /api/merges for a company.
+
+def fetch_merges(company: str, offline: bool = False) -> dict:
+    """Fetch merges (org-state type "merges") for a company.
 
     Returns dict: { canonicalId: { absorbed: [], aliases: [], ... } }
+    Read from the company's KV snapshot, revalidated against the live
+    sync-version (kv_snapshot.py); offline=True uses the stored snapshot only.
+    Raises requests.RequestException when the viewer is unreachable and no
+    snapshot is stored, kv_snapshot.SnapshotMissing offline without one.
     """
-    base_url = os.environ.get('VIEWER_BASE_URL', 'http://localhost:3000')
-    bypass_secret = os.environ.get('VERCEL_AUTOMATION_BYPASS_SECRET', '')
-
-    url = f"{base_url}/api/merges?account={company.lower()}"
-    headers = {}
-    if bypass_secret:
-        headers['x-vercel-protection-bypass'] = bypass_secret
+    return kv_state(company, "merges", offline)
 
-    response = requests.get(url, headers=headers, timeout=10)
-    response.raise_for_status()
-    return response.json()
 
+def prefetch_merges(companies: Iterable[str]) -> Dict[str, Exception]:
+    """Revalidate many companies' KV snapshots concurrently; later fetch_merges() calls reuse them.
 
-def build_alias_lookup(merges: dict) -> dict:
-    """Build normalized alias -> (canonical_id, canonical_name) lookup."""
-    lookup = {}
-    for canonical_id, merge in merges.items():
-        for alias in merge.get('aliases', []):
-            normalized = normalize_entity_name(alias)
-            if normalized:  # Skip empty normalized names
-                lookup[normalized] = {
-                    'canonical_id': canonical_id,
-                    'alias': alias
-                }
-    return lookup
+    Returns {company: exception} for companies whose fetch failed (they are
+    fetched again, and fail again, on demand).
+    """
+    return prefetch_snapshots(companies)
 
 
 def normalize_entity_name(name: str) -> str:
@@ -50,3 +40,126 @@ def normalize_entity_name(name: str) -> str:
     name = re.sub(r'\b(group|inc|ltd|llc|corp|corporation|limited)\s*$', '', name)
     name = re.sub(r'\s+', ' ', name)
     return name.strip()
+
+
+# Minimum scores for fuzzy alias hits (exact and id hits score 1.0)
+ACRONYM_SCORE = 0.9
+TOKEN_SET_SCORE = 0.95
+MIN_TRIGRAM_SCORE = 0.8
+
+
+class AliasIndex:
+    """Known aliases of canonical entities, searchable exactly and fuzzily.
+
+    Built once per company from the KV merges (build_alias_index), then
+    lookup() tries, in order: absorbed/canonical id, exact normalized name,
+    token set, acronym, and trigram similarity. Acronym hits need a stated
+    acronym on at least one side ("DS", "... (DS)"); two names that merely
+    share initials do not match. Each hit carries its match_type and a score
+    in [0, 1]. A name matching two canonical entities equally well is
+    ambiguous and returns None.
+    """
+
+    def __init__(self):
+        # entity_similarity imports this module, so import its helpers lazily
+        from entity_similarity import char_trigrams, name_acronym, name_tokens, stated_acronyms
+        self._char_trigrams, self._name_tokens = char_trigrams, name_tokens
+        self._name_acronym, self._stated_acronyms = name_acronym, stated_acronyms
+        self.entries = []
+        self.by_id = {}
+        self.by_normalized = {}
+        self.by_tokens = {}
+        self.by_acronym = {}
+        self.by_trigram = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, alias: str, canonical_id: str, origin: str = "kv"):
+        """Register one alias of canonical_id."""
+        normalized = normalize_entity_name(alias or "")
+        if not normalized:
+            return
+        entry = {"alias": alias, "canonical_id": canonical_id, "origin": origin}
+        index = len(self.entries)
+        self.entries.append(entry)
+        self.by_normalized.setdefault(normalized, []).append(index)
+        tokens = frozenset(self._name_tokens(alias))
+        if tokens:
+            self.by_tokens.setdefault(tokens, []).append(index)
+        for key in self._stated_acronyms(alias):
+            self.by_acronym.setdefault(key, []).append((index, True))
+        initials = self._name_acronym(alias)
+        if initials and initials not in self._stated_acronyms(alias):
+            self.by_acronym.setdefault(initials, []).append((index, False))
+        grams = self._char_trigrams(alias)
+        entry["trigrams"] = grams
+        for gram in grams:
+            self.by_trigram.setdefault(gram, set()).add(index)
+
+    def add_id(self, entity_id: str, canonical_id: str):
+        """Register an entity id (e.g. an absorbed node) as belonging to canonical_id."""
+        if entity_id:
+            self.by_id[entity_id] = canonical_id
+
+    def _hit(self, indices, match_type: str, score: float) -> Dict | None:
+        canonical_ids = {self.entries[i]["canonical_id"] for i in indices}
+        if len(canonical_ids) != 1:
+            return None  # Ambiguous
+        entry = self.entries[indices[0]]
+        return {"canonical_id": entry["canonical_id"], "alias": entry["alias"], "origin": entry["origin"],
+                "match_type": match_type, "score": score}
+
+    def lookup(self, name: str, entity_id: str | None = None) -> Dict | None:
+        """Best alias hit for an entity name (and optionally its id), or None."""
+        if entity_id and entity_id in self.by_id:
+            return {"canonical_id": self.by_id[entity_id], "alias": entity_id, "origin": "id",
+                    "match_type": "id", "score": 1.0}
+
+        normalized = normalize_entity_name(name or "")
+        if not normalized:
+            return None
+        if normalized in self.by_normalized:
+            return self._hit(self.by_normalized[normalized], "normalized", 1.0)
+
+        tokens = frozenset(self._name_tokens(name))
+        if tokens in self.by_tokens:
+            return self._hit(self.by_tokens[tokens], "token_set", TOKEN_SET_SCORE)
+
+        stated = self._stated_acronyms(name)
+        for key in sorted(stated | {self._name_acronym(name)} - {""}):
+            # Initials only match an alias that states the acronym, and vice versa
+            indices = [i for i, alias_stated in self.by_acronym.get(key, []) if alias_stated or key in stated]
+            hit = self._hit(indices, "acronym", ACRONYM_SCORE) if indices else None
+            if hit:
+                return hit
+
+        grams = self._char_trigrams(name)
+        if not grams:
+            return None
+        shared = {}
+        for gram in grams:
+            for index in self.by_trigram.get(gram, ()):
+                shared[index] = shared.get(index, 0) + 1
+        scored = []
+        for index, overlap in shared.items():
+            other = self.entries[index]["trigrams"]
+            score = overlap / (len(grams) + len(other) - overlap)
+            if score >= MIN_TRIGRAM_SCORE:
+                scored.append((score, index))
+        if not scored:
+            return None
+        best = max(score for score, _ in scored)
+        return self._hit([i for score, i in scored if score == best], "trigram", round(best, 3))
+
+
+def build_alias_index(merges: dict) -> AliasIndex:
+    """AliasIndex over KV merges: every alias and absorbed id points at its canonical id."""
+    index = AliasIndex()
+    for canonical_id, merge in merges.items():
+        index.add_id(canonical_id, canonical_id)
+        for absorbed_id in merge.get('absorbed', []):
+            index.add_id(absorbed_id, canonical_id)
+        for alias in merge.get('aliases', []):
+            index.add(alias, canonical_id, origin='kv')
+    return index
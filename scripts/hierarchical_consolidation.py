@@ -0,0 +1,202 @@
+"""Hierarchical map-reduce consolidation for very large entity lists.
+
+A single flat batching pass cannot see merges that span batches. Tree
+reduction fixes that in O(log n) rounds of parallel calls:
+
+- map: every batch of quality entities is consolidated independently
+- reduce: outputs are compacted to id/name/type/parent_id, neighbouring
+  groups are combined (fan-in), and each combined group is consolidated
+  again, returning only merges and parent changes
+- repeat until a single group (the global result) remains
+
+LLM calls are injected as callables, so this module has no API dependency.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from consolidation_batching import CHARS_PER_TOKEN, DEFAULT_INPUT_TOKEN_BUDGET, OUTPUT_TOKENS_PER_ENTITY, form_batches
+
+# Reduce calls only return changes, so one call can review many compact entities
+REDUCE_MAX_ENTITIES = 400
+
+DEFAULT_FAN_IN = 2
+
+
+def compact_entity(entity: Dict) -> Dict:
+    """Compact a consolidated entity to what a reduce call needs to see."""
+    return {
+        "id": entity["id"],
+        "name": entity.get("name") or entity["id"],
+        "type": entity.get("type"),
+        "parent_id": entity.get("parent_id"),
+    }
+
+
+def estimate_compact_tokens(entity: Dict) -> int:
+    """Estimate prompt tokens for one compacted entity."""
+    return len(json.dumps(compact_entity(entity))) // CHARS_PER_TOKEN + 1
+
+
+def merge_same_ids(entities: List[Dict]) -> List[Dict]:
+    """Collapse entities that independent batches gave the same id.
+
+    Ids are slugs of the canonical name, so equal ids are the same org unit.
+    original_ids are unioned; the first non-null parent_id wins.
+    """
+    merged = {}
+    for entity in entities:
+        existing = merged.get(entity["id"])
+        if not existing:
+            merged[entity["id"]] = dict(entity, original_ids=list(entity.get("original_ids") or [entity["id"]]))
+            continue
+        for orig_id in entity.get("original_ids") or [entity["id"]]:
+            if orig_id not in existing["original_ids"]:
+                existing["original_ids"].append(orig_id)
+        if not existing.get("parent_id") and entity.get("parent_id"):
+            existing["parent_id"] = entity["parent_id"]
+    return list(merged.values())
+
+
+def apply_reduction(entities: List[Dict], reduction: Dict) -> List[Dict]:
+    """Apply a reduce-call result (merges and parent changes) to a group.
+
+    Each returned entity names a canonical input id and, in original_ids, the
+    input ids merged into it. Their original_ids are composed so they still
+    point at quality entities. Inputs the reduce call did not mention pass
+    through unchanged; parent_ids pointing at absorbed ids are remapped.
+    """
+    by_id = {e["id"]: e for e in entities}
+    absorbed = {}
+    updated = {}
+
+    for out in reduction.get("entities", []):
+        members = [i for i in out.get("original_ids") or [] if i in by_id]
+        canonical = out.get("id") if out.get("id") in by_id else (members[0] if members else None)
+        if canonical is None or canonical in absorbed:
+            continue
+
+        record = dict(updated.get(canonical) or by_id[canonical])
+        record["original_ids"] = list(record.get("original_ids") or [canonical])
+        for member in members:
+            if member == canonical or member in absorbed or member in updated:
+                continue
+            for orig_id in by_id[member].get("original_ids") or [member]:
+                if orig_id not in record["original_ids"]:
+                    record["original_ids"].append(orig_id)
+            absorbed[member] = canonical
+            if not record.get("parent_id") and by_id[member].get("parent_id"):
+                record["parent_id"] = by_id[member]["parent_id"]
+
+        if out.get("name"):
+            record["name"] = out["name"]
+        if out.get("type"):
+            record["type"] = out["type"]
+        if out.get("parent_id"):
+            record["parent_id"] = out["parent_id"]
+        updated[canonical] = record
+
+    result = []
+    for entity in entities:
+        if entity["id"] in absorbed:
+            continue
+        record = updated.get(entity["id"], entity)
+        parent_id = absorbed.get(record.get("parent_id"), record.get("parent_id"))
+        if parent_id == record["id"]:
+            parent_id = None
+        if parent_id != record.get("parent_id"):
+            record = dict(record, parent_id=parent_id)
+        result.append(record)
+    return result
+
+
+def combine_groups(groups: List[List[Dict]], level: int, fan_in: int = DEFAULT_FAN_IN,
+                   input_token_budget: int = DEFAULT_INPUT_TOKEN_BUDGET) -> tuple:
+    """Combine neighbouring groups for one reduce level and plan its calls.
+
+    Returns (combined_groups, jobs) where each job is
+    (group_index, compacted_entities, context) for one reduce call.
+    """
+    combined = [groups[i:i + fan_in] for i in range(0, len(groups), fan_in)]
+    groups = [merge_same_ids([e for g in parts for e in g]) for parts in combined]
+
+    jobs = []
+    for group_index, group in enumerate(groups):
+        if len(combined[group_index]) < 2:
+            continue  # odd group out was already reduced at the previous level
+        sub_batches = form_batches(
+            group,
+            input_token_budget=input_token_budget,
+            output_token_budget=OUTPUT_TOKENS_PER_ENTITY * REDUCE_MAX_ENTITIES,
+            token_estimator=estimate_compact_tokens,
+            name_key="name",
+        )
+        for sub_index, sub in enumerate(sub_batches):
+            context = f"Reduce level {level}, group {group_index + 1}/{len(groups)}, part {sub_index + 1}/{len(sub_batches)}"
+            jobs.append((group_index, [compact_entity(e) for e in sub], context))
+    return groups, jobs
+
+
+def plan_reduce_jobs(groups: List[List[Dict]], fan_in: int = DEFAULT_FAN_IN,
+                     input_token_budget: int = DEFAULT_INPUT_TOKEN_BUDGET) -> List[tuple]:
+    """All reduce jobs tree_reduce() would run if no reduce call merged anything.
+
+    Used by the dry-run planner as an upper bound; returns (level, job) pairs.
+    """
+    fan_in = max(2, fan_in)
+    planned = []
+    level = 0
+    while len(groups) > 1:
+        level += 1
+        groups, jobs = combine_groups(groups, level, fan_in, input_token_budget)
+        planned.extend((level, job) for job in jobs)
+    return planned
+
+
+def tree_reduce(batches: List[List[Dict]],
+                map_fn: Callable[[List[Dict], str], Dict],
+                reduce_fn: Callable[[List[Dict], str], Dict],
+                max_workers: int = 4,
+                fan_in: int = DEFAULT_FAN_IN,
+                input_token_budget: int = DEFAULT_INPUT_TOKEN_BUDGET) -> Dict:
+    """Consolidate batches in parallel, then reduce level by level to one result.
+
+    map_fn(batch, context) consolidates quality entities and reduce_fn(compact,
+    context) reviews compacted entities; both return the usual
+    {entities, hierarchy_notes, duplicate_resolutions} dict.
+    """
+    fan_in = max(2, fan_in)
+    notes = []
+    duplicates = []
+
+    def collect(result):
+        if result.get("hierarchy_notes"):
+            notes.append(result["hierarchy_notes"])
+        duplicates.extend(result.get("duplicate_resolutions", []))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        total = len(batches)
+        results = list(pool.map(lambda ib: map_fn(ib[1], f"Batch {ib[0] + 1}/{total}"), enumerate(batches)))
+        groups = []
+        for result in results:
+            collect(result)
+            groups.append(merge_same_ids(result.get("entities", [])))
+
+        level = 0
+        while len(groups) > 1:
+            level += 1
+            groups, jobs = combine_groups(groups, level, fan_in, input_token_budget)
+
+            print(f"    Reduce level {level}: {len(groups)} groups, {len(jobs)} calls")
+            reductions = list(pool.map(lambda job: reduce_fn(job[1], job[2]), jobs))
+
+            for (group_index, _, _), reduction in zip(jobs, reductions):
+                collect(reduction)
+                groups[group_index] = apply_reduction(groups[group_index], reduction)
+
+    return {
+        "entities": groups[0] if groups else [],
+        "hierarchy_notes": "\n\n".join(notes),
+        "duplicate_resolutions": duplicates,
+        "reduction_levels": level,
+    }
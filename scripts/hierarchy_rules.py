@@ -0,0 +1,188 @@
+"""Rule-based parent edges from explicit quote phrasing.
+
+Most parents the consolidation LLM infers are stated outright in quotes:
+"Biomarkers sits within Oncology R&D", "Imaging is part of Oncology",
+"Oncology R&D includes Biomarkers". One regex built over the known entity
+names and these connectors finds every such relation in a quote in a
+single scan, so explicit edges come for free and only the rest of the
+hierarchy needs the LLM.
+
+Connector strength: "within", "part of", "reports into", "includes" are
+strong; "under" and "in" are weak (also used for non-org phrasing).
+"""
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from consolidation_batching import candidate_clusters
+from duplicate_candidates import find_duplicate_candidates
+
+# Shortest entity name used as a surface form (shorter ones are too noisy in free text)
+MIN_NAME_CHARS = 4
+
+# Child named first: "X sits within Y"
+_FORWARD_STRONG = (r"within|inside|part\s+of|belongs?\s+to|reports?\s+(?:in)?to|rolls?\s+up\s+(?:in)?to"
+                   r"|(?:is\s+)?a\s+(?:sub-?)?(?:team|group|unit|function|division)\s+(?:of|in|within)")
+_FORWARD_WEAK = r"underneath|under|(?:sits?|lives?|is|are)\s+in"
+# Parent named first: "Y includes X"
+_REVERSE = r"includes?|including|contains?|consists?\s+of|oversees?|is\s+made\s+up\s+of|has(?:\s+(?:a|an|the))?"
+
+_VERBS = r"(?:(?:which|that|who)\s+)?(?:(?:sits?|is|are|falls?|lives?|was|were)\s+)?"
+_FILLER = r"(?:\s+(?:team|group|org|organization|function|department|unit))?"
+_ARTICLE = r"(?:the\s+|our\s+)?(?:broader\s+|larger\s+|wider\s+|overall\s+)?"
+
+CONNECTOR_WEIGHT = {"strong": 1.0, "weak": 0.5, "reverse": 1.0}
+
+
+def surface_forms(name: str) -> List[str]:
+    """Lowercase forms a name is written as in quotes (with and without its parenthetical)."""
+    forms = {(name or "").lower().strip(), re.sub(r"\s*\([^)]*\)", " ", name or "").lower().strip()}
+    return [f for f in forms if len(f) >= MIN_NAME_CHARS]
+
+
+def build_relation_pattern(names: List[str]) -> re.Pattern | None:
+    """One pattern matching "<name> <connector> <name>" for every connector and known name.
+
+    The right-hand name sits in a lookahead so it can start the next match
+    ("A sits within B, which is part of C" yields both edges).
+    """
+    names = sorted(set(names), key=len, reverse=True)
+    if not names:
+        return None
+    alternation = "|".join(re.escape(n) for n in names)
+    left = r"\b(?P<left>" + alternation + r")" + _FILLER + r",?\s+" + _VERBS
+    right = r"\s+" + _ARTICLE + r"(?=(?P<right>" + alternation + r")\b)"
+    return re.compile(
+        left + r"(?:(?P<strong>" + _FORWARD_STRONG + r")|(?P<weak>" + _FORWARD_WEAK + r")|(?P<reverse>" + _REVERSE + r"))"
+        + right,
+        re.IGNORECASE,
+    )
+
+
+def scan_relations(quote: str, pattern: re.Pattern) -> List[tuple]:
+    """(child form, parent form, kind) for every relation stated in a quote."""
+    relations = []
+    for match in pattern.finditer(quote or ""):
+        kind = next(k for k in ("strong", "weak", "reverse") if match.group(k))
+        left, right = match.group("left").lower(), match.group("right").lower()
+        if kind == "reverse":
+            left, right = right, left
+        relations.append((left, right, kind))
+    return relations
+
+
+def propose_parent_edges(entities: List[Dict], owner: Dict[int, int] | None = None,
+                         name_key: str = "entity_name") -> Dict[int, Dict]:
+    """Parent edges stated in entities' quotes.
+
+    owner maps entity index -> representative index (e.g. a duplicate
+    cluster's canonical entity); by default every entity represents itself.
+    Returns {child index: {"parent", "confidence", "votes", "kinds"}} in
+    representative-index space. A child whose top parents tie gets no edge;
+    edges that would close a cycle are dropped.
+    """
+    owner = owner if owner is not None else {i: i for i in range(len(entities))}
+    surface = {}
+    for i, entity in enumerate(entities):
+        for form in surface_forms(entity[name_key]):
+            surface.setdefault(form, owner[i])
+    pattern = build_relation_pattern(list(surface))
+    if pattern is None:
+        return {}
+
+    weights = defaultdict(Counter)
+    kinds = defaultdict(lambda: defaultdict(set))
+    scanned = set()
+    for entity in entities:
+        for source in entity.get("all_sources", []):
+            quote = source.get("raw_quote") or ""
+            if quote in scanned:
+                continue  # The same quote is often attached to several entities
+            scanned.add(quote)
+            for child_form, parent_form, kind in scan_relations(quote, pattern):
+                child, parent = surface.get(child_form), surface.get(parent_form)
+                if child is None or parent is None or child == parent:
+                    continue
+                weights[child][parent] += CONNECTOR_WEIGHT[kind]
+                kinds[child][parent].add(kind)
+
+    edges = {}
+    for child, counter in weights.items():
+        ranked = counter.most_common(2)
+        if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+            continue  # Tied parents are not explicit
+        parent, weight = ranked[0]
+        strong = kinds[child][parent] - {"weak"}
+        edges[child] = {
+            "parent": parent,
+            "confidence": "high" if strong and len(counter) == 1 else "medium",
+            "votes": weight,
+            "kinds": sorted(kinds[child][parent]),
+        }
+
+    # Drop edges that would close a cycle (visit children in index order for determinism)
+    for child in sorted(edges):
+        seen = {child}
+        node = edges[child]["parent"]
+        while node in edges:
+            if node == child:
+                del edges[child]
+                break
+            if node in seen:
+                break  # A cycle further up; dropped when its own members are visited
+            seen.add(node)
+            node = edges[node]["parent"]
+    return edges
+
+
+def edges_report(entities: List[Dict], edges: Dict[int, Dict], name_key: str = "entity_name") -> List[Dict]:
+    """Edges as JSON-ready rows, for output/{company}/rule_parent_edges.json."""
+    return [{
+        "child_id": entities[child]["id"],
+        "child_name": entities[child][name_key],
+        "parent_id": entities[edge["parent"]]["id"],
+        "parent_name": entities[edge["parent"]][name_key],
+        "confidence": edge["confidence"],
+        "votes": edge["votes"],
+        "kinds": edge["kinds"],
+    } for child, edge in sorted(edges.items())]
+
+
+def settle_by_rules(entities: List[Dict], edges: Dict[int, Dict] | None = None,
+                    near_duplicate_ids: set | None = None) -> Dict:
+    """Take entities with an explicit high-confidence parent and no near-duplicate out of the LLM's hands.
+
+    Returns the LLM consolidation shape for the settled entities, plus
+    "unresolved": everything else, for the LLM. Only entities alone in their
+    candidate_clusters() group and without a trigram duplicate candidate
+    (near_duplicate_ids, from find_duplicate_candidates()) are settled, so no
+    duplicate decision is skipped.
+    """
+    edges = propose_parent_edges(entities) if edges is None else edges
+    if near_duplicate_ids is None:
+        near_duplicate_ids = set(find_duplicate_candidates(entities)["per_entity"])
+    alone = {group[0] for group in candidate_clusters(entities)
+             if len(group) == 1 and entities[group[0]]["id"] not in near_duplicate_ids}
+
+    settled, unresolved = [], []
+    for i, entity in enumerate(entities):
+        edge = edges.get(i)
+        if i in alone and edge and edge["confidence"] == "high":
+            settled.append({
+                "id": entity["id"],
+                "name": entity["entity_name"],
+                "type": entity.get("entity_type", "team"),
+                "parent_id": entities[edge["parent"]]["id"],
+                "confidence": entity.get("confidence", "medium"),
+                "original_ids": [entity["id"]],
+            })
+        else:
+            unresolved.append(entity)
+
+    return {
+        "entities": settled,
+        "unresolved": unresolved,
+        "hierarchy_notes": (f"Rule-based hierarchy: {len(settled)} entities placed from explicit quote phrasing "
+                            f"({len(edges)} edges proposed)."),
+        "duplicate_resolutions": [],
+    }
@@ -0,0 +1,151 @@
+"""Incremental consolidation: diff fresh quality entities against a previous run.
+
+consolidate_with_hierarchy.py re-sends every quality entity to the LLM on a
+full run. When only a handful of new Gong calls have landed, most entities
+were already consolidated last time. This module splits the fresh
+filter_quality_entities() output into:
+
+- known entities: their id (or normalized name) is already covered by an
+  entity in consolidated_with_hierarchy.json, so sources are re-attached
+  deterministically with no LLM call
+- new entities: genuinely new names that need LLM placement, sent together
+  with the existing entities they most likely sit next to
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from entity_similarity import name_similarity, name_tokens
+from fetch_kv_merges import normalize_entity_name
+
+# Existing entity named in a new entity's quotes is a likely parent/sibling
+QUOTE_MENTION_BONUS = 0.5
+
+
+def load_existing_consolidation(filepath: Path) -> Dict | None:
+    """Load a previous consolidated_with_hierarchy.json, or None if absent/unreadable."""
+    if not filepath.exists():
+        return None
+    try:
+        with open(filepath) as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        print(f"  Warning: Could not read existing consolidation {filepath}: {e}")
+        return None
+    if not data.get("entities"):
+        return None
+    return data
+
+
+def consolidated_to_structure(entity: Dict) -> Dict:
+    """Convert a saved consolidated entity back to the LLM result shape.
+
+    merge_consolidation_with_sources() consumes {id, name, type, parent_id,
+    confidence, original_ids}; saved entities use entity_name/entity_type/
+    parent_entity instead.
+    """
+    return {
+        "id": entity["id"],
+        "name": entity.get("entity_name") or entity["id"],
+        "type": entity.get("entity_type", "team"),
+        "parent_id": entity.get("parent_entity"),
+        "confidence": entity.get("confidence", "medium"),
+        "original_ids": list(entity.get("original_ids") or [entity["id"]]),
+    }
+
+
+def diff_against_existing(quality_entities: List[Dict], existing: Dict) -> Tuple[List[Dict], List[Dict]]:
+    """Split quality entities into already-consolidated structure and new entities.
+
+    Returns (structures, new_entities):
+    - structures: one LLM-shaped entry per existing consolidated entity, with
+      original_ids extended by any fresh quality entity whose normalized name
+      matches the consolidated entity's name
+    - new_entities: quality entities not covered by any existing entity
+    """
+    structures = [consolidated_to_structure(e) for e in existing.get("entities", [])]
+
+    by_original_id = {}
+    by_name = {}
+    for structure in structures:
+        for orig_id in structure["original_ids"]:
+            by_original_id.setdefault(orig_id, structure)
+        by_name.setdefault(normalize_entity_name(structure["name"]), structure)
+
+    new_entities = []
+    for entity in quality_entities:
+        if entity["id"] in by_original_id:
+            continue
+        structure = by_name.get(normalize_entity_name(entity["entity_name"]))
+        if structure:
+            structure["original_ids"].append(entity["id"])
+            by_original_id[entity["id"]] = structure
+            continue
+        new_entities.append(entity)
+
+    return structures, new_entities
+
+
+def select_neighbors(entity: Dict, existing_entities: List[Dict], limit: int = 5) -> List[Dict]:
+    """Pick existing consolidated entities most likely related to a new entity.
+
+    Scores by name similarity, plus a bonus when the existing entity's name
+    appears in one of the new entity's quotes ("X is part of Oncology").
+    """
+    quotes = " ".join((s.get("raw_quote") or "") for s in entity.get("all_sources", [])).lower()
+    quote_tokens = name_tokens(quotes)
+
+    scored = []
+    for existing in existing_entities:
+        existing_name = existing.get("entity_name") or ""
+        score = name_similarity(entity["entity_name"], existing_name)
+        existing_tokens = name_tokens(existing_name)
+        if existing_tokens and existing_tokens <= quote_tokens:
+            score += QUOTE_MENTION_BONUS
+        if score > 0:
+            scored.append((score, existing["id"], existing))
+
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    return [existing for _, _, existing in scored[:limit]]
+
+
+def collect_neighbors(new_entities: List[Dict], existing_entities: List[Dict], per_entity: int = 5) -> List[Dict]:
+    """Union of select_neighbors() over a batch of new entities, first-seen order."""
+    seen = set()
+    neighbors = []
+    for entity in new_entities:
+        for neighbor in select_neighbors(entity, existing_entities, per_entity):
+            if neighbor["id"] not in seen:
+                seen.add(neighbor["id"])
+                neighbors.append(neighbor)
+    return neighbors
+
+
+def apply_placements(structures: List[Dict], placement: Dict, new_entities: List[Dict]) -> List[Dict]:
+    """Fold an LLM placement result for new entities into the existing structure.
+
+    Placement entities whose id matches an existing consolidated entity are
+    merges: their new original_ids are appended to that entity. All other
+    placement entities are appended as new structure entries. Only ids of the
+    new entities are accepted as original_ids, so the LLM cannot re-home
+    entities that were already consolidated.
+    """
+    new_ids = {e["id"] for e in new_entities}
+    by_id = {s["id"]: s for s in structures}
+    result = list(structures)
+
+    for placed in placement.get("entities", []):
+        original_ids = [i for i in placed.get("original_ids", [placed.get("id")]) if i in new_ids]
+        target = by_id.get(placed.get("id"))
+        if target:
+            for orig_id in original_ids:
+                if orig_id not in target["original_ids"]:
+                    target["original_ids"].append(orig_id)
+            continue
+        if not original_ids:
+            continue
+        placed = dict(placed, original_ids=original_ids)
+        result.append(placed)
+        by_id[placed["id"]] = placed
+
+    return result
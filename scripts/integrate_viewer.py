@@ -10,6 +10,9 @@ Usage:
     python3 scripts/integrate_viewer.py --preview     # Show what would be updated
     python3 scripts/integrate_viewer.py --update      # Actually update index.html
     python3 scripts/integrate_viewer.py --export-json # Export data files only
+    python3 scripts/integrate_viewer.py --json --bake-kv               # Per-company JSON with KV decisions applied
+    python3 scripts/integrate_viewer.py --json --bake-kv --kv-snapshot # Same, from stored KV snapshots (no requests)
+    python3 scripts/integrate_viewer.py --json --compact-calls         # Per-company JSON with a shared calls table
 
 Output:
     - output/viewer_data.json           # DATA object for viewer
@@ -24,12 +27,24 @@ import argparse
 import hashlib
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+import requests
+
+from alias_dictionary import alias_group, build_alias_dictionary, load_alias_dictionary
+from bake_overlays import BASE_FILENAME, bake_company_data
+from call_ids import CallIdResolver, snippet_call_key
+from call_table import compact_calls
+from kv_snapshot import SnapshotMissing, account_snapshot
+from local_matcher import ManualNodeIndex, top_k
+from manual_maps import load_manual_map
+from sparse_json import empty_evidence, sparse
+from speaker_turns import segment_contexts
+from subtree_rollups import add_rollups
 
 BASE_DIR = Path(__file__).parent.parent
 OUTPUT_DIR = BASE_DIR / "output"
 PUBLIC_DIR = BASE_DIR / "public"
-MANUAL_MAPS_DIR = BASE_DIR / "Manual Maps Jan 26 2026"
 
 COMPANIES = ["abbvie", "astrazeneca", "gsk", "lilly", "novartis", "regeneron", "roche"]
 
@@ -49,7 +64,10 @@ BATCHES_DIR = BASE_DIR / "batches_enriched"
 
 def load_transcripts(company: str) -> dict:
     """Load all transcripts for a company from batches_enriched/.
-    Returns: { call_id: { 'text': str, 'title': str } }
+    Returns: { call_id: { 'text': str, 'title': str, 'gongUrl'?: str, 'date'?: str } }
+
+    Snippets name calls in other forms than the batch call_id; look them up
+    through CallIdResolver.from_transcripts(), not by key.
     """
     transcripts = {}
     batch_dir = BATCHES_DIR / company
@@ -65,6 +83,10 @@ def load_transcripts(company: str) -> dict:
                 'text': call.get('transcript_text', ''),
                 'title': call.get('call_title', '')
             }
+            if call.get('gong_url'):
+                transcripts[call['call_id']]['gongUrl'] = call['gong_url']
+            if call.get('call_date'):
+                transcripts[call['call_id']]['date'] = call['call_date']
     return transcripts
 
 
@@ -272,6 +294,14 @@ def normalize_entity_name(name: str) -> str:
     return re.sub(r'\s+', ' ', name.lower().strip())
 
 
+def load_company_alias_dictionary(company: str, manual_map: Dict) -> Dict:
+    """Alias dictionary harvested by consolidation, else one built from the manual map alone."""
+    dictionary = load_alias_dictionary(OUTPUT_DIR / company / "alias_dictionary.json")
+    if dictionary is None:
+        dictionary = build_alias_dictionary(company, manual_map.get("root", manual_map) if manual_map else None)
+    return dictionary
+
+
 def build_manual_map_names(manual_root: Dict) -> set:
     """Build a set of normalized names from the manual map."""
     names = set()
@@ -287,12 +317,70 @@ def build_manual_map_names(manual_root: Dict) -> set:
     return names
 
 
+def is_name_matched(name: str, manual_names: set, alias_dictionary: Dict = None) -> bool:
+    """True when an auto entity name is a manual node name or a known alias of one."""
+    alias = alias_group(alias_dictionary, name)
+    return normalize_entity_name(name) in manual_names or bool(alias and alias.get("manual_node_id"))
+
+
+def match_auto_map_locally(auto_map: Dict, manual_map: Dict, alias_dictionary: Dict = None) -> Dict:
+    """Score auto entities without a name/alias match against the manual nodes (local_matcher.py).
+
+    Returns {"auto_matched": [...], "by_node": {manual node id: [(entity
+    name, parent name)]}, "llm_queue": [...]}: confident matches, the same
+    grouped for the manual/auto join, and the ambiguous remainder left for
+    LLM suggestion, each with its top-ranked manual nodes ("candidate_matches").
+    Entities are identified by name and auto map parent, so a same-named
+    entity elsewhere in the auto map is not matched with them.
+    """
+    result = {"auto_matched": [], "by_node": {}, "llm_queue": []}
+    if not auto_map or not auto_map.get("root") or not manual_map:
+        return result
+    manual_root = manual_map.get("root", manual_map)
+    manual_names = build_manual_map_names(manual_root)
+    index = ManualNodeIndex(manual_root)
+
+    def collect(node, ancestors):
+        name = node.get("name", "")
+        if node.get("snippets") and name and not is_name_matched(name, manual_names, alias_dictionary):
+            local = index.match(name, ancestors)
+            parent = ancestors[0] if ancestors else None
+            if local["status"] == "auto":
+                best = local["best"]
+                result["auto_matched"].append({"gong_entity": name, "gong_parent": parent,
+                                               **{k: v for k, v in best.items() if k != "rank_score"}})
+                result["by_node"].setdefault(best["manual_node_id"], []).append((name, parent))
+            else:
+                result["llm_queue"].append({"gong_entity": name, "gong_parent": parent,
+                                            "candidate_matches": top_k(local["candidates"])})
+        for child in node.get("children", []):
+            collect(child, [name] + ancestors)
+
+    collect(auto_map["root"], [])
+    return result
+
+
+def save_local_matches(company: str, local_matches: Dict):
+    """Write output/{company}/local_matches.json (auto-matched entities and the LLM queue)."""
+    filepath = OUTPUT_DIR / company / "local_matches.json"
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(filepath, "w") as f:
+        json.dump({"company": company, "generated_at": datetime.now().isoformat(),
+                   "auto_matched": local_matches["auto_matched"], "llm_queue": local_matches["llm_queue"]},
+                  f, indent=2)
+
+
 def generate_match_review_from_auto_map(company: str, auto_map: Dict, manual_map: Dict,
-                                        transcripts: dict = None) -> Dict:
+                                        transcripts: dict = None, alias_dictionary: Dict = None,
+                                        local_matches: Dict = None) -> Dict:
     """Generate match review data from true auto map.
 
     Finds entities in auto map that DON'T match any manual map node.
-    These are the "unmatched" entities that need user review.
+    These are the "unmatched" entities that need user review. An entity whose
+    name is a known alias of a manual node (alias_dictionary) is matched, and
+    so is one the local matcher auto-matched (local_matches, from
+    match_auto_map_locally()). Each item carries its top-ranked manual nodes
+    ("candidate_matches") for the viewer's entity picker.
 
     Loads LLM match suggestions to provide suggested matches.
     If transcripts provided, enriches each snippet with contextBefore/contextAfter.
@@ -303,6 +391,12 @@ def generate_match_review_from_auto_map(company: str, auto_map: Dict, manual_map
     # Build set of all manual map entity names (normalized)
     manual_root = manual_map.get("root", manual_map)
     manual_names = build_manual_map_names(manual_root) if manual_root else set()
+    auto_matched = {(normalize_entity_name(m["gong_entity"]), m["gong_parent"])
+                    for m in (local_matches or {}).get("auto_matched", [])}
+    # Candidates the local matcher already ranked (with full ancestors); the rest are scored here
+    queued_candidates = {(normalize_entity_name(m["gong_entity"]), m["gong_parent"]): m["candidate_matches"]
+                         for m in (local_matches or {}).get("llm_queue", []) if "candidate_matches" in m}
+    node_index = None
 
     # Load LLM match suggestions
     llm_data = load_llm_matches(company)
@@ -316,12 +410,14 @@ def generate_match_review_from_auto_map(company: str, auto_map: Dict, manual_map
     unmatched_items = []
 
     def collect_unmatched(node, parent_name=None):
+        nonlocal node_index
         name = node.get("name", "")
         name_lower = normalize_entity_name(name)
         snippets = node.get("snippets", [])
 
-        # Check if this entity matches any manual map node
-        is_matched = name_lower in manual_names
+        # Check if this entity matches any manual map node, by name, known alias or local match
+        is_matched = (is_name_matched(name, manual_names, alias_dictionary)
+                      or (name_lower, parent_name) in auto_matched)
 
         if snippets and not is_matched:
             # This entity has evidence but no manual map match - add to review
@@ -339,6 +435,11 @@ def generate_match_review_from_auto_map(company: str, auto_map: Dict, manual_map
                     "reasoning": llm_match.get("reasoning")
                 }
 
+            candidate_matches = queued_candidates.get((name_lower, parent_name))
+            if candidate_matches is None:
+                node_index = node_index or ManualNodeIndex(manual_root)
+                candidate_matches = node_index.top_candidates(name, [parent_name])
+
             item = {
                 "id": f"{company}_{name_lower.replace(' ', '_')}_{hashlib.md5((company + ':' + name_lower + ':' + parent_name).encode()).hexdigest()[:8]}",
                 "company": company,
@@ -355,10 +456,11 @@ def generate_match_review_from_auto_map(company: str, auto_map: Dict, manual_map
                 "internal_name": first_snippet.get("internalName"),
                 "internal_email": first_snippet.get("internalEmail"),
                 "llm_suggested_match": llm_suggested_match,
+                "candidate_matches": candidate_matches,
                 "status": "pending",
                 "gong_url": first_snippet.get("gongUrl"),
                 "call_id": first_snippet.get("callId"),
-                "call_count": len(set(s.get("callId") for s in snippets if s.get("callId"))),
+                "call_count": len({snippet_call_key(s) for s in snippets} - {None}),
                 "all_snippets": snippets
             }
             unmatched_items.append(item)
@@ -373,17 +475,18 @@ def generate_match_review_from_auto_map(company: str, auto_map: Dict, manual_map
     ctx_total = 0
     ctx_replaced = 0
     if transcripts:
+        call_resolver = CallIdResolver.from_transcripts(transcripts)
         for item in unmatched_items:
             entity_name = item.get("gong_entity", "")
             for snippet in item.get("all_snippets", []):
-                call_id = snippet.get("callId")
-                if call_id and call_id in transcripts:
+                call_key = call_resolver.resolve_snippet(snippet)
+                if call_key:
                     ctx_total += 1
                     # Try standard match first, then fallbacks
-                    context = find_context(snippet.get("quote", ""), transcripts[call_id])
+                    context = find_context(snippet.get("quote", ""), transcripts[call_key])
                     if not context:
                         context = find_context_with_fallbacks(
-                            snippet.get("quote", ""), transcripts[call_id],
+                            snippet.get("quote", ""), transcripts[call_key],
                             entity_name=entity_name
                         )
                         if context and context.get("exactQuote"):
@@ -403,6 +506,7 @@ def generate_match_review_from_auto_map(company: str, auto_map: Dict, manual_map
     return {
         "total_unmatched": len(unmatched_items),
         "total_with_suggestions": with_suggestions,
+        "total_auto_matched": len((local_matches or {}).get("auto_matched", [])),
         "items": unmatched_items
     }
 
@@ -428,30 +532,6 @@ def load_llm_matches(company: str) -> Dict:
     return {}
 
 
-def load_manual_map(company: str) -> Dict:
-    """Load manual map for a company."""
-    # Try different filename patterns (prefer fixed versions)
-    patterns = [
-        f"{company}_rd_map_fixed.json",  # Prefer fixed version
-        f"{company}_rd_map.json",
-        f"{company}-rd-org-map.json",
-        f"{company}_rd_map (2).json"
-    ]
-
-    for pattern in patterns:
-        filepath = MANUAL_MAPS_DIR / pattern
-        if filepath.exists():
-            try:
-                with open(filepath) as f:
-                    return json.load(f)
-            except json.JSONDecodeError as e:
-                print(f"  Warning: JSON error in {pattern}: {e}")
-                continue
-
-    print(f"  Warning: No valid manual map found for {company}")
-    return {}
-
-
 def count_nodes(node: Dict) -> int:
     """Count total nodes in tree."""
     count = 1
@@ -460,55 +540,85 @@ def count_nodes(node: Dict) -> int:
     return count
 
 
-def build_auto_entity_lookup(enriched_root: Dict) -> Dict[str, Dict]:
-    """Build a lookup of entity name → full entity data from auto map.
+class AutoEntityIndex:
+    """Join index from manual map nodes to the auto map entities that carry evidence.
 
-    This allows us to merge Gong data (snippets, size, leader, sizeMentions)
-    from the auto map into manual map nodes when they share the same entity name.
-
-    Returns dict with: snippets, size, leader, sizeMentions for each matched entity.
+    Entities are keyed separately by auto node id, normalized name, alias
+    group (alias_dictionary) and normalized name under their auto map parent
+    (for local matches), so an id never shadows a name and two entities
+    sharing a name are both kept. candidates() returns every auto entity for
+    a manual node, each with how it was joined.
 
     Handles both:
     - TRUE auto map format: data directly on node
     - Legacy enriched format: data in gong_evidence
     """
-    lookup = {}
-
-    def collect(node):
-        name_lower = node.get("name", "").lower().strip()
-        node_id = node.get("id", "")
-
-        # Get snippets - check both formats
-        # TRUE auto map: snippets directly on node
-        snippets = node.get("snippets", [])
-
-        # Legacy enriched format: snippets in gong_evidence
-        if not snippets:
-            gong_evidence = node.get("gong_evidence", {})
-            snippets = gong_evidence.get("snippets", [])
 
+    def __init__(self, enriched_root: Dict | None = None, alias_dictionary: Dict = None):
+        self.alias_dictionary = alias_dictionary
+        self.entities = []
+        self.by_id = {}
+        self.by_name = {}
+        self.by_alias = {}
+        self.by_placement = {}
+        if enriched_root:
+            self._collect(enriched_root)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def _collect(self, node: Dict, parent: str | None = None):
+        # TRUE auto map: snippets directly on node; legacy enriched format: in gong_evidence
+        snippets = node.get("snippets", []) or node.get("gong_evidence", {}).get("snippets", [])
         if snippets:
-            # Build full entity data object
-            entity_data = {
+            self.add({
+                "id": node.get("id", ""),
+                "name": node.get("name", ""),
                 "snippets": snippets,
                 "size": node.get("size"),
                 "leader": node.get("leader"),
                 "sizeMentions": node.get("sizeMentions", []),
-            }
-
-            # Index by both name and id for flexible matching
-            if name_lower:
-                lookup[name_lower] = entity_data
-            if node_id:
-                lookup[node_id] = entity_data
-
+            }, parent)
         for child in node.get("children", []):
-            collect(child)
-
-    collect(enriched_root)
-    return lookup
-
-
+            self._collect(child, node.get("name", ""))
+
+    def add(self, entity: Dict, parent: str | None = None):
+        index = len(self.entities)
+        self.entities.append(entity)
+        if entity.get("id"):
+            self.by_id.setdefault(entity["id"], []).append(index)
+        name = normalize_entity_name(entity.get("name", ""))
+        if name:
+            self.by_name.setdefault(name, []).append(index)
+            self.by_placement.setdefault((name, parent), []).append(index)
+            group = alias_group(self.alias_dictionary, name)
+            if group:
+                self.by_alias.setdefault(group["key"], []).append(index)
+
+    def candidates(self, node: Dict, local_by_node: Dict = None) -> List[tuple]:
+        """[(entity, matched_by)] for a manual node, each entity once.
+
+        matched_by is "id", "name", "alias" (same alias_dictionary group) or
+        "local" (auto-matched to this node by local_matcher; local_by_node
+        lists (entity name, parent name) pairs per manual node id).
+        """
+        name = normalize_entity_name(node.get("name", ""))
+        group = alias_group(self.alias_dictionary, name) if name else None
+        keyed = [
+            ("id", self.by_id.get(node.get("id") or "", [])),
+            ("name", self.by_name.get(name, [])),
+            ("alias", self.by_alias.get(group["key"], []) if group else []),
+            ("local", [i for local_name, parent in (local_by_node or {}).get(node.get("id"), [])
+                       for i in self.by_placement.get((normalize_entity_name(local_name), parent), [])]),
+        ]
+        seen = set()
+        result = []
+        for matched_by, indices in keyed:
+            for index in indices:
+                if index not in seen:
+                    seen.add(index)
+                    result.append((self.entities[index], matched_by))
+        return result
 
 
 def count_snippets(node: Dict) -> int:
@@ -572,7 +682,8 @@ def build_leader_lookup(manual_root: Dict) -> Dict[str, Dict]:
 
 
 def convert_node_for_viewer(node: Dict, leader_lookup: Dict = None,
-                            transcripts: dict = None, context_stats: dict = None) -> Dict:
+                            transcripts: dict = None, context_stats: dict = None,
+                            call_resolver: CallIdResolver = None) -> Dict:
     """Convert auto map node to viewer DATA format.
 
     Handles both:
@@ -583,7 +694,9 @@ def convert_node_for_viewer(node: Dict, leader_lookup: Dict = None,
     from manual map by entity name.
 
     If transcripts is provided, enriches each snippet with contextBefore,
-    contextAfter, and callTitle from the transcript.
+    contextAfter, and callTitle from the transcript. Snippet call ids are
+    resolved to transcript keys by call_resolver (built from transcripts
+    when not given; pass one to share it across calls).
 
     context_stats is a mutable dict for tracking: matched, total, failures.
 
@@ -594,6 +707,8 @@ def convert_node_for_viewer(node: Dict, leader_lookup: Dict = None,
     if not leader and leader_lookup:
         name_lower = node.get("name", "").lower().strip()
         leader = leader_lookup.get(name_lower)
+    if transcripts and call_resolver is None:
+        call_resolver = CallIdResolver.from_transcripts(transcripts)
 
     result = {
         "id": node.get("id"),
@@ -628,13 +743,14 @@ def convert_node_for_viewer(node: Dict, leader_lookup: Dict = None,
         # Enrich with transcript context if available
         if transcripts and context_stats is not None:
             call_id = snippet.get("callId")
-            if call_id and call_id in transcripts:
+            call_key = call_resolver.resolve_snippet(snippet)
+            if call_key:
                 context_stats['total'] += 1
-                context = find_context(viewer_snippet['quote'], transcripts[call_id])
+                context = find_context(viewer_snippet['quote'], transcripts[call_key])
                 if not context:
                     entity_name = node.get("name", "")
                     context = find_context_with_fallbacks(
-                        viewer_snippet['quote'], transcripts[call_id],
+                        viewer_snippet['quote'], transcripts[call_key],
                         entity_name=entity_name
                     )
                     if context and context.get("exactQuote"):
@@ -674,18 +790,40 @@ def convert_node_for_viewer(node: Dict, leader_lookup: Dict = None,
     # Recursively process children
     for child in node.get("children", []):
         result["children"].append(
-            convert_node_for_viewer(child, leader_lookup, transcripts, context_stats)
+            convert_node_for_viewer(child, leader_lookup, transcripts, context_stats, call_resolver)
         )
 
     return result
 
 
-def convert_manual_node_for_viewer(node: Dict, entity_lookup: Dict = None) -> Dict:
+def merge_auto_entities(matches: List[tuple]) -> Dict | None:
+    """Evidence of every auto entity joined to one manual node, with provenance.
+
+    Each snippet is tagged with the auto entity it came from (entityName),
+    and matchedEntities lists the entities and how each was joined.
+    """
+    if not matches:
+        return None
+    sizes = [e["size"] for e, _ in matches if e.get("size")]
+    return {
+        "snippets": [{**s, "entityName": s.get("entityName") or e.get("name")}
+                     for e, _ in matches for s in e.get("snippets", [])],
+        "sizes": list(dict.fromkeys(sizes)),
+        "leader": next((e["leader"] for e, _ in matches if e.get("leader")), None),
+        "sizeMentions": [m for e, _ in matches for m in e.get("sizeMentions", [])],
+        "matchedEntities": [{"name": e.get("name"), "confidence": "medium", "matchedBy": matched_by}
+                            for e, matched_by in matches],
+    }
+
+
+def convert_manual_node_for_viewer(node: Dict, entity_index: AutoEntityIndex = None,
+                                   local_by_node: Dict = None) -> Dict:
     """Convert manual map node to viewer MANUAL_DATA format with enriched data.
 
     Viewer expects gongEvidence (camelCase), not gong_evidence.
-    If entity_lookup is provided, we merge matching data (snippets, size, leader,
-    sizeMentions) from the auto map into this manual map node.
+    If entity_index is provided, we merge data (snippets, size, leader,
+    sizeMentions) from every auto map entity joined to this node: by id,
+    name, alias group, or local match (local_by_node).
     """
     result = {
         "id": node.get("id"),
@@ -694,16 +832,7 @@ def convert_manual_node_for_viewer(node: Dict, entity_lookup: Dict = None) -> Di
         "level": node.get("level", 0),
         "sites": node.get("sites", []),
         "notes": node.get("notes", ""),
-        "gongEvidence": {  # camelCase for viewer
-            "matchedEntities": [],
-            "matchedContacts": [],
-            "totalMentions": 0,
-            "teamSizes": [],
-            "sizeMentions": [],
-            "snippets": [],
-            "confidence": "none",
-            "status": "unverified"
-        },
+        "gongEvidence": empty_evidence(),  # camelCase for viewer
         "children": []
     }
 
@@ -725,13 +854,9 @@ def convert_manual_node_for_viewer(node: Dict, entity_lookup: Dict = None) -> Di
             "status": gong_evidence.get("status", "unverified")
         }
 
-    # MERGE DATA from auto map lookup if available
-    if entity_lookup and not result["gongEvidence"]["snippets"]:
-        name_lower = node.get("name", "").lower().strip()
-        node_id = node.get("id", "")
-
-        # Try to find matching entity by name or id
-        matched_entity = entity_lookup.get(name_lower) or entity_lookup.get(node_id)
+    # MERGE DATA from auto map entities joined to this node
+    if entity_index and not result["gongEvidence"]["snippets"]:
+        matched_entity = merge_auto_entities(entity_index.candidates(node, local_by_node))
 
         if matched_entity:
             # Pull snippets
@@ -741,11 +866,11 @@ def convert_manual_node_for_viewer(node: Dict, entity_lookup: Dict = None) -> Di
                 result["gongEvidence"]["totalMentions"] = len(snippets)
                 result["gongEvidence"]["confidence"] = "medium"
                 result["gongEvidence"]["status"] = "auto_matched"
+                result["gongEvidence"]["matchedEntities"] = matched_entity["matchedEntities"]
 
-            # Pull team size from auto entity
-            auto_size = matched_entity.get("size")
-            if auto_size:
-                result["gongEvidence"]["teamSizes"] = [auto_size]
+            # Pull team sizes from auto entities
+            if matched_entity["sizes"]:
+                result["gongEvidence"]["teamSizes"] = matched_entity["sizes"]
 
             # Pull sizeMentions from auto entity
             auto_size_mentions = matched_entity.get("sizeMentions", [])
@@ -759,7 +884,7 @@ def convert_manual_node_for_viewer(node: Dict, entity_lookup: Dict = None) -> Di
 
     # Recursively process children
     for child in node.get("children", []):
-        result["children"].append(convert_manual_node_for_viewer(child, entity_lookup))
+        result["children"].append(convert_manual_node_for_viewer(child, entity_index, local_by_node))
 
     return result
 
@@ -878,24 +1003,28 @@ def calculate_manual_map_stats(root: Dict) -> Dict:
     return stats
 
 
-def convert_manual_map_to_viewer(company: str, manual_map: Dict, enriched_map: Dict = None) -> Dict:
+def convert_manual_map_to_viewer(company: str, manual_map: Dict, enriched_map: Dict = None,
+                                 alias_dictionary: Dict = None, local_matches: Dict = None) -> Dict:
     """Convert manual map to viewer MANUAL_DATA format with enriched data.
 
     If enriched_map is provided, data from matching entities (snippets, size,
-    leader, sizeMentions) will be merged into the manual map nodes.
+    leader, sizeMentions) will be merged into the manual map nodes, matching
+    by name, id, alias_dictionary alias or local match (local_matches).
+    Every node gets a "rollup" of its subtree's evidence (subtree_rollups.py).
     """
     raw_root = manual_map.get("root", manual_map)  # Handle both formats
 
-    # Build entity lookup from auto map (includes snippets, size, leader, sizeMentions)
-    entity_lookup = {}
+    # Join index over auto map entities (snippets, size, leader, sizeMentions)
+    entity_index = None
     if enriched_map and enriched_map.get("root"):
-        entity_lookup = build_auto_entity_lookup(enriched_map["root"])
+        entity_index = AutoEntityIndex(enriched_map["root"], alias_dictionary)
 
     # Convert to viewer format with data merging
-    root = convert_manual_node_for_viewer(raw_root, entity_lookup)
+    root = convert_manual_node_for_viewer(raw_root, entity_index, (local_matches or {}).get("by_node"))
 
-    # Calculate stats
+    # Calculate stats, and per-node subtree totals for the viewer
     stats = calculate_manual_map_stats(root)
+    add_rollups(root)
 
     return {
         "company": COMPANY_DISPLAY_NAMES.get(company, company.title()),
@@ -926,6 +1055,7 @@ def generate_viewer_data() -> tuple:
         # Load all data
         enriched_map = load_enriched_auto_map(company)
         manual_map = load_manual_map(company)
+        alias_dictionary = load_company_alias_dictionary(company, manual_map)
 
         # Load transcripts for context extraction
         transcripts = load_transcripts(company)
@@ -936,17 +1066,26 @@ def generate_viewer_data() -> tuple:
             data[company] = convert_auto_map_to_data(company, enriched_map, manual_map, transcripts)
             print(f"    DATA: {data[company]['stats']['entities']} entities, {data[company]['stats']['snippets']} snippets")
 
+        # Match entities with no name/alias match locally; only the ambiguous rest goes to the LLM
+        local_matches = match_auto_map_locally(enriched_map, manual_map, alias_dictionary)
+        if enriched_map and manual_map:
+            save_local_matches(company, local_matches)
+            print(f"    LOCAL MATCHES: {len(local_matches['auto_matched'])} auto-matched, "
+                  f"{len(local_matches['llm_queue'])} left for LLM suggestion")
+
         if manual_map:
             # Pass enriched DATA root (has contextBefore on snippets) instead of raw auto map
             enriched_data_for_manual = data.get(company) if data.get(company) else enriched_map
-            manual_data[company] = convert_manual_map_to_viewer(company, manual_map, enriched_data_for_manual)
+            manual_data[company] = convert_manual_map_to_viewer(company, manual_map, enriched_data_for_manual,
+                                                                alias_dictionary, local_matches)
             # Use stats from conversion
             stats = manual_data[company].get("stats", {})
             print(f"    MANUAL_DATA: {stats.get('entities', 0)} entities, {stats.get('matched', 0)} matched, {stats.get('snippets', 0)} snippets")
 
         # Generate match review from auto map (finds unmatched entities)
         if enriched_map and manual_map:
-            match_review_data = generate_match_review_from_auto_map(company, enriched_map, manual_map, transcripts)
+            match_review_data = generate_match_review_from_auto_map(company, enriched_map, manual_map, transcripts,
+                                                                    alias_dictionary, local_matches)
             if match_review_data:
                 match_review["companies"][company] = match_review_data
                 print(f"    MATCH_REVIEW: {match_review_data['total_unmatched']} unmatched items")
@@ -1033,12 +1172,34 @@ def preview(data: Dict, manual_data: Dict, match_review: Dict):
     print(f"Total MATCH_REVIEW_DATA size: {len(json.dumps(match_review)):,} bytes")
 
 
-def export_per_company_json(manual_data: Dict, match_review: Dict):
+def bake_kv_overlays(company: str, company_manual: Dict, offline: bool = False) -> Dict | None:
+    """company_manual with the company's KV decisions applied, or None when no snapshot is available."""
+    try:
+        snapshot = account_snapshot(company, offline=offline)
+    except (requests.RequestException, SnapshotMissing) as e:
+        print(f"  Warning: not baking KV decisions for {company} ({e})")
+        return None
+    return bake_company_data(company_manual, snapshot)
+
+
+def export_per_company_json(manual_data: Dict, match_review: Dict, bake_kv: bool = False,
+                            kv_offline: bool = False, compact: bool = False):
     """Export per-company JSON files for Next.js app.
 
     Writes:
       public/data/{company}/manual.json
+      public/data/{company}/manual.base.json  (with bake_kv: the unbaked map)
       public/data/{company}/match-review.json
+
+    With bake_kv, manual.json has the KV snapshot's merges, field edits,
+    moves and additions/deletions applied (bake_overlays.py); the viewer then
+    only applies decisions made after the build.
+
+    Snippet context windows are written as speaker turns with resolved
+    speaker names (speaker_turns.py), not as raw tagged text. With compact,
+    each file's call metadata goes into a "calls" table the snippets and
+    review items index into (call_table.py). Null and default fields are
+    left out of every file (sparse_json.py).
     """
     data_dir = PUBLIC_DIR / "data"
     print(f"\nWriting per-company JSON to {data_dir}/...")
@@ -1050,11 +1211,23 @@ def export_per_company_json(manual_data: Dict, match_review: Dict):
         # Manual map data
         company_manual = manual_data.get(company)
         if company_manual:
+            company_manual = segment_contexts(company_manual)
+            if compact:
+                company_manual = compact_calls(company_manual)
+            baked = bake_kv_overlays(company, company_manual, kv_offline) if bake_kv else None
+            base_path = company_dir / BASE_FILENAME
+            if baked:
+                with open(base_path, "w") as f:
+                    json.dump(sparse(company_manual), f)
+                company_manual = baked
+            elif base_path.exists():
+                base_path.unlink()
             manual_path = company_dir / "manual.json"
             with open(manual_path, "w") as f:
-                json.dump(company_manual, f)
+                json.dump(sparse(company_manual), f)
             size = manual_path.stat().st_size
-            print(f"  {company}/manual.json ({size:,} bytes)")
+            baked_note = f", KV sync-version {baked['kvOverlay']['syncVersion']} baked in" if baked else ""
+            print(f"  {company}/manual.json ({size:,} bytes{baked_note})")
         else:
             print(f"  {company}/manual.json (skipped — no data)")
 
@@ -1062,11 +1235,13 @@ def export_per_company_json(manual_data: Dict, match_review: Dict):
         company_review = match_review.get("companies", {}).get(company)
         review_obj = {
             "generated": match_review.get("generated", ""),
-            **(company_review or {"total_unmatched": 0, "items": []})
+            **segment_contexts(company_review or {"total_unmatched": 0, "items": []})
         }
+        if compact:
+            review_obj = compact_calls(review_obj)
         review_path = company_dir / "match-review.json"
         with open(review_path, "w") as f:
-            json.dump(review_obj, f)
+            json.dump(sparse(review_obj), f)
         size = review_path.stat().st_size
         print(f"  {company}/match-review.json ({size:,} bytes)")
 
@@ -1080,6 +1255,12 @@ def main():
     parser.add_argument("--export-json", action="store_true", help="Export data files only")
     parser.add_argument("--json", action="store_true",
                         help="Export per-company JSON for Next.js (public/data/{company}/)")
+    parser.add_argument("--bake-kv", action="store_true",
+                        help="With --json: apply KV review decisions to manual.json at build time")
+    parser.add_argument("--kv-snapshot", action="store_true",
+                        help="With --bake-kv: use stored KV snapshots (output/kv_snapshots/) without requests")
+    parser.add_argument("--compact-calls", action="store_true",
+                        help="With --json: write call metadata once per call in a shared calls table")
 
     args = parser.parse_args()
 
@@ -1098,7 +1279,8 @@ def main():
         export_json(data, manual_data, match_review)
 
     if args.json:
-        export_per_company_json(manual_data, match_review)
+        export_per_company_json(manual_data, match_review, bake_kv=args.bake_kv, kv_offline=args.kv_snapshot,
+                                compact=args.compact_calls)
 
     if args.update:
         success = update_viewer(data, manual_data, match_review)
@@ -0,0 +1,172 @@
+"""Pooled client for the viewer's KV API.
+
+One requests.Session with a keep-alive connection pool serves every call, so
+a pipeline run or an e2e cleanup pays one TCP/TLS handshake per host rather
+than one per request. The Vercel protection-bypass header, retries with
+exponential backoff (connection errors, 429 and 5xx) and the API layout live
+here:
+
+    /api/org-state?account=&type=   corrections, field-edits, sizes, merges, ...
+    /api/match-review?account=      reviewer match decisions
+    /api/sync-version?account=      bumped on every write
+    /api/autosave?account=          last autosaved viewer state
+
+fetch_accounts() and map_concurrent() run calls on a thread pool sharing the
+session's connections. delete_state_keys() and delete_match_review_items()
+remove many entries of one KV object in a single request.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterable, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "http://localhost:3000"
+
+# State types served by /api/org-state, with the body field that names an entry on DELETE
+STATE_KEY_FIELDS = {
+    "corrections": "entityId",
+    "field-edits": "entityId",
+    "sizes": "key",
+    "resolutions": "key",
+    "merges": "canonicalId",
+    "manual-map-overrides": "nodeId",
+    "manual-map-modifications": "entityId",
+    "graduated-map": "entityId",
+}
+
+# Statuses worth retrying (rate limit, transient server errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Attempts per request and the first backoff delay (doubled each retry)
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 0.5
+
+# Keep-alive connections kept per host; also the default fetch_accounts() concurrency
+POOL_SIZE = 8
+
+
+class KVClient:
+    """Keep-alive client for one viewer deployment."""
+
+    def __init__(self, base_url: str | None = None, bypass_secret: str | None = None, timeout: float = 10,
+                 max_attempts: int | None = None, backoff: float | None = None, pool_size: int | None = None):
+        base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
+        # Accept ".../api" too (older callers configured the API root)
+        self.base_url = base_url[:-4] if base_url.endswith("/api") else base_url
+        self.timeout = timeout
+        self.max_attempts = max_attempts or MAX_ATTEMPTS
+        self.backoff = BACKOFF_SECONDS if backoff is None else backoff
+        self.pool_size = pool_size or POOL_SIZE
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if bypass_secret:
+            self.session.headers["x-vercel-protection-bypass"] = bypass_secret
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, method: str, endpoint: str, account: str, body: Dict | None = None, **params):
+        """Call /api/{endpoint}?account=... with retries; returns the decoded JSON body (None if empty)."""
+        url = f"{self.base_url}/api/{endpoint}"
+        params = {"account": account.lower(), **params}
+        for attempt in range(self.max_attempts):
+            last = attempt == self.max_attempts - 1
+            try:
+                response = self.session.request(method, url, params=params, json=body, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or last:
+                    response.raise_for_status()
+                    return response.json() if response.content else None
+            time.sleep(self.backoff * (2 ** attempt))
+
+    def get(self, endpoint: str, account: str, **params):
+        return self.request("GET", endpoint, account, **params)
+
+    def delete(self, endpoint: str, account: str, body: Dict, **params):
+        return self.request("DELETE", endpoint, account, body=body, **params)
+
+    # --- Typed endpoints ---
+
+    def get_state(self, account: str, state_type: str) -> Dict:
+        """One org-state object (e.g. merges: {canonicalId: {absorbed, aliases, ...}})."""
+        return self.get("org-state", account, type=state_type) or {}
+
+    def delete_state(self, account: str, state_type: str, key: str):
+        return self.delete("org-state", account, {STATE_KEY_FIELDS[state_type]: key}, type=state_type)
+
+    def delete_state_keys(self, account: str, state_type: str, keys: List[str]):
+        """Delete several entries of one state object in a single request."""
+        return self.delete("org-state", account, {"keys": list(keys)}, type=state_type)
+
+    def get_match_review(self, account: str) -> Dict:
+        return self.get("match-review", account) or {}
+
+    def delete_match_review(self, account: str, item_id: str):
+        return self.delete("match-review", account, {"itemId": item_id})
+
+    def delete_match_review_items(self, account: str, item_ids: List[str]):
+        """Delete several match decisions in a single request."""
+        return self.delete("match-review", account, {"itemIds": list(item_ids)})
+
+    def get_sync_version(self, account: str) -> str:
+        return str((self.get("sync-version", account) or {}).get("version", "0"))
+
+    def read(self, endpoint: str, account: str):
+        """Read any endpoint by its short name (an org-state type or match-review/sync-version/autosave)."""
+        if endpoint in STATE_KEY_FIELDS:
+            return self.get_state(account, endpoint)
+        return self.get(endpoint, account)
+
+    def map_concurrent(self, call: Callable[[Hashable], object], items: Iterable[Hashable],
+                       workers: int | None = None) -> Dict[Hashable, object]:
+        """Run call(item) for every item on a thread pool; {item: result or raised RequestException}.
+
+        Calls touching the same KV object (e.g. two deletes from one
+        account's merges) must not run together: the API rewrites the whole
+        object, so one would undo the other.
+        """
+        items = list(items)
+
+        def safe(item):
+            try:
+                return call(item)
+            except requests.RequestException as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=workers or self.pool_size) as pool:
+            return dict(zip(items, pool.map(safe, items)))
+
+    def fetch_accounts(self, fetch: Callable[[str], object], accounts: Iterable[str],
+                       workers: int | None = None) -> Dict[str, object]:
+        """Run fetch(account) for every account concurrently; {account: result or raised exception}."""
+        return self.map_concurrent(fetch, accounts, workers)
+
+
+_shared = {}
+
+
+def shared_client(base_url: str | None = None, bypass_secret: str | None = None) -> KVClient:
+    """Process-wide client per deployment, defaulting to VIEWER_BASE_URL and the bypass secret env vars."""
+    base_url = base_url or os.environ.get("VIEWER_BASE_URL", DEFAULT_BASE_URL)
+    if bypass_secret is None:
+        bypass_secret = (os.environ.get("VERCEL_AUTOMATION_BYPASS_SECRET")
+                         or os.environ.get("GONG_VIEWER_BYPASS_SECRET", ""))
+    key = (base_url, bypass_secret)
+    if key not in _shared:
+        _shared[key] = KVClient(base_url, bypass_secret)
+    return _shared[key]
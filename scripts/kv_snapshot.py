@@ -0,0 +1,127 @@
+"""Local, sync-version-tagged snapshots of each account's KV state.
+
+Every pipeline run used to read merges live, so a viewer outage silently
+skipped the alias step and two runs over the same extractions could differ.
+Here each account's review state (merges, corrections, field edits, size
+overrides, manual map moves and additions/deletions, match decisions) is
+kept in
+output/kv_snapshots/{account}.json, tagged with the account's sync-version
+(bumped by the API on every write):
+
+- online: one /api/sync-version request revalidates the stored snapshot;
+  the state is refetched only when the version moved. If the viewer is
+  unreachable the stored snapshot is used, with a warning.
+- offline (--kv-snapshot): the stored snapshot is used as-is, no requests.
+
+A snapshot validated once is reused for the rest of the process.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable
+
+import requests
+
+from kv_client import KVClient, shared_client
+
+BASE_DIR = Path(__file__).parent.parent
+SNAPSHOT_DIR = BASE_DIR / "output" / "kv_snapshots"
+
+# KV state kept per account: org-state types plus reviewer match decisions
+SNAPSHOT_TYPES = ("merges", "corrections", "field-edits", "sizes", "manual-map-overrides",
+                  "manual-map-modifications", "match-review")
+
+# Snapshots validated against the live sync-version during this process, per (dir, account)
+_validated = {}
+
+
+class SnapshotMissing(FileNotFoundError):
+    """Offline mode was asked for an account that has no stored snapshot."""
+
+
+def snapshot_path(account: str, snapshot_dir: Path | None = None) -> Path:
+    return (snapshot_dir or SNAPSHOT_DIR) / f"{account.lower()}.json"
+
+
+def load_snapshot(account: str, snapshot_dir: Path | None = None) -> Dict | None:
+    """Stored snapshot for an account, or None."""
+    path = snapshot_path(account, snapshot_dir)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_snapshot(snapshot: Dict, snapshot_dir: Path | None = None):
+    path = snapshot_path(snapshot["account"], snapshot_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(snapshot, f, indent=2)
+
+
+def refresh_snapshot(account: str, client: KVClient | None = None, snapshot_dir: Path | None = None) -> tuple:
+    """Revalidate an account's snapshot; returns (snapshot, "current" | "refreshed").
+
+    The version is read before the state, so a write that lands mid-fetch
+    leaves the snapshot tagged with the older version and the next run
+    refetches.
+    """
+    account = account.lower()
+    client = client or shared_client()
+    stored = load_snapshot(account, snapshot_dir)
+    version = client.get_sync_version(account)
+    if stored and stored.get("sync_version") == version and set(SNAPSHOT_TYPES) <= set(stored.get("state", {})):
+        return stored, "current"
+
+    snapshot = {
+        "account": account,
+        "sync_version": version,
+        "fetched_at": datetime.now().isoformat(),
+        "state": {state_type: client.read(state_type, account) or {} for state_type in SNAPSHOT_TYPES},
+    }
+    save_snapshot(snapshot, snapshot_dir)
+    return snapshot, "refreshed"
+
+
+def account_snapshot(account: str, offline: bool = False, client: KVClient | None = None,
+                     snapshot_dir: Path | None = None) -> Dict:
+    """The account's snapshot: revalidated once per process online, read from disk offline.
+
+    Raises SnapshotMissing offline when no snapshot is stored, and
+    requests.RequestException online when the viewer is down and there is
+    nothing stored to fall back on.
+    """
+    account = account.lower()
+    key = (str(snapshot_dir or SNAPSHOT_DIR), account)
+    if offline:
+        stored = load_snapshot(account, snapshot_dir)
+        if stored is None:
+            raise SnapshotMissing(f"No KV snapshot for {account} at {snapshot_path(account, snapshot_dir)}")
+        return stored
+    if key not in _validated:
+        try:
+            _validated[key], _ = refresh_snapshot(account, client, snapshot_dir)
+        except requests.RequestException as e:
+            stored = load_snapshot(account, snapshot_dir)
+            if stored is None:
+                raise
+            print(f"  Warning: KV unreachable ({e}); using snapshot at sync-version {stored['sync_version']} "
+                  f"from {stored['fetched_at']}")
+            return stored
+    return _validated[key]
+
+
+def kv_state(account: str, state_type: str, offline: bool = False, client: KVClient | None = None,
+             snapshot_dir: Path | None = None) -> Dict:
+    """One state object (e.g. "merges") from the account's snapshot."""
+    return account_snapshot(account, offline, client, snapshot_dir)["state"].get(state_type, {})
+
+
+def prefetch_snapshots(accounts: Iterable[str], client: KVClient | None = None,
+                       snapshot_dir: Path | None = None) -> Dict[str, Exception]:
+    """Revalidate many accounts concurrently; returns {account: exception} for failures."""
+    client = client or shared_client()
+    results = client.fetch_accounts(
+        lambda account: account_snapshot(account, client=client, snapshot_dir=snapshot_dir),
+        [a.lower() for a in accounts])
+    return {account: result for account, result in results.items() if isinstance(result, Exception)}
@@ -0,0 +1,63 @@
+"""Per-call token and latency ledger for LLM pipeline steps.
+
+Each API call records input/output/cache tokens and wall-clock latency so
+cost and latency can be measured per company. The ledger is written as JSON
+beside the step's output (e.g. output/{company}/consolidation_calls.json).
+"""
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+class CallLedger:
+    """Thread-safe list of per-call usage records."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+
+    def record(self, call_type: str, context: str, usage, latency_s: float, stop_reason: str | None = None) -> Dict:
+        """Record one call. `usage` is the API's usage object (or a dict)."""
+        entry = {
+            "call_type": call_type,
+            "context": context,
+            "latency_s": round(latency_s, 3),
+            "stop_reason": stop_reason,
+        }
+        for field in USAGE_FIELDS:
+            value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+            entry[field] = value or 0
+        with self._lock:
+            self.calls.append(entry)
+        return entry
+
+    def totals(self) -> Dict:
+        """Sum tokens and latency over all recorded calls."""
+        with self._lock:
+            calls = list(self.calls)
+        totals = {"calls": len(calls), "latency_s": round(sum(c["latency_s"] for c in calls), 3)}
+        for field in USAGE_FIELDS:
+            totals[field] = sum(c[field] for c in calls)
+        totals["truncated_calls"] = sum(1 for c in calls if c["stop_reason"] == "max_tokens")
+        return totals
+
+    def save(self, filepath: Path, company: str):
+        """Write the ledger as JSON."""
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            calls = list(self.calls)
+        with open(filepath, "w") as f:
+            json.dump({
+                "company": company,
+                "generated_at": datetime.now().isoformat(),
+                "totals": self.totals(),
+                "calls": calls,
+            }, f, indent=2)
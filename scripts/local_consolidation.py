@@ -0,0 +1,254 @@
+"""Deterministic, offline consolidation for the easy cases.
+
+Many consolidation decisions need no LLM: "Discovery Sciences" and
+"Discovery Sciences (DS)" are the same unit, "DS" is its acronym, and a
+quote saying "Oncology Biomarkers sits within Oncology R&D" states the
+parent outright. This module settles those locally:
+
+- duplicates: union-find over names that are equal once parentheticals,
+  punctuation, word order and filler words ("team", "the") are ignored,
+  plus short acronyms that expand to exactly one other entity
+- parents: "X within Y" / "X is part of Y" / "X reports into Y" stated
+  in quotes, where X and Y are known entities (hierarchy_rules.py)
+
+Everything else that candidate_clusters() puts near another entity (e.g.
+"Oncology" vs "Oncology Research": duplicate or child?) is ambiguous and
+left for the LLM. Entities with no near neighbours are resolved as-is.
+"""
+import re
+from collections import Counter
+from typing import Dict, List
+
+from consolidation_batching import candidate_clusters
+from entity_similarity import UnionFind, name_acronym, name_tokens, parenthetical_acronym
+from hierarchy_rules import propose_parent_edges
+from size_mentions import merge_size_mentions
+
+
+def strip_parenthetical(name: str) -> str:
+    """Drop parenthetical asides ("Discovery Sciences (DS)" -> "Discovery Sciences")."""
+    return re.sub(r"\s*\([^)]*\)", " ", name or "").strip()
+
+
+def identity_key(name: str) -> frozenset:
+    """Token set that two names must share exactly to be the same entity."""
+    return frozenset(name_tokens(strip_parenthetical(name)))
+
+
+def _is_bare_acronym(name: str) -> bool:
+    bare = (name or "").strip()
+    return bool(re.fullmatch(r"[A-Za-z][A-Za-z0-9&]{1,5}", bare)) and any(c.isupper() for c in bare[1:])
+
+
+def deterministic_clusters(entities: List[Dict], name_key: str = "entity_name") -> tuple:
+    """Cluster entities that are unambiguously the same.
+
+    Returns (groups, reasons): groups as lists of entity indices, and
+    {root index: set of reasons} for groups with more than one member.
+    """
+    uf = UnionFind(range(len(entities)))
+    reasons = {}
+
+    def join(i, j, reason):
+        uf.union(i, j)
+        reasons.setdefault(i, set()).add(reason)
+        reasons.setdefault(j, set()).add(reason)
+
+    # Same tokens once parentheticals, punctuation, order and filler words are ignored
+    by_identity = {}
+    for i, entity in enumerate(entities):
+        key = identity_key(entity[name_key])
+        if not key:
+            continue
+        if key in by_identity:
+            join(by_identity[key], i, "same name")
+        else:
+            by_identity[key] = i
+
+    # Short acronyms ("DS") that expand to exactly one identity
+    expansions = {}
+    for i, entity in enumerate(entities):
+        name = entity[name_key]
+        for acronym in {parenthetical_acronym(name), name_acronym(strip_parenthetical(name))} - {""}:
+            expansions.setdefault(acronym, set()).add(uf.find(i))
+    for i, entity in enumerate(entities):
+        name = entity[name_key]
+        if not _is_bare_acronym(name):
+            continue
+        targets = {uf.find(t) for t in expansions.get(name.lower().replace("&", ""), set())} - {uf.find(i)}
+        if len(targets) == 1:
+            join(targets.pop(), i, "acronym")
+
+    groups = uf.groups()
+    group_reasons = {}
+    for group in groups:
+        if len(group) > 1:
+            group_reasons[group[0]] = set().union(*(reasons.get(i, set()) for i in group))
+    return groups, group_reasons
+
+
+def _canonical_index(entities: List[Dict], group: List[int]) -> int:
+    """Most-mentioned member, then the longest name without a parenthetical."""
+    return max(group, key=lambda i: (entities[i].get("mention_count", 0),
+                                     len(strip_parenthetical(entities[i]["entity_name"])),
+                                     -i))
+
+
+def infer_parents(entities: List[Dict], owner: Dict[int, int], resolved: set) -> Dict[int, tuple]:
+    """Parents stated in quotes, for resolved owners.
+
+    owner maps each entity index to the index that represents it (its
+    cluster's canonical entity). Returns {owner index: (parent owner index,
+    votes)} from hierarchy_rules.propose_parent_edges().
+    """
+    edges = propose_parent_edges(entities, owner)
+    return {child: (edge["parent"], edge["votes"]) for child, edge in edges.items() if child in resolved}
+
+
+def local_consolidate(entities: List[Dict]) -> Dict:
+    """Resolve easy duplicates and quote-stated parents without an LLM.
+
+    Takes filter_quality_entities() output. Returns the LLM consolidation
+    shape ({entities, hierarchy_notes, duplicate_resolutions}) for resolved
+    entities, plus "unresolved": entities to send to the LLM.
+    """
+    groups, group_reasons = deterministic_clusters(entities)
+    group_of = {i: group for group in groups for i in group}
+    owner = {}
+    for group in groups:
+        canonical = _canonical_index(entities, group)
+        for i in group:
+            owner[i] = canonical
+
+    # A candidate cluster is resolved when local rules collapse it to one entity
+    resolved_owners = set()
+    unresolved = []
+    for candidates in candidate_clusters(entities):
+        owners = {owner[i] for i in candidates}
+        if len(owners) == 1:
+            resolved_owners |= owners
+        else:
+            unresolved.extend(entities[i] for i in candidates)
+    # Keep deterministic groups whole: a member pulled into an ambiguous cluster takes its group along
+    unresolved_ids = {e["id"] for e in unresolved}
+    for owner_index in list(resolved_owners):
+        members = group_of[owner_index]
+        if any(entities[i]["id"] in unresolved_ids for i in members):
+            resolved_owners.discard(owner_index)
+            for i in members:
+                if entities[i]["id"] not in unresolved_ids:
+                    unresolved.append(entities[i])
+                    unresolved_ids.add(entities[i]["id"])
+
+    parents = infer_parents(entities, owner, resolved_owners)
+
+    structures = []
+    resolutions = []
+    for group in groups:
+        canonical = owner[group[0]]
+        if canonical not in resolved_owners:
+            continue
+        entity = entities[canonical]
+        types = Counter()
+        for i in group:
+            types[entities[i].get("entity_type", "team")] += entities[i].get("mention_count", 1)
+        parent = parents.get(canonical)
+        structures.append({
+            "id": entity["id"],
+            "name": strip_parenthetical(entity["entity_name"]) or entity["entity_name"],
+            "type": types.most_common(1)[0][0],
+            "parent_id": entities[parent[0]]["id"] if parent else None,
+            "confidence": entity.get("confidence", "medium"),
+            "original_ids": [entities[i]["id"] for i in group],
+        })
+        if len(group) > 1:
+            resolutions.append({
+                "merged_names": [entities[i]["entity_name"] for i in group],
+                "canonical_name": structures[-1]["name"],
+                "reason": "Local: " + ", ".join(sorted(group_reasons.get(group[0], {"same name"}))),
+            })
+
+    return {
+        "entities": structures,
+        "unresolved": unresolved,
+        "hierarchy_notes": (f"Local consolidation: {len(structures)} entities resolved without LLM "
+                            f"({len(resolutions)} merges, {len(parents)} parents stated in quotes); "
+                            f"{len(unresolved)} ambiguous entities left for the LLM."),
+        "duplicate_resolutions": resolutions,
+    }
+
+
+def singleton_structures(entities: List[Dict]) -> List[Dict]:
+    """Unmerged, unplaced structures for entities nobody resolved (no-LLM mode)."""
+    return [{
+        "id": e["id"],
+        "name": e["entity_name"],
+        "type": e.get("entity_type", "team"),
+        "parent_id": None,
+        "confidence": e.get("confidence", "medium"),
+        "original_ids": [e["id"]],
+    } for e in entities]
+
+
+def combine_consolidations(local: Dict, llm: Dict) -> Dict:
+    """Join local and LLM results, pointing local parent_ids at the LLM's merged ids."""
+    final_id = {}
+    for entity in llm.get("entities", []):
+        for original_id in entity.get("original_ids") or [entity["id"]]:
+            final_id[original_id] = entity["id"]
+
+    entities = []
+    for structure in local["entities"]:
+        parent_id = structure["parent_id"]
+        entities.append({**structure, "parent_id": final_id.get(parent_id, parent_id)})
+    entities.extend(llm.get("entities", []))
+
+    notes = [local.get("hierarchy_notes") or "", llm.get("hierarchy_notes") or ""]
+    return {
+        "entities": entities,
+        "hierarchy_notes": "\n\n".join(n for n in notes if n),
+        "duplicate_resolutions": local.get("duplicate_resolutions", []) + llm.get("duplicate_resolutions", []),
+    }
+
+
+def premerge_entities(entities: List[Dict], groups: Dict[str, List[str]], reason: str) -> tuple:
+    """Merge quality entities already known to be one entity, before any batching.
+
+    groups maps a canonical id to the ids of quality entities that are the
+    same entity (e.g. KV alias hits). Each group with two or more members
+    becomes one entity: the member whose id is the canonical id if present,
+    else the most mentioned, absorbing the others' sources, mention counts,
+    size mentions and leader. Returns (entities, duplicate_resolutions).
+    """
+    by_id = {e["id"]: e for e in entities}
+    replaced = {}
+    absorbed = set()
+    resolutions = []
+
+    for canonical_id, member_ids in groups.items():
+        members = [by_id[i] for i in dict.fromkeys(member_ids) if i in by_id]
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda e: (e["id"] != canonical_id, -e.get("mention_count", 0)))
+        keep, others = members[0], members[1:]
+
+        merged = dict(keep)
+        merged["all_sources"] = [s for e in members for s in e.get("all_sources", [])]
+        merged["mention_count"] = sum(e.get("mention_count", 0) for e in members)
+        merged["size_mentions"] = merge_size_mentions(e.get("size_mentions", []) for e in members)
+        merged["team_size"] = next((e["team_size"] for e in members if e.get("team_size")), None)
+        leader = next((e for e in members if e.get("leader")), None)
+        if leader:
+            merged["leader"], merged["leader_title"] = leader["leader"], leader.get("leader_title")
+        merged["premerged_ids"] = [e["id"] for e in others]
+
+        replaced[keep["id"]] = merged
+        absorbed.update(e["id"] for e in others)
+        resolutions.append({
+            "merged_names": [e["entity_name"] for e in members],
+            "canonical_name": keep["entity_name"],
+            "reason": reason,
+        })
+
+    result = [replaced.get(e["id"], e) for e in entities if e["id"] not in absorbed]
+    return result, resolutions
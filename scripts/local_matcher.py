@@ -0,0 +1,189 @@
+"""Deterministic matcher from auto-map entities to manual map nodes.
+
+Auto-map entities whose name is not a manual node name (or a known alias)
+used to go straight to match review, with suggestions from a separate LLM
+run (*_llm_matches.json). Many are easy: "Discovery Sciences Team" is the
+node "Discovery Sciences", "P RED" is "Pharma Research & Early Development
+(pRED)". This module scores each entity against the manual nodes sharing a
+token, trigram or acronym with it (inverted indexes built once per map):
+
+- token set: Jaccard of significant words, parentheticals ignored
+- trigram: Jaccard of character trigrams, parentheticals ignored
+- acronym: a stated acronym ("DS", "(DS)", spoken "P RED") on one side
+  equal to the other side's initials or stated acronym
+- ancestor path: how well the entity's auto-map parent matches one of the
+  node's manual ancestors, added as a bonus that separates same-named nodes
+
+The best node is auto-matched when it scores at least AUTO_MATCH_SCORE and
+beats the runner-up by MIN_MARGIN; everything else stays in match review
+and is left for LLM suggestion. top_candidates() gives those items their
+best few nodes, so reviewers pick from a ranked list.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+from alias_dictionary import strip_parenthetical
+from entity_similarity import (
+    char_trigrams, jaccard, name_acronym, name_similarity, name_tokens, parenthetical_acronym, stated_acronyms,
+)
+from fetch_kv_merges import ACRONYM_SCORE
+
+# Weight of the ancestor-path agreement added to the name score
+PATH_WEIGHT = 0.2
+
+# A best node at or above this score (and MIN_MARGIN clear of the next) is auto-matched
+AUTO_MATCH_SCORE = 0.9
+MIN_MARGIN = 0.1
+
+# Nodes scoring below this are not reported as candidates
+MIN_CANDIDATE_SCORE = 0.3
+
+# Candidate nodes emitted per match-review item for the viewer's entity picker
+TOP_K_CANDIDATES = 5
+
+# Shorter acronyms ("RD": R&D, Retinal Diseases, Rare Diseases) are too ambiguous to match on
+MIN_ACRONYM_LENGTH = 3
+
+
+def spoken_acronym(name: str) -> str:
+    """Acronym spelled out in short words ("P RED" -> "pred"), else ""."""
+    words = (name or "").split()
+    if len(words) < 2 or any(len(w) > 4 for w in words):
+        return ""
+    compact = re.sub(r"[^a-z0-9]", "", "".join(words).lower())
+    return compact if 2 <= len(compact) <= 6 else ""
+
+
+def _acronym_forms(name: str) -> tuple:
+    """(stated acronyms, initials) of a name, lowercase, each at least MIN_ACRONYM_LENGTH long.
+
+    A parenthetical that is not the name's initials is a qualifier
+    ("Clinical Operations (pRED)"), not an acronym of the name.
+    """
+    initials = name_acronym(strip_parenthetical(name))
+    stated = stated_acronyms(name) | {spoken_acronym(name)}
+    parenthetical = parenthetical_acronym(name)
+    if parenthetical and parenthetical != initials:
+        stated.discard(parenthetical)
+    stated = {key for key in stated if len(key) >= MIN_ACRONYM_LENGTH}
+    return stated, initials if len(initials) >= MIN_ACRONYM_LENGTH else ""
+
+
+def _acronym_match(a: tuple, b: tuple) -> bool:
+    """Whether two names' (stated, initials) forms agree; one side must state its acronym."""
+    (stated_a, initials_a), (stated_b, initials_b) = a, b
+    return bool(stated_a & (stated_b | {initials_b} - {""}) or stated_b & {initials_a} - {""})
+
+
+def name_affinity(a: str, b: str) -> float:
+    """name_similarity(), or ACRONYM_SCORE when one name is the other's stated acronym."""
+    score = name_similarity(a, b)
+    if score < ACRONYM_SCORE and _acronym_match(_acronym_forms(a), _acronym_forms(b)):
+        return ACRONYM_SCORE
+    return score
+
+
+class ManualNodeIndex:
+    """Manual map nodes indexed by token, trigram and acronym for local matching."""
+
+    def __init__(self, manual_root: Dict | None):
+        self.nodes = []
+        self.by_token = {}
+        self.by_trigram = {}
+        self.by_acronym = {}
+        if manual_root:
+            self._collect(manual_root, [])
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _collect(self, node: Dict, ancestors: List[str]):
+        name = node.get("name") or ""
+        if name and node.get("id"):
+            core = strip_parenthetical(name) or name
+            stated, initials = _acronym_forms(name)
+            index = len(self.nodes)
+            self.nodes.append({
+                "id": node["id"], "name": name, "path": " > ".join(ancestors + [name]),
+                "ancestors": list(ancestors), "tokens": name_tokens(core), "trigrams": char_trigrams(core),
+                "stated": stated, "initials": initials,
+            })
+            for token in self.nodes[index]["tokens"]:
+                self.by_token.setdefault(token, set()).add(index)
+            for gram in self.nodes[index]["trigrams"]:
+                self.by_trigram.setdefault(gram, set()).add(index)
+            for key in stated | {initials} - {""}:
+                self.by_acronym.setdefault(key, set()).add(index)
+        for child in node.get("children", []):
+            self._collect(child, ancestors + [name] if name else ancestors)
+
+    def score(self, name: str, ancestors: List[str] = ()) -> List[Dict]:
+        """Candidate nodes for an entity, best first, each with its score and features.
+
+        ancestors are the entity's auto-map ancestor names, nearest first; the
+        nearest one is compared with every manual ancestor of the node.
+        """
+        core = strip_parenthetical(name) or name or ""
+        tokens, grams = name_tokens(core), char_trigrams(core)
+        stated, initials = _acronym_forms(name or "")
+
+        candidates = set()
+        for token in tokens:
+            candidates |= self.by_token.get(token, set())
+        for key in stated | {initials} - {""}:
+            candidates |= self.by_acronym.get(key, set())
+        # A trigram Jaccard of MIN_CANDIDATE_SCORE needs about that share of the
+        # name's trigrams in common, so nodes sharing fewer are never scored
+        shared = Counter(index for gram in grams for index in self.by_trigram.get(gram, ()))
+        min_shared = max(1, math.floor(MIN_CANDIDATE_SCORE * len(grams)))
+        candidates |= {index for index, count in shared.items() if count >= min_shared}
+
+        parent = next((a for a in ancestors if a), None)
+        scored = []
+        for index in candidates:
+            node = self.nodes[index]
+            acronym = _acronym_match((stated, initials), (node["stated"], node["initials"]))
+            features = {
+                "token_set": round(jaccard(tokens, node["tokens"]), 3),
+                "trigram": round(jaccard(grams, node["trigrams"]), 3),
+                "acronym": acronym,
+            }
+            name_score = max(features["token_set"], features["trigram"], ACRONYM_SCORE if acronym else 0.0)
+            if name_score < MIN_CANDIDATE_SCORE:
+                continue
+            features["path"] = round(max((name_affinity(parent, a) for a in node["ancestors"]), default=0.0)
+                                     if parent else 0.0, 3)
+            raw = name_score + PATH_WEIGHT * features["path"]
+            scored.append({"raw": raw, "index": index, "features": features})
+
+        scored.sort(key=lambda c: (-c["raw"], c["index"]))
+        return [{
+            "manual_node_id": self.nodes[c["index"]]["id"],
+            "manual_node_name": self.nodes[c["index"]]["name"],
+            "manual_node_path": self.nodes[c["index"]]["path"],
+            "score": round(min(c["raw"], 1.0), 3),
+            "rank_score": round(c["raw"], 3),
+            "features": c["features"],
+        } for c in scored]
+
+    def match(self, name: str, ancestors: List[str] = ()) -> Dict:
+        """{"status": "auto" | "ambiguous" | "none", "best": candidate or None, "candidates": [...]}."""
+        candidates = self.score(name, ancestors)
+        if not candidates:
+            return {"status": "none", "best": None, "candidates": []}
+        best = candidates[0]
+        runner_up = candidates[1]["rank_score"] if len(candidates) > 1 else 0.0
+        confident = best["rank_score"] >= AUTO_MATCH_SCORE and best["rank_score"] - runner_up >= MIN_MARGIN
+        return {"status": "auto" if confident else "ambiguous", "best": best, "candidates": candidates}
+
+    def top_candidates(self, name: str, ancestors: List[str] = (), k: int | None = None) -> List[Dict]:
+        """The k best nodes for an entity as {manual_node_id, manual_node_name, manual_node_path, score}."""
+        return top_k(self.score(name, ancestors), k)
+
+
+def top_k(candidates: List[Dict], k: int | None = None) -> List[Dict]:
+    """The k best of score()/match() candidates, in the shape top_candidates() returns."""
+    return [{field: c[field] for field in ("manual_node_id", "manual_node_name", "manual_node_path", "score")}
+            for c in candidates[:k or TOP_K_CANDIDATES]]
@@ -0,0 +1,36 @@
+"""Loader for the hand-built manual org maps.
+
+Both the consolidation pipeline (alias dictionary harvest) and
+integrate_viewer.py (manual/auto join) read these, so the loader lives here
+rather than in either script.
+"""
+import json
+from pathlib import Path
+from typing import Dict
+
+BASE_DIR = Path(__file__).parent.parent
+MANUAL_MAPS_DIR = BASE_DIR / "Manual Maps Jan 26 2026"
+
+
+def load_manual_map(company: str) -> Dict:
+    """Load manual map for a company."""
+    # Try different filename patterns (prefer fixed versions)
+    patterns = [
+        f"{company}_rd_map_fixed.json",  # Prefer fixed version
+        f"{company}_rd_map.json",
+        f"{company}-rd-org-map.json",
+        f"{company}_rd_map (2).json"
+    ]
+
+    for pattern in patterns:
+        filepath = MANUAL_MAPS_DIR / pattern
+        if filepath.exists():
+            try:
+                with open(filepath) as f:
+                    return json.load(f)
+            except json.JSONDecodeError as e:
+                print(f"  Warning: JSON error in {pattern}: {e}")
+                continue
+
+    print(f"  Warning: No valid manual map found for {company}")
+    return {}
@@ -0,0 +1,166 @@
+"""Single-pass team-size mention scanner.
+
+The old extract_team_size_from_text() ran six regexes over one quote in
+turn and stopped at the first hit, so only the first quote of an entity
+was ever searched and only one size came back. Here the six shapes are one
+alternation compiled once; a single finditer() pass returns every
+non-overlapping mention with its span, kind and normalized number or range.
+
+scan_texts() joins a batch of quotes with a separator no pattern can cross
+and scans them in one call, mapping spans back to each quote.
+SizeMentionCollector buffers quotes while extractions stream past and
+scans them in fixed-size batches, keeping at most SIZE_MENTIONS_PER_KEY
+mentions per key, so its memory grows with the number of keys, not
+quotes.
+"""
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+_NUM = r"(?<![\d,.])\d{1,4}"
+_UNITS = r"(?:people|persons?|scientists|researchers|employees|team\s+members?|members?|folks|FTEs?)\b"
+_HEDGES = r"(?:about|around|approximately|roughly|close\s+to|nearly|maybe|like|probably)"
+
+# Order matters: earlier alternatives win at the same start position. The
+# leading lookahead lets the engine skip positions no alternative can start at.
+SIZE_MENTION_PATTERN = re.compile(
+    r"(?=[\dtgdw])(?:"
+    r"(?P<range>(?P<range_low>" + _NUM + r")\s*(?:to|-)\s*(?P<range_high>" + _NUM + r")\s*" + _UNITS + r")"
+    r"|(?P<person_team>(?P<person_team_n>" + _NUM + r")[\s-]person\s+(?:team|group|department))"
+    r"|(?P<count>(?P<count_n>" + _NUM + r"(?:,\d{3})*)\s*" + _UNITS + r")"
+    r"|(?P<of_us>(?P<of_us_n>" + _NUM + r")\s+of\s+us\b)"
+    r"|(?P<team_of>\b(?:team|group|department)\s+of\s+(?P<team_of_n>" + _NUM + r")(?!\d))"
+    r"|(?P<we_are>\bwe(?:'re|\s+are)\s+(?P<we_are_hedge>about\s+)?(?P<we_are_n>" + _NUM + r")(?!\d)"
+    r"(?!\s*(?:year|month|day|license|seat)))"
+    r")",
+    re.IGNORECASE,
+)
+
+# Hedge word just before a count ("about 50 people"), checked only on a hit
+_HEDGE_BEFORE = re.compile(r"\b" + _HEDGES + r"\s+$", re.IGNORECASE)
+
+# Never matched by any alternative, so mentions cannot span two joined quotes
+_SEPARATOR = "\x00"
+
+# Quotes buffered per scan in SizeMentionCollector
+SCAN_BATCH_SIZE = 512
+
+# Mentions kept per key and per merged entity (the first ones in stream order)
+SIZE_MENTIONS_PER_KEY = 20
+
+
+def _to_int(digits: str) -> int:
+    return int(digits.replace(",", ""))
+
+
+def _mention(match: re.Match, offset: int = 0) -> Dict:
+    kind = match.lastgroup
+    start = match.start(kind)
+    if kind == "range":
+        low, high = sorted((_to_int(match["range_low"]), _to_int(match["range_high"])))
+        value = f"{low}-{high}"
+    else:
+        low = high = _to_int(match[f"{kind}_n"])
+        value = str(low)
+    if kind == "count":
+        hedge = _HEDGE_BEFORE.search(match.string, max(offset, start - 24), start)
+    else:
+        hedge = match.groupdict().get(f"{kind}_hedge")
+    return {
+        "value": value,
+        "low": low,
+        "high": high,
+        "kind": kind,
+        "approximate": bool(hedge) or kind == "range",
+        "text": match.group(kind).strip(),
+        "span": [start - offset, match.end(kind) - offset],
+    }
+
+
+def scan_text(text: str) -> List[Dict]:
+    """Every size mention in one text, in order."""
+    if not text:
+        return []
+    return [_mention(m) for m in SIZE_MENTION_PATTERN.finditer(text)]
+
+
+def scan_texts(texts: List[str]) -> List[List[Dict]]:
+    """Size mentions for each text, found with one regex pass over the batch."""
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text or "") + len(_SEPARATOR)
+    joined = _SEPARATOR.join(text or "" for text in texts)
+
+    results = [[] for _ in texts]
+    for match in SIZE_MENTION_PATTERN.finditer(joined):
+        index = bisect_right(starts, match.start()) - 1
+        results[index].append(_mention(match, starts[index]))
+    return results
+
+
+def extract_team_size_from_text(text: str) -> str | None:
+    """First size mentioned in text (e.g. "50" or "10-20"), or None."""
+    match = SIZE_MENTION_PATTERN.search(text or "")
+    return _mention(match)["value"] if match else None
+
+
+class SizeMentionCollector:
+    """Collect up to `limit` size mentions per key from streamed quotes, scanning in batches."""
+
+    def __init__(self, batch_size: int = SCAN_BATCH_SIZE, limit: int = SIZE_MENTIONS_PER_KEY):
+        self.batch_size = batch_size
+        self.limit = limit
+        self.mentions = {}
+        self._pending: List[Tuple[str, str, Dict]] = []
+        # key -> dedup keys of its kept mentions (at most limit each)
+        self._seen = {}
+
+    def add(self, key: str, text: str, source: Dict):
+        """Queue a quote; source fields (call_id, call_date, speaker_id) are copied onto its mentions."""
+        if not text or len(self.mentions.get(key, ())) >= self.limit:
+            return
+        self._pending.append((key, text, source))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Scan all queued quotes."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        for (key, _, source), found in zip(pending, scan_texts([text for _, text, _ in pending])):
+            if not found:
+                continue
+            kept = self.mentions.setdefault(key, [])
+            seen = self._seen.setdefault(key, set())
+            for mention in found:
+                if len(kept) >= self.limit:
+                    break
+                # Several extractions from one call often share a quote; keep one mention per call
+                dedup_key = (mention["value"], mention["span"][0], source.get("call_id"))
+                if dedup_key in seen:
+                    continue
+                seen.add(dedup_key)
+                mention.update(source)
+                kept.append(mention)
+
+    def results(self) -> Dict[str, List[Dict]]:
+        """Flush and return {key: [mention, ...]} in stream order."""
+        self.flush()
+        return self.mentions
+
+
+def merge_size_mentions(mention_lists: Iterable[List[Dict]], limit: int = SIZE_MENTIONS_PER_KEY) -> List[Dict]:
+    """Combine mentions from merged entities, dropping repeats of the same value from the same call."""
+    merged = []
+    seen = set()
+    for mentions in mention_lists:
+        for mention in mentions:
+            key = (mention["value"], mention.get("call_id"))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(mention)
+    return merged[:limit]
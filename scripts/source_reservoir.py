@@ -0,0 +1,47 @@
+"""Bounded top-K source reservoir for entity pre-aggregation.
+
+pre_aggregate_entities() used to append every source of a normalized name
+to an unbounded list, only for merge_consolidation_with_sources() to keep
+10 of them. A reservoir keeps the best K sources as they stream past
+(highest confidence first, then most recent call date) together with the
+full mention count and confidence tally, so memory stays flat as
+extraction files grow.
+"""
+import heapq
+from collections import Counter
+from typing import Dict, List
+
+CONFIDENCE_RANK = {"high": 2, "medium": 1, "low": 0}
+
+# Sources kept per normalized name (headroom over the 10 kept after call_id dedup)
+SOURCE_RESERVOIR_SIZE = 20
+
+
+class SourceReservoir:
+    """Keep the top `size` sources by (confidence, call_date); ties keep the earliest seen."""
+
+    __slots__ = ("size", "count", "confidence_counts", "_heap", "_seq")
+
+    def __init__(self, size: int = SOURCE_RESERVOIR_SIZE):
+        self.size = size
+        self.count = 0
+        self.confidence_counts = Counter()
+        self._heap = []
+        self._seq = 0
+
+    def add(self, source: Dict):
+        """Offer one source; O(log size)."""
+        self.count += 1
+        confidence = source.get("confidence", "medium")
+        self.confidence_counts[confidence] += 1
+
+        self._seq += 1
+        entry = (CONFIDENCE_RANK.get(confidence, 1), source.get("call_date") or "", -self._seq, source)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, entry)
+        elif entry[:3] > self._heap[0][:3]:
+            heapq.heapreplace(self._heap, entry)
+
+    def sources(self) -> List[Dict]:
+        """Kept sources, best first."""
+        return [entry[3] for entry in sorted(self._heap, key=lambda e: e[:3], reverse=True)]
@@ -0,0 +1,69 @@
+"""Sparse viewer JSON: per-company files without null and default fields.
+
+convert_manual_node_for_viewer() gives every manual node the full
+gongEvidence skeleton, and every node and snippet every field, so large
+unmatched subtrees are mostly "matchedEntities": [], "confidence":
+"none", "children": [] and nulls. sparse() drops, on write:
+
+- null fields anywhere
+- node, gongEvidence and snippet fields equal to their default below
+- a gongEvidence left empty by that
+
+The viewer restores the defaults on load (lib/viewer-json.ts), so these
+tables and its fillDefaults() must agree.
+"""
+from typing import Any, Dict
+
+from subtree_rollups import EMPTY_ROLLUP
+
+# Defaults of a manual node (viewer OrgNode)
+NODE_DEFAULTS = {"level": 0, "sites": [], "notes": "", "children": [], "rollup": EMPTY_ROLLUP}
+
+# Evidence of a manual node no auto entity was joined to (viewer GongEvidence)
+EVIDENCE_DEFAULTS = {
+    "matchedEntities": [],
+    "matchedContacts": [],
+    "totalMentions": 0,
+    "teamSizes": [],
+    "sizeMentions": [],
+    "snippets": [],
+    "confidence": "none",
+    "status": "unverified",
+}
+
+# Defaults of a snippet (viewer Snippet)
+SNIPPET_DEFAULTS = {"sizeMentions": []}
+
+# Record kind a field's value holds, per enclosing kind (None: plain data)
+CHILD_KINDS = {
+    None: {"root": "node", "all_snippets": "snippet"},
+    "node": {"children": "node", "gongEvidence": "evidence"},
+    "evidence": {"snippets": "snippet"},
+    "snippet": {},
+}
+
+DEFAULTS = {None: {}, "node": NODE_DEFAULTS, "evidence": EVIDENCE_DEFAULTS, "snippet": SNIPPET_DEFAULTS}
+
+
+def empty_evidence() -> Dict:
+    """A fresh copy of EVIDENCE_DEFAULTS."""
+    return {key: list(value) if isinstance(value, list) else value for key, value in EVIDENCE_DEFAULTS.items()}
+
+
+def sparse(data: Any, kind: str | None = None) -> Any:
+    """Copy of viewer data without null fields and record fields at their default."""
+    if isinstance(data, list):
+        return [sparse(item, kind) for item in data]
+    if not isinstance(data, dict):
+        return data
+    defaults, child_kinds = DEFAULTS[kind], CHILD_KINDS[kind]
+    result = {}
+    for key, value in data.items():
+        if value is None or (key in defaults and value == defaults[key]):
+            continue
+        value = sparse(value, child_kinds.get(key))
+        if child_kinds.get(key) == "evidence" and not value:
+            continue
+        result[key] = value
+    return result
+
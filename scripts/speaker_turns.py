@@ -0,0 +1,104 @@
+"""Build-time speaker-turn segmentation of snippet context windows.
+
+Context windows are transcript text with "[Speaker <gong id>]" tags. The
+viewer used to find the tags with regexes on every context-modal open
+(lib/speaker-resolution.ts) to name the two sides of the call. This
+module does that once per build: each window becomes a list of
+[speaker index, text] turns, and the snippet carries the display name of
+every speaker index, so the 19-digit speaker ids are not shipped at all.
+
+    "context": {
+        "speakers": ["Jane", "Alice"],
+        "before": [[-1, "...end of a turn "], [0, ": How big is it? "]],
+        "after": [[1, ": About 50."]]
+    }
+
+Speaker -1 is text before the window's first tag. A turn's text is
+everything after its tag, verbatim, so "[" + name + "]" + text gives back
+the tagged line with the speaker resolved.
+"""
+import re
+from typing import Any, Dict, List
+
+SPEAKER_TAG = re.compile(r"\[Speaker (\d+)\]")
+
+# Labels for speakers the two-speaker heuristic cannot name
+FALLBACK_LABELS = "ABCDEFGH"
+
+# Chars of the quote located in the context to find who said it
+QUOTE_PROBE_CHARS = 40
+
+
+def speaker_ids(text: str) -> List[str]:
+    """Distinct speaker ids tagged in text, in order of first appearance."""
+    return list(dict.fromkeys(SPEAKER_TAG.findall(text or "")))
+
+
+def segment_turns(text: str) -> List[tuple]:
+    """(speaker id or None, text) turns of a context window."""
+    turns = []
+    position, speaker = 0, None
+    for match in SPEAKER_TAG.finditer(text or ""):
+        if match.start() > position or speaker is not None:
+            turns.append((speaker, text[position:match.start()]))
+        position, speaker = match.end(), match.group(1)
+    if text and (position < len(text) or speaker is not None):
+        turns.append((speaker, text[position:]))
+    return turns
+
+
+def build_speaker_map(full_context: str, snippet: Dict) -> Dict[str, str]:
+    """Speaker id -> display name using the viewer's two-speaker heuristic.
+
+    With exactly two speakers and the snippet's speakerId among them, the
+    speaker nearest before the quote is the customer and the other one the
+    internal rep. Otherwise nobody is named.
+    """
+    ids = speaker_ids(full_context)
+    quote_speaker = snippet.get("speakerId")
+    if not quote_speaker or len(ids) != 2 or quote_speaker not in ids:
+        return {}
+    probe = (snippet.get("quote") or "").lower()[:QUOTE_PROBE_CHARS]
+    quote_idx = full_context.lower().find(probe)
+    if quote_idx > 0:
+        nearest = re.search(r"\[Speaker (\d+)\][^[]*$", full_context[:quote_idx])
+        if nearest and nearest.group(1) in ids:
+            quote_speaker = nearest.group(1)
+    other = next((i for i in ids if i != quote_speaker), None)
+    speaker_map = {quote_speaker: (snippet.get("customerName") or "Customer").split(";")[0].strip()}
+    if other:
+        speaker_map[other] = (snippet.get("internalName") or "BioRender Rep").split(";")[0].strip()
+    return speaker_map
+
+
+def segment_snippet_context(snippet: Dict) -> Dict:
+    """Copy of a snippet with contextBefore/contextAfter replaced by a segmented "context"."""
+    before, after = snippet.get("contextBefore"), snippet.get("contextAfter")
+    if before is None and after is None:
+        return snippet
+    before, after = before or "", after or ""
+    speaker_map = build_speaker_map(before + (snippet.get("quote") or "") + after, snippet)
+
+    ids = speaker_ids(before + after)
+    unnamed = [i for i in ids if i not in speaker_map]
+    names = [speaker_map.get(i) or f"Speaker {FALLBACK_LABELS[unnamed.index(i) % len(FALLBACK_LABELS)]}"
+             for i in ids]
+    index = {speaker: i for i, speaker in enumerate(ids)}
+
+    def turns(text):
+        return [[-1 if speaker is None else index[speaker], part] for speaker, part in segment_turns(text)]
+
+    result = {k: v for k, v in snippet.items() if k not in ("contextBefore", "contextAfter")}
+    result["context"] = {"speakers": names, "before": turns(before), "after": turns(after)}
+    return result
+
+
+def segment_contexts(data: Any) -> Any:
+    """Copy of viewer data with every snippet's context window segmented into turns."""
+    if isinstance(data, list):
+        return [segment_contexts(item) for item in data]
+    if not isinstance(data, dict):
+        return data
+    if "contextBefore" in data or "contextAfter" in data:
+        return segment_snippet_context(data)
+    return {key: segment_contexts(value) for key, value in data.items()}
@@ -0,0 +1,149 @@
+"""Incremental JSON parsing for streamed LLM consolidation replies.
+
+A consolidation reply that hits max_tokens is cut off mid-JSON, and a
+whole-reply json.loads() then loses every entity in it. The parser here is
+fed text chunks as they stream in and yields each complete object of the
+"entities" array as soon as its closing brace arrives, so a truncated reply
+still keeps everything received before the cut.
+
+iter_json_array() applies the same idea to large files on disk (e.g.
+entities_llm_v2.json), yielding one array item at a time.
+"""
+import json
+import re
+from typing import Dict, List
+
+
+class IncrementalArrayParser:
+    """Extract complete objects from a JSON array under `key` while text streams in."""
+
+    def __init__(self, key: str = "entities"):
+        self.key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self.buffer = ""
+        self.items = []
+        self.closed = False  # saw the array's closing bracket
+        self._pos = None     # scan position inside the array, None until found
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._item_start = None
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Add streamed text; return objects completed by this chunk."""
+        self.buffer += chunk
+        before = len(self.items)
+        self._scan()
+        return self.items[before:]
+
+    def _scan(self):
+        if self.closed:
+            return
+        if self._pos is None:
+            match = self.key_pattern.search(self.buffer)
+            if not match:
+                return
+            self._pos = match.end()
+
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf):
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in '{[':
+                if self._depth == 0 and c == '{':
+                    self._item_start = i
+                self._depth += 1
+            elif c in '}]':
+                if self._depth == 0:
+                    self.closed = True
+                    i += 1
+                    break
+                self._depth -= 1
+                if self._depth == 0 and c == '}' and self._item_start is not None:
+                    try:
+                        self.items.append(json.loads(buf[self._item_start:i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item_start = None
+            i += 1
+        self._pos = i
+
+
+def covered_input_ids(consolidated_entities: List[Dict]) -> set:
+    """Input ids accounted for by consolidated entities (their original_ids)."""
+    covered = set()
+    for entity in consolidated_entities:
+        covered.update(entity.get("original_ids") or [entity.get("id")])
+    return covered
+
+
+def split_remainder(entities: List[Dict], consolidated_entities: List[Dict]) -> List[List[Dict]]:
+    """Plan re-requests after a truncated reply: uncovered inputs, split in two.
+
+    Returns [] when every input was covered, and [] for a single entity that
+    produced nothing (it cannot be split further).
+    """
+    covered = covered_input_ids(consolidated_entities)
+    remainder = [e for e in entities if e["id"] not in covered]
+    if not remainder or (len(remainder) == 1 and len(entities) == 1):
+        return []
+    if len(remainder) == 1:
+        return [remainder]
+    mid = (len(remainder) + 1) // 2
+    return [remainder[:mid], remainder[mid:]]
+
+
+def iter_json_array(fileobj, key: str = "entities", chunk_size: int = 1 << 20):
+    """Yield items of the array under `key` from a large JSON file, one at a time.
+
+    Reads the file in chunks and decodes each item with the C decoder, so
+    memory stays bounded by the chunk size plus one item, not the file size.
+    """
+    decoder = json.JSONDecoder()
+    key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    buf = ""
+    eof = False
+
+    # Find the start of the array
+    while True:
+        match = key_pattern.search(buf)
+        if match:
+            pos = match.end()
+            break
+        if eof:
+            return
+        chunk = fileobj.read(chunk_size)
+        eof = not chunk
+        buf = buf[-len(key) - 16:] + chunk
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                return
+            chunk = fileobj.read(chunk_size)
+            eof = not chunk
+            buf, pos = chunk, 0
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = fileobj.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield item
+        pos = end
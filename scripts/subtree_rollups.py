@@ -0,0 +1,59 @@
+"""Per-node subtree rollups of the viewer manual map.
+
+calculate_manual_map_stats() only totals the whole company, so the viewer
+walked each subtree to count evidence below a node. add_rollups() computes
+every node's totals in one bottom-up pass and stores them on the node:
+
+    "rollup": {"snippets": 12, "matchedDescendants": 3, "calls": 5,
+               "firstDate": "2025-03-19", "lastDate": "2025-11-12"}
+
+snippets, calls and the dates cover the node and its descendants;
+matchedDescendants counts auto-matched nodes below it; calls are counted
+by call_ids.snippet_call_key(), so a callId and a gongUrl of one call are
+one call. The dates are left out of a subtree without dated snippets. Distinct calls are merged
+small-into-large, so the pass stays near-linear in the number of snippets.
+Review decisions made in the viewer are not included.
+"""
+from typing import Dict
+
+from call_ids import snippet_call_key
+
+# Rollup of a subtree without evidence (also the viewer's default)
+EMPTY_ROLLUP = {"snippets": 0, "matchedDescendants": 0, "calls": 0}
+
+
+def _rollup(node: Dict) -> tuple:
+    """(matched nodes in subtree, distinct call ids, first date, last date), storing node["rollup"]."""
+    evidence = node.get("gongEvidence") or {}
+    snippets = evidence.get("snippets") or []
+    count = len(snippets)
+    calls = {snippet_call_key(s) for s in snippets} - {None}
+    dates = [s["date"] for s in snippets if s.get("date")]
+    first, last = (min(dates), max(dates)) if dates else (None, None)
+
+    matched_below = 0
+    for child in node.get("children", []):
+        child_matched, child_calls, child_first, child_last = _rollup(child)
+        count += child["rollup"]["snippets"]
+        matched_below += child_matched
+        if len(child_calls) > len(calls):
+            calls, child_calls = child_calls, calls
+        calls |= child_calls
+        if child_first and (not first or child_first < first):
+            first = child_first
+        if child_last and (not last or child_last > last):
+            last = child_last
+
+    node["rollup"] = {"snippets": count, "matchedDescendants": matched_below, "calls": len(calls)}
+    if first:
+        node["rollup"]["firstDate"] = first
+        node["rollup"]["lastDate"] = last
+    matched_self = 1 if evidence.get("status") == "auto_matched" else 0
+    return matched_below + matched_self, calls, first, last
+
+
+def add_rollups(root: Dict) -> Dict:
+    """Store a rollup on every node of a viewer manual tree; returns the root's."""
+    if root:
+        _rollup(root)
+    return root.get("rollup", dict(EMPTY_ROLLUP)) if root else dict(EMPTY_ROLLUP)
@@ -4,7 +4,12 @@ Shared test fixtures for GongOrgViewerStatic bug tests.
 import json
 import re
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
 
 # Project root
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -137,3 +142,121 @@ def get_enriched_auto_map_path(company: str) -> Path:
 def get_extraction_path(company: str) -> Path:
     """Get path to raw extraction for a company."""
     return PROJECT_ROOT / 'extractions' / company / 'entities_llm_v2.json'
+
+
+# Body field naming the entry to delete, per org-state type (mirrors app/api/org-state)
+_STUB_KEY_FIELDS = {"merges": "canonicalId", "sizes": "key", "resolutions": "key", "manual-map-overrides": "nodeId"}
+
+
+class KVStubServer:
+    """In-process stand-in for the viewer's KV API (org-state, match-review, sync-version, autosave).
+
+    state maps "{type}:{account}" to the stored object, like the real KV keys.
+    Every request is logged with its method, path, query, headers and client
+    port (one port per TCP connection). fail_next holds statuses to answer
+    the next requests with, to exercise retries.
+    """
+
+    def __init__(self):
+        self.state = {}
+        self.versions = {}
+        self.requests = []
+        self.fail_next = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _handle(self, method):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                with stub.lock:
+                    stub.requests.append({"method": method, "path": url.path, "query": query,
+                                          "headers": dict(self.headers), "port": self.client_address[1]})
+                    if stub.fail_next:
+                        return self._send(stub.fail_next.pop(0), {"error": "stub failure"})
+                    status, payload = stub.respond(method, url.path, query, body)
+                self._send(status, payload)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_DELETE(self):
+                self._handle("DELETE")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+
+    def respond(self, method, path, query, body):
+        account = query.get("account", "")
+        endpoint = path.rsplit("/", 1)[-1]
+        if endpoint == "sync-version":
+            return 200, {"version": str(self.versions.get(account, 0))}
+        if endpoint == "org-state":
+            key = f"{query.get('type')}:{account}"
+            if method == "GET":
+                return 200, self.state.get(key, {})
+            for entry in body.get("keys") or [body[_STUB_KEY_FIELDS.get(query.get("type"), "entityId")]]:
+                self.state.get(key, {}).pop(entry, None)
+        elif endpoint == "match-review":
+            key = f"match-review:{account}"
+            if method == "GET":
+                return 200, self.state.get(key, {"approved": {}, "rejected": {}, "manual": {}})
+            for item_id in body.get("itemIds") or [body["itemId"]]:
+                for category in self.state.get(key, {}).values():
+                    category.pop(item_id, None)
+        elif endpoint == "autosave":
+            saved = self.state.get(f"autosave:{account}")
+            return (200, saved) if saved else (404, {"error": "No autosave found"})
+        else:
+            return 404, {"error": "unknown endpoint"}
+        self.bump(account)
+        return 200, {"success": True}
+
+    def bump(self, account):
+        """Advance an account's sync-version, as every KV write does."""
+        self.versions[account] = self.versions.get(account, 0) + 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        if self.thread.is_alive():
+            self.server.shutdown()
+            self.server.server_close()
+
+
+@pytest.fixture
+def kv_stub():
+    """A running KVStubServer; stopped after the test."""
+    server = KVStubServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def kv_snapshot_dir(tmp_path, monkeypatch):
+    """Point kv_snapshot at an empty temporary directory and forget validated snapshots."""
+    monkeypatch.syspath_prepend(str(PROJECT_ROOT / 'scripts'))
+    import kv_snapshot
+    snapshot_dir = tmp_path / "kv_snapshots"
+    monkeypatch.setattr(kv_snapshot, "SNAPSHOT_DIR", snapshot_dir)
+    monkeypatch.setattr(kv_snapshot, "_validated", {})
+    return snapshot_dir
@@ -5,22 +5,31 @@ E2E Test Cleanup: Remove all __test_ prefixed items and verify KV state matches
 Usage:
     python3 tests/e2e_cleanup.py                # Clean + verify
     python3 tests/e2e_cleanup.py --verify-only  # Just verify snapshots match
+    python3 tests/e2e_cleanup.py --workers 1    # Serial requests
 """
 
+import hashlib
 import json
 import os
 import sys
 import argparse
 from pathlib import Path
 
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from kv_client import KVClient
+
 # Load bypass secret
 ENV_PATH = Path(__file__).parent.parent.parent.parent / ".env.shared"
 SNAP_DIR = Path(__file__).parent / "e2e-snapshots"
-BASE_URL = "https://gong-org-viewer-static.vercel.app/api"
+BASE_URL = "https://gong-org-viewer-static.vercel.app"
 
 COMPANIES = ["abbvie", "astrazeneca", "gsk", "lilly", "novartis", "regeneron", "roche"]
 ENDPOINTS = ["corrections", "field-edits", "match-review", "merges", "graduated-map",
              "sizes", "resolutions", "autosave", "sync-version"]
+CLEANED_ENDPOINTS = ["match-review", "merges", "corrections", "field-edits", "sizes"]
+UNCOMPARED_ENDPOINTS = {"sync-version", "autosave"}
 
 
 def load_env():
@@ -38,133 +47,113 @@ def load_env():
     sys.exit(1)
 
 
-def api_get(endpoint, account, secret):
-    """GET from KV API."""
-    import urllib.request
-    url = f"{BASE_URL}/{endpoint}?account={account}"
-    req = urllib.request.Request(url, headers={
-        "x-vercel-protection-bypass": secret
-    })
-    try:
-        with urllib.request.urlopen(req) as resp:
-            return json.loads(resp.read())
-    except Exception as e:
-        print(f"  GET {endpoint}?account={account} failed: {e}")
-        return None
-
-
-def api_delete(endpoint, account, secret, body):
-    """DELETE from KV API."""
-    import urllib.request
-    url = f"{BASE_URL}/{endpoint}?account={account}"
-    data = json.dumps(body).encode()
-    req = urllib.request.Request(url, data=data, method="DELETE", headers={
-        "Content-Type": "application/json",
-        "x-vercel-protection-bypass": secret
-    })
-    try:
-        with urllib.request.urlopen(req) as resp:
-            return resp.status
-    except Exception as e:
-        print(f"  DELETE {endpoint}?account={account} failed: {e}")
-        return None
-
-
-def clean_test_data(secret):
-    """Remove all __test_ prefixed items from each endpoint."""
+def canonical_digest(value) -> str:
+    """SHA-256 of a JSON value serialized canonically (sorted keys, no whitespace)."""
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def key_diff(snapshot, current) -> dict:
+    """Top-level keys added, removed and changed between two JSON objects."""
+    if not isinstance(snapshot, dict) or not isinstance(current, dict):
+        return {"added": [], "removed": [], "changed": ["<root>"]}
+    return {
+        "added": sorted(set(current) - set(snapshot)),
+        "removed": sorted(set(snapshot) - set(current)),
+        "changed": sorted(k for k in set(snapshot) & set(current)
+                          if canonical_digest(snapshot[k]) != canonical_digest(current[k])),
+    }
+
+
+def find_test_keys(endpoint, state) -> list:
+    """__test_ prefixed keys in one endpoint's state."""
+    if not isinstance(state, dict):
+        return []
+    if endpoint == "match-review":
+        return sorted({item_id for category in ["approved", "rejected", "manual"]
+                       if isinstance(state.get(category), dict)
+                       for item_id in state[category] if item_id.startswith("__test_")})
+    return sorted(key for key in state if key.startswith("__test_"))
+
+
+def read_all(client, pairs, workers=None) -> dict:
+    """GET every (account, endpoint) concurrently; failed reads are reported and come back as None."""
+    results = client.map_concurrent(lambda pair: client.read(pair[1], pair[0]), pairs, workers)
+    for (account, endpoint), result in results.items():
+        if isinstance(result, requests.RequestException):
+            print(f"  GET {endpoint}?account={account} failed: {result}")
+            results[(account, endpoint)] = None
+    return results
+
+
+def clean_test_data(client, workers=None):
+    """Remove all __test_ prefixed items from each endpoint.
+
+    Reads every account's endpoints concurrently, then deletes each
+    endpoint's __test_ keys with one bulk request. Bulk deletes for different
+    (account, endpoint) pairs touch different KV objects, so they run in
+    parallel too.
+    """
     print("Cleaning __test_ prefixed data...")
-    cleaned = 0
+    states = read_all(client, [(account, endpoint) for account in COMPANIES for endpoint in CLEANED_ENDPOINTS],
+                      workers)
+    doomed = {pair: keys for pair, state in states.items() if (keys := find_test_keys(pair[1], state))}
 
-    for account in COMPANIES:
-        # Clean match review __test_ items
-        state = api_get("match-review", account, secret)
-        if state and isinstance(state, dict):
-            for category in ["approved", "rejected", "manual"]:
-                items = state.get(category, {})
-                if isinstance(items, dict):
-                    for item_id in list(items.keys()):
-                        if item_id.startswith("__test_"):
-                            api_delete("match-review", account, secret, {"itemId": item_id})
-                            cleaned += 1
-                            print(f"  Deleted match-review/{account}/{category}/{item_id}")
-
-        # Clean merges __test_ items
-        merges = api_get("merges", account, secret)
-        if merges and isinstance(merges, dict):
-            for key in list(merges.keys()):
-                if key.startswith("__test_"):
-                    api_delete("merges", account, secret, {"canonicalId": key})
-                    cleaned += 1
-                    print(f"  Deleted merges/{account}/{key}")
-
-        # Clean corrections __test_ items
-        corrections = api_get("corrections", account, secret)
-        if corrections and isinstance(corrections, dict):
-            for key in list(corrections.keys()):
-                if key.startswith("__test_"):
-                    api_delete("corrections", account, secret, {"entityId": key})
-                    cleaned += 1
-                    print(f"  Deleted corrections/{account}/{key}")
-
-        # Clean field-edits __test_ items
-        edits = api_get("field-edits", account, secret)
-        if edits and isinstance(edits, dict):
-            for key in list(edits.keys()):
-                if key.startswith("__test_"):
-                    api_delete("field-edits", account, secret, {"entityId": key})
-                    cleaned += 1
-                    print(f"  Deleted field-edits/{account}/{key}")
-
-        # Clean sizes __test_ items
-        sizes = api_get("sizes", account, secret)
-        if sizes and isinstance(sizes, dict):
-            for key in list(sizes.keys()):
-                if key.startswith("__test_"):
-                    api_delete("sizes", account, secret, {"key": key})
-                    cleaned += 1
-                    print(f"  Deleted sizes/{account}/{key}")
+    def delete(pair):
+        account, endpoint = pair
+        if endpoint == "match-review":
+            return client.delete_match_review_items(account, doomed[pair])
+        return client.delete_state_keys(account, endpoint, doomed[pair])
+
+    cleaned = 0
+    for (account, endpoint), result in client.map_concurrent(delete, doomed, workers).items():
+        if isinstance(result, requests.RequestException):
+            print(f"  DELETE {endpoint}?account={account} failed: {result}")
+            continue
+        for key in doomed[(account, endpoint)]:
+            print(f"  Deleted {endpoint}/{account}/{key}")
+        cleaned += len(doomed[(account, endpoint)])
 
     print(f"\nCleaned {cleaned} __test_ items")
     return cleaned
 
 
-def verify_snapshots(secret):
-    """Verify current KV state matches pre-test snapshots."""
+def verify_snapshots(client, workers=None):
+    """Verify current KV state matches pre-test snapshots.
+
+    Compares canonical-JSON digests; key-level diffs are computed only for
+    endpoints whose digest differs.
+    """
     print("\nVerifying KV state matches snapshots...")
     mismatches = []
 
+    snapshots = {}
     for account in COMPANIES:
         for endpoint in ENDPOINTS:
             snap_path = SNAP_DIR / f"{account}_{endpoint}.json"
             if not snap_path.exists():
                 print(f"  SKIP: No snapshot for {account}/{endpoint}")
                 continue
-
-            snapshot = json.loads(snap_path.read_text())
-            current = api_get(endpoint, account, secret)
-
-            if current is None:
-                mismatches.append(f"{account}/{endpoint}: API returned None")
-                continue
-
-            # Skip sync-version (changes on every write)
-            if endpoint == "sync-version":
-                continue
-
-            # Skip autosave (changes frequently)
-            if endpoint == "autosave":
-                continue
-
-            if current != snapshot:
-                mismatches.append(f"{account}/{endpoint}: KV drift detected")
-                # Show diff summary
-                if isinstance(current, dict) and isinstance(snapshot, dict):
-                    added = set(current.keys()) - set(snapshot.keys())
-                    removed = set(snapshot.keys()) - set(current.keys())
-                    if added:
-                        print(f"    Added keys: {added}")
-                    if removed:
-                        print(f"    Removed keys: {removed}")
+            snapshots[(account, endpoint)] = snap_path
+
+    currents = read_all(client, snapshots, workers)
+    for (account, endpoint), snap_path in snapshots.items():
+        current = currents[(account, endpoint)]
+        if current is None:
+            mismatches.append(f"{account}/{endpoint}: API returned None")
+            continue
+
+        # Skip sync-version (changes on every write) and autosave (changes frequently)
+        if endpoint in UNCOMPARED_ENDPOINTS:
+            continue
+
+        snapshot = json.loads(snap_path.read_text())
+        if canonical_digest(current) != canonical_digest(snapshot):
+            mismatches.append(f"{account}/{endpoint}: KV drift detected")
+            diff = key_diff(snapshot, current)
+            for label, keys in [("Added", diff["added"]), ("Removed", diff["removed"]), ("Changed", diff["changed"])]:
+                if keys:
+                    print(f"    {account}/{endpoint} {label} keys: {keys}")
 
     if mismatches:
         print(f"\nWARNING: {len(mismatches)} mismatches found:")
@@ -179,14 +168,16 @@ def verify_snapshots(secret):
 def main():
     parser = argparse.ArgumentParser(description="E2E test cleanup and verification")
     parser.add_argument("--verify-only", action="store_true", help="Only verify snapshots")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent KV requests (1 = serial)")
     args = parser.parse_args()
 
     secret = load_env()
 
-    if not args.verify_only:
-        clean_test_data(secret)
-
-    ok = verify_snapshots(secret)
+    # One pooled keep-alive session for every GET/DELETE
+    with KVClient(BASE_URL, secret, pool_size=args.workers) as client:
+        if not args.verify_only:
+            clean_test_data(client, args.workers)
+        ok = verify_snapshots(client, args.workers)
     sys.exit(0 if ok else 1)
 
 
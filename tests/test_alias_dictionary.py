@@ -0,0 +1,120 @@
+"""
+Tests for the harvested alias dictionary (scripts/alias_dictionary.py) and its
+use in integrate_viewer's manual/auto join.
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from alias_dictionary import (
+    add_to_alias_index, alias_group, aliases_of, build_alias_dictionary, harvest_quote_pairs,
+    load_alias_dictionary, save_alias_dictionary,
+)
+from fetch_kv_merges import AliasIndex
+from integrate_viewer import AutoEntityIndex, convert_manual_node_for_viewer, generate_match_review_from_auto_map
+
+MANUAL_ROOT = {
+    "id": "roche", "name": "Roche", "children": [
+        {"id": "node-pred", "name": "Pharma Research & Early Development (pRED)", "children": [
+            {"id": "node-ds", "name": "Discovery Sciences"},
+        ]},
+        {"id": "node-onc", "name": "Oncology (Solid Tumors)"},
+    ],
+}
+
+
+class TestHarvestQuotePairs:
+
+    def test_trims_leading_words_to_the_acronym(self):
+        pairs = harvest_quote_pairs(["So Genentech Research and Early Development (gRED) is separate"])
+        assert pairs == {("Genentech Research and Early Development", "gRED"): 1}
+
+    def test_drops_leading_stop_word(self):
+        pairs = harvest_quote_pairs(["In Discovery Sciences (DS) we have 50 people"])
+        assert list(pairs) == [("Discovery Sciences", "DS")]
+
+    def test_ignores_non_acronym_parentheticals(self):
+        assert not harvest_quote_pairs(["Oncology Research (Basel) is big", "Big Team (BT2X9LONG) here"])
+
+    def test_initials_must_match(self):
+        assert not harvest_quote_pairs(["Discovery Sciences (BE) is unrelated"])
+
+    def test_repeated_quote_counted_once(self):
+        quote = "Discovery Sciences (DS) is ours"
+        assert harvest_quote_pairs([quote, quote])[("Discovery Sciences", "DS")] == 1
+
+
+class TestBuildAliasDictionary:
+
+    def test_manual_parenthetical(self):
+        dictionary = build_alias_dictionary("roche", MANUAL_ROOT)
+        group = alias_group(dictionary, "pRED")
+        assert group["manual_node_id"] == "node-pred"
+        assert alias_group(dictionary, "Pharma Research & Early Development") is group
+        # Descriptive parentheticals are not acronyms
+        assert alias_group(dictionary, "Solid Tumors") is None
+
+    def test_kv_aliases_join_manual_node(self):
+        merges = {"node-ds": {"absorbed": [], "aliases": ["Disc Sci", "DS"]}}
+        dictionary = build_alias_dictionary("roche", MANUAL_ROOT, merges)
+        group = alias_group(dictionary, "Disc Sci")
+        assert group["key"] == "node-ds"
+        assert group["manual_node_id"] == "node-ds"
+        assert set(aliases_of(dictionary, "DS")) == {"Discovery Sciences", "Disc Sci"}
+
+    def test_quote_acronym_attaches_to_known_name(self):
+        dictionary = build_alias_dictionary("roche", MANUAL_ROOT, quotes=["Discovery Sciences (DS) sits in pRED"])
+        assert alias_group(dictionary, "DS")["manual_node_id"] == "node-ds"
+
+    def test_conflicting_quote_acronyms_are_ambiguous(self):
+        dictionary = build_alias_dictionary("roche", quotes=["Discovery Sciences (DS) team", "Data Science (DS) team"])
+        assert alias_group(dictionary, "DS") is None
+        assert dictionary["ambiguous"]["ds"] == ["Data Science", "Discovery Sciences"]
+
+    def test_reviewer_claim_beats_quotes(self):
+        merges = {"node-ds": {"absorbed": [], "aliases": ["DS"]}}
+        dictionary = build_alias_dictionary("roche", MANUAL_ROOT, merges, quotes=["Data Science (DS) team"])
+        assert alias_group(dictionary, "DS")["key"] == "node-ds"
+        assert "ds" not in dictionary["ambiguous"]
+
+    def test_round_trip(self, tmp_path):
+        dictionary = build_alias_dictionary("roche", MANUAL_ROOT)
+        path = tmp_path / "roche" / "alias_dictionary.json"
+        save_alias_dictionary(path, dictionary)
+        assert load_alias_dictionary(path)["index"] == dictionary["index"]
+        assert load_alias_dictionary(tmp_path / "missing.json") is None
+
+    def test_alias_index_groups_by_key(self):
+        dictionary = build_alias_dictionary("roche", MANUAL_ROOT, quotes=["Discovery Sciences (DS) team"])
+        index = add_to_alias_index(dictionary, AliasIndex())
+        assert index.lookup("DS")["canonical_id"] == "node-ds"
+        assert index.lookup("Discovery Sciences")["canonical_id"] == "node-ds"
+
+
+class TestViewerJoin:
+
+    def test_manual_node_picks_up_alias_named_auto_entities(self):
+        dictionary = build_alias_dictionary("roche", MANUAL_ROOT)
+        auto_root = {"name": "Roche", "children": [
+            {"name": "Pharma Research & Early Development", "snippets": [{"quote": "a"}], "size": "500"},
+            {"name": "pRED", "snippets": [{"quote": "b"}], "leader": "Jane Doe"},
+        ]}
+        node = convert_manual_node_for_viewer(MANUAL_ROOT["children"][0], AutoEntityIndex(auto_root, dictionary))
+        evidence = node["gongEvidence"]
+        assert [s["quote"] for s in evidence["snippets"]] == ["a", "b"]
+        assert evidence["teamSizes"] == ["500"]
+        assert node["leader"] == "Jane Doe"
+
+    def test_alias_named_auto_entity_is_not_sent_to_review(self, monkeypatch):
+        import integrate_viewer
+        monkeypatch.setattr(integrate_viewer, "load_llm_matches", lambda company: {})
+        auto_map = {"root": {"name": "Roche", "children": [
+            {"name": "pRED", "snippets": [{"quote": "pRED is 500 people"}]},
+            {"name": "Imaging", "snippets": [{"quote": "Imaging team"}]},
+        ]}}
+        dictionary = build_alias_dictionary("roche", MANUAL_ROOT)
+        review = generate_match_review_from_auto_map("roche", auto_map, {"root": MANUAL_ROOT},
+                                                     alias_dictionary=dictionary)
+        assert [item["gong_entity"] for item in review["items"]] == ["Imaging"]
@@ -8,6 +8,8 @@ import sys
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+import pytest
+
 # Add scripts to path for import
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
@@ -75,96 +77,172 @@ class TestNormalizeEntityName:
         assert normalize_entity_name("Group") == ""
 
 
-class TestBuildAliasLookup:
-    """3a: build_alias_lookup maps normalized aliases to canonical IDs."""
-
-    def test_basic_lookup(self):
-        from fetch_kv_merges import build_alias_lookup
-        merges = {
-            'entity-001': {
-                'absorbed': ['entity-002'],
-                'aliases': ['ABCD Group', 'XYZ Therapeutics'],
-                'mergedSnippets': [],
-                'mergedAt': '2026-01-01T00:00:00Z'
-            }
+class TestAliasIndex:
+    """Exact, acronym and fuzzy alias lookups against KV merges."""
+
+    MERGES = {
+        'discovery-sciences': {'absorbed': ['ds-team'], 'aliases': ['Discovery Sciences (DS)', 'Disc. Sciences']},
+        'oncology-rd': {'absorbed': [], 'aliases': ['Oncology R&D']},
+        'data-science': {'absorbed': [], 'aliases': ['Data Science']},
+    }
+
+    def index(self):
+        from fetch_kv_merges import build_alias_index
+        return build_alias_index(self.MERGES)
+
+    def test_exact_normalized(self):
+        hit = self.index().lookup('discovery sciences (ds)')
+        assert (hit['canonical_id'], hit['match_type'], hit['score']) == ('discovery-sciences', 'normalized', 1.0)
+
+    def test_absorbed_id(self):
+        hit = self.index().lookup('Anything', entity_id='ds-team')
+        assert (hit['canonical_id'], hit['match_type']) == ('discovery-sciences', 'id')
+
+    def test_token_set(self):
+        hit = self.index().lookup('R&D Oncology Team')
+        assert (hit['canonical_id'], hit['match_type']) == ('oncology-rd', 'token_set')
+
+    def test_connective_word_is_a_token_set_match(self):
+        hit = self.index().lookup('Oncology R and D')
+        assert (hit['canonical_id'], hit['match_type'], hit['score']) == ('oncology-rd', 'token_set', 0.95)
+
+    def test_trigram(self):
+        hit = self.index().lookup('Oncologyy R&D')
+        assert (hit['canonical_id'], hit['match_type']) == ('oncology-rd', 'trigram')
+        assert 0.8 <= hit['score'] < 1.0
+
+    def test_ambiguous_acronym_returns_none(self):
+        # "DS" is the parenthetical of Discovery Sciences and the initials of Data Science
+        assert self.index().lookup('DS') is None
+
+    def test_unrelated_name(self):
+        assert self.index().lookup('Finance') is None
+
+    def test_acronym_unique(self):
+        from fetch_kv_merges import build_alias_index
+        index = build_alias_index({'pred': {'absorbed': [], 'aliases': ['Pharma Research & Early Development (pRED)']}})
+        hit = index.lookup('pRED')
+        assert (hit['canonical_id'], hit['match_type'], hit['score']) == ('pred', 'acronym', 0.9)
+
+    def test_premerged_alias_hits_keep_their_ids(self):
+        from consolidation_merge import merge_consolidation_with_sources
+        from local_consolidation import premerge_entities, singleton_structures
+        quality = [{'id': i, 'entity_name': name, 'entity_type': 'team', 'mention_count': 1,
+                    'all_sources': [{'call_id': i, 'raw_quote': name}]}
+                   for i, name in (('disc-sciences', 'Disc. Sciences'), ('ds-sciences', 'Discovery Sciences (DS)'))]
+        groups = {}
+        for entity in quality:
+            groups.setdefault(self.index().lookup(entity['entity_name'])['canonical_id'], []).append(entity['id'])
+        premerged, _ = premerge_entities(quality, groups, 'Known alias')
+        final = merge_consolidation_with_sources({'entities': singleton_structures(premerged)}, premerged)
+        assert len(final) == 1
+        assert sorted(final[0]['original_ids']) == ['disc-sciences', 'ds-sciences']
+        assert {s['call_id'] for s in final[0]['all_sources']} == {'disc-sciences', 'ds-sciences'}
+
+
+class TestAliasIndexLookups:
+    """3a: build_alias_index resolves ids, canonical names and aliases to canonical IDs."""
+
+    MERGES = {
+        'entity-001': {
+            'absorbed': ['entity-002'],
+            'aliases': ['ABCD Group', 'XYZ Therapeutics'],
+            'mergedSnippets': [],
+            'mergedAt': '2026-01-01T00:00:00Z'
         }
-        lookup = build_alias_lookup(merges)
-        assert 'abcd' in lookup  # "ABCD Group" -> strip "Group" -> "abcd"
-        assert lookup['abcd']['canonical_id'] == 'entity-001'
-        assert lookup['abcd']['alias'] == 'ABCD Group'
-        assert 'xyz therapeutics' in lookup
-        assert lookup['xyz therapeutics']['canonical_id'] == 'entity-001'
+    }
+
+    def test_canonical_and_absorbed_ids(self):
+        from fetch_kv_merges import build_alias_index
+        index = build_alias_index(self.MERGES)
+        for entity_id in ('entity-001', 'entity-002'):
+            hit = index.lookup('Unrelated', entity_id=entity_id)
+            assert (hit['canonical_id'], hit['match_type'], hit['origin']) == ('entity-001', 'id', 'id')
+
+    def test_alias_name(self):
+        from fetch_kv_merges import build_alias_index
+        hit = build_alias_index(self.MERGES).lookup('XYZ Therapeutics')
+        assert (hit['canonical_id'], hit['alias'], hit['match_type']) == ('entity-001', 'XYZ Therapeutics', 'normalized')
+
+    def test_alias_without_suffix(self):
+        from fetch_kv_merges import build_alias_index
+        hit = build_alias_index(self.MERGES).lookup('ABCD')  # "ABCD Group" -> strip "Group" -> "abcd"
+        assert (hit['canonical_id'], hit['alias'], hit['match_type']) == ('entity-001', 'ABCD Group', 'normalized')
+
+    def test_case_insensitive(self):
+        from fetch_kv_merges import build_alias_index
+        hit = build_alias_index(self.MERGES).lookup('xyz THERAPEUTICS')
+        assert (hit['canonical_id'], hit['match_type']) == ('entity-001', 'normalized')
 
     def test_multiple_merges(self):
-        from fetch_kv_merges import build_alias_lookup
-        merges = {
+        from fetch_kv_merges import build_alias_index
+        index = build_alias_index({
             'e1': {'absorbed': ['e2'], 'aliases': ['Alpha Group']},
             'e3': {'absorbed': ['e4'], 'aliases': ['Beta Corp']}
-        }
-        lookup = build_alias_lookup(merges)
-        assert 'alpha' in lookup
-        assert 'beta' in lookup
-        assert lookup['alpha']['canonical_id'] == 'e1'
-        assert lookup['beta']['canonical_id'] == 'e3'
+        })
+        assert index.lookup('alpha')['canonical_id'] == 'e1'
+        assert index.lookup('Beta')['canonical_id'] == 'e3'
+        assert index.lookup('Beta Corp', entity_id='e2')['canonical_id'] == 'e1'
 
     def test_empty_merges(self):
-        from fetch_kv_merges import build_alias_lookup
-        lookup = build_alias_lookup({})
-        assert lookup == {}
+        from fetch_kv_merges import build_alias_index
+        index = build_alias_index({})
+        assert len(index) == 0
+        assert index.lookup('Alpha', entity_id='e1') is None
 
     def test_no_aliases(self):
-        from fetch_kv_merges import build_alias_lookup
-        merges = {'e1': {'absorbed': ['e2'], 'aliases': []}}
-        lookup = build_alias_lookup(merges)
-        assert lookup == {}
+        from fetch_kv_merges import build_alias_index
+        index = build_alias_index({'e1': {'absorbed': ['e2'], 'aliases': []}})
+        assert len(index) == 0
+        assert index.lookup('e1') is None
+        assert index.lookup('Anything', entity_id='e2')['canonical_id'] == 'e1'
 
 
 class TestFetchMerges:
-    """3a: fetch_merges() fetches from KV API."""
+    """3a: fetch_merges() fetches from KV API (local stub server, temporary snapshot dir)."""
 
-    @patch('fetch_kv_merges.requests')
-    def test_fetch_merges_basic(self, mock_requests):
+    @pytest.fixture(autouse=True)
+    def _snapshots(self, kv_snapshot_dir):
+        return kv_snapshot_dir
+
+    def test_fetch_merges_basic(self, kv_stub, monkeypatch):
         from fetch_kv_merges import fetch_merges
-        mock_response = MagicMock()
-        mock_response.json.return_value = {'e1': {'absorbed': ['e2'], 'aliases': ['Foo']}}
-        mock_response.raise_for_status = MagicMock()
-        mock_requests.get.return_value = mock_response
+        monkeypatch.setenv('VIEWER_BASE_URL', kv_stub.base_url)
+        kv_stub.state['merges:testco'] = {'e1': {'absorbed': ['e2'], 'aliases': ['Foo']}}
 
         result = fetch_merges('testco')
         assert 'e1' in result
-        mock_requests.get.assert_called_once()
         # Check URL contains account parameter
-        call_args = mock_requests.get.call_args
-        assert 'testco' in call_args[0][0]
+        assert {'account': 'testco', 'type': 'merges'} in [r['query'] for r in kv_stub.requests]
 
-    @patch('fetch_kv_merges.requests')
-    def test_fetch_merges_with_bypass_secret(self, mock_requests):
+    def test_fetch_merges_with_bypass_secret(self, kv_stub, monkeypatch):
         from fetch_kv_merges import fetch_merges
-        mock_response = MagicMock()
-        mock_response.json.return_value = {}
-        mock_response.raise_for_status = MagicMock()
-        mock_requests.get.return_value = mock_response
-
-        with patch.dict('os.environ', {'VERCEL_AUTOMATION_BYPASS_SECRET': 'test-secret'}):
-            fetch_merges('testco')
+        monkeypatch.setenv('VIEWER_BASE_URL', kv_stub.base_url)
+        monkeypatch.setenv('VERCEL_AUTOMATION_BYPASS_SECRET', 'test-secret')
+        fetch_merges('testco')
         # Should include bypass header
-        call_args = mock_requests.get.call_args
-        headers = call_args[1].get('headers', {})
+        headers = {k.lower(): v for k, v in kv_stub.requests[0]['headers'].items()}
         assert headers.get('x-vercel-protection-bypass') == 'test-secret'
 
-    @patch('fetch_kv_merges.requests')
-    def test_fetch_merges_network_error(self, mock_requests):
+    def test_fetch_merges_network_error(self, kv_stub, monkeypatch):
         """Pipeline should handle network errors gracefully."""
         import requests as real_requests
         from fetch_kv_merges import fetch_merges
-        mock_requests.get.side_effect = real_requests.RequestException("Connection refused")
-        mock_requests.RequestException = real_requests.RequestException
-
-        try:
-            fetch_merges('testco')
-            assert False, "Should have raised RequestException"
-        except Exception:
-            pass  # Expected - caller handles gracefully
+        kv_stub.stop()
+        monkeypatch.setenv('VIEWER_BASE_URL', kv_stub.base_url)
+        monkeypatch.setattr('kv_client.BACKOFF_SECONDS', 0)
+        with pytest.raises(real_requests.RequestException):
+            fetch_merges('testco')  # caller handles gracefully
+
+    def test_prefetch_serves_later_fetches(self, kv_stub, monkeypatch):
+        from fetch_kv_merges import fetch_merges, prefetch_merges
+        monkeypatch.setenv('VIEWER_BASE_URL', kv_stub.base_url)
+        kv_stub.state['merges:a'] = {'x': {'absorbed': [], 'aliases': ['X']}}
+        assert prefetch_merges(['a', 'b']) == {}
+        prefetched = len(kv_stub.requests)
+        assert fetch_merges('a') == {'x': {'absorbed': [], 'aliases': ['X']}}
+        assert fetch_merges('b') == {}
+        assert len(kv_stub.requests) == prefetched
 
 
 class TestNormalizationParity:
@@ -252,7 +330,7 @@ class TestFetchKvMergesModuleExists:
         assert script_path.exists(), "scripts/fetch_kv_merges.py must exist"
 
     def test_module_importable(self):
-        from fetch_kv_merges import fetch_merges, build_alias_lookup, normalize_entity_name
+        from fetch_kv_merges import fetch_merges, build_alias_index, normalize_entity_name
         assert callable(fetch_merges)
-        assert callable(build_alias_lookup)
+        assert callable(build_alias_index)
         assert callable(normalize_entity_name)
@@ -0,0 +1,113 @@
+"""
+Tests for build-time KV overlay baking (scripts/bake_overlays.py) and
+integrate_viewer's per-company export with --bake-kv.
+"""
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from bake_overlays import BASE_FILENAME, bake_company_data, bake_working_tree, overlay_stamps
+from kv_snapshot import save_snapshot
+from sparse_json import sparse
+
+
+def make_root():
+    return {
+        "id": "root", "name": "Root", "type": "group", "children": [
+            {"id": "a", "name": "Division A", "type": "division", "leader": {"name": "Alice", "title": "VP"},
+             "children": [
+                 {"id": "a1", "name": "Team A1", "type": "team", "children": []},
+                 {"id": "a2", "name": "Team A2", "type": "team", "children": []},
+             ]},
+            {"id": "b", "name": "Division B", "type": "division", "children": [
+                {"id": "b1", "name": "Team B1", "type": "team", "children": []},
+            ]},
+        ],
+    }
+
+
+STATE = {
+    "merges": {"a": {"absorbed": ["a2"], "savedAt": "2026-01-01T00:00:00Z"}},
+    "field-edits": {
+        "a": {"name": {"original": "Division A", "edited": "Division Alpha"},
+              "leaderName": {"original": "Alice", "edited": "Alicia"}, "savedAt": "2026-01-02T00:00:00Z"},
+        "b": {"leaderName": {"original": "", "edited": "Bob"}, "savedAt": "2026-01-02T00:00:00Z"},
+    },
+    "manual-map-overrides": {
+        "a1": {"originalParent": "a", "newParent": "b", "movedAt": "2026-01-03", "savedAt": "2026-01-03T00:00:00Z"},
+    },
+    "manual-map-modifications": {
+        "added": [{"id": "new1", "name": "New Team", "parentId": "a", "addedAt": "2026-01-04T00:00:00Z"}],
+        "deleted": [{"id": "b1", "deletedAt": "2026-01-05T00:00:00Z"}],
+    },
+}
+
+
+def children(node, node_id):
+    for child in node["children"]:
+        if child["id"] == node_id:
+            return [c["id"] for c in child["children"]]
+
+
+class TestBakeWorkingTree:
+
+    def test_applies_overlays_like_the_viewer(self):
+        root = make_root()
+        tree = bake_working_tree(root, STATE["manual-map-overrides"], STATE["manual-map-modifications"],
+                                 STATE["merges"], STATE["field-edits"])
+        division_a, division_b = tree["children"]
+        assert children(tree, "a") == ["a2", "new1"]
+        assert children(tree, "b") == ["a1"]
+        assert division_a["children"][0]["absorbed"] is True
+        assert division_a["displayName"] == "Division Alpha"
+        assert division_a["displayLeaderName"] == "Alicia"
+        # Leader edits need a leader
+        assert "displayLeaderName" not in division_b
+        moved = division_b["children"][0]
+        assert moved["originalParent"] == "a" and moved["override"]["newParent"] == "b"
+        # Input untouched
+        assert children(root, "a") == ["a1", "a2"]
+
+    def test_no_overlays_is_a_copy(self):
+        assert bake_working_tree(make_root()) == make_root()
+
+    def test_stamps(self):
+        stamps = overlay_stamps(STATE)
+        assert stamps["merges"] == {"a": "2026-01-01T00:00:00Z"}
+        assert stamps["manual-map-modifications"] == {"added:new1": "2026-01-04T00:00:00Z",
+                                                      "deleted:b1": "2026-01-05T00:00:00Z"}
+
+    def test_marker(self):
+        data = {"company": "Test", "stats": {}, "root": make_root()}
+        baked = bake_company_data(data, {"sync_version": "42", "state": STATE})
+        assert baked["kvOverlay"]["syncVersion"] == "42"
+        assert baked["kvOverlay"]["base"] == BASE_FILENAME
+        assert set(baked["kvOverlay"]["stamps"]["field-edits"]) == {"a", "b"}
+        assert "kvOverlay" not in data
+
+
+class TestExportBaked:
+
+    def test_writes_baked_and_base(self, tmp_path, monkeypatch, kv_snapshot_dir):
+        import integrate_viewer
+        monkeypatch.setattr(integrate_viewer, "PUBLIC_DIR", tmp_path)
+        monkeypatch.setattr(integrate_viewer, "COMPANIES", ["roche", "gsk"])
+        save_snapshot({"account": "roche", "sync_version": "7", "fetched_at": "", "state": STATE},
+                      kv_snapshot_dir)
+        manual = {"roche": {"company": "Roche", "root": make_root()},
+                  "gsk": {"company": "GSK", "root": make_root()}}
+
+        integrate_viewer.export_per_company_json(manual, {"companies": {}}, bake_kv=True, kv_offline=True)
+
+        roche = json.loads((tmp_path / "data" / "roche" / "manual.json").read_text())
+        assert roche["kvOverlay"]["syncVersion"] == "7"
+        assert children(roche["root"], "b") == ["a1"]
+        base = json.loads((tmp_path / "data" / "roche" / BASE_FILENAME).read_text())
+        assert base == sparse(manual["roche"])
+        # No snapshot for gsk: exported unbaked, without a base file
+        gsk = json.loads((tmp_path / "data" / "gsk" / "manual.json").read_text())
+        assert "kvOverlay" not in gsk
+        assert not (tmp_path / "data" / "gsk" / BASE_FILENAME).exists()
@@ -0,0 +1,82 @@
+"""
+Tests for call-id resolution (scripts/call_ids.py) and its use for
+snippet -> transcript lookups in integrate_viewer.
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from call_ids import CallIdResolver, call_key, parse_call_id, snippet_call_key
+
+FULL = "1868065fa493e4cf0b7c2d9a1e5f3b8c6d4a2e0f9b7c5d3a1e8f6b4c2d0a2f35"
+OTHER = "1868065fa493ffff0b7c2d9a1e5f3b8c6d4a2e0f9b7c5d3a1e8f6b4c2d0a0000"
+
+
+class TestParseCallId:
+
+    def test_forms(self):
+        assert parse_call_id("2025-11-12_1868065FA493") == ("2025-11-12", "1868065fa493")
+        assert parse_call_id(f"https://app.gong.io/call?id={FULL}") == (None, FULL)
+        assert parse_call_id(FULL) == (None, FULL)
+        assert parse_call_id("not a call") == (None, None)
+
+
+class TestCallKey:
+
+    def test_id_forms_of_one_call_agree(self):
+        keys = {call_key("2025-11-12_1868065fa493"), call_key(FULL), call_key(f"https://app.gong.io/call?id={FULL}"),
+                snippet_call_key({"callId": None, "gongUrl": f"https://app.gong.io/call?id={FULL}"})}
+        assert keys == {"1868065fa493"}
+
+    def test_unparseable_form_is_kept(self):
+        assert call_key(None, "c1", "c2") == "c1"
+        assert snippet_call_key({}) is None
+
+
+class TestCallIdResolver:
+
+    def test_truncated_id_resolves_to_full_hash_key(self):
+        resolver = CallIdResolver([(FULL, None, "2025-11-12")])
+        assert resolver.resolve("2025-11-12_1868065fa493") == FULL
+
+    def test_full_hash_resolves_to_truncated_key(self):
+        resolver = CallIdResolver([("2025-11-12_1868065fa493",)])
+        assert resolver.resolve(FULL) == "2025-11-12_1868065fa493"
+        assert resolver.resolve_snippet({"gongUrl": f"https://app.gong.io/call?id={FULL}"}) == \
+            "2025-11-12_1868065fa493"
+
+    def test_gong_url_of_the_batch(self):
+        resolver = CallIdResolver([("call-7", f"https://app.gong.io/call?id={FULL}")])
+        assert resolver.resolve_snippet({"callId": "2025-11-12_1868065fa493"}) == "call-7"
+
+    def test_shared_prefix_is_decided_by_date(self):
+        resolver = CallIdResolver([(FULL, None, "2025-11-12"), (OTHER, None, "2025-12-01")])
+        assert resolver.resolve("1868065fa493") is None
+        assert resolver.resolve("2025-12-01_1868065fa493") == OTHER
+        assert resolver.resolve_snippet({"callId": "1868065fa493", "date": "2025-11-12"}) == FULL
+
+    def test_short_prefix_does_not_resolve(self):
+        resolver = CallIdResolver([(FULL,)])
+        assert resolver.resolve("2025-11-12_1868") is None
+        assert resolver.resolve("") is None
+
+
+class TestSnippetContext:
+
+    def test_snippets_find_transcripts_under_other_id_forms(self):
+        from integrate_viewer import convert_node_for_viewer
+        transcripts = {FULL: {"text": "Intro. The oncology team has forty people. Outro.", "title": "Roche sync",
+                              "date": "2025-11-12"}}
+        node = {"name": "Oncology", "snippets": [
+            {"quote": "The oncology team has forty people.", "callId": "2025-11-12_1868065fa493"},
+            {"quote": "Unknown call", "callId": "2025-11-12_deadbeef0000"},
+        ]}
+        stats = {"matched": 0, "total": 0, "failures": []}
+        result = convert_node_for_viewer(node, transcripts=transcripts, context_stats=stats)
+        assert result["snippets"][0]["callTitle"] == "Roche sync"
+        # The viewer keeps the snippet's own callId
+        assert result["snippets"][0]["callId"] == "2025-11-12_1868065fa493"
+        assert stats["matched"] == 1
+        assert [f["callId"] for f in stats["failures"]] == ["2025-11-12_deadbeef0000"]
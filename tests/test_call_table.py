@@ -0,0 +1,61 @@
+"""
+Tests for the opt-in compact viewer JSON format (scripts/call_table.py).
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from call_table import compact_calls, expand_calls
+
+CALL = {"callId": "2025-07-10_d7af7ddef683", "gongUrl": "https://app.gong.io/call?id=d7af7ddef683",
+        "callTitle": "BioRender & AbbVie - Intro Call", "date": "2025-07-10",
+        "customerName": "Kira Fahy; Shuang Chen", "customerEmail": "kfahy@abbvie.com; shuang.chen@abbvie.com",
+        "internalName": "Michael Long", "internalEmail": "michael.long@biorender.com"}
+
+REVIEW = {"generated": "2026-01-01", "total_unmatched": 1, "items": [{
+    "id": "abbvie_lake_county", "gong_entity": "Lake County", "snippet": "lake county",
+    "call_id": CALL["callId"], "gong_url": CALL["gongUrl"], "snippet_date": CALL["date"],
+    "person_name": CALL["customerName"], "person_email": CALL["customerEmail"],
+    "internal_name": CALL["internalName"], "internal_email": CALL["internalEmail"],
+    "all_snippets": [
+        {"quote": "lake county", "speakerId": "1", **CALL},
+        {"quote": "and Irvine", "speakerId": "2", **CALL},
+        {"quote": "another call", **CALL, "callId": "2025-08-01_aaaaaaaaaaaa", "date": "2025-08-01"},
+        {"quote": "no call"},
+    ],
+}]}
+
+
+class TestCompactCalls:
+
+    def test_snippets_and_items_share_call_rows(self):
+        compact = compact_calls(REVIEW)
+        assert len(compact["calls"]) == 2
+        item = compact["items"][0]
+        assert item["call"] == 0 and "person_name" not in item
+        assert [s.get("call") for s in item["all_snippets"]] == [0, 0, 1, None]
+        assert item["all_snippets"][0] == {"quote": "lake county", "speakerId": "1", "call": 0}
+
+    def test_round_trip(self):
+        assert expand_calls(compact_calls(REVIEW)) == REVIEW
+
+    def test_item_with_other_metadata_keeps_it(self):
+        review = {"items": [{**REVIEW["items"][0], "person_name": "Someone Else", "all_snippets": [
+            {"quote": "q", **CALL}]}]}
+        compact = compact_calls(review)
+        assert len(compact["calls"]) == 1
+        assert compact["items"][0]["person_name"] == "Someone Else"
+        assert expand_calls(compact) == review
+
+    def test_mixed_id_forms_share_a_row(self):
+        by_id = {"quote": "a", "callId": CALL["callId"], "date": CALL["date"]}
+        by_url = {"quote": "b", "gongUrl": CALL["gongUrl"], "callTitle": CALL["callTitle"]}
+        compact = compact_calls({"all_snippets": [by_id, by_url]})
+        assert compact["calls"] == [{"callId": CALL["callId"], "date": CALL["date"],
+                                     "gongUrl": CALL["gongUrl"], "callTitle": CALL["callTitle"]}]
+        assert [s["call"] for s in compact["all_snippets"]] == [0, 0]
+        # Each snippet gains the other's call fields, and loses nothing
+        for original, expanded in zip((by_id, by_url), expand_calls(compact)["all_snippets"]):
+            assert original.items() <= expanded.items()
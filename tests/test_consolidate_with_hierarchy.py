@@ -0,0 +1,289 @@
+"""
+Tests for the LLM orchestration in scripts/consolidate_with_hierarchy.py.
+
+The script imports anthropic, config and adapters at module level. Where
+they are not installed, minimal stand-ins are registered before the import;
+LLM calls go to a fake streaming client that replays canned replies.
+"""
+import importlib.util
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+
+def _normalize_extraction(e):
+    """Format A (entity_name/entity_type) pass-through, like adapters.normalize_extraction."""
+    return {
+        'entity_name': e.get('entity_name'),
+        'entity_type': e.get('entity_type', 'team'),
+        'raw_quote': e.get('raw_quote'),
+        'confidence': e.get('confidence', 'medium'),
+        'speaker_id': e.get('speaker_id'),
+        'call_date': e.get('call_date'),
+        'call_id': e.get('call_id'),
+        'leader': e.get('leader'),
+        'leader_title': e.get('leader_title'),
+    }
+
+
+def _stand_in(name, **attrs):
+    if name in sys.modules or importlib.util.find_spec(name) is not None:
+        return
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+
+
+_stand_in('anthropic', Anthropic=type('Anthropic', (), {}))
+_stand_in('config', COMPANIES={}, EXTRACTIONS_DIR=PROJECT_ROOT / 'extractions', OUTPUT_DIR=PROJECT_ROOT / 'output',
+          RATE_LIMIT_DELAY=0, MODEL='test-model')
+_stand_in('adapters', normalize_extraction=_normalize_extraction)
+
+import consolidate_with_hierarchy as cwh  # noqa: E402
+from consolidation_prompts import FIELD_SEP  # noqa: E402
+
+
+class FakeStream:
+    def __init__(self, text, usage, stop_reason):
+        # Small chunks, so the incremental parser sees entities split across chunks
+        self.text_stream = [text[i:i + 7] for i in range(0, len(text), 7)]
+        self._final = types.SimpleNamespace(usage=usage, stop_reason=stop_reason)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_final_message(self):
+        return self._final
+
+
+class FakeClient:
+    """Stands in for anthropic.Anthropic: messages.stream() replays reply(prompt) -> (text, stop_reason)."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = []
+        self.messages = self
+
+    def stream(self, model, max_tokens, system, messages):
+        prompt = messages[0]['content']
+        self.requests.append(prompt)
+        text, stop_reason = self.reply(prompt)
+        usage = {'input_tokens': len(prompt) // 4, 'output_tokens': len(text) // 4}
+        return FakeStream(text, usage, stop_reason)
+
+
+def prompt_ids(prompt, section='## Entities'):
+    """Ids of the table rows in one section of a user prompt."""
+    ids = []
+    for line in prompt.split(section, 1)[1].split('\n## ', 1)[0].splitlines():
+        if FIELD_SEP in line and not line.startswith('id' + FIELD_SEP):
+            ids.append(line.split(FIELD_SEP, 1)[0])
+    return ids
+
+
+def structure(entity_id, name, parent_id=None, original_ids=None):
+    return {'id': entity_id, 'name': name, 'type': 'team', 'parent_id': parent_id, 'confidence': 'medium',
+            'original_ids': original_ids or [entity_id]}
+
+
+def reply_json(entities, notes=''):
+    return json.dumps({'entities': entities, 'hierarchy_notes': notes, 'duplicate_resolutions': []})
+
+
+def quality_entity(entity_id, name):
+    return {'id': entity_id, 'entity_name': name, 'entity_type': 'team', 'mention_count': 1, 'confidence': 'high',
+            'all_sources': [{'call_id': f'call-{entity_id}', 'raw_quote': f'We work with {name}.'}]}
+
+
+def extraction(name, call_id, quote=None, entity_type='team'):
+    return {'entity_name': name, 'entity_type': entity_type, 'raw_quote': quote or f'We work with {name}.',
+            'call_id': call_id, 'call_date': '2026-02-01', 'confidence': 'high'}
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(cwh, 'EXTRACTIONS_DIR', tmp_path / 'extractions')
+    monkeypatch.setattr(cwh, 'OUTPUT_DIR', tmp_path / 'output')
+    monkeypatch.setattr(cwh, 'RATE_LIMIT_DELAY', 0)
+    cwh._call_ledger.reset()
+    return tmp_path
+
+
+class TestIncrementalConsolidation:
+    """Known entities are re-attached without the LLM; only new ones are sent for placement."""
+
+    EXISTING = {
+        'account': 'acme',
+        'consolidated_at': '2026-01-01T00:00:00',
+        'entities': [
+            {'id': 'discovery-sciences', 'entity_name': 'Discovery Sciences', 'entity_type': 'department',
+             'parent_entity': None, 'confidence': 'high', 'original_ids': ['discovery-sciences'],
+             'all_sources': [{'call_id': 'old-1', 'raw_quote': 'Discovery Sciences'}]},
+            {'id': 'oncology', 'entity_name': 'Oncology', 'entity_type': 'team',
+             'parent_entity': 'discovery-sciences', 'confidence': 'medium', 'original_ids': ['oncology'],
+             'all_sources': [{'call_id': 'old-2', 'raw_quote': 'Oncology'}]},
+        ],
+        'hierarchy_notes': 'Previous run',
+        'duplicate_resolutions': [],
+    }
+
+    def write_inputs(self, tmp_path, extractions):
+        extractions_path = tmp_path / 'extractions' / 'acme' / 'entities_llm_v2.json'
+        extractions_path.parent.mkdir(parents=True)
+        extractions_path.write_text(json.dumps({'entities': extractions}))
+        existing_path = tmp_path / 'output' / 'acme' / 'consolidated_with_hierarchy.json'
+        existing_path.parent.mkdir(parents=True)
+        existing_path.write_text(json.dumps(self.EXISTING))
+
+    def test_only_new_entities_are_placed(self, tmp_path):
+        self.write_inputs(tmp_path, [
+            extraction('Discovery Sciences', 'c1', entity_type='department'),
+            extraction('Oncology', 'c2'),
+            extraction('Oncology Biomarkers', 'c3', 'Oncology Biomarkers sits within Oncology.'),
+        ])
+        client = FakeClient(lambda prompt: (reply_json(
+            [structure('oncology-biomarkers', 'Oncology Biomarkers', parent_id='oncology')], 'Placed under Oncology'),
+            'end_turn'))
+
+        result = cwh.consolidate_company_incremental('acme', client)
+
+        assert len(client.requests) == 1
+        assert prompt_ids(client.requests[0], '## New entities') == ['oncology-biomarkers']
+        assert 'oncology' in prompt_ids(client.requests[0], '## Existing consolidated entities')
+        assert [(c['call_type'], c['context']) for c in cwh._call_ledger.calls] == [('placement', '')]
+
+        by_id = {e['id']: e for e in result['entities']}
+        assert sorted(by_id) == ['discovery-sciences', 'oncology', 'oncology-biomarkers']
+        assert by_id['oncology']['parent_entity'] == 'discovery-sciences'
+        assert [s['call_id'] for s in by_id['oncology']['all_sources']] == ['c2']
+        assert by_id['oncology-biomarkers']['parent_entity'] == 'oncology'
+        assert [s['call_id'] for s in by_id['oncology-biomarkers']['all_sources']] == ['c3']
+        assert result['stats']['incremental'] == {
+            'previous_consolidated_at': '2026-01-01T00:00:00', 'known_entities': 2, 'new_entities': 1}
+        assert result['hierarchy_notes'] == 'Previous run\n\nPlaced under Oncology'
+
+    def test_nothing_new_makes_no_call(self, tmp_path):
+        self.write_inputs(tmp_path, [extraction('Oncology', 'c2')])
+        client = FakeClient(lambda prompt: pytest.fail('no LLM call expected'))
+
+        result = cwh.consolidate_company_incremental('acme', client)
+
+        assert client.requests == []
+        by_id = {e['id']: e for e in result['entities']}
+        assert [s['call_id'] for s in by_id['oncology']['all_sources']] == ['c2']
+        # No fresh sources: the previously saved entity is kept as it was
+        assert by_id['discovery-sciences'] == self.EXISTING['entities'][0]
+
+
+class TestTreeReduce:
+    """Batches are consolidated, then reduced level by level, every call landing in the ledger."""
+
+    ENTITIES = [
+        quality_entity('research-development', 'Research & Development'),
+        quality_entity('oncology', 'Oncology'),
+        quality_entity('discovery-sciences', 'Discovery Sciences'),
+        quality_entity('ds', 'DS'),
+        quality_entity('finance', 'Finance'),
+    ]
+
+    @staticmethod
+    def reply(prompt):
+        ids = prompt_ids(prompt)
+        names = {e['id']: e['entity_name'] for e in TestTreeReduce.ENTITIES}
+        if 'were consolidated in separate batches' not in prompt:
+            return reply_json([structure(i, names[i]) for i in ids]), 'end_turn'
+        # Reduce calls return only what changes
+        parents = {line.split(FIELD_SEP)[0]: line.split(FIELD_SEP)[3]
+                   for line in prompt.splitlines() if line.split(FIELD_SEP)[0] in ids}
+        changes = []
+        if {'discovery-sciences', 'ds'} <= set(ids):
+            changes.append(structure('discovery-sciences', 'Discovery Sciences', original_ids=['discovery-sciences', 'ds']))
+        if {'oncology', 'research-development'} <= set(ids) and parents['oncology'] == '-':
+            changes.append(structure('oncology', 'Oncology', parent_id='research-development'))
+        return reply_json(changes, 'Cross-batch findings' if changes else ''), 'end_turn'
+
+    def test_batches_reduce_to_one_result(self, monkeypatch):
+        monkeypatch.setattr(cwh, 'MAX_ENTITIES_PER_CALL', 2)
+        client = FakeClient(self.reply)
+
+        result = cwh.consolidate_with_llm_tree('acme', self.ENTITIES, client, max_workers=2)
+
+        by_id = {e['id']: e for e in result['entities']}
+        assert sorted(by_id) == ['discovery-sciences', 'finance', 'oncology', 'research-development']
+        assert by_id['discovery-sciences']['original_ids'] == ['discovery-sciences', 'ds']
+        assert by_id['oncology']['parent_id'] == 'research-development'
+        assert by_id['finance']['parent_id'] is None
+        assert result['hierarchy_notes'] == 'Cross-batch findings'
+
+        # Three map calls, then level 1 reduces two batches and level 2 adds the third
+        calls = sorted((c['call_type'], c['context']) for c in cwh._call_ledger.calls)
+        assert calls == [
+            ('consolidate', 'Batch 1/3'), ('consolidate', 'Batch 2/3'), ('consolidate', 'Batch 3/3'),
+            ('cross_batch', 'Reduce level 1, group 1/2, part 1/1'),
+            ('cross_batch', 'Reduce level 2, group 1/1, part 1/1'),
+        ]
+        assert all(c['input_tokens'] > 0 and c['output_tokens'] > 0 for c in cwh._call_ledger.calls)
+        assert cwh._call_ledger.totals()['calls'] == len(client.requests) == 5
+
+        # The absorbed id no longer reaches the last reduce call
+        last_reduce = [p for p in client.requests if 'Reduce level 2' in p]
+        assert sorted(prompt_ids(last_reduce[0])) == ['discovery-sciences', 'finance', 'oncology', 'research-development']
+
+
+class TestStreamedTruncation:
+    """A reply cut off at max_tokens keeps its complete entities and re-requests the rest in parts."""
+
+    ENTITIES = [
+        quality_entity('clinical-operations', 'Clinical Operations'),
+        quality_entity('biostatistics', 'Biostatistics'),
+        quality_entity('data-management', 'Data Management'),
+        quality_entity('pharmacovigilance', 'Pharmacovigilance'),
+    ]
+
+    @staticmethod
+    def echo(prompt):
+        names = {e['id']: e['entity_name'] for e in TestStreamedTruncation.ENTITIES}
+        return reply_json([structure(i, names[i]) for i in prompt_ids(prompt)])
+
+    def truncating_reply(self, truncate_parts=False):
+        def reply(prompt):
+            text = self.echo(prompt)
+            ids = prompt_ids(prompt)
+            if len(ids) == len(self.ENTITIES) or truncate_parts:
+                # Cut inside the third (or only) entity
+                cut = text.index(f'"id": "{ids[min(2, len(ids) - 1)]}"') + 10
+                return text[:cut], 'max_tokens'
+            return text, 'end_turn'
+        return reply
+
+    def test_remainder_is_re_requested_in_parts(self):
+        client = FakeClient(self.truncating_reply())
+
+        result = cwh.consolidate_with_llm('acme', self.ENTITIES, client)
+
+        assert [e['id'] for e in result['entities']] == [
+            'clinical-operations', 'biostatistics', 'data-management', 'pharmacovigilance']
+        assert [prompt_ids(p) for p in client.requests] == [
+            [e['id'] for e in self.ENTITIES], ['data-management'], ['pharmacovigilance']]
+        assert [(c['context'], c['stop_reason']) for c in cwh._call_ledger.calls] == [
+            ('', 'max_tokens'), ('remainder part 1/2', 'end_turn'), ('remainder part 2/2', 'end_turn')]
+        assert cwh._call_ledger.totals()['truncated_calls'] == 1
+
+    def test_unsplittable_remainder_is_not_retried(self):
+        client = FakeClient(self.truncating_reply(truncate_parts=True))
+
+        result = cwh.consolidate_with_llm('acme', self.ENTITIES, client)
+
+        # Each single-entity part is cut off before its entity completes and cannot be split further
+        assert [e['id'] for e in result['entities']] == ['clinical-operations', 'biostatistics']
+        assert len(client.requests) == 3
+        assert cwh._call_ledger.totals()['truncated_calls'] == 3
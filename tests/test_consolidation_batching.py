@@ -0,0 +1,107 @@
+"""
+Tests for similarity-clustered, token-budgeted consolidation batches (scripts/consolidation_batching.py).
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from consolidation_batching import candidate_clusters, form_batches, estimate_entity_tokens
+from entity_similarity import acronym_keys, UnionFind
+
+
+def entity(name, mentions=1, quote='quote ' * 30):
+    return {
+        'id': name.lower().replace(' ', '-'),
+        'entity_name': name,
+        'entity_type': 'team',
+        'mention_count': mentions,
+        'confidence': 'medium',
+        'all_sources': [{'call_id': 'c1', 'raw_quote': quote}],
+    }
+
+
+def cluster_names(entities):
+    return [sorted(entities[i]['entity_name'] for i in c) for c in candidate_clusters(entities)]
+
+
+class TestAcronymKeys:
+
+    def test_initials(self):
+        assert 'ds' in acronym_keys('Discovery Sciences')
+
+    def test_parenthetical(self):
+        assert 'pred' in acronym_keys('Pharma Research & Early Development (pRED)')
+
+    def test_bare_acronym(self):
+        assert acronym_keys('gRED') == {'gred'}
+
+    def test_single_long_word_has_no_acronym(self):
+        assert acronym_keys('Oncology') == set()
+
+
+class TestUnionFind:
+
+    def test_groups(self):
+        uf = UnionFind(['a', 'b', 'c', 'd'])
+        uf.union('a', 'c')
+        uf.union('c', 'd')
+        assert uf.groups() == [['a', 'c', 'd'], ['b']]
+
+
+class TestCandidateClusters:
+    """Likely duplicates and parent/child names are clustered together."""
+
+    def test_acronym_clusters_with_expansion(self):
+        entities = [entity('Discovery Sciences'), entity('Immunology'), entity('DS')]
+        assert ['DS', 'Discovery Sciences'] in cluster_names(entities)
+
+    def test_token_containment_clusters(self):
+        entities = [entity('Oncology'), entity('Biologics Engineering'), entity('Oncology Research')]
+        assert ['Oncology', 'Oncology Research'] in cluster_names(entities)
+
+    def test_unrelated_names_stay_apart(self):
+        entities = [entity('Oncology'), entity('Immunology'), entity('Vaccines')]
+        assert len(candidate_clusters(entities)) == 3
+
+
+class TestFormBatches:
+    """Batches respect token budgets and keep clusters together."""
+
+    def test_small_list_single_batch(self):
+        entities = [entity(f'Team {chr(65 + i)}{chr(65 + i)}x') for i in range(5)]
+        assert len(form_batches(entities)) == 1
+
+    def test_all_entities_kept_once(self):
+        entities = [entity(f'Unit {i} Alpha{i}') for i in range(120)]
+        batches = form_batches(entities, max_entities=50)
+        ids = [e['id'] for batch in batches for e in batch]
+        assert sorted(ids) == sorted(e['id'] for e in entities)
+
+    def test_max_entities_respected(self):
+        entities = [entity(f'Zz{i}qq Unit{i}') for i in range(120)]
+        batches = form_batches(entities, max_entities=50)
+        assert all(len(b) <= 50 for b in batches)
+        assert len(batches) == 3
+
+    def test_input_budget_respected(self):
+        entities = [entity(f'Xq{i} Yy{i}', quote='word ' * 100) for i in range(40)]
+        cost = estimate_entity_tokens(entities[0])
+        budget = 900 + cost * 10
+        batches = form_batches(entities, input_token_budget=budget)
+        assert all(len(b) <= 10 for b in batches)
+
+    def test_duplicates_share_batch_across_mention_order(self):
+        """'DS' ranked far below 'Discovery Sciences' still lands in its batch."""
+        entities = [entity('Discovery Sciences', mentions=100)]
+        entities += [entity(f'Filler{i} Qz{i}', mentions=50) for i in range(80)]
+        entities += [entity('DS', mentions=1)]
+        batches = form_batches(entities, max_entities=50)
+        for batch in batches:
+            names = {e['entity_name'] for e in batch}
+            if 'Discovery Sciences' in names:
+                assert 'DS' in names
+                break
+        else:
+            assert False, "Discovery Sciences not batched"
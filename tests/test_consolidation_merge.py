@@ -0,0 +1,51 @@
+"""
+Tests for attaching sources to the consolidated structure (scripts/consolidation_merge.py).
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from consolidation_merge import merge_consolidation_with_sources
+from local_consolidation import premerge_entities
+
+
+def entity(name, mentions=1, quotes=()):
+    return {
+        'id': name.lower().replace(' ', '-'),
+        'entity_name': name,
+        'entity_type': 'team',
+        'mention_count': mentions,
+        'confidence': 'medium',
+        'all_sources': [{'call_id': f'c{i}', 'raw_quote': q} for i, q in enumerate(quotes)],
+    }
+
+
+class TestMergeConsolidationWithSources:
+
+    def test_sources_mentions_and_leader_of_merged_ids(self):
+        a = dict(entity('Discovery Sciences', mentions=2, quotes=['a', 'b']), leader='Jane')
+        b = dict(entity('DS Team', mentions=1, quotes=['c']), team_size='40')
+        llm = {'entities': [{'id': 'discovery-sciences', 'name': 'Discovery Sciences', 'type': 'department',
+                             'parent_id': 'pred', 'original_ids': ['discovery-sciences', 'ds-team']}]}
+        final = merge_consolidation_with_sources(llm, [a, b])
+        assert final[0]['parent_entity'] == 'pred'
+        assert final[0]['mention_count'] == 3
+        assert (final[0]['leader'], final[0]['team_size']) == ('Jane', '40')
+        # Sources are deduplicated by call_id ('a' and 'c' share c0)
+        assert [s['raw_quote'] for s in final[0]['all_sources']] == ['a', 'b']
+
+    def test_premerged_ids_reach_final_output(self):
+        a = entity('Disc Sciences', quotes=['a'])
+        b = entity('Discovery Sciences', quotes=['b'])
+        c = entity('DS Team', quotes=['c'])
+        quality, _ = premerge_entities([a, b, c], {'discovery-sciences': ['disc-sciences', 'discovery-sciences']},
+                                       'Known alias')
+        # The LLM then merges the pre-merged entity with a third one
+        llm = {'entities': [{'id': 'discovery-sciences', 'name': 'Discovery Sciences', 'type': 'department',
+                             'parent_id': None, 'original_ids': ['discovery-sciences', 'ds-team']}]}
+        final = merge_consolidation_with_sources(llm, quality)
+        assert final[0]['original_ids'] == ['discovery-sciences', 'ds-team', 'disc-sciences']
+        assert 'premerged_ids' not in final[0]
+
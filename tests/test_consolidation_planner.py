@@ -0,0 +1,104 @@
+"""
+Tests for the --dry-run cost and latency planner (scripts/consolidation_planner.py).
+"""
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from consolidation_planner import (
+    build_plan, estimate_call, estimate_cost, estimate_latency, expected_output_tokens,
+    project_wall_clock, write_plan, MIN_CACHEABLE_TOKENS,
+)
+from hierarchical_consolidation import plan_reduce_jobs
+
+
+def call(output_tokens=600, system_tokens=500, user_tokens=2000, call_type='consolidate'):
+    return {'call_type': call_type, 'context': '', 'system_tokens': system_tokens,
+            'user_tokens': user_tokens, 'output_tokens': output_tokens, 'may_truncate': False}
+
+
+class TestEstimateCall:
+
+    def test_output_capped_and_flagged(self):
+        c = estimate_call('consolidate', '', 'sys', 'user', expected_output_tokens(100), 4000)
+        assert c['output_tokens'] == 4000
+        assert c['may_truncate']
+
+    def test_prompt_tokens_scale_with_text(self):
+        small = estimate_call('consolidate', '', 's', 'u' * 400, 100, 4000)
+        large = estimate_call('consolidate', '', 's', 'u' * 4000, 100, 4000)
+        assert large['user_tokens'] > small['user_tokens'] * 5
+
+
+class TestProjectWallClock:
+
+    def test_sequential_sums_latency_and_delay(self):
+        calls = [call(), call()]
+        expected = 2 * estimate_latency(calls[0]) + 1.0
+        assert project_wall_clock(calls, concurrency=1, delay_s=1.0) == round(expected, 1)
+
+    def test_concurrency_overlaps_calls(self):
+        calls = [call() for _ in range(8)]
+        assert project_wall_clock(calls, concurrency=4) == round(2 * estimate_latency(calls[0]), 1)
+
+    def test_rate_limit_spaces_starts(self):
+        calls = [call(output_tokens=0) for _ in range(10)]
+        # 10 starts at 6s spacing (10 rpm): last starts at 54s
+        assert project_wall_clock(calls, concurrency=10, rate_limit_rpm=10) >= 54
+
+    def test_no_calls(self):
+        assert project_wall_clock([]) == 0.0
+
+    def test_levels_run_one_after_another(self):
+        # One slow map call and three reduce calls: the reduce level waits for the map level
+        slow, fast = call(output_tokens=6000), call(output_tokens=60)
+        calls = [slow, call(output_tokens=60)] + [dict(fast, level=1) for _ in range(3)]
+        expected = estimate_latency(slow) + estimate_latency(fast)
+        assert project_wall_clock(calls, concurrency=4) == round(expected, 1)
+
+    def test_estimate_call_records_level(self):
+        assert estimate_call('cross_batch', '', 's', 'u', 10, 4000, level=2)['level'] == 2
+
+
+class TestEstimateCost:
+
+    def test_short_system_prompt_not_cached(self):
+        cost = estimate_cost([call(), call()])
+        assert cost['cache_read_tokens'] == 0
+        assert cost['input_tokens'] == 2 * (500 + 2000)
+
+    def test_long_system_prompt_cached_after_first_call(self):
+        sys_tokens = MIN_CACHEABLE_TOKENS + 100
+        cost = estimate_cost([call(system_tokens=sys_tokens) for _ in range(3)])
+        assert cost['cache_write_tokens'] == sys_tokens
+        assert cost['cache_read_tokens'] == 2 * sys_tokens
+
+    def test_usd(self):
+        cost = estimate_cost([call(output_tokens=1_000_000, system_tokens=0, user_tokens=1_000_000)])
+        assert cost['usd'] == 18.0
+
+
+class TestPlanReduceJobs:
+
+    def test_levels_for_five_batches(self):
+        groups = [[{'id': f'e{b}-{i}', 'name': f'Name{b}x{i}', 'type': 'team', 'parent_id': None}
+                   for i in range(3)] for b in range(5)]
+        levels = sorted({level for level, _ in plan_reduce_jobs(groups)})
+        assert levels == [1, 2, 3]  # 5 -> 3 -> 2 -> 1
+
+    def test_single_group_has_no_jobs(self):
+        assert plan_reduce_jobs([[{'id': 'a', 'name': 'A'}]]) == []
+
+
+class TestBuildPlan:
+
+    def test_plan_written(self, tmp_path):
+        plan = build_plan('roche', {'quality_filtered': 10}, [call(), call()], 'flat', 1, 0, 1.0)
+        assert plan['calls'] == 2
+        assert plan['projection']['wall_clock_s'] > 0
+        path = tmp_path / 'roche' / 'consolidation_plan.json'
+        write_plan(path, plan)
+        assert json.loads(path.read_text())['mode'] == 'flat'
@@ -0,0 +1,123 @@
+"""
+Tests for compact consolidation prompts and the per-call ledger
+(scripts/consolidation_prompts.py, scripts/llm_ledger.py).
+"""
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+import consolidation_prompts
+from consolidation_prompts import (
+    CROSS_BATCH_SYSTEM_PROMPT, MIN_CACHEABLE_TOKENS, cached_system, encode_compact_table, encode_entity_line,
+    encode_entity_table, ENTITY_TABLE_HEADER,
+)
+from llm_ledger import CallLedger
+
+ENTITY = {
+    'id': 'discovery-sciences',
+    'entity_name': 'Discovery Sciences',
+    'entity_type': 'department',
+    'mention_count': 4,
+    'confidence': 'high',
+    'all_sources': [
+        {'raw_quote': 'Discovery Sciences | DS\nsits within R&D'},
+        {'raw_quote': 'x' * 500},
+        {'raw_quote': ''},
+        {'raw_quote': 'fourth quote is not sampled'},
+    ],
+}
+
+
+class TestEncodeEntityLine:
+
+    def test_single_line_with_fields(self):
+        line = encode_entity_line(ENTITY)
+        assert '\n' not in line
+        assert line.startswith('discovery-sciences | Discovery Sciences | department | 4 | high | ')
+
+    def test_pipes_in_quotes_escaped(self):
+        fields = encode_entity_line(ENTITY).split(' | ')
+        assert len(fields) == 6
+
+    def test_quotes_truncated_and_limited(self):
+        line = encode_entity_line(ENTITY, quote_chars=50)
+        assert 'x' * 51 not in line
+        assert '…' in line
+        assert 'fourth quote' not in line
+
+    def test_smaller_than_indented_json(self):
+        summary = {
+            'id': ENTITY['id'], 'entity_name': ENTITY['entity_name'], 'entity_type': ENTITY['entity_type'],
+            'mention_count': 4, 'confidence': 'high',
+            'sample_quotes': [s['raw_quote'][:200] for s in ENTITY['all_sources'][:3]],
+        }
+        assert len(encode_entity_line(ENTITY)) < len(json.dumps(summary, indent=2))
+
+
+class TestTables:
+
+    def test_entity_table_header(self):
+        table = encode_entity_table([ENTITY, ENTITY])
+        assert table.splitlines()[0] == ENTITY_TABLE_HEADER
+        assert len(table.splitlines()) == 3
+
+    def test_compact_table_accepts_both_shapes(self):
+        table = encode_compact_table([
+            {'id': 'oncology', 'name': 'Oncology', 'type': 'therapeutic_area', 'parent_id': 'rd'},
+            {'id': 'rd', 'entity_name': 'R&D', 'entity_type': 'department', 'parent_entity': None},
+        ])
+        assert table.splitlines()[1:] == ['oncology | Oncology | therapeutic_area | rd', 'rd | R&D | department | -']
+
+
+class TestCachedSystem:
+
+    def test_cache_marker_on_last_block(self):
+        base = 'x' * (MIN_CACHEABLE_TOKENS * 4)
+        system = cached_system(base, 'task')
+        assert [b['text'] for b in system] == [base, 'task']
+        assert 'cache_control' not in system[0]
+        assert system[1]['cache_control'] == {'type': 'ephemeral'}
+
+    def test_no_marker_below_minimum(self, capsys, monkeypatch):
+        monkeypatch.setattr(consolidation_prompts, '_short_prefixes_logged', set())
+        system = cached_system(CROSS_BATCH_SYSTEM_PROMPT)
+        assert 'cache_control' not in system[0]
+        assert 'not marked for caching' in capsys.readouterr().out
+
+
+class TestCallLedger:
+
+    def test_records_usage_objects_and_dicts(self):
+        ledger = CallLedger()
+        ledger.record('consolidate', 'Batch 1/2',
+                      SimpleNamespace(input_tokens=100, output_tokens=50, cache_creation_input_tokens=800,
+                                      cache_read_input_tokens=None), 1.5, 'end_turn')
+        ledger.record('consolidate', 'Batch 2/2',
+                      {'input_tokens': 90, 'output_tokens': 4000, 'cache_read_input_tokens': 800}, 2.25, 'max_tokens')
+        totals = ledger.totals()
+        assert totals['calls'] == 2
+        assert totals['input_tokens'] == 190
+        assert totals['cache_read_input_tokens'] == 800
+        assert totals['cache_creation_input_tokens'] == 800
+        assert totals['truncated_calls'] == 1
+        assert totals['latency_s'] == 3.75
+
+    def test_save(self, tmp_path):
+        ledger = CallLedger()
+        ledger.record('placement', '', {'input_tokens': 1, 'output_tokens': 2}, 0.1)
+        path = tmp_path / 'roche' / 'consolidation_calls.json'
+        ledger.save(path, 'roche')
+        data = json.loads(path.read_text())
+        assert data['company'] == 'roche'
+        assert data['calls'][0]['call_type'] == 'placement'
+        assert data['totals']['output_tokens'] == 2
+
+    def test_reset(self):
+        ledger = CallLedger()
+        ledger.record('x', '', {}, 0)
+        ledger.reset()
+        assert ledger.totals()['calls'] == 0
@@ -0,0 +1,71 @@
+"""
+Tests for the NumPy all-pairs duplicate-candidate report (scripts/duplicate_candidates.py).
+"""
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from duplicate_candidates import find_duplicate_candidates, save_duplicate_candidates, top_similar, trigram_matrix
+from entity_similarity import char_trigrams
+
+
+def entities(*names):
+    return [{'id': n.lower().replace(' ', '-'), 'entity_name': n} for n in names]
+
+
+class TestTrigramMatrix:
+
+    def test_rows_unit_norm_and_cosine_matches_sets(self):
+        names = ['Discovery Sciences', 'Discovery Science', 'Finance']
+        matrix = trigram_matrix(names)
+        assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0)
+        a, b = char_trigrams(names[0]), char_trigrams(names[1])
+        expected = len(a & b) / (len(a) * len(b)) ** 0.5
+        assert float(matrix[0] @ matrix[1]) == pytest.approx(expected, abs=1e-5)
+
+    def test_empty_name_is_zero_row(self):
+        matrix = trigram_matrix(['', 'Oncology'])
+        assert not matrix[0].any()
+
+
+class TestTopSimilar:
+
+    def test_excludes_self_and_sorts(self):
+        matrix = trigram_matrix(['Oncology', 'Oncology Team', 'Oncology R&D', 'Finance'])
+        top = top_similar(matrix, top_k=2, min_similarity=0.1, block_rows=2)
+        assert all(j != 0 for j, _ in top[0])
+        assert [s for _, s in top[0]] == sorted([s for _, s in top[0]], reverse=True)
+        assert top[3] == []
+
+    def test_single_name(self):
+        assert top_similar(trigram_matrix(['Oncology'])) == [[]]
+
+
+class TestFindDuplicateCandidates:
+
+    def test_pairs_deduplicated(self, tmp_path):
+        report = find_duplicate_candidates(entities('Discovery Sciences', 'Discovery Science', 'Finance'))
+        assert report['pair_count'] == 1
+        assert {report['pairs'][0]['a_id'], report['pairs'][0]['b_id']} == {'discovery-sciences', 'discovery-science'}
+        assert set(report['per_entity']) == {'discovery-sciences', 'discovery-science'}
+
+        path = tmp_path / 'roche' / 'duplicate_candidates.json'
+        save_duplicate_candidates(path, 'roche', report)
+        assert json.loads(path.read_text())['company'] == 'roche'
+
+    def test_thousands_of_names_quickly(self):
+        rng = random.Random(0)
+        words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))) for _ in range(500)]
+        names = [' '.join(rng.choice(words).title() for _ in range(rng.randint(1, 4))) for _ in range(2000)]
+        start = time.perf_counter()
+        find_duplicate_candidates(entities(*names))
+        assert time.perf_counter() - start < 1.0
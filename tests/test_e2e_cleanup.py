@@ -0,0 +1,75 @@
+"""
+Tests for tests/e2e_cleanup.py (concurrent cleanup, digest verification) against a local stub server.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import e2e_cleanup
+from e2e_cleanup import canonical_digest, clean_test_data, key_diff, verify_snapshots
+from kv_client import KVClient
+
+
+@pytest.fixture
+def client(kv_stub):
+    with KVClient(kv_stub.base_url, backoff=0) as kv:
+        yield kv
+
+
+class TestDigests:
+
+    def test_key_order_and_whitespace_do_not_matter(self):
+        assert canonical_digest({"a": 1, "b": [1, 2]}) == canonical_digest(json.loads('{"b": [1,2], "a": 1}'))
+        assert canonical_digest({"a": 1}) != canonical_digest({"a": 2})
+
+    def test_key_diff(self):
+        diff = key_diff({"keep": 1, "gone": 2, "edit": {"x": 1}}, {"keep": 1, "new": 3, "edit": {"x": 2}})
+        assert diff == {"added": ["new"], "removed": ["gone"], "changed": ["edit"]}
+
+
+class TestCleanTestData:
+
+    def test_one_bulk_delete_per_endpoint(self, kv_stub, client):
+        kv_stub.state["merges:roche"] = {"__test_a": {}, "__test_b": {}, "real": {}}
+        kv_stub.state["sizes:gsk"] = {"__test_s": {}}
+        kv_stub.state["match-review:roche"] = {"approved": {"__test_x": {}}, "rejected": {"keep": {}},
+                                               "manual": {"__test_y": {}}}
+
+        assert clean_test_data(client) == 5
+        assert kv_stub.state["merges:roche"] == {"real": {}}
+        assert kv_stub.state["sizes:gsk"] == {}
+        assert kv_stub.state["match-review:roche"] == {"approved": {}, "rejected": {"keep": {}}, "manual": {}}
+        deletes = [r for r in kv_stub.requests if r["method"] == "DELETE"]
+        assert len(deletes) == 3
+
+    def test_nothing_to_clean(self, kv_stub, client):
+        assert clean_test_data(client) == 0
+        assert all(r["method"] == "GET" for r in kv_stub.requests)
+
+
+class TestVerifySnapshots:
+
+    @pytest.fixture
+    def snap_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(e2e_cleanup, "COMPANIES", ["roche"])
+        monkeypatch.setattr(e2e_cleanup, "ENDPOINTS", ["merges", "sync-version"])
+        monkeypatch.setattr(e2e_cleanup, "SNAP_DIR", tmp_path)
+        (tmp_path / "roche_merges.json").write_text(json.dumps({"b": {"x": 1}, "a": {}}, indent=2))
+        (tmp_path / "roche_sync-version.json").write_text(json.dumps({"version": "1"}))
+        return tmp_path
+
+    def test_matching_state(self, kv_stub, client, snap_dir):
+        kv_stub.state["merges:roche"] = {"a": {}, "b": {"x": 1}}
+        kv_stub.versions["roche"] = 99  # never compared
+        assert verify_snapshots(client)
+
+    def test_drift_reports_keys(self, kv_stub, client, snap_dir, capsys):
+        kv_stub.state["merges:roche"] = {"a": {}, "b": {"x": 2}, "__test_z": {}}
+        assert not verify_snapshots(client)
+        out = capsys.readouterr().out
+        assert "Added keys: ['__test_z']" in out
+        assert "Changed keys: ['b']" in out
@@ -0,0 +1,64 @@
+"""
+Tests for the manual map <-> auto map join index (AutoEntityIndex in
+scripts/integrate_viewer.py).
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from alias_dictionary import build_alias_dictionary
+from integrate_viewer import AutoEntityIndex, convert_manual_node_for_viewer
+
+AUTO_ROOT = {"id": "auto-root", "name": "Roche", "children": [
+    # Its id equals another entity's name: neither may shadow the other
+    {"id": "oncology", "name": "Oncology Biomarkers", "snippets": [{"quote": "biomarkers"}], "size": "20"},
+    {"id": "auto-1", "name": "Oncology", "snippets": [{"quote": "oncology one"}], "size": "300"},
+    {"id": "auto-2", "name": "oncology ", "snippets": [{"quote": "oncology two"}], "size": "300"},
+    {"id": "auto-3", "name": "Imaging", "gong_evidence": {"snippets": [{"quote": "legacy imaging"}]}},
+]}
+
+
+class TestAutoEntityIndex:
+
+    def test_same_name_entities_are_all_joined(self):
+        index = AutoEntityIndex(AUTO_ROOT)
+        matches = index.candidates({"id": "m-onc", "name": "Oncology"})
+        assert [(e["id"], by) for e, by in matches] == [("auto-1", "name"), ("auto-2", "name")]
+
+    def test_id_and_name_keys_do_not_collide(self):
+        index = AutoEntityIndex(AUTO_ROOT)
+        matches = index.candidates({"id": "oncology", "name": "Oncology"})
+        assert [(e["id"], by) for e, by in matches] == [
+            ("oncology", "id"), ("auto-1", "name"), ("auto-2", "name")]
+
+    def test_legacy_gong_evidence(self):
+        index = AutoEntityIndex(AUTO_ROOT)
+        assert [e["id"] for e, _ in index.candidates({"name": "Imaging"})] == ["auto-3"]
+
+    def test_alias_and_local_joins(self):
+        manual_root = {"id": "roche", "name": "Roche", "children": [
+            {"id": "node-pred", "name": "Pharma Research & Early Development (pRED)"}]}
+        auto_root = {"name": "Roche", "children": [
+            {"id": "a", "name": "pRED", "snippets": [{"quote": "p"}]},
+            {"id": "b", "name": "P RED", "snippets": [{"quote": "q"}]},
+            {"id": "c", "name": "Sites", "children": [{"id": "d", "name": "P RED", "snippets": [{"quote": "r"}]}]},
+        ]}
+        index = AutoEntityIndex(auto_root, build_alias_dictionary("roche", manual_root))
+        matches = index.candidates(manual_root["children"][0], {"node-pred": [("P RED", "Roche")]})
+        # Only the locally matched "P RED" under Roche, not the same name under Sites
+        assert [(e["id"], by) for e, by in matches] == [("a", "alias"), ("b", "local")]
+
+
+class TestMergeProvenance:
+
+    def test_snippets_keep_their_source_entity(self):
+        node = convert_manual_node_for_viewer({"id": "m-onc", "name": "Oncology"}, AutoEntityIndex(AUTO_ROOT))
+        evidence = node["gongEvidence"]
+        assert [(s["quote"], s["entityName"]) for s in evidence["snippets"]] == [
+            ("oncology one", "Oncology"), ("oncology two", "oncology ")]
+        assert evidence["totalMentions"] == 2
+        assert evidence["teamSizes"] == ["300"]
+        assert [m["matchedBy"] for m in evidence["matchedEntities"]] == ["name", "name"]
+        # The auto map's snippets are not modified
+        assert "entityName" not in AUTO_ROOT["children"][1]["snippets"][0]
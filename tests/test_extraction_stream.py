@@ -0,0 +1,87 @@
+"""
+Tests for streamed extraction reading and the bounded source reservoir
+(scripts/streaming_json.py iter_json_array, scripts/source_reservoir.py).
+"""
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from streaming_json import iter_json_array
+from source_reservoir import SourceReservoir
+
+
+def source(call_id, confidence='medium', call_date='2025-01-01'):
+    return {'call_id': call_id, 'confidence': confidence, 'call_date': call_date}
+
+
+class TestIterJsonArray:
+
+    DOC = {
+        'batch_id': 'b1',
+        'entities': [
+            {'entity_name': 'Oncology', 'raw_quote': 'braces } and ] inside "quotes"'},
+            {'entity_name': 'R&D', 'nested': {'list': [1, 2, {'a': None}]}},
+            {'entity_name': 'Diagnostics'},
+        ],
+        'trailer': True,
+    }
+
+    @pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 20])
+    def test_matches_json_load_at_any_chunk_size(self, chunk_size):
+        text = json.dumps(self.DOC, indent=2)
+        items = list(iter_json_array(io.StringIO(text), 'entities', chunk_size=chunk_size))
+        assert items == self.DOC['entities']
+
+    def test_missing_key_yields_nothing(self):
+        assert list(iter_json_array(io.StringIO('{"other": [1, 2]}'), 'entities', chunk_size=4)) == []
+
+    def test_empty_array(self):
+        assert list(iter_json_array(io.StringIO('{"entities": []}'))) == []
+
+    def test_truncated_item_raises(self):
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_array(io.StringIO('{"entities": [{"a": 1}, {"b": '), chunk_size=8))
+
+    def test_is_lazy(self):
+        stream = io.StringIO(json.dumps({'entities': [{'i': i} for i in range(1000)]}))
+        items = iter_json_array(stream, chunk_size=256)
+        assert next(items) == {'i': 0}
+        assert stream.tell() < 1024
+
+
+class TestSourceReservoir:
+
+    def test_keeps_top_by_confidence_then_recency(self):
+        reservoir = SourceReservoir(size=3)
+        reservoir.add(source('old-high', 'high', '2024-01-01'))
+        reservoir.add(source('low', 'low', '2025-06-01'))
+        reservoir.add(source('new-medium', 'medium', '2025-06-01'))
+        reservoir.add(source('new-high', 'high', '2025-06-01'))
+        reservoir.add(source('old-medium', 'medium', '2023-01-01'))
+        assert [s['call_id'] for s in reservoir.sources()] == ['new-high', 'old-high', 'new-medium']
+
+    def test_counts_every_mention(self):
+        reservoir = SourceReservoir(size=2)
+        for i in range(10):
+            reservoir.add(source(f'c{i}', 'high' if i < 6 else 'low'))
+        assert reservoir.count == 10
+        assert reservoir.confidence_counts == {'high': 6, 'low': 4}
+        assert len(reservoir.sources()) == 2
+
+    def test_ties_keep_earliest_seen(self):
+        reservoir = SourceReservoir(size=2)
+        for i in range(5):
+            reservoir.add(source(f'c{i}'))
+        assert [s['call_id'] for s in reservoir.sources()] == ['c0', 'c1']
+
+    def test_missing_date_ranks_below_dated(self):
+        reservoir = SourceReservoir(size=1)
+        reservoir.add(source('undated', 'high', None))
+        reservoir.add(source('dated', 'high', '2025-01-01'))
+        assert reservoir.sources()[0]['call_id'] == 'dated'
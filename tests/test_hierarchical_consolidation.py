@@ -0,0 +1,102 @@
+"""
+Tests for hierarchical map-reduce consolidation (scripts/hierarchical_consolidation.py).
+
+LLM calls are plain callables here, so no API access is needed.
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from hierarchical_consolidation import apply_reduction, merge_same_ids, tree_reduce
+
+
+def consolidated(entity_id, name, parent_id=None, original_ids=None):
+    return {'id': entity_id, 'name': name, 'type': 'team', 'parent_id': parent_id,
+            'confidence': 'medium', 'original_ids': original_ids or [entity_id]}
+
+
+class TestMergeSameIds:
+
+    def test_unions_original_ids(self):
+        merged = merge_same_ids([
+            consolidated('oncology', 'Oncology', original_ids=['oncology', 'onc']),
+            consolidated('oncology', 'Oncology', parent_id='rd', original_ids=['oncology-ta']),
+        ])
+        assert len(merged) == 1
+        assert merged[0]['original_ids'] == ['oncology', 'onc', 'oncology-ta']
+        assert merged[0]['parent_id'] == 'rd'
+
+
+class TestApplyReduction:
+
+    def test_merge_composes_original_ids(self):
+        group = [consolidated('discovery-sciences', 'Discovery Sciences', original_ids=['discovery-sciences']),
+                 consolidated('ds', 'DS', original_ids=['ds', 'ds-team'])]
+        reduction = {'entities': [{'id': 'discovery-sciences', 'original_ids': ['discovery-sciences', 'ds']}]}
+        result = apply_reduction(group, reduction)
+        assert [e['id'] for e in result] == ['discovery-sciences']
+        assert result[0]['original_ids'] == ['discovery-sciences', 'ds', 'ds-team']
+
+    def test_parents_remapped_to_canonical(self):
+        group = [consolidated('discovery-sciences', 'Discovery Sciences'),
+                 consolidated('ds', 'DS'),
+                 consolidated('hts', 'HTS', parent_id='ds')]
+        reduction = {'entities': [{'id': 'discovery-sciences', 'original_ids': ['ds']}]}
+        result = apply_reduction(group, reduction)
+        assert result[-1]['parent_id'] == 'discovery-sciences'
+
+    def test_parent_change_only(self):
+        group = [consolidated('rd', 'R&D'), consolidated('oncology', 'Oncology')]
+        result = apply_reduction(group, {'entities': [{'id': 'oncology', 'parent_id': 'rd'}]})
+        assert result[1]['parent_id'] == 'rd'
+        assert result[1]['original_ids'] == ['oncology']
+
+    def test_unknown_ids_ignored(self):
+        group = [consolidated('rd', 'R&D')]
+        assert apply_reduction(group, {'entities': [{'id': 'nope', 'original_ids': ['nada']}]}) == group
+
+
+class TestTreeReduce:
+    """Batches are mapped in parallel and reduced until one group remains."""
+
+    def test_cross_batch_duplicates_merged(self):
+        batches = [[{'id': 'discovery-sciences', 'entity_name': 'Discovery Sciences'}],
+                   [{'id': 'ds', 'entity_name': 'DS'}],
+                   [{'id': 'oncology', 'entity_name': 'Oncology'}]]
+
+        def map_fn(batch, context):
+            return {'entities': [consolidated(e['id'], e['entity_name']) for e in batch],
+                    'hierarchy_notes': context, 'duplicate_resolutions': []}
+
+        reduce_calls = []
+
+        def reduce_fn(compact, context):
+            reduce_calls.append(context)
+            ids = {e['id'] for e in compact}
+            if {'discovery-sciences', 'ds'} <= ids:
+                return {'entities': [{'id': 'discovery-sciences', 'original_ids': ['discovery-sciences', 'ds']}],
+                        'duplicate_resolutions': [{'merged_names': ['Discovery Sciences', 'DS']}]}
+            return {'entities': [], 'duplicate_resolutions': []}
+
+        result = tree_reduce(batches, map_fn, reduce_fn, max_workers=2)
+
+        ids = sorted(e['id'] for e in result['entities'])
+        assert ids == ['discovery-sciences', 'oncology']
+        ds = next(e for e in result['entities'] if e['id'] == 'discovery-sciences')
+        assert ds['original_ids'] == ['discovery-sciences', 'ds']
+        assert result['reduction_levels'] == 2  # 3 -> 2 -> 1 groups
+        assert len(result['duplicate_resolutions']) == 1
+        assert reduce_calls
+
+    def test_single_batch_needs_no_reduce(self):
+        def map_fn(batch, context):
+            return {'entities': [consolidated('a', 'A')]}
+
+        def reduce_fn(compact, context):
+            raise AssertionError("reduce should not run for one batch")
+
+        result = tree_reduce([[{'id': 'a'}]], map_fn, reduce_fn)
+        assert result['reduction_levels'] == 0
+        assert [e['id'] for e in result['entities']] == ['a']
@@ -0,0 +1,81 @@
+"""
+Tests for rule-based parent edges from quote phrasing (scripts/hierarchy_rules.py).
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from hierarchy_rules import build_relation_pattern, edges_report, propose_parent_edges, scan_relations, settle_by_rules
+
+
+def entity(name, quotes=()):
+    return {
+        'id': name.lower().replace(' ', '-').replace('&', ''),
+        'entity_name': name,
+        'entity_type': 'team',
+        'confidence': 'medium',
+        'all_sources': [{'call_id': f'c{i}', 'raw_quote': q} for i, q in enumerate(quotes)],
+    }
+
+
+class TestScanRelations:
+
+    PATTERN = build_relation_pattern(['biomarkers', 'oncology r&d', 'imaging', 'pathology', 'early development'])
+
+    def test_forward_chain_in_one_scan(self):
+        quote = 'So Biomarkers sits within Oncology R&D, which is part of Early Development.'
+        assert scan_relations(quote, self.PATTERN) == [
+            ('biomarkers', 'oncology r&d', 'strong'),
+            ('oncology r&d', 'early development', 'strong'),
+        ]
+
+    def test_reverse_and_weak(self):
+        assert scan_relations('Oncology R&D includes Imaging', self.PATTERN) == [('imaging', 'oncology r&d', 'reverse')]
+        assert scan_relations('the Pathology team is under Imaging', self.PATTERN) == [('pathology', 'imaging', 'weak')]
+
+    def test_requires_adjacent_known_names(self):
+        assert scan_relations('We sit within Oncology R&D', self.PATTERN) == []
+        assert scan_relations('Biomarkers works closely with Oncology R&D', self.PATTERN) == []
+
+
+class TestProposeParentEdges:
+
+    def test_confidence_and_report(self):
+        entities = [
+            entity('Oncology R&D'),
+            entity('Biomarkers', ['Biomarkers sits within Oncology R&D']),
+            entity('Imaging', ['Imaging is under Oncology R&D']),
+        ]
+        edges = propose_parent_edges(entities)
+        assert edges[1]['parent'] == 0 and edges[1]['confidence'] == 'high'
+        assert edges[2]['confidence'] == 'medium'
+        report = edges_report(entities, edges)
+        assert report[0] == {'child_id': 'biomarkers', 'child_name': 'Biomarkers', 'parent_id': 'oncology-rd',
+                             'parent_name': 'Oncology R&D', 'confidence': 'high', 'votes': 1.0, 'kinds': ['strong']}
+
+    def test_tied_parents_dropped(self):
+        entities = [entity('Oncology R&D'), entity('Early Development'),
+                    entity('Biomarkers', ['Biomarkers is part of Oncology R&D', 'Biomarkers is part of Early Development'])]
+        assert 2 not in propose_parent_edges(entities)
+
+    def test_shared_quote_counted_once(self):
+        quote = 'Biomarkers sits within Oncology R&D'
+        entities = [entity('Oncology R&D', [quote]), entity('Biomarkers', [quote])]
+        assert propose_parent_edges(entities)[1]['votes'] == 1.0
+
+
+class TestSettleByRules:
+
+    def test_only_high_confidence_without_near_duplicates(self):
+        entities = [
+            entity('Oncology R&D'),
+            entity('Biomarkers', ['Biomarkers sits within Oncology R&D']),
+            entity('Biomarker', ['Biomarker reports into Oncology R&D']),
+            entity('Imaging', ['Imaging is under Oncology R&D']),
+            entity('Pathology', ['Pathology is part of Oncology R&D']),
+        ]
+        result = settle_by_rules(entities)
+        assert [(e['id'], e['parent_id']) for e in result['entities']] == [('pathology', 'oncology-rd')]
+        assert {e['id'] for e in result['unresolved']} == {'oncology-rd', 'biomarkers', 'biomarker', 'imaging'}
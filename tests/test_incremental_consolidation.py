@@ -0,0 +1,132 @@
+"""
+Tests for incremental consolidation (scripts/incremental_consolidation.py).
+"""
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from incremental_consolidation import (
+    load_existing_consolidation,
+    diff_against_existing,
+    select_neighbors,
+    apply_placements,
+)
+
+
+def quality_entity(entity_id, name, quotes=()):
+    return {
+        'id': entity_id,
+        'entity_name': name,
+        'entity_type': 'team',
+        'mention_count': max(len(quotes), 1),
+        'confidence': 'high',
+        'all_sources': [{'call_id': f'c{i}', 'raw_quote': q} for i, q in enumerate(quotes)],
+    }
+
+
+EXISTING = {
+    'consolidated_at': '2026-01-01T00:00:00',
+    'entities': [
+        {'id': 'discovery-sciences', 'entity_name': 'Discovery Sciences', 'entity_type': 'department',
+         'parent_entity': None, 'confidence': 'high', 'original_ids': ['discovery-sciences', 'ds']},
+        {'id': 'oncology', 'entity_name': 'Oncology', 'entity_type': 'therapeutic_area',
+         'parent_entity': 'discovery-sciences', 'confidence': 'medium', 'original_ids': ['oncology']},
+    ],
+}
+
+
+class TestDiffAgainstExisting:
+    """Known entities are re-attached; only new names are returned for the LLM."""
+
+    def test_known_ids_are_not_new(self):
+        quality = [quality_entity('ds', 'DS'), quality_entity('oncology', 'Oncology')]
+        structures, new = diff_against_existing(quality, EXISTING)
+        assert new == []
+        assert [s['id'] for s in structures] == ['discovery-sciences', 'oncology']
+
+    def test_structure_keeps_hierarchy(self):
+        structures, _ = diff_against_existing([], EXISTING)
+        oncology = structures[1]
+        assert oncology['parent_id'] == 'discovery-sciences'
+        assert oncology['name'] == 'Oncology'
+        assert oncology['type'] == 'therapeutic_area'
+
+    def test_same_normalized_name_attaches_new_id(self):
+        quality = [quality_entity('discovery-sciences-group', 'Discovery Sciences Group')]
+        structures, new = diff_against_existing(quality, EXISTING)
+        assert new == []
+        assert 'discovery-sciences-group' in structures[0]['original_ids']
+
+    def test_new_names_returned(self):
+        quality = [quality_entity('ds', 'DS'), quality_entity('immunology', 'Immunology')]
+        _, new = diff_against_existing(quality, EXISTING)
+        assert [e['id'] for e in new] == ['immunology']
+
+    def test_does_not_mutate_existing(self):
+        quality = [quality_entity('discovery-sciences-group', 'Discovery Sciences Group')]
+        diff_against_existing(quality, EXISTING)
+        assert EXISTING['entities'][0]['original_ids'] == ['discovery-sciences', 'ds']
+
+
+class TestSelectNeighbors:
+    """Neighbors are similar names or names mentioned in the new entity's quotes."""
+
+    def test_similar_name_ranked_first(self):
+        entity = quality_entity('oncology-research', 'Oncology Research')
+        neighbors = select_neighbors(entity, EXISTING['entities'], limit=1)
+        assert [n['id'] for n in neighbors] == ['oncology']
+
+    def test_quote_mention_selected(self):
+        entity = quality_entity('hts', 'HTS', quotes=['HTS sits within Discovery Sciences'])
+        neighbors = select_neighbors(entity, EXISTING['entities'])
+        assert neighbors[0]['id'] == 'discovery-sciences'
+
+    def test_unrelated_returns_empty(self):
+        entity = quality_entity('xyz', 'Xylophone')
+        assert select_neighbors(entity, EXISTING['entities']) == []
+
+
+class TestApplyPlacements:
+    """LLM placement results are folded into the existing structure."""
+
+    def test_merge_into_existing(self):
+        structures, new = diff_against_existing([quality_entity('disc-sci', 'Disc Sci')], EXISTING)
+        placement = {'entities': [{'id': 'discovery-sciences', 'name': 'Discovery Sciences',
+                                   'type': 'department', 'original_ids': ['disc-sci']}]}
+        result = apply_placements(structures, placement, new)
+        assert len(result) == 2
+        assert 'disc-sci' in result[0]['original_ids']
+
+    def test_new_entity_appended_with_parent(self):
+        structures, new = diff_against_existing([quality_entity('hts', 'HTS')], EXISTING)
+        placement = {'entities': [{'id': 'hts', 'name': 'HTS', 'type': 'team',
+                                   'parent_id': 'discovery-sciences', 'original_ids': ['hts']}]}
+        result = apply_placements(structures, placement, new)
+        assert result[-1]['id'] == 'hts'
+        assert result[-1]['parent_id'] == 'discovery-sciences'
+
+    def test_cannot_rehome_known_ids(self):
+        structures, new = diff_against_existing([quality_entity('hts', 'HTS')], EXISTING)
+        placement = {'entities': [{'id': 'hts', 'name': 'HTS', 'type': 'team',
+                                   'original_ids': ['hts', 'oncology']}]}
+        result = apply_placements(structures, placement, new)
+        assert result[-1]['original_ids'] == ['hts']
+
+
+class TestLoadExistingConsolidation:
+
+    def test_missing_file(self, tmp_path):
+        assert load_existing_consolidation(tmp_path / 'nope.json') is None
+
+    def test_empty_entities_treated_as_missing(self, tmp_path):
+        path = tmp_path / 'consolidated_with_hierarchy.json'
+        path.write_text(json.dumps({'entities': []}))
+        assert load_existing_consolidation(path) is None
+
+    def test_loads_entities(self, tmp_path):
+        path = tmp_path / 'consolidated_with_hierarchy.json'
+        path.write_text(json.dumps(EXISTING))
+        assert len(load_existing_consolidation(path)['entities']) == 2
@@ -0,0 +1,86 @@
+"""
+Tests for the pooled KV API client (scripts/kv_client.py) against a local stub server.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from kv_client import KVClient, shared_client
+
+
+@pytest.fixture
+def client(kv_stub):
+    with KVClient(kv_stub.base_url, "secret", backoff=0) as kv:
+        yield kv
+
+
+class TestKVClient:
+
+    def test_reads_org_state(self, kv_stub, client):
+        kv_stub.state["merges:roche"] = {"e1": {"absorbed": ["e2"], "aliases": ["Foo"]}}
+        assert client.get_state("Roche", "merges") == {"e1": {"absorbed": ["e2"], "aliases": ["Foo"]}}
+        assert kv_stub.requests[0]["path"] == "/api/org-state"
+        assert kv_stub.requests[0]["query"] == {"account": "roche", "type": "merges"}
+
+    def test_bypass_header_on_every_request(self, kv_stub, client):
+        client.get_state("roche", "sizes")
+        client.get_sync_version("roche")
+        assert all(r["headers"].get("x-vercel-protection-bypass") == "secret" for r in kv_stub.requests)
+
+    def test_connections_are_reused(self, kv_stub, client):
+        for _ in range(5):
+            client.read("corrections", "roche")
+            client.read("match-review", "roche")
+        assert len(kv_stub.requests) == 10
+        assert len({r["port"] for r in kv_stub.requests}) == 1
+
+    def test_delete_uses_type_key_field(self, kv_stub, client):
+        kv_stub.state["merges:gsk"] = {"__test_a": {}, "keep": {}}
+        client.delete_state("gsk", "merges", "__test_a")
+        assert kv_stub.state["merges:gsk"] == {"keep": {}}
+        assert client.get_sync_version("gsk") == "1"
+
+    def test_delete_match_review_item(self, kv_stub, client):
+        kv_stub.state["match-review:gsk"] = {"approved": {"__test_x": {}}, "rejected": {}, "manual": {"__test_x": {}}}
+        client.delete_match_review("gsk", "__test_x")
+        assert client.get_match_review("gsk") == {"approved": {}, "rejected": {}, "manual": {}}
+
+    def test_retries_transient_errors(self, kv_stub, client):
+        kv_stub.fail_next = [503, 429]
+        assert client.get_state("roche", "merges") == {}
+        assert len(kv_stub.requests) == 3
+
+    def test_gives_up_after_max_attempts(self, kv_stub, client):
+        kv_stub.fail_next = [500, 500, 500]
+        with pytest.raises(requests.HTTPError):
+            client.get_state("roche", "merges")
+
+    def test_client_errors_are_not_retried(self, kv_stub, client):
+        with pytest.raises(requests.HTTPError):
+            client.read("autosave", "roche")
+        assert len(kv_stub.requests) == 1
+
+    def test_fetch_accounts_concurrently(self, kv_stub, client):
+        for account in ("abbvie", "gsk", "roche"):
+            kv_stub.state[f"merges:{account}"] = {account: {}}
+        results = client.fetch_accounts(lambda a: client.get_state(a, "merges"), ["abbvie", "gsk", "roche"])
+        assert results == {"abbvie": {"abbvie": {}}, "gsk": {"gsk": {}}, "roche": {"roche": {}}}
+
+    def test_fetch_accounts_returns_failures(self, kv_stub, client):
+        kv_stub.stop()
+        results = client.fetch_accounts(lambda a: client.get_state(a, "merges"), ["gsk"])
+        assert isinstance(results["gsk"], requests.RequestException)
+
+    def test_api_root_base_url_accepted(self, kv_stub):
+        with KVClient(kv_stub.base_url + "/api/") as kv:
+            kv.get_state("roche", "merges")
+        assert kv_stub.requests[0]["path"] == "/api/org-state"
+
+    def test_shared_client_per_deployment(self, kv_stub):
+        assert shared_client(kv_stub.base_url, "") is shared_client(kv_stub.base_url, "")
+        assert shared_client(kv_stub.base_url, "x") is not shared_client(kv_stub.base_url, "")
@@ -0,0 +1,88 @@
+"""
+Tests for sync-version-aware KV snapshots (scripts/kv_snapshot.py) against a local stub server.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+import kv_snapshot
+from kv_client import KVClient
+from kv_snapshot import SNAPSHOT_TYPES, SnapshotMissing, account_snapshot, kv_state, load_snapshot, refresh_snapshot
+
+
+@pytest.fixture
+def client(kv_stub):
+    with KVClient(kv_stub.base_url, backoff=0) as kv:
+        yield kv
+
+
+def _paths(kv_stub):
+    return [r["path"] for r in kv_stub.requests]
+
+
+class TestRefreshSnapshot:
+
+    def test_first_run_fetches_everything(self, kv_stub, client, kv_snapshot_dir):
+        kv_stub.state["merges:roche"] = {"e1": {"absorbed": [], "aliases": ["DS"]}}
+        kv_stub.versions["roche"] = 7
+        snapshot, status = refresh_snapshot("roche", client)
+        assert status == "refreshed"
+        assert snapshot["sync_version"] == "7"
+        assert snapshot["state"]["merges"] == {"e1": {"absorbed": [], "aliases": ["DS"]}}
+        assert set(snapshot["state"]) == set(SNAPSHOT_TYPES)
+        assert load_snapshot("roche") == snapshot
+
+    def test_unchanged_version_costs_one_request(self, kv_stub, client, kv_snapshot_dir):
+        refresh_snapshot("roche", client)
+        kv_stub.requests.clear()
+        _, status = refresh_snapshot("roche", client)
+        assert status == "current"
+        assert _paths(kv_stub) == ["/api/sync-version"]
+
+    def test_write_triggers_refetch(self, kv_stub, client, kv_snapshot_dir):
+        kv_stub.state["merges:roche"] = {"__a": {}, "b": {}}
+        refresh_snapshot("roche", client)
+        client.delete_state("roche", "merges", "__a")
+        snapshot, status = refresh_snapshot("roche", client)
+        assert status == "refreshed"
+        assert snapshot["state"]["merges"] == {"b": {}}
+
+
+class TestAccountSnapshot:
+
+    def test_validated_once_per_process(self, kv_stub, client, kv_snapshot_dir):
+        kv_state("roche", "merges", client=client)
+        count = len(kv_stub.requests)
+        kv_state("roche", "corrections", client=client)
+        assert len(kv_stub.requests) == count
+
+    def test_viewer_down_falls_back_to_stored(self, kv_stub, client, kv_snapshot_dir):
+        kv_stub.state["merges:roche"] = {"e1": {}}
+        refresh_snapshot("roche", client)
+        kv_stub.stop()
+        assert kv_state("roche", "merges", client=client) == {"e1": {}}
+
+    def test_viewer_down_without_snapshot_raises(self, kv_stub, client, kv_snapshot_dir):
+        kv_stub.stop()
+        with pytest.raises(requests.RequestException):
+            kv_state("roche", "merges", client=client)
+
+    def test_offline_reads_stored_without_requests(self, kv_stub, client, kv_snapshot_dir):
+        kv_stub.state["sizes:gsk"] = {"k": {"size": 12}}
+        refresh_snapshot("gsk", client)
+        kv_stub.requests.clear()
+        assert kv_state("gsk", "sizes", offline=True) == {"k": {"size": 12}}
+        assert kv_stub.requests == []
+
+    def test_offline_without_snapshot(self, kv_snapshot_dir):
+        with pytest.raises(SnapshotMissing):
+            account_snapshot("lilly", offline=True)
+
+    def test_prefetch_many_accounts(self, kv_stub, client, kv_snapshot_dir):
+        assert kv_snapshot.prefetch_snapshots(["abbvie", "gsk", "roche"], client) == {}
+        assert sorted(p.stem for p in kv_snapshot_dir.glob("*.json")) == ["abbvie", "gsk", "roche"]
@@ -0,0 +1,138 @@
+"""
+Tests for deterministic no-LLM consolidation (scripts/local_consolidation.py).
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from local_consolidation import (
+    combine_consolidations, deterministic_clusters, infer_parents, local_consolidate, premerge_entities,
+    singleton_structures,
+)
+
+
+def entity(name, mentions=1, quotes=(), entity_type='team'):
+    return {
+        'id': name.lower().replace(' ', '-').replace('(', '').replace(')', '').replace('&', ''),
+        'entity_name': name,
+        'entity_type': entity_type,
+        'mention_count': mentions,
+        'confidence': 'medium',
+        'all_sources': [{'call_id': f'c{i}', 'raw_quote': q} for i, q in enumerate(quotes)],
+    }
+
+
+def names(entities, groups):
+    return sorted(sorted(entities[i]['entity_name'] for i in g) for g in groups if len(g) > 1)
+
+
+class TestDeterministicClusters:
+
+    def test_parenthetical_order_and_filler_words(self):
+        entities = [entity('Discovery Sciences'), entity('Discovery Sciences (DS)'),
+                    entity('Sciences, Discovery'), entity('The Oncology Team'), entity('Oncology')]
+        groups, reasons = deterministic_clusters(entities)
+        assert names(entities, groups) == [
+            ['Discovery Sciences', 'Discovery Sciences (DS)', 'Sciences, Discovery'],
+            ['Oncology', 'The Oncology Team'],
+        ]
+        assert reasons[0] == {'same name'}
+
+    def test_acronym_with_single_expansion(self):
+        entities = [entity('Discovery Sciences'), entity('DS')]
+        groups, reasons = deterministic_clusters(entities)
+        assert names(entities, groups) == [['DS', 'Discovery Sciences']]
+        assert 'acronym' in reasons[0]
+
+    def test_ambiguous_acronym_not_merged(self):
+        entities = [entity('Discovery Sciences'), entity('Data Science'), entity('DS')]
+        groups, _ = deterministic_clusters(entities)
+        assert names(entities, groups) == []
+
+    def test_different_names_not_merged(self):
+        entities = [entity('Oncology'), entity('Oncology Research')]
+        assert names(entities, deterministic_clusters(entities)[0]) == []
+
+
+class TestInferParents:
+
+    def test_within_and_part_of(self):
+        entities = [
+            entity('Oncology R&D'),
+            entity('Biomarkers', quotes=['Biomarkers sits within Oncology R&D, about 40 people']),
+            entity('Imaging', quotes=['and Imaging is part of the broader Oncology R&D org']),
+        ]
+        owner = {i: i for i in range(3)}
+        parents = infer_parents(entities, owner, resolved={0, 1, 2})
+        assert parents == {1: (0, 1), 2: (0, 1)}
+
+    def test_child_must_be_named_in_same_clause(self):
+        entities = [entity('Oncology R&D'),
+                    entity('Biomarkers', quotes=['Biomarkers is great. We sit within Oncology R&D'])]
+        assert infer_parents(entities, {0: 0, 1: 1}, resolved={0, 1}) == {}
+
+    def test_cycles_dropped(self):
+        entities = [entity('Alpha Group', quotes=['Alpha Group sits under Beta Group']),
+                    entity('Beta Group', quotes=['Beta Group sits under Alpha Group'])]
+        parents = infer_parents(entities, {0: 0, 1: 1}, resolved={0, 1})
+        assert len(parents) == 1
+
+
+class TestLocalConsolidate:
+
+    def test_resolves_easy_cases_and_defers_ambiguous(self):
+        entities = [
+            entity('Discovery Sciences', mentions=5),
+            entity('Discovery Sciences (DS)', mentions=2),
+            entity('DS'),
+            entity('Oncology'),
+            entity('Oncology Research', quotes=['Oncology Research sits within Discovery Sciences']),
+            entity('Finance'),
+        ]
+        result = local_consolidate(entities)
+        by_name = {e['name']: e for e in result['entities']}
+        assert set(by_name) == {'Discovery Sciences', 'Finance'}
+        assert sorted(by_name['Discovery Sciences']['original_ids']) == ['discovery-sciences', 'discovery-sciences-ds', 'ds']
+        assert by_name['Discovery Sciences']['id'] == 'discovery-sciences'
+        assert {e['entity_name'] for e in result['unresolved']} == {'Oncology', 'Oncology Research'}
+        assert len(result['duplicate_resolutions']) == 1
+
+    def test_combine_remaps_parent_to_llm_id(self):
+        entities = [entity('Biomarkers', quotes=['Biomarkers sits within Oncology']),
+                    entity('Oncology'), entity('Oncology Research')]
+        local = local_consolidate(entities)
+        assert local['entities'][0]['parent_id'] == 'oncology'
+        llm = {'entities': [{'id': 'oncology-rd', 'name': 'Oncology R&D', 'type': 'department', 'parent_id': None,
+                             'original_ids': ['oncology', 'oncology-research']}],
+               'hierarchy_notes': 'merged', 'duplicate_resolutions': []}
+        combined = combine_consolidations(local, llm)
+        assert combined['entities'][0]['parent_id'] == 'oncology-rd'
+        assert len(combined['entities']) == 2
+
+    def test_singleton_structures(self):
+        structures = singleton_structures([entity('Oncology')])
+        assert structures[0]['original_ids'] == ['oncology']
+        assert structures[0]['parent_id'] is None
+
+
+class TestPremergeEntities:
+
+    def test_merges_into_canonical_member(self):
+        a = dict(entity('Disc Sciences', mentions=3, quotes=['a']), team_size='40')
+        b = dict(entity('Discovery Sciences', mentions=1, quotes=['b']), leader='Jane')
+        c = entity('Finance')
+        merged, resolutions = premerge_entities([a, b, c], {'discovery-sciences': ['disc-sciences', 'discovery-sciences']},
+                                                'Known alias')
+        assert [e['id'] for e in merged] == ['discovery-sciences', 'finance']
+        keep = merged[0]
+        assert keep['mention_count'] == 4
+        assert [s['raw_quote'] for s in keep['all_sources']] == ['b', 'a']
+        assert (keep['team_size'], keep['leader']) == ('40', 'Jane')
+        assert keep['premerged_ids'] == ['disc-sciences']
+        assert resolutions[0]['reason'] == 'Known alias'
+
+    def test_single_member_groups_untouched(self):
+        entities = [entity('Oncology')]
+        assert premerge_entities(entities, {'x': ['oncology']}, 'r') == (entities, [])
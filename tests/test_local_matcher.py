@@ -0,0 +1,168 @@
+"""
+Tests for the deterministic auto-map -> manual map matcher (scripts/local_matcher.py)
+and its use in integrate_viewer's match review.
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from local_matcher import ManualNodeIndex, spoken_acronym
+
+MANUAL_ROOT = {
+    "id": "roche", "name": "Roche", "children": [
+        {"id": "pred", "name": "Pharma Research & Early Development (pRED)", "children": [
+            {"id": "pred-ds", "name": "Discovery Sciences"},
+            {"id": "pred-clinops", "name": "Clinical Operations (pRED)"},
+            {"id": "pred-onc", "name": "Oncology"},
+        ]},
+        {"id": "gred", "name": "Genentech Research & Early Development (gRED)", "children": [
+            {"id": "gred-onc", "name": "Oncology"},
+        ]},
+        {"id": "rd", "name": "Retinal Diseases"},
+    ],
+}
+
+
+class TestManualNodeIndex:
+
+    def setup_method(self):
+        self.index = ManualNodeIndex(MANUAL_ROOT)
+
+    def test_filler_words_are_ignored(self):
+        result = self.index.match("Discovery Sciences Team", ["pRED"])
+        assert result["status"] == "auto"
+        assert result["best"]["manual_node_id"] == "pred-ds"
+        assert result["best"]["manual_node_path"] == ("Roche > Pharma Research & Early Development (pRED) > "
+                                                      "Discovery Sciences")
+
+    def test_spoken_acronym(self):
+        assert spoken_acronym("P RED") == "pred"
+        assert spoken_acronym("Pharma Research") == ""
+        assert self.index.match("P RED")["best"]["manual_node_id"] == "pred"
+
+    def test_qualifier_parenthetical_is_not_an_acronym(self):
+        # "(pRED)" on Clinical Operations names its parent, not the node
+        candidates = self.index.score("pRED")
+        assert [c["manual_node_id"] for c in candidates] == ["pred"]
+
+    def test_short_acronyms_do_not_match(self):
+        assert self.index.match("RD")["status"] == "none"
+
+    def test_ancestor_path_separates_same_names(self):
+        result = self.index.match("Oncology Group", ["gRED", "Roche"])
+        assert result["status"] == "auto"
+        assert result["best"]["manual_node_id"] == "gred-onc"
+
+    def test_same_names_without_path_are_ambiguous(self):
+        result = self.index.match("Oncology")
+        assert result["status"] == "ambiguous"
+        assert {c["manual_node_id"] for c in result["candidates"][:2]} == {"pred-onc", "gred-onc"}
+
+    def test_trigram_prefilter_drops_no_candidate(self):
+        from entity_similarity import char_trigrams, jaccard
+        from local_matcher import MIN_CANDIDATE_SCORE
+        for name in ("Oncology Biomarkers", "Discovery Science", "Clinical Ops", "Retina", "Early Dev"):
+            grams = char_trigrams(name)
+            expected = {n["id"] for n in self.index.nodes
+                        if jaccard(grams, n["trigrams"]) >= MIN_CANDIDATE_SCORE}
+            found = {c["manual_node_id"] for c in self.index.score(name)
+                     if c["features"]["trigram"] >= MIN_CANDIDATE_SCORE}
+            assert found == expected
+
+    def test_partial_overlap_is_left_for_review(self):
+        result = self.index.match("Oncology Biomarkers")
+        assert result["status"] == "ambiguous"
+        assert result["best"]["score"] < 0.9
+
+
+class TestMatchReview:
+
+    def test_local_matches_leave_review_and_join_manual_nodes(self, monkeypatch):
+        import integrate_viewer
+        monkeypatch.setattr(integrate_viewer, "load_llm_matches", lambda company: {})
+        auto_map = {"root": {"name": "Roche", "children": [
+            {"name": "P RED", "snippets": [{"quote": "P RED is 500 people"}], "children": [
+                {"name": "Discovery Sciences Team", "snippets": [{"quote": "DS has 40"}]},
+            ]},
+            {"name": "Imaging", "snippets": [{"quote": "Imaging team"}]},
+        ]}}
+        manual_map = {"root": MANUAL_ROOT}
+
+        local = integrate_viewer.match_auto_map_locally(auto_map, manual_map)
+        assert {m["gong_entity"]: m["manual_node_id"] for m in local["auto_matched"]} == {
+            "P RED": "pred", "Discovery Sciences Team": "pred-ds"}
+        assert [m["gong_entity"] for m in local["llm_queue"]] == ["Imaging"]
+
+        review = integrate_viewer.generate_match_review_from_auto_map("roche", auto_map, manual_map,
+                                                                      local_matches=local)
+        assert [item["gong_entity"] for item in review["items"]] == ["Imaging"]
+        assert review["total_auto_matched"] == 2
+
+        viewer = integrate_viewer.convert_manual_map_to_viewer("roche", manual_map, auto_map, local_matches=local)
+        pred = viewer["root"]["children"][0]
+        assert [s["quote"] for s in pred["gongEvidence"]["snippets"]] == ["P RED is 500 people"]
+        assert [s["quote"] for s in pred["children"][0]["gongEvidence"]["snippets"]] == ["DS has 40"]
+
+    def test_local_match_joins_only_its_own_parent(self, monkeypatch):
+        import integrate_viewer
+        monkeypatch.setattr(integrate_viewer, "load_llm_matches", lambda company: {})
+        auto_map = {"root": {"name": "Roche", "children": [
+            {"name": "gRED", "children": [
+                {"name": "Oncology Group", "snippets": [{"quote": "gRED oncology"}]},
+                {"name": "Oncology Group", "snippets": [{"quote": "gRED oncology again"}]},
+            ]},
+            {"name": "Partners", "children": [
+                {"name": "Oncology Group", "snippets": [{"quote": "a partner's oncology group"}]},
+            ]},
+        ]}}
+        manual_map = {"root": MANUAL_ROOT}
+
+        local = integrate_viewer.match_auto_map_locally(auto_map, manual_map)
+        assert [(m["gong_parent"], m["manual_node_id"]) for m in local["auto_matched"]] == [
+            ("gRED", "gred-onc"), ("gRED", "gred-onc")]
+        assert [m["gong_parent"] for m in local["llm_queue"]] == ["Partners"]
+
+        review = integrate_viewer.generate_match_review_from_auto_map("roche", auto_map, manual_map,
+                                                                      local_matches=local)
+        # Counts matched entities, not distinct (name, parent) keys
+        assert review["total_auto_matched"] == 2
+        assert [item["gong_parent"] for item in review["items"]] == ["Partners"]
+
+        viewer = integrate_viewer.convert_manual_map_to_viewer("roche", manual_map, auto_map, local_matches=local)
+        gred_onc = viewer["root"]["children"][1]["children"][0]
+        assert [s["quote"] for s in gred_onc["gongEvidence"]["snippets"]] == ["gRED oncology", "gRED oncology again"]
+
+    def test_review_items_carry_ranked_candidates(self, monkeypatch):
+        import integrate_viewer
+        monkeypatch.setattr(integrate_viewer, "load_llm_matches", lambda company: {})
+        auto_map = {"root": {"name": "Roche", "children": [
+            {"name": "Oncology Biomarkers", "snippets": [{"quote": "Biomarkers sit in oncology"}]},
+        ]}}
+        review = integrate_viewer.generate_match_review_from_auto_map("roche", auto_map, {"root": MANUAL_ROOT})
+        candidates = review["items"][0]["candidate_matches"]
+        assert {c["manual_node_id"] for c in candidates[:2]} == {"pred-onc", "gred-onc"}
+        assert set(candidates[0]) == {"manual_node_id", "manual_node_name", "manual_node_path", "score"}
+        assert len(candidates) <= 5
+
+    def test_review_items_reuse_local_candidates(self, monkeypatch):
+        import integrate_viewer
+        monkeypatch.setattr(integrate_viewer, "load_llm_matches", lambda company: {})
+        auto_map = {"root": {"name": "Roche", "children": [
+            {"name": "gRED", "children": [
+                {"name": "Oncology Biomarkers", "snippets": [{"quote": "Biomarkers sit in oncology"}]},
+            ]},
+        ]}}
+        manual_map = {"root": MANUAL_ROOT}
+        local = integrate_viewer.match_auto_map_locally(auto_map, manual_map)
+        queued = local["llm_queue"][0]["candidate_matches"]
+        # Ranked with the full ancestor path, so gRED's Oncology comes first
+        assert queued[0]["manual_node_id"] == "gred-onc"
+
+        def rescore(*args):
+            raise AssertionError("review item re-scored")
+        monkeypatch.setattr(integrate_viewer.ManualNodeIndex, "score", rescore)
+        review = integrate_viewer.generate_match_review_from_auto_map("roche", auto_map, manual_map,
+                                                                      local_matches=local)
+        assert review["items"][0]["candidate_matches"] == queued
@@ -0,0 +1,93 @@
+"""
+Tests for the single-pass size-mention scanner (scripts/size_mentions.py).
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from size_mentions import (
+    SizeMentionCollector, extract_team_size_from_text, merge_size_mentions, scan_text, scan_texts,
+)
+
+
+def values(mentions):
+    return [m['value'] for m in mentions]
+
+
+class TestScanText:
+
+    def test_finds_every_mention_in_one_quote(self):
+        text = 'Oncology has about 1,200 people, and my group of 15 sits under a 40-person department.'
+        mentions = scan_text(text)
+        assert values(mentions) == ['1200', '15', '40']
+        assert mentions[0]['approximate']
+        assert mentions[0]['kind'] == 'count'
+        assert [text[slice(*m['span'])] for m in mentions] == [m['text'] for m in mentions]
+
+    def test_range_normalized(self):
+        mention = scan_text('we have 20 to 10 scientists')[0]
+        assert (mention['value'], mention['low'], mention['high']) == ('10-20', 10, 20)
+
+    def test_shapes(self):
+        assert values(scan_text('there are 12 of us')) == ['12']
+        assert values(scan_text("we're about 30 now")) == ['30']
+        assert values(scan_text('a team of 8 chemists')) == ['8']
+
+    def test_ignores_non_sizes(self):
+        assert scan_text("we're 5 years in, with 200 licenses and 12345 people") == []
+        assert scan_text('') == []
+
+    def test_first_value_for_team_size(self):
+        assert extract_team_size_from_text('roughly 50 researchers, 3 of us on ML') == '50'
+        assert extract_team_size_from_text('no numbers here') is None
+
+
+class TestScanTexts:
+
+    def test_matches_per_text_scan_with_local_spans(self):
+        texts = ['team of 8', '', None, 'we are 9', '150 employees and 2 of us']
+        batched = scan_texts(texts)
+        assert batched == [scan_text(t or '') for t in texts]
+
+    def test_mentions_do_not_cross_quotes(self):
+        assert scan_texts(['there are 12', 'people here']) == [[], []]
+
+
+class TestSizeMentionCollector:
+
+    def test_groups_by_key_and_copies_source(self):
+        collector = SizeMentionCollector(batch_size=2)
+        collector.add('oncology', '50 people in oncology', {'call_id': 'c1', 'call_date': '2025-01-01'})
+        collector.add('rd', 'nothing here', {'call_id': 'c2'})
+        collector.add('oncology', 'grew to 60 people', {'call_id': 'c3'})
+        results = collector.results()
+        assert [(m['value'], m['call_id']) for m in results['oncology']] == [('50', 'c1'), ('60', 'c3')]
+        assert results['oncology'][0]['call_date'] == '2025-01-01'
+        assert 'rd' not in results
+
+    def test_duplicate_quote_same_call_counted_once(self):
+        collector = SizeMentionCollector()
+        for _ in range(3):
+            collector.add('oncology', '50 people', {'call_id': 'c1'})
+        assert len(collector.results()['oncology']) == 1
+
+    def test_mentions_per_key_capped(self):
+        collector = SizeMentionCollector(batch_size=4, limit=3)
+        for i in range(10):
+            collector.add('oncology', f'{i + 10} people', {'call_id': f'c{i}'})
+        collector.add('rd', '5 people', {'call_id': 'c0'})
+        results = collector.results()
+        assert [m['value'] for m in results['oncology']] == ['10', '11', '12']
+        assert len(collector._seen['oncology']) == 3
+        assert [m['value'] for m in results['rd']] == ['5']
+
+
+class TestMergeSizeMentions:
+
+    def test_dedupes_value_per_call(self):
+        a = [{'value': '50', 'call_id': 'c1'}, {'value': '60', 'call_id': 'c1'}]
+        b = [{'value': '50', 'call_id': 'c1'}, {'value': '50', 'call_id': 'c2'}]
+        assert [(m['value'], m['call_id']) for m in merge_size_mentions([a, b])] == [
+            ('50', 'c1'), ('60', 'c1'), ('50', 'c2')]
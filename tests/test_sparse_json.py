@@ -0,0 +1,37 @@
+"""
+Tests for sparse per-company viewer JSON (scripts/sparse_json.py).
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from integrate_viewer import convert_manual_node_for_viewer
+from sparse_json import EVIDENCE_DEFAULTS, empty_evidence, sparse
+
+
+class TestSparse:
+
+    def test_unmatched_subtree_keeps_only_identity(self):
+        node = convert_manual_node_for_viewer({"id": "a", "name": "A", "type": "division", "children": [
+            {"id": "b", "name": "B", "type": None}]})
+        assert sparse({"root": node})["root"] == {
+            "id": "a", "name": "A", "type": "division", "children": [{"id": "b", "name": "B"}]}
+
+    def test_non_default_evidence_and_snippets(self):
+        node = {"id": "a", "name": "A", "level": 2, "children": [], "gongEvidence": {
+            **empty_evidence(), "totalMentions": 1, "status": "auto_matched",
+            "snippets": [{"quote": "q", "date": None, "sizeMentions": [], "speakerId": "1"}]}}
+        assert sparse({"root": node})["root"] == {"id": "a", "name": "A", "level": 2, "gongEvidence": {
+            "totalMentions": 1, "status": "auto_matched", "snippets": [{"quote": "q", "speakerId": "1"}]}}
+
+    def test_plain_data_only_loses_nulls(self):
+        review = {"items": [{"id": "x", "llm_suggested_match": None, "candidate_matches": [],
+                             "all_snippets": [{"quote": "q", "sizeMentions": []}]}]}
+        assert sparse(review) == {"items": [{"id": "x", "candidate_matches": [], "all_snippets": [{"quote": "q"}]}]}
+
+    def test_empty_evidence_is_a_fresh_copy(self):
+        evidence = empty_evidence()
+        evidence["snippets"].append("x")
+        assert EVIDENCE_DEFAULTS["snippets"] == []
@@ -0,0 +1,65 @@
+"""
+Tests for build-time speaker-turn segmentation of context windows
+(scripts/speaker_turns.py), ported from lib/speaker-resolution.ts.
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from speaker_turns import build_speaker_map, segment_contexts, segment_snippet_context, segment_turns
+
+
+class TestSegmentTurns:
+
+    def test_leading_text_and_tagged_turns(self):
+        assert segment_turns("...tail [Speaker 1]: Hi [Speaker 22]: Hello") == [
+            (None, "...tail "), ("1", ": Hi "), ("22", ": Hello")]
+
+    def test_untagged_and_empty(self):
+        assert segment_turns("no tags") == [(None, "no tags")]
+        assert segment_turns("") == []
+
+
+class TestBuildSpeakerMap:
+
+    def test_nearest_speaker_before_quote_is_the_customer(self):
+        context = "[Speaker 1] I run the oncology team. [Speaker 2] How big is it? [Speaker 1] About 50 people."
+        snippet = {"quote": "About 50 people.", "speakerId": "2",
+                   "customerName": "Jane Doe; Bob", "internalName": "Alice"}
+        assert build_speaker_map(context, snippet) == {"1": "Jane Doe", "2": "Alice"}
+
+    def test_needs_exactly_two_speakers(self):
+        snippet = {"quote": "x", "speakerId": "1"}
+        assert build_speaker_map("[Speaker 1] a [Speaker 2] b [Speaker 3] x", snippet) == {}
+        assert build_speaker_map("[Speaker 1] x", snippet) == {}
+
+
+class TestSegmentSnippetContext:
+
+    def test_turns_reference_named_speakers(self):
+        snippet = {"quote": "About 50 people.", "speakerId": "111", "customerName": "Jane", "internalName": "Alice",
+                   "contextBefore": "...team [Speaker 222]: How big? [Speaker 111]: ",
+                   "contextAfter": " [Speaker 222]: Thanks."}
+        result = segment_snippet_context(snippet)
+        assert "contextBefore" not in result and "contextAfter" not in result
+        assert result["context"] == {
+            "speakers": ["Alice", "Jane"],
+            "before": [[-1, "...team "], [0, ": How big? "], [1, ": "]],
+            "after": [[-1, " "], [0, ": Thanks."]],
+        }
+        assert snippet["contextBefore"].startswith("...team")
+
+    def test_unnamed_speakers_get_letters(self):
+        result = segment_snippet_context({"quote": "q", "contextBefore": "[Speaker 5] a [Speaker 9] b",
+                                          "contextAfter": ""})
+        assert result["context"]["speakers"] == ["Speaker A", "Speaker B"]
+        assert result["context"]["after"] == []
+
+    def test_walks_viewer_data(self):
+        data = {"root": {"gongEvidence": {"snippets": [{"quote": "q", "contextBefore": "", "contextAfter": ""},
+                                                       {"quote": "no context"}]}}}
+        snippets = segment_contexts(data)["root"]["gongEvidence"]["snippets"]
+        assert snippets[0]["context"] == {"speakers": [], "before": [], "after": []}
+        assert snippets[1] == {"quote": "no context"}
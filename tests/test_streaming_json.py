@@ -0,0 +1,90 @@
+"""
+Tests for incremental parsing of streamed consolidation replies (scripts/streaming_json.py).
+"""
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from streaming_json import IncrementalArrayParser, split_remainder
+
+REPLY = '''```json
+{
+  "entities": [
+    {"id": "discovery-sciences", "name": "Discovery Sciences {DS}", "type": "department", "parent_id": null, "original_ids": ["discovery-sciences", "ds"]},
+    {"id": "oncology", "name": "Oncology \\"TA\\"", "type": "therapeutic_area", "parent_id": "discovery-sciences", "original_ids": ["oncology"]}
+  ],
+  "hierarchy_notes": "notes",
+  "duplicate_resolutions": []
+}
+```'''
+
+
+def feed_in_chunks(parser, text, size=7):
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+
+
+class TestIncrementalArrayParser:
+
+    def test_full_reply(self):
+        parser = IncrementalArrayParser()
+        feed_in_chunks(parser, REPLY)
+        assert [e['id'] for e in parser.items] == ['discovery-sciences', 'oncology']
+        assert parser.closed
+
+    def test_braces_and_quotes_inside_strings(self):
+        parser = IncrementalArrayParser()
+        feed_in_chunks(parser, REPLY, size=1)
+        assert parser.items[0]['name'] == 'Discovery Sciences {DS}'
+        assert parser.items[1]['name'] == 'Oncology "TA"'
+
+    def test_truncated_reply_keeps_complete_entities(self):
+        cut = REPLY.index('"therapeutic_area"')
+        parser = IncrementalArrayParser()
+        feed_in_chunks(parser, REPLY[:cut])
+        assert [e['id'] for e in parser.items] == ['discovery-sciences']
+        assert not parser.closed
+
+    def test_feed_returns_new_items(self):
+        parser = IncrementalArrayParser()
+        first_end = REPLY.index('},') + 1
+        assert [e['id'] for e in parser.feed(REPLY[:first_end])] == ['discovery-sciences']
+        assert [e['id'] for e in parser.feed(REPLY[first_end:])] == ['oncology']
+
+    def test_buffer_is_full_text(self):
+        parser = IncrementalArrayParser()
+        feed_in_chunks(parser, REPLY)
+        assert parser.buffer == REPLY
+
+    def test_nested_arrays_inside_items(self):
+        text = json.dumps({'entities': [{'id': 'a', 'original_ids': ['a', 'b'], 'meta': {'x': [1, 2]}}]})
+        parser = IncrementalArrayParser()
+        feed_in_chunks(parser, text, size=3)
+        assert parser.items == [{'id': 'a', 'original_ids': ['a', 'b'], 'meta': {'x': [1, 2]}}]
+
+
+class TestSplitRemainder:
+
+    def inputs(self, n):
+        return [{'id': f'e{i}'} for i in range(n)]
+
+    def test_all_covered(self):
+        assert split_remainder(self.inputs(2), [{'id': 'x', 'original_ids': ['e0', 'e1']}]) == []
+
+    def test_remainder_split_in_two(self):
+        parts = split_remainder(self.inputs(6), [{'id': 'e0', 'original_ids': ['e0', 'e1']}])
+        assert [[e['id'] for e in p] for p in parts] == [['e2', 'e3'], ['e4', 'e5']]
+
+    def test_nothing_parsed_splits_whole_batch(self):
+        parts = split_remainder(self.inputs(5), [])
+        assert [len(p) for p in parts] == [3, 2]
+
+    def test_single_entity_not_split_forever(self):
+        assert split_remainder(self.inputs(1), []) == []
+
+    def test_single_remaining_entity_retried(self):
+        parts = split_remainder(self.inputs(2), [{'id': 'e0'}])
+        assert [[e['id'] for e in p] for p in parts] == [['e1']]
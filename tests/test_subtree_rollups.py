@@ -0,0 +1,66 @@
+"""
+Tests for per-node subtree rollups (scripts/subtree_rollups.py).
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from subtree_rollups import EMPTY_ROLLUP, add_rollups
+
+
+def evidence(*snippets, status="auto_matched"):
+    return {"gongEvidence": {"status": status, "snippets": [
+        {"quote": q, "callId": call, "date": date} for q, call, date in snippets]}}
+
+
+def make_tree():
+    return {"id": "root", "name": "Root", "children": [
+        {"id": "a", "name": "A", **evidence(("a", "c1", "2025-05-01")), "children": [
+            {"id": "a1", "name": "A1", **evidence(("x", "c1", "2025-03-01"), ("y", "c2", None)), "children": []},
+            {"id": "a2", "name": "A2", **evidence(status="unverified"), "children": [
+                {"id": "a2x", "name": "A2X", **evidence(("z", "c3", "2025-09-01")), "children": []},
+            ]},
+        ]},
+        {"id": "b", "name": "B", "children": []},
+    ]}
+
+
+class TestAddRollups:
+
+    def test_bottom_up_totals(self):
+        root = make_tree()
+        assert add_rollups(root) == {"snippets": 4, "matchedDescendants": 3, "calls": 3,
+                                     "firstDate": "2025-03-01", "lastDate": "2025-09-01"}
+        division_a = root["children"][0]
+        assert division_a["rollup"]["matchedDescendants"] == 2
+        assert division_a["children"][0]["rollup"] == {"snippets": 2, "matchedDescendants": 0, "calls": 2,
+                                                       "firstDate": "2025-03-01", "lastDate": "2025-03-01"}
+        assert division_a["children"][1]["rollup"]["calls"] == 1
+
+    def test_mixed_call_id_forms_count_once(self):
+        root = {"id": "root", "name": "Root", "gongEvidence": {"snippets": [
+            {"quote": "a", "callId": "2025-07-10_d7af7ddef683"}]}, "children": [
+            {"id": "a", "name": "A", "gongEvidence": {"snippets": [
+                {"quote": "b", "gongUrl": "https://app.gong.io/call?id=d7af7ddef683"},
+                {"quote": "c", "callId": "d7af7ddef6831b2c99"}]}, "children": []},
+        ]}
+        assert add_rollups(root)["calls"] == 1
+        assert root["children"][0]["rollup"]["calls"] == 1
+
+    def test_subtree_without_evidence(self):
+        root = make_tree()
+        add_rollups(root)
+        assert root["children"][1]["rollup"] == EMPTY_ROLLUP
+        assert add_rollups({}) == EMPTY_ROLLUP
+
+    def test_baking_recomputes_rollups(self):
+        from bake_overlays import bake_company_data
+        root = make_tree()
+        add_rollups(root)
+        state = {"manual-map-overrides": {"a2": {"originalParent": "a", "newParent": "b", "savedAt": "t"}}}
+        baked = bake_company_data({"company": "Test", "root": root}, {"state": state})["root"]
+        assert baked["children"][0]["rollup"]["snippets"] == 3
+        assert baked["children"][1]["rollup"]["snippets"] == 1
+        assert root["children"][1]["rollup"] == EMPTY_ROLLUP